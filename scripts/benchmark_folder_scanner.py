@@ -0,0 +1,101 @@
+"""
+Script đo hiệu năng quét thư mục video trên cây thư mục giả lập
+(mặc định 100.000 file), so sánh cách quét cũ (os.walk hai lượt + getsize)
+với FolderScanner (scandir một lượt) và chế độ quét lại tăng dần.
+
+Cách dùng:
+    python scripts/benchmark_folder_scanner.py [--files 100000] [--per-dir 100] [--keep]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.folder_scanner import FolderScanner
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mkv', '.mov', '.webm', '.m4v', '.flv', '.wmv']
+OTHER_EXTENSIONS = ['.jpg', '.txt', '.srt']
+
+def build_tree(root, total_files, files_per_dir):
+    """Tạo cây thư mục giả lập, khoảng 1/3 số file là video"""
+    dir_count = max(1, total_files // files_per_dir)
+    created = 0
+    for d in range(dir_count):
+        # Hai cấp thư mục để có cả thư mục con lồng nhau
+        dir_path = os.path.join(root, f"group_{d // 32:04d}", f"dir_{d:05d}")
+        os.makedirs(dir_path, exist_ok=True)
+        for f in range(files_per_dir):
+            if created >= total_files:
+                return created
+            if f % 3 == 0:
+                ext = VIDEO_EXTENSIONS[f % len(VIDEO_EXTENSIONS)]
+            else:
+                ext = OTHER_EXTENSIONS[f % len(OTHER_EXTENSIONS)]
+            with open(os.path.join(dir_path, f"file_{f:04d}{ext}"), 'wb') as fh:
+                fh.write(b'\0' * (f % 7))
+            created += 1
+    return created
+
+def legacy_scan(folder_path):
+    """Cách quét cũ của refresh_folder_with_loading: đếm một lượt, thu thập một lượt"""
+    total = 0
+    for root, _, files in os.walk(folder_path):
+        for file in files:
+            if os.path.splitext(file)[1].lower() in VIDEO_EXTENSIONS:
+                total += 1
+
+    videos = []
+    for root, _, files in os.walk(folder_path):
+        for file in files:
+            if os.path.splitext(file)[1].lower() in VIDEO_EXTENSIONS:
+                file_path = os.path.join(root, file)
+                videos.append({"name": file, "path": file_path, "file_size_bytes": os.path.getsize(file_path)})
+    return videos
+
+def timed(label, func, *args):
+    """Chạy hàm và in thời gian thực hiện"""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed * 1000:10.1f} ms   ({len(result)} video)")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo hiệu năng FolderScanner")
+    parser.add_argument('--files', type=int, default=100000, help="Tổng số file giả lập")
+    parser.add_argument('--per-dir', type=int, default=100, help="Số file mỗi thư mục")
+    parser.add_argument('--keep', action='store_true', help="Giữ lại cây thư mục sau khi đo")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="scanner_bench_")
+    try:
+        start = time.perf_counter()
+        created = build_tree(root, args.files, args.per_dir)
+        print(f"Đã tạo {created} file trong {time.perf_counter() - start:.1f} s tại {root}\n")
+
+        legacy = timed("os.walk hai lượt + getsize (cách cũ)", legacy_scan, root)
+
+        scanner = FolderScanner(extensions=VIDEO_EXTENSIONS)
+        full = timed("FolderScanner.scan (một lượt scandir)", scanner.scan, root)
+        timed("FolderScanner.rescan (không thay đổi)", scanner.rescan, root)
+
+        # Thêm một file vào một thư mục: chỉ thư mục đó được đọc lại
+        some_dir = os.path.dirname(full[len(full) // 2]["path"])
+        with open(os.path.join(some_dir, "new_clip.mp4"), 'wb') as fh:
+            fh.write(b'\0')
+        changed = timed("FolderScanner.rescan (1 thư mục thay đổi)", scanner.rescan, root)
+
+        assert len(full) == len(legacy), "Số video không khớp với cách quét cũ"
+        assert len(changed) == len(full) + 1, "Quét tăng dần không phát hiện file mới"
+    finally:
+        if args.keep:
+            print(f"\nGiữ lại cây thư mục tại: {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
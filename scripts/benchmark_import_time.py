@@ -0,0 +1,84 @@
+"""
+Script đo thời gian import lúc khởi động bằng "python -X importtime" và kiểm tra
+ngân sách import: tổng thời gian import module khởi động (mặc định app.py) phải
+nhỏ hơn ngân sách, và các thư viện nặng (cv2, numpy, PIL, imagehash, telebot,
+telethon) không được nạp trước khi cửa sổ chính hiển thị.
+
+Trả về mã thoát 1 nếu vượt ngân sách hoặc có thư viện nặng bị nạp sớm.
+
+Cách dùng:
+    python scripts/benchmark_import_time.py [--module app] [--budget-ms 800] [--runs 3] [--top 15]
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC_DIR)
+
+from utils.lazy_import import HEAVY_MODULES
+
+# Dòng của -X importtime: "import time:   self [us] |  cumulative | tên module"
+LINE_PATTERN = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+def measure_imports(module):
+    """
+    Import module trong một tiến trình mới với -X importtime
+
+    Returns:
+        list: [(tên module, self us, cumulative us, độ sâu)] theo thứ tự import xong
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Không import được {module}:\n" + "\n".join(errors[-10:]))
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo thời gian import lúc khởi động")
+    parser.add_argument('--module', default="app", help="Module được import (tính từ thư mục src)")
+    parser.add_argument('--budget-ms', type=float, default=800, help="Ngân sách tổng thời gian import (ms)")
+    parser.add_argument('--runs', type=int, default=3, help="Số lần đo, lấy lần nhanh nhất")
+    parser.add_argument('--top', type=int, default=15, help="Số module chậm nhất được in ra")
+    args = parser.parse_args()
+
+    runs = [measure_imports(args.module) for _ in range(args.runs)]
+    # Lần nhanh nhất ít bị ảnh hưởng bởi cache đĩa và tải máy
+    entries = min(runs, key=lambda run: sum(entry[1] for entry in run))
+    total_ms = sum(entry[1] for entry in entries) / 1000
+
+    print(f"import {args.module}: {len(entries)} module, tổng {total_ms:.1f} ms "
+          f"(nhanh nhất trong {args.runs} lần)\n")
+
+    print(f"{'Module':<50} {'tự thân':>10} {'tích lũy':>10}")
+    slowest = sorted(entries, key=lambda entry: entry[2], reverse=True)
+    for name, self_us, cumulative_us, depth in [entry for entry in slowest if entry[3] == 0][:args.top]:
+        print(f"{name:<50} {self_us / 1000:8.1f} ms {cumulative_us / 1000:8.1f} ms")
+
+    loaded = {entry[0] for entry in entries}
+    eager = [name for name in HEAVY_MODULES if name in loaded or name.split('.')[0] in loaded]
+    print()
+    if eager:
+        print(f"Thư viện nặng bị nạp lúc khởi động: {', '.join(eager)}")
+    else:
+        print("Không có thư viện nặng nào bị nạp lúc khởi động")
+
+    within_budget = total_ms <= args.budget_ms
+    print(f"{'ĐẠT' if within_budget else 'VƯỢT'} ngân sách import {args.budget_ms:.0f} ms")
+    return 0 if within_budget and not eager else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
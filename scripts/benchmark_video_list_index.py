@@ -0,0 +1,83 @@
+"""
+Script đo hiệu năng sắp xếp và tìm kiếm khi gõ trên danh sách video giả lập
+(mặc định 50.000 video), so sánh cách cũ (sắp xếp lại và duyệt toàn bộ tên
+ở mỗi lần gõ) với VideoListIndex. Mục tiêu: dưới 16 ms cho mỗi phím gõ.
+
+Cách dùng:
+    python scripts/benchmark_video_list_index.py [--videos 50000] [--query "beach_wedding"]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.video_list_index import VideoListIndex, SORT_NAME, SORT_SIZE
+
+WORDS = ["holiday", "beach", "family", "trip", "birthday", "party", "wedding", "concert",
+         "clip", "raw", "final", "edit", "export", "camera", "phone", "drone"]
+STATUSES = ["new", "uploaded", "duplicate"]
+
+def make_videos(count):
+    """Tạo danh sách video giả lập"""
+    rng = random.Random(42)
+    return [{
+        "name": f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{i:06d}.mp4",
+        "path": f"/videos/{i:06d}.mp4",
+        "file_size_bytes": rng.randint(1, 4 * 1024 ** 3),
+        "duration": rng.random() * 3600,
+        "mtime": rng.random() * 1e9,
+        "status": rng.choice(STATUSES)
+    } for i in range(count)]
+
+def timed(func, *args):
+    """Chạy hàm, trả về (kết quả, thời gian ms)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+def legacy_filter(videos, text):
+    """Cách lọc cũ của filter_videos: duyệt toàn bộ tên ở mỗi lần gõ"""
+    text = text.lower()
+    return [v for v in videos if text in v["name"].lower()]
+
+def type_query(label, filter_func, query):
+    """Gõ từng ký tự của truy vấn và in thời gian mỗi phím"""
+    times = []
+    for end in range(1, len(query) + 1):
+        result, elapsed = timed(filter_func, query[:end])
+        times.append(elapsed)
+    print(f"{label:<40} tối đa {max(times):7.2f} ms   trung bình {sum(times) / len(times):7.2f} ms"
+          f"   ({len(result)} kết quả)")
+    return max(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo hiệu năng VideoListIndex")
+    parser.add_argument('--videos', type=int, default=50000, help="Số video giả lập")
+    parser.add_argument('--query', default="beach_wedding", help="Truy vấn được gõ từng ký tự")
+    args = parser.parse_args()
+
+    videos = make_videos(args.videos)
+    print(f"{len(videos)} video, truy vấn '{args.query}'\n")
+
+    _, elapsed = timed(lambda: sorted(videos, key=lambda v: v["name"].lower()))
+    print(f"{'sorted() theo tên (cách cũ)':<40} {elapsed:10.2f} ms")
+
+    index, elapsed = timed(VideoListIndex, videos)
+    print(f"{'Xây dựng chỉ mục':<40} {elapsed:10.2f} ms")
+    _, elapsed = timed(index.sorted, SORT_NAME)
+    print(f"{'VideoListIndex.sorted (lần đầu)':<40} {elapsed:10.2f} ms")
+    _, elapsed = timed(index.sorted, SORT_NAME)
+    print(f"{'VideoListIndex.sorted (đã lưu)':<40} {elapsed:10.2f} ms\n")
+
+    type_query("Duyệt toàn bộ mỗi phím (cách cũ)", lambda q: legacy_filter(videos, q), args.query)
+    index.sorted(SORT_SIZE, True)
+    worst = type_query("VideoListIndex.filter (theo kích thước)",
+                       lambda q: index.filter(q, SORT_SIZE, True), args.query)
+
+    print(f"\n{'ĐẠT' if worst < 16 else 'CHƯA ĐẠT'} mục tiêu 16 ms mỗi phím")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Script đo độ trễ làm mới danh sách video phân trang (update_video_list_ui)
+khi lật trang liên tục (mặc định 1.000 lần), so sánh cách cũ (4 lần findChild
+và unpolish/polish cho mỗi hàng ở mỗi lần làm mới) với bảng widget dựng sẵn
+và polish lại theo lô.
+
+Chỉ đo phần danh sách video: thanh phân trang không được tải.
+
+Cách dùng:
+    python scripts/benchmark_video_list_refresh.py [--videos 5000] [--flips 1000]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+# Chạy được cả khi không có màn hình
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtWidgets, uic
+
+from ui.main_tab.main_ui_init import fix_ui_file, build_video_row_registry
+from ui.main_tab.main_ui_video import update_video_list_ui, update_selection_count, format_file_size
+
+UI_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'ui', 'qt_designer', 'main_tab', 'video_list.ui')
+STATUSES = ["new", "uploaded", "duplicate"]
+
+class ListHost:
+    """Đối tượng tối thiểu thay cho MainUI, chỉ có những gì update_video_list_ui cần"""
+    update_video_list_ui = update_video_list_ui
+    update_selection_count = update_selection_count
+    format_file_size = format_file_size
+    build_video_row_registry = build_video_row_registry
+
+    def __init__(self, videos):
+        self.video_list = QtWidgets.QWidget()
+        uic.loadUi(fix_ui_file(self, UI_PATH), self.video_list)
+        self.video_list.show()
+        self.video_rows = self.build_video_row_registry(self.video_list)
+        self.page_videos = []
+        self.selection_label = QtWidgets.QLabel()
+        self.all_videos = videos
+        self.current_page = 1
+
+    def request_visible_metadata(self, videos):
+        pass
+
+    def _update_pagination_ui(self, total_pages):
+        pass
+
+def legacy_refresh(host):
+    """Cách làm mới cũ: tìm lại widget và polish lại nhãn trạng thái của mọi hàng"""
+    start_idx = (host.current_page - 1) * 10
+    current_videos = host.all_videos[start_idx:start_idx + 10]
+    for i in range(1, 11):
+        row = host.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}")
+        label = host.video_list.findChild(QtWidgets.QLabel, f"label{i}")
+        status = host.video_list.findChild(QtWidgets.QLabel, f"status{i}")
+        checkbox = host.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
+        if i <= len(current_videos):
+            video = current_videos[i - 1]
+            row.setVisible(True)
+            label.setText(video["name"])
+            status.setProperty("class", {"new": "statusNew", "uploaded": "statusUploaded",
+                                         "duplicate": "statusDuplicate"}[video["status"]])
+            status.style().unpolish(status)
+            status.style().polish(status)
+            checkbox.setChecked(video["status"] == "new")
+        else:
+            row.setVisible(False)
+
+def measure(label, app, host, refresh, flips):
+    """Lật trang liên tục và in độ trễ mỗi lần làm mới"""
+    total_pages = (len(host.all_videos) + 9) // 10
+    samples = []
+    for flip in range(flips):
+        host.current_page = flip % total_pages + 1
+        start = time.perf_counter()
+        refresh(host)
+        app.processEvents()  # Bao gồm cả việc vẽ lại
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    print(f"{label:<40} trung bình {statistics.mean(samples):7.3f} ms   "
+          f"p95 {samples[int(len(samples) * 0.95)]:7.3f} ms   tổng {sum(samples):8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo độ trễ làm mới danh sách video")
+    parser.add_argument('--videos', type=int, default=5000, help="Số video giả lập")
+    parser.add_argument('--flips', type=int, default=1000, help="Số lần lật trang")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    # Trạng thái xen kẽ để nhãn trạng thái đổi class ở hầu hết các lần lật trang
+    videos = [{
+        "name": f"video_{i:06d}.mp4",
+        "path": f"/videos/video_{i:06d}.mp4",
+        "file_size_bytes": i * 1024,
+        "status": STATUSES[(i // 7) % len(STATUSES)]
+    } for i in range(args.videos)]
+
+    print(f"{args.videos} video, {args.flips} lần lật trang\n")
+    measure("findChild + polish mỗi hàng (cách cũ)", app, ListHost(videos), legacy_refresh, args.flips)
+    measure("update_video_list_ui", app, ListHost(videos), ListHost.update_video_list_ui, args.flips)
+
+if __name__ == "__main__":
+    main()
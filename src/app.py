@@ -6,7 +6,9 @@ Main application to upload videos to Telegram with advanced features.
 """
 import os
 import sys
+import time
 import logging
+import threading
 from queue import Queue
 import traceback
 import platform
@@ -29,19 +31,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger("TelegramUploader")
 
-# Thiết lập SSL sớm trước khi import Telethon
-from utils.ssl_helper import setup_ssl
+# Thời điểm bắt đầu khởi động (đo thời gian đến khi cửa sổ chính hiển thị)
+startup_started = time.perf_counter()
 
-# Kiểm tra và thiết lập SSL (quan trọng cho Telethon trên Windows)
-try:
-    ssl_ready = setup_ssl()
-    if ssl_ready:
-        logger.info("SSL được cấu hình thành công")
-    else:
-        logger.warning("Không thể cấu hình SSL, Telethon có thể hoạt động chậm hơn")
-except Exception as e:
-    logger.error(f"Lỗi khi thiết lập SSL: {str(e)}")
-    logger.error(traceback.format_exc())
+from utils.startup_fingerprint import StartupFingerprint
+from utils.lazy_import import warm_up
+from utils.ssl_helper import setup_ssl
 
 # Import FFmpeg Manager
 from utils.ffmpeg_manager import FFmpegManager
@@ -57,12 +52,49 @@ from utils.telegram.telegram_connector import TelegramConnector
 # Import utilities
 from utils.video_analyzer import VideoAnalyzer
 from utils.upload_history import UploadHistory
+from utils.upload_job_queue import UploadJobQueue, STATUS_PENDING, SOURCE_BULK
 
 # Import các module mới
 from utils.disk_space_checker import DiskSpaceChecker
 from utils.update_checker import UpdateChecker
 from utils.performance_optimizer import PerformanceOptimizer
 
+def prepare_startup():
+    """
+    Kiểm tra dấu vân tay môi trường và thiết lập SSL (trước khi Telethon được nạp).
+    Nếu môi trường không đổi từ lần khởi động đầy đủ gần nhất, bỏ qua các bước kiểm tra
+    (SSL, splash screen) để kiểm tra lại trong nền sau khi cửa sổ chính đã hiển thị.
+    
+    Returns:
+        tuple: (StartupFingerprint, True nếu khởi động nhanh được)
+    """
+    startup_fingerprint = StartupFingerprint()
+    warm_start = startup_fingerprint.matches()
+    
+    # Kiểm tra và thiết lập SSL (quan trọng cho Telethon trên Windows)
+    if warm_start:
+        logger.info("Môi trường khởi động không đổi, SSL sẽ được kiểm tra lại trong nền")
+    else:
+        try:
+            ssl_ready = setup_ssl()
+            if ssl_ready:
+                logger.info("SSL được cấu hình thành công")
+            else:
+                logger.warning("Không thể cấu hình SSL, Telethon có thể hoạt động chậm hơn")
+        except Exception as e:
+            logger.error(f"Lỗi khi thiết lập SSL: {str(e)}")
+            logger.error(traceback.format_exc())
+    
+    return startup_fingerprint, warm_start
+
+class UiInvoker(QtCore.QObject):
+    """Chạy một hàm trên luồng giao diện (phát tín hiệu từ luồng phụ sẽ được xếp hàng)"""
+    call = QtCore.pyqtSignal(object)
+    
+    def __init__(self):
+        super().__init__()
+        self.call.connect(lambda func: func())
+
 class TelegramUploaderApp:
     """
     Main application for uploading videos to Telegram.
@@ -71,6 +103,9 @@ class TelegramUploaderApp:
         """
         Initialize the application.
         """
+        # Dấu vân tay môi trường khởi động, thiết lập SSL nếu cần
+        self.startup_fingerprint, self.warm_start = prepare_startup()
+        
         self.app = None
         self.main_window = None
         self.is_uploading = False
@@ -78,6 +113,7 @@ class TelegramUploaderApp:
         
         # Khởi tạo ứng dụng Qt trước khi tiếp tục
         self.app = QtWidgets.QApplication(sys.argv)
+        self.ui_invoker = UiInvoker()
         
         # Khởi tạo FFmpeg Manager
         self.ffmpeg_manager = FFmpegManager()
@@ -100,12 +136,21 @@ class TelegramUploaderApp:
         app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         data_dir = os.path.join(app_root, 'data')
         os.makedirs(data_dir, exist_ok=True)  # Đảm bảo thư mục data tồn tại
-        history_file = os.path.join(data_dir, 'upload_history.json')
-        self.upload_history = UploadHistory(history_file)
+        # Lịch sử lưu trong SQLite, dữ liệu upload_history.json cũ được chuyển sang ở lần chạy đầu.
+        # Các thay đổi được gom và ghi nền, close() khi thoát sẽ ghi nốt phần còn lại
+        history_file = os.path.join(data_dir, 'upload_history.db')
+        try:
+            retention_days = int(self.config['SETTINGS'].get('history_retention_days', '365'))
+        except (KeyError, ValueError):
+            retention_days = 365
+        self.upload_history = UploadHistory(history_file, write_behind=True, retention_days=retention_days)
         
         # Initialize task queue
         self.task_queue = Queue()
         
+        # Hàng đợi tải lên bền vững (khôi phục công việc dang dở khi khởi động)
+        self.upload_job_queue = UploadJobQueue(os.path.join(data_dir, 'upload_jobs.db'))
+        
         # Khởi tạo các module tiện ích mới
         self.disk_checker = DiskSpaceChecker()
         self.update_checker = UpdateChecker()
@@ -203,6 +248,12 @@ class TelegramUploaderApp:
         # Save configuration
         self.config_manager.save_config(self.config)
         
+        # Dừng tải lên hàng loạt nền trước khi ngắt kết nối và đóng lịch sử/hàng đợi:
+        # chờ video đang tải lên xong để kết quả được ghi lại (các video còn lại
+        # được tiếp tục ở lần chạy sau)
+        if getattr(self, 'bulk_uploader', None):
+            self.bulk_uploader.stop(wait=True)
+        
         # Disconnect APIs
         if hasattr(self, 'telegram_api') and self.telegram_api:
             self.telegram_api.disconnect()
@@ -210,6 +261,22 @@ class TelegramUploaderApp:
         if hasattr(self, 'telethon_uploader') and self.telethon_uploader:
             self.telethon_uploader.disconnect()
         
+        # Dừng lượt quét thư mục đang chạy nền
+        if hasattr(self, 'main_tab') and self.main_tab:
+            self.main_tab.cancel_folder_scan(wait=True)
+        
+        # Đóng lịch sử tải lên
+        if hasattr(self, 'upload_history') and self.upload_history:
+            self.upload_history.close()
+        
+        # Đóng hàng đợi tải lên (các công việc chưa xong sẽ được tiếp tục ở lần chạy sau)
+        if hasattr(self, 'upload_job_queue') and self.upload_job_queue:
+            self.upload_job_queue.close()
+        
+        # Dừng dọn dẹp cache nền
+        if hasattr(self, 'performance_optimizer') and self.performance_optimizer:
+            self.performance_optimizer.stop_cache_maintenance()
+        
         # Accept close event
         event.accept()
     
@@ -224,6 +291,14 @@ class TelegramUploaderApp:
         Chạy ứng dụng và hiển thị giao diện người dùng
         """
         try:
+            # Khởi động nhanh: môi trường không đổi và Telegram đã cấu hình xong
+            if self.warm_start and self.ffmpeg_manager.is_available and self._is_telegram_ready():
+                self.on_splash_screen_finished(True)
+                logger.info(f"Khởi động nhanh: cửa sổ chính hiển thị sau "
+                            f"{(time.perf_counter() - startup_started) * 1000:.0f} ms")
+                self._revalidate_startup_in_background()
+                return self.app.exec()
+
             # Hiển thị splash screen
             self.splash_screen = show_splash_screen(self.app, self.ffmpeg_manager)
             
@@ -250,6 +325,114 @@ class TelegramUploaderApp:
             
             return 1
             
+    def _resume_bulk_uploads(self):
+        """Tiếp tục tải lên hàng loạt còn dang dở từ phiên trước (không quét lại thư mục)"""
+        if not self.upload_job_queue.count(STATUS_PENDING, source=SOURCE_BULK):
+            return
+        from utils.auto_uploader import BulkUploader, AppVideoSender
+        self.bulk_uploader = BulkUploader(AppVideoSender(self), self.video_analyzer, self.upload_history,
+                                          job_queue=self.upload_job_queue)
+        self.bulk_uploader.resume()
+    
+    def _is_telegram_ready(self):
+        """
+        Kiểm tra cấu hình Telegram có đủ để bỏ qua bước cấu hình của splash screen không
+
+        Returns:
+            bool: True nếu đã có bot token và chat id, hoặc Telethon đã xác thực OTP
+        """
+        try:
+            config = self.config
+            if config.get('TELEGRAM', 'bot_token', fallback='') and config.get('TELEGRAM', 'chat_id', fallback=''):
+                return True
+            return bool(
+                config.get('TELETHON', 'api_id', fallback='')
+                and config.get('TELETHON', 'api_hash', fallback='')
+                and config.getboolean('TELETHON', 'otp_verified', fallback=False)
+            )
+        except Exception as e:
+            logger.error(f"Lỗi khi đọc cấu hình Telegram: {str(e)}")
+            return False
+
+    def _revalidate_startup_in_background(self):
+        """
+        Chạy lại trong nền các kiểm tra đã bỏ qua khi khởi động nhanh: SSL, dấu vân tay,
+        không gian lưu trữ, cập nhật và tối ưu hóa. Nếu môi trường không còn khớp, dấu vân
+        tay bị xóa để lần sau chạy đầy đủ splash screen.
+        """
+        def revalidate():
+            try:
+                setup_ssl()
+                self.startup_fingerprint.revalidate(self.ffmpeg_manager.get_ffmpeg_path())
+            except Exception as e:
+                logger.error(f"Lỗi khi kiểm tra lại môi trường khởi động: {str(e)}")
+                self.startup_fingerprint.invalidate()
+
+            try:
+                space_info = self.disk_checker.check_all()
+                self.ui_invoker.call.emit(lambda: self._show_disk_space_warnings(space_info))
+            except Exception as e:
+                logger.error(f"Lỗi khi kiểm tra không gian lưu trữ: {str(e)}")
+
+        threading.Thread(target=revalidate, name="StartupRevalidate", daemon=True).start()
+
+        # Kiểm tra cập nhật như bước của splash screen, kết quả hiển thị trên luồng giao diện
+        self.update_checker.check_for_updates_async(
+            callback=lambda result: self.ui_invoker.call.emit(lambda: self._show_update_result(result))
+        )
+
+        # Dọn dẹp cache/log/temp như bước cuối của splash screen
+        self.performance_optimizer.optimize_async()
+
+    def _show_disk_space_warnings(self, space_info):
+        """
+        Cảnh báo nếu thiếu không gian trống hoặc không có quyền ghi (như splash screen)
+
+        Args:
+            space_info (dict): Kết quả DiskSpaceChecker.check_all()
+        """
+        free = space_info['disk_space']['formatted']['free']
+        if not space_info['has_sufficient_space']:
+            QtWidgets.QMessageBox.warning(
+                self.main_window,
+                "Cảnh báo không gian lưu trữ",
+                f"Cảnh báo: Không gian trống ({free}) thấp hơn yêu cầu tối thiểu (1GB)\n\n"
+                f"Ứng dụng có thể không hoạt động đúng cách.\nVui lòng giải phóng thêm không gian đĩa."
+            )
+        if not space_info['write_permission']:
+            QtWidgets.QMessageBox.warning(
+                self.main_window,
+                "Cảnh báo quyền ghi",
+                "Cảnh báo: Không có quyền ghi vào thư mục làm việc\n\n"
+                "Ứng dụng có thể không hoạt động đúng cách.\nVui lòng chạy ứng dụng với quyền admin hoặc kiểm tra lại quyền truy cập."
+            )
+
+    def _show_update_result(self, result):
+        """
+        Thông báo nếu có phiên bản mới (như splash screen)
+
+        Args:
+            result (dict): Kết quả UpdateChecker.check_for_updates()
+        """
+        if 'error' in result:
+            logger.error(f"Lỗi kiểm tra cập nhật: {result['error']}")
+            return
+        if not result.get('has_update'):
+            return
+
+        update_msg = f"Có phiên bản mới: {result['latest_version']} (hiện tại: {result['current_version']})"
+        reply = QtWidgets.QMessageBox.information(
+            self.main_window,
+            "Cập nhật mới",
+            f"{update_msg}\n\n{result.get('update_notes', '')}\n\nBạn có muốn tải cập nhật không?",
+            QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
+            QtWidgets.QMessageBox.StandardButton.No
+        )
+        if reply == QtWidgets.QMessageBox.StandardButton.Yes:
+            import webbrowser
+            webbrowser.open(result['update_url'])
+            self.update_checker.mark_as_notified()
+
     def setup_ui(self):
         """Set up application UI - only create the main window, don't show it yet"""
         try:
@@ -283,9 +466,7 @@ class TelegramUploaderApp:
             
             # Đóng splash screen
             if hasattr(self, 'splash_screen') and self.splash_screen:
-                # Tắt các timer trước khi đóng
-                if hasattr(self.splash_screen, 'process_timer') and self.splash_screen.process_timer.isActive():
-                    self.splash_screen.process_timer.stop()
+                # Tắt timer trạng thái FFmpeg trước khi đóng
                 if hasattr(self.splash_screen, 'ffmpeg_status_timer') and self.splash_screen.ffmpeg_status_timer.isActive():
                     self.splash_screen.ffmpeg_status_timer.stop()
                 
@@ -301,10 +482,21 @@ class TelegramUploaderApp:
             # Đảm bảo cửa sổ chính được hiển thị
             # Xử lý sự kiện và cập nhật giao diện
             QtWidgets.QApplication.processEvents()
+
+            # Nạp sẵn trong nền các thư viện nặng (cv2, telethon...) đã được hoãn lúc khởi động
+            warm_up()
+            
+            # Dọn dẹp cache định kỳ trong nền theo ngân sách từng loại
+            self.performance_optimizer.start_cache_maintenance()
             
             # Kiểm tra nếu cần hiển thị dialog cấu hình Telegram
             if not self.telegram_configured:
                 self.show_telegram_config_dialog()
+            elif hasattr(self, 'main_tab'):
+                # Tiếp tục các video tải lên còn dang dở từ phiên trước
+                from utils.main_tab import resume_pending_uploads
+                resume_pending_uploads(self.main_tab)
+                self._resume_bulk_uploads()
             
             logging.info("Đã khởi động ứng dụng thành công với giao diện Qt")
         except Exception as e:
@@ -82,6 +82,12 @@ class AutoUploaderManager:
         # Lấy danh sách phần mở rộng
         extensions = app.config['SETTINGS']['video_extensions'].split(',')
         
+        # Thời gian file phải không thay đổi trước khi tải lên (tránh tải file đang ghi dở)
+        try:
+            settle_time = float(app.config['SETTINGS'].get('auto_settle_time', '5'))
+        except ValueError:
+            settle_time = 5
+        
         # Cập nhật trạng thái giao diện
         app.auto_upload_active = True
         app.start_auto_btn.config(state=tk.DISABLED)
@@ -107,7 +113,8 @@ class AutoUploaderManager:
             extensions=extensions,
             check_interval=check_interval,
             check_duplicates=app.auto_check_duplicates_var.get(),
-            check_history=app.auto_check_history_var.get()
+            check_history=app.auto_check_history_var.get(),
+            settle_time=settle_time
         )
         
         # Lưu cài đặt
@@ -52,7 +52,10 @@ class ConfigManager:
                 'delay_between_uploads': '5',
                 'auto_mode': 'false',
                 'check_duplicates': 'true',
-                'auto_check_interval': '60'  # Thời gian kiểm tra tự động (giây)
+                'auto_check_interval': '60',  # Thời gian kiểm tra tự động (giây)
+                'auto_settle_time': '5',  # Thời gian file phải không đổi trước khi tự động tải lên (giây)
+                'history_retention_days': '365',  # Lịch sử cũ hơn số ngày này được nén vào kho lưu trữ (0: không giới hạn)
+                'video_list_mode': 'virtual'  # Danh sách video: virtual (cuộn liên tục) hoặc paged (phân trang)
             }
             config['TELETHON'] = {
                 'api_id': '',
@@ -5,7 +5,6 @@ import logging
 import os
 import tempfile
 import math
-import numpy as np
 import time
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve
@@ -11,6 +11,8 @@ from PyQt5 import QtWidgets, QtCore, QtGui
 # Import UI components
 from ui.components.loading_overlay import LoadingOverlay
 from ui.components.play_button import PlayButton
+from utils.folder_scanner import FolderScanner
+from utils.video_list_index import VideoListIndex
 
 # Import UI initialization methods
 from ui.main_tab.main_ui_init import (
@@ -23,6 +25,9 @@ from ui.main_tab.main_ui_init import (
     load_folder_selection,
     load_sub_tabs,
     load_video_list,
+    build_video_row_registry,
+    get_video_list_mode,
+    setup_virtual_video_list,
     load_video_preview,
     load_video_frames,
     load_action_bar
@@ -45,6 +50,14 @@ from ui.main_tab.main_ui_folder import (
     browse_folder,
     refresh_folder,
     refresh_folder_with_loading,
+    cancel_folder_scan,
+    _is_current_scan,
+    on_scan_batch,
+    request_visible_metadata,
+    on_scan_finished,
+    on_scan_metadata,
+    on_scan_error,
+    on_scan_worker_finished,
     show_loading_overlay,
     load_recent_folder,
     load_recent_folders_from_config,
@@ -58,6 +71,9 @@ from ui.main_tab.main_ui_folder import (
 # Import video management methods
 from ui.main_tab.main_ui_video import (
     update_video_list_ui,
+    update_virtual_video_list,
+    request_virtual_visible_metadata,
+    on_virtual_row_clicked,
     debug_video_list_issue,
     update_selection_count,
     format_file_size,
@@ -72,6 +88,7 @@ from ui.main_tab.main_ui_video import (
     initialize_sort_dropdown,
     sort_videos,
     filter_videos,
+    _sync_video_index,
     update_pagination_ui,
     handle_page_change,
     go_to_page,
@@ -108,6 +125,18 @@ class MainUI(QtWidgets.QMainWindow):
         self.current_page = 1  # Current pagination page
         self.selected_video_count = 0  # Number of selected videos
         self.selected_videos_size = 0  # Total size of selected videos
+        self.folder_scanner = FolderScanner()  # Recursive scanner with per-directory cache
+        self.scan_thread = None  # QThread running the folder scan
+        self.retired_scans = []  # (QThread, worker) of cancelled scans still finishing
+        self.scan_worker = None  # FolderScanWorker of the current scan
+        self.scan_index = {}  # Maps video paths to their info dictionaries
+        self.video_index = VideoListIndex()  # Sort keys and name search index of all_videos
+        self.sort_key = None  # Current sort key (None: scan order)
+        self.sort_reverse = False  # Whether the current sort is descending
+        self.video_rows = []  # (row, label, status, checkbox) widgets of the paginated list
+        self.page_videos = []  # Videos shown in the rows of the current page
+        self.video_list_model = None  # VideoListModel when the virtualised list is used
+        self.video_list_view = None  # QListView showing video_list_model
 
         # Khởi tạo pagination manager
         self.pagination_manager = None
@@ -168,6 +197,9 @@ class MainUI(QtWidgets.QMainWindow):
     load_folder_selection = load_folder_selection
     load_sub_tabs = load_sub_tabs
     load_video_list = load_video_list
+    build_video_row_registry = build_video_row_registry
+    get_video_list_mode = get_video_list_mode
+    setup_virtual_video_list = setup_virtual_video_list
     load_video_preview = load_video_preview
     load_video_frames = load_video_frames
     load_action_bar = load_action_bar
@@ -186,6 +218,14 @@ class MainUI(QtWidgets.QMainWindow):
     browse_folder = browse_folder
     refresh_folder = refresh_folder
     refresh_folder_with_loading = refresh_folder_with_loading
+    cancel_folder_scan = cancel_folder_scan
+    _is_current_scan = _is_current_scan
+    on_scan_batch = on_scan_batch
+    request_visible_metadata = request_visible_metadata
+    on_scan_finished = on_scan_finished
+    on_scan_metadata = on_scan_metadata
+    on_scan_error = on_scan_error
+    on_scan_worker_finished = on_scan_worker_finished
     show_loading_overlay = show_loading_overlay
     load_recent_folder = load_recent_folder
     load_recent_folders_from_config = load_recent_folders_from_config
@@ -197,6 +237,9 @@ class MainUI(QtWidgets.QMainWindow):
     
     # Video management
     update_video_list_ui = update_video_list_ui
+    update_virtual_video_list = update_virtual_video_list
+    request_virtual_visible_metadata = request_virtual_visible_metadata
+    on_virtual_row_clicked = on_virtual_row_clicked
     debug_video_list_issue = debug_video_list_issue
     update_selection_count = update_selection_count
     format_file_size = format_file_size
@@ -211,6 +254,7 @@ class MainUI(QtWidgets.QMainWindow):
     initialize_sort_dropdown = initialize_sort_dropdown
     sort_videos = sort_videos
     filter_videos = filter_videos
+    _sync_video_index = _sync_video_index
     _update_pagination_ui = update_pagination_ui
     handle_page_change = handle_page_change
     go_to_page = go_to_page
@@ -3,11 +3,18 @@ Folder management methods for the MainUI class
 """
 import os
 import logging
-import time
 import traceback
 from PyQt5 import QtWidgets, QtCore
 
-from utils.main_tab import refresh_video_list, clear_video_preview, clear_video_frames
+from utils.video_list_index import SORT_DURATION, SORT_STATUS
+from utils.ffmpeg_registry import get_registry
+from utils.main_tab import (
+    FolderScanWorker,
+    check_duplicates,
+    check_upload_history,
+    clear_video_preview,
+    clear_video_frames
+)
 
 logger = logging.getLogger(__name__)
 
@@ -101,120 +108,231 @@ def refresh_folder(self):
     # Hiển thị overlay loading
     self.show_loading_overlay("Đang quét thư mục video...", show_spinner=True)
     
-    # Sử dụng QTimer để tránh đóng băng UI
-    QtCore.QTimer.singleShot(100, self.refresh_folder_with_loading)
+    # Bắt đầu quét ở vòng lặp sự kiện kế tiếp để overlay kịp hiển thị
+    QtCore.QTimer.singleShot(0, self.refresh_folder_with_loading)
 
 def refresh_folder_with_loading(self):
-    """Làm mới thư mục với hiệu ứng loading - CẢI TIẾN"""
-    self.update_video_list_ui()
-    self.debug_video_list_issue()
+    """Quét thư mục trong thread nền, danh sách video được cập nhật theo từng đợt"""
+    folder_path = self.folder_path_edit.text()
+    
+    # Dừng lượt quét trước nếu vẫn đang chạy
+    self.cancel_folder_scan()
+    
+    if not folder_path or not os.path.isdir(folder_path):
+        logger.error(f"Thư mục không hợp lệ: {folder_path}")
+        self.loading_overlay.hide()
+        QtWidgets.QMessageBox.warning(self, "Lỗi", "Thư mục không hợp lệ hoặc không tồn tại!")
+        return
+    
     try:
-        # Đặt con trỏ wait
-        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
-        
-        folder_path = self.folder_path_edit.text()
-        
-        # Hiển thị đang quét video
-        self.loading_overlay.set_message(f"Đang quét video trong thư mục...\n{folder_path}")
-        QtWidgets.QApplication.processEvents()
-        
-        # Đếm số file trong thư mục 
-        video_count = self.count_video_files(folder_path)
-        
-        # Hiển thị số lượng video đã tìm thấy
-        self.loading_overlay.set_message(f"Đã tìm thấy {video_count} video.\nĐang phân tích...")
-        QtWidgets.QApplication.processEvents()
-        
-        # Nếu có nhiều file, xử lý từng batch
-        if video_count > 100:
-            # Tạo progress dialog
-            progress_dialog = QtWidgets.QProgressDialog(
-                f"Đang quét {video_count} video trong thư mục...", 
-                "Hủy", 0, 100, self
-            )
-            progress_dialog.setWindowTitle("Đang tải danh sách video")
-            progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
-            progress_dialog.show()
-            
-            # Sử dụng hàm tiện ích để làm mới danh sách video với báo cáo tiến trình
-            self.all_videos = []
-            
-            # Xử lý file theo batch
-            total_files = 0
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    ext = os.path.splitext(file)[1].lower()
-                    if ext in ['.mp4', '.avi', '.mkv', '.mov', '.webm', '.m4v', '.flv', '.wmv']:
-                        total_files += 1
-            
-            processed_files = 0
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    ext = os.path.splitext(file)[1].lower()
-                    if ext in ['.mp4', '.avi', '.mkv', '.mov', '.webm', '.m4v', '.flv', '.wmv']:
-                        file_path = os.path.join(root, file)
-                        video_info = {
-                            "name": file,
-                            "path": file_path,
-                            "status": "new",
-                            "file_size_bytes": os.path.getsize(file_path)
-                        }
-                        self.all_videos.append(video_info)
-                        
-                        processed_files += 1
-                        progress = int((processed_files / total_files) * 100)
-                        progress_dialog.setValue(progress)
-                        
-                        # Cập nhật loading overlay
-                        self.loading_overlay.set_message(f"Đã quét {processed_files}/{total_files} video...")
-                        QtWidgets.QApplication.processEvents()
-                        
-                        if progress_dialog.wasCanceled():
-                            break
-                    
-                    if progress_dialog.wasCanceled():
-                        break
-                
-                if progress_dialog.wasCanceled():
-                    break
-            
-            progress_dialog.close()
-        else:
-            # Sử dụng hàm tiện ích để làm mới danh sách video
-            self.all_videos = refresh_video_list(self, folder_path)
-        
-        # Kiểm tra nếu có FFmpeg để hiển thị frames
-        has_ffmpeg = self.check_ffmpeg_installed()
-        if not has_ffmpeg:
-            self.loading_overlay.set_message("Đang hoàn tất... (FFmpeg không có sẵn, không thể trích xuất khung hình)")
-            QtWidgets.QApplication.processEvents()
-            time.sleep(1)  # Cho phép người dùng đọc thông báo
-        
-        # Cập nhật từ điển video
+        # Xóa danh sách cũ
+        self.all_videos = []
         self.videos = {}
-        for video in self.all_videos:
-            self.videos[video["name"]] = video["path"]
-        
-        # Reset bộ đếm lựa chọn
+        self.scan_index = {}  # Ánh xạ đường dẫn -> thông tin video để cập nhật metadata
+        self.video_index.clear()  # Chỉ mục sắp xếp/tìm kiếm được xây dựng dần theo từng đợt
+        self.sort_key = None  # Danh sách mới theo thứ tự quét
         self.selected_video_count = 0
         self.selected_videos_size = 0
-        
-        # Cập nhật UI
         self.update_video_list_ui()
         
-        # Lưu thư mục vào danh sách gần đây
-        self.add_to_recent_folders(folder_path)
+        self.loading_overlay.set_message(f"Đang quét video trong thư mục...\n{folder_path}")
+        
+        # Ghi nhớ các tùy chọn kiểm tra tại thời điểm bắt đầu quét
+        self.scan_check_duplicates = bool(getattr(self, 'duplicate_check_box', None) and self.duplicate_check_box.isChecked())
+        self.scan_check_history = bool(getattr(self, 'history_check_box', None) and self.history_check_box.isChecked())
+        
+        # Worker chạy trong QThread riêng, kết quả được gửi về UI qua signal
+        self.scan_thread = QtCore.QThread()
+        self.scan_worker = FolderScanWorker(
+            folder_path,
+            self.folder_scanner,
+            probe_metadata=True,
+            compute_hash=self.scan_check_duplicates or self.scan_check_history
+        )
+        self.scan_worker.moveToThread(self.scan_thread)
+        
+        # Kết nối các tín hiệu
+        self.scan_thread.started.connect(self.scan_worker.run)
+        self.scan_worker.batch_ready.connect(self.on_scan_batch)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.metadata_ready.connect(self.on_scan_metadata)
+        self.scan_worker.error.connect(self.on_scan_error)
+        self.scan_worker.finished.connect(self.on_scan_worker_finished)
+        self.scan_worker.finished.connect(self.scan_thread.quit)
+        
+        # Bắt đầu quét
+        self.scan_thread.start()
         
     except Exception as e:
         logger.error(f"Lỗi khi làm mới thư mục: {str(e)}")
         logger.error(traceback.format_exc())
+        self.loading_overlay.hide()
         
         # Hiển thị thông báo lỗi
         QtWidgets.QMessageBox.critical(self, "Lỗi", f"Không thể quét thư mục: {str(e)}")
-    finally:
-        # Khôi phục con trỏ và ẩn loading overlay
-        QtWidgets.QApplication.restoreOverrideCursor()
+
+def cancel_folder_scan(self, wait=False):
+    """
+    Dừng lượt quét thư mục đang chạy (nếu có) mà không chặn UI: thread tự kết thúc
+    sau file đang đọc dở, kết quả còn lại của lượt cũ bị bỏ qua
+    
+    Args:
+        wait: Chờ thread kết thúc (khi đóng ứng dụng)
+    """
+    worker = getattr(self, 'scan_worker', None)
+    thread = getattr(self, 'scan_thread', None)
+    self.scan_worker = None
+    self.scan_thread = None
+    
+    if worker is not None:
+        worker.stop()
+        # Ngắt kết nối với UI, chỉ giữ finished -> thread.quit
+        for signal in (worker.batch_ready, worker.scan_finished, worker.metadata_ready, worker.error):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
+    
+    if thread is None or thread.isFinished():
+        return
+    
+    if wait:
+        thread.quit()
+        thread.wait()
+        return
+    
+    # Giữ tham chiếu tới khi thread kết thúc để Qt không hủy thread đang chạy
+    retired = self.retired_scans
+    entry = (thread, worker)
+    retired.append(entry)
+    
+    def release():
+        # finished được phát ngay trước khi thread dừng hẳn: chờ nốt phần còn lại
+        thread.wait()
+        if entry in retired:
+            retired.remove(entry)
+    
+    thread.finished.connect(release)
+    thread.quit()
+
+def _is_current_scan(self):
+    """Kiểm tra signal có đến từ lượt quét hiện tại không (bỏ qua signal của lượt đã hủy)"""
+    worker = self.sender()
+    return worker is not None and worker is getattr(self, 'scan_worker', None)
+
+def on_scan_batch(self, videos):
+    """Nhận một đợt video từ worker và hiển thị ngay"""
+    if not self._is_current_scan():
+        return
+    
+    first_batch = not self.all_videos
+    
+    for video in videos:
+        self.scan_index[video["path"]] = video
+        self.videos[video["name"]] = video["path"]
+    
+    model = getattr(self, 'video_list_model', None)
+    if model is not None and model.videos is self.all_videos:
+        # Danh sách ảo hóa: chèn thêm hàng, giữ nguyên vị trí cuộn
+        for video in videos:
+            video["selected"] = video.get("status") == "new"
+        model.append_videos(videos)
+    else:
+        self.all_videos.extend(videos)
+    
+    self.video_index.add(videos)
+    
+    # Danh sách có thể sử dụng ngay sau đợt đầu tiên
+    if first_batch:
         self.loading_overlay.hide()
+    
+    self.update_video_list_ui()
+
+def request_visible_metadata(self, videos):
+    """
+    Yêu cầu worker đọc metadata của các video đang hiển thị trước
+    
+    Args:
+        videos: Danh sách video của trang hiện tại
+    """
+    worker = getattr(self, 'scan_worker', None)
+    if worker is None:
+        return
+    
+    pending = [video["path"] for video in videos if not video.get("metadata_loaded")]
+    if pending:
+        worker.prioritize(pending)
+
+def on_scan_finished(self, total):
+    """Xử lý khi đã liệt kê xong thư mục (metadata vẫn đang được đọc trong nền)"""
+    if not self._is_current_scan():
+        return
+    
+    self.loading_overlay.hide()
+    logger.info(f"Đã tìm thấy {total} video trong {self.folder_path_edit.text()}")
+    
+    # Kiểm tra FFmpeg một lần để cảnh báo khi không thể trích xuất khung hình
+    if getattr(self, 'has_ffmpeg', None) is None:
+        self.has_ffmpeg = self.check_ffmpeg_installed()
+        if not self.has_ffmpeg:
+            logger.warning("FFmpeg không có sẵn, không thể trích xuất khung hình")
+    
+    self.update_video_list_ui()
+    
+    # Lưu thư mục vào danh sách gần đây
+    self.add_to_recent_folders(self.folder_path_edit.text())
+
+def on_scan_metadata(self, results):
+    """Cập nhật metadata (độ phân giải, thời lượng, hash) cho các video đã hiển thị"""
+    if not self._is_current_scan():
+        return
+    
+    for path, metadata in results.items():
+        video = self.scan_index.get(path)
+        if video is not None:
+            video.update(metadata)
+    
+    # Thời lượng thay đổi: khóa sắp xếp theo thời lượng phải tính lại
+    self.video_index.invalidate(SORT_DURATION)
+    
+    # Vẽ lại các hàng có thời lượng mới (chỉ các hàng đang hiển thị thực sự được vẽ)
+    model = getattr(self, 'video_list_model', None)
+    if model is not None:
+        model.update_paths(results.keys())
+
+def on_scan_error(self, message):
+    """Hiển thị lỗi từ worker quét thư mục"""
+    if not self._is_current_scan():
+        return
+    
+    self.loading_overlay.hide()
+    QtWidgets.QMessageBox.critical(self, "Lỗi", f"Không thể quét thư mục: {message}")
+
+def on_scan_worker_finished(self):
+    """Khi đã có đủ hash: kiểm tra video trùng lặp và lịch sử tải lên"""
+    if not self._is_current_scan():
+        return
+    
+    try:
+        if self.all_videos and self.scan_check_duplicates:
+            check_duplicates(self, self.all_videos)
+        
+        if self.all_videos and self.scan_check_history:
+            check_upload_history(self, self.all_videos)
+        
+        # Trạng thái thay đổi: khóa sắp xếp theo trạng thái phải tính lại
+        self.video_index.invalidate(SORT_STATUS)
+        
+        # Danh sách ảo hóa: bỏ chọn video trùng hoặc đã tải lên (như danh sách phân trang)
+        if getattr(self, 'video_list_model', None) is not None:
+            for video in self.all_videos:
+                if video.get("status") != "new":
+                    video["selected"] = False
+        
+        self.update_video_list_ui()
+    except Exception as e:
+        logger.error(f"Lỗi khi kiểm tra video sau khi quét: {str(e)}")
+        logger.error(traceback.format_exc())
 
 def show_loading_overlay(self, message="Đang tải...", show_spinner=True):
     """
@@ -577,15 +695,11 @@ def count_video_files(self, folder_path):
     Returns:
         int: Số lượng file video
     """
-    video_extensions = ['.mp4', '.avi', '.mkv', '.mov', '.webm', '.m4v', '.flv', '.wmv']
     count = 0
     
     try:
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in video_extensions:
-                    count += 1
+        # Quét đệ quy một lượt, kết quả được đệm cho lần quét tiếp theo
+        count = self.folder_scanner.count(folder_path)
     except Exception as e:
         logger.error(f"Lỗi khi đếm file video: {str(e)}")
     
@@ -593,20 +707,13 @@ def count_video_files(self, folder_path):
 
 def check_ffmpeg_installed(self):
     """
-    Kiểm tra xem FFmpeg có được cài đặt không
+    Kiểm tra xem FFmpeg có được cài đặt không (dùng registry FFmpeg dùng chung,
+    chỉ chạy lại ffmpeg khi file thực thi thay đổi)
     
     Returns:
         bool: True nếu FFmpeg được cài đặt, ngược lại False
     """
     try:
-        # Thử chạy lệnh ffmpeg -version
-        import subprocess
-        result = subprocess.run(
-            ["ffmpeg", "-version"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            timeout=2
-        )
-        return result.returncode == 0
-    except:
+        return get_registry().is_available()
+    except Exception:
         return False
@@ -8,9 +8,17 @@ from PyQt5 import QtWidgets, QtCore, QtGui, uic
 from PyQt5.QtCore import Qt
 
 from ui.components.play_button import PlayButton
+from utils.main_tab import VideoListModel, VideoItemDelegate
 
 logger = logging.getLogger(__name__)
 
+# Video list display modes (SETTINGS/video_list_mode)
+VIDEO_LIST_MODE_VIRTUAL = "virtual"  # One scrollable list, only visible rows are painted
+VIDEO_LIST_MODE_PAGED = "paged"      # 10 videos per page with pagination controls
+
+# Delay before requesting metadata for the rows shown after scrolling (ms)
+VISIBLE_METADATA_DELAY = 100
+
 def apply_global_stylesheet(self):
     """Apply global stylesheet to maintain the beautiful design"""
     self.setStyleSheet("""
@@ -268,6 +276,9 @@ def load_video_list(self):
         uic.loadUi(fixed_ui_path, list_widget)
         logger.info("Video list UI loaded successfully")
         
+        # Tìm các widget của 10 hàng một lần duy nhất, các lần làm mới dùng lại
+        self.video_rows = self.build_video_row_registry(list_widget)
+        
         # Clear mock data from video list
         for i in range(1, 11):
             videoItem = list_widget.findChild(QtWidgets.QFrame, f"videoItem{i}")
@@ -311,6 +322,10 @@ def load_video_list(self):
         self.first_page_button = list_widget.findChild(QtWidgets.QPushButton, "firstPageButton")
         self.last_page_button = list_widget.findChild(QtWidgets.QPushButton, "lastPageButton")
 
+        # Danh sách ảo hóa (mặc định), phân trang chỉ dùng khi được chọn trong cấu hình
+        if self.get_video_list_mode() == VIDEO_LIST_MODE_VIRTUAL:
+            self.setup_virtual_video_list(list_widget)
+
         # Add shadow effect
         shadow = QtWidgets.QGraphicsDropShadowEffect()
         shadow.setBlurRadius(15)
@@ -332,6 +347,100 @@ def load_video_list(self):
         # Fallback to a basic video list if loading fails
         return self.create_fallback_video_list()
         
+def build_video_row_registry(self, list_widget):
+    """
+    Look up the widgets of the 10 video rows once
+    
+    Args:
+        list_widget: Widget loaded from video_list.ui
+        
+    Returns:
+        list: One (row, label, status, checkbox) tuple per row, None for rows with missing widgets
+    """
+    rows = []
+    for i in range(1, 11):
+        widgets = (
+            list_widget.findChild(QtWidgets.QFrame, f"videoItem{i}"),
+            list_widget.findChild(QtWidgets.QLabel, f"label{i}"),
+            list_widget.findChild(QtWidgets.QLabel, f"status{i}"),
+            list_widget.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
+        )
+        if None in widgets:
+            logger.warning(f"Không tìm thấy đủ các widget cho hàng {i}")
+            widgets = None
+        rows.append(widgets)
+    return rows
+
+def get_video_list_mode(self):
+    """
+    Đọc chế độ hiển thị danh sách video từ cấu hình (SETTINGS/video_list_mode)
+    
+    Returns:
+        str: VIDEO_LIST_MODE_VIRTUAL hoặc VIDEO_LIST_MODE_PAGED
+    """
+    mode = VIDEO_LIST_MODE_VIRTUAL
+    config = getattr(getattr(self, 'app', None), 'config', None)
+    try:
+        if hasattr(config, 'has_section') and config.has_section('SETTINGS'):
+            mode = config.get('SETTINGS', 'video_list_mode', fallback=VIDEO_LIST_MODE_VIRTUAL)
+        elif isinstance(config, dict) and isinstance(config.get('SETTINGS'), dict):
+            mode = config['SETTINGS'].get('video_list_mode', VIDEO_LIST_MODE_VIRTUAL)
+    except Exception as e:
+        logger.error(f"Error reading video list mode from config: {str(e)}")
+    
+    mode = str(mode).strip().lower()
+    return mode if mode in (VIDEO_LIST_MODE_VIRTUAL, VIDEO_LIST_MODE_PAGED) else VIDEO_LIST_MODE_VIRTUAL
+
+def setup_virtual_video_list(self, list_widget):
+    """
+    Replace the 10 fixed video rows and the pagination controls with a
+    virtualised QListView (only the visible rows are painted)
+    
+    Args:
+        list_widget: Widget loaded from video_list.ui
+    """
+    scroll_area = list_widget.findChild(QtWidgets.QScrollArea, "videosScrollArea")
+    if scroll_area is None or scroll_area.parentWidget() is None:
+        logger.warning("videosScrollArea not found, keeping the paginated video list")
+        return
+    
+    layout = scroll_area.parentWidget().layout()
+    position = layout.indexOf(scroll_area)
+    
+    self.video_list_model = VideoListModel(list_widget)
+    
+    view = QtWidgets.QListView(list_widget)
+    view.setObjectName("virtualVideoList")
+    view.setModel(self.video_list_model)
+    view.setItemDelegate(VideoItemDelegate(view))
+    view.setUniformItemSizes(True)  # Row geometry is computed once, not per video
+    view.setLayoutMode(QtWidgets.QListView.Batched)
+    view.setBatchSize(500)
+    view.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+    view.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+    view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+    view.setFrameShape(QtWidgets.QFrame.NoFrame)
+    view.setMouseTracking(True)  # Hover highlight
+    view.setCursor(QtCore.Qt.PointingHandCursor)
+    view.clicked.connect(self.on_virtual_row_clicked)
+    
+    layout.insertWidget(position, view, 1)
+    scroll_area.hide()
+    
+    pagination_container = list_widget.findChild(QtWidgets.QWidget, "paginationContainer")
+    if pagination_container:
+        pagination_container.hide()
+    
+    # Metadata of the rows on screen is requested once scrolling settles
+    self.visible_metadata_timer = QtCore.QTimer(self)
+    self.visible_metadata_timer.setSingleShot(True)
+    self.visible_metadata_timer.setInterval(VISIBLE_METADATA_DELAY)
+    self.visible_metadata_timer.timeout.connect(self.request_virtual_visible_metadata)
+    view.verticalScrollBar().valueChanged.connect(lambda _value: self.visible_metadata_timer.start())
+    
+    self.video_list_view = view
+    logger.info("Virtualised video list enabled")
+
 def load_video_preview(self):
     """Load video preview component from .ui file"""
     ui_path = os.path.join(self.get_ui_dir(), "video_preview.ui")
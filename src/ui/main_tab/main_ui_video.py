@@ -6,9 +6,11 @@ import logging
 import traceback
 import subprocess
 import platform
+from collections import Counter
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import Qt
 
+from utils.video_list_index import SORT_NAME, SORT_SIZE, SORT_DURATION, SORT_MTIME, SORT_STATUS
 from utils.main_tab import (
     display_video_info, 
     display_video_frames,
@@ -21,11 +23,47 @@ from utils.main_tab import (
 
 logger = logging.getLogger(__name__)
 
+# Các tên file dài hơn được rút gọn ở giữa (tương ứng khoảng 800px trong CSS)
+MAX_FILENAME_LENGTH = 120
+
+# Trạng thái video -> (nhãn hiển thị, class CSS)
+STATUS_DISPLAY = {
+    "new": ("Mới", "statusNew"),
+    "uploaded": ("Đã tải", "statusUploaded"),
+    "duplicate": ("Trùng", "statusDuplicate")
+}
+
+# Tùy chọn trong dropdown sắp xếp -> (khóa sắp xếp, giảm dần)
+SORT_OPTIONS = [
+    (SORT_NAME, False),      # Tên (A-Z)
+    (SORT_NAME, True),       # Tên (Z-A)
+    (SORT_SIZE, True),       # Kích thước (lớn → nhỏ)
+    (SORT_SIZE, False),      # Kích thước (nhỏ → lớn)
+    (SORT_DURATION, True),   # Thời lượng (dài → ngắn)
+    (SORT_DURATION, False),  # Thời lượng (ngắn → dài)
+    (SORT_MTIME, True),      # Ngày (mới → cũ)
+    (SORT_MTIME, False),     # Ngày (cũ → mới)
+    (SORT_STATUS, False)     # Trạng thái (uploaded, duplicate, new)
+]
+
+def _display_name(video_name):
+    """Rút gọn tên file quá dài, giữ phần đầu và phần cuối"""
+    if len(video_name) <= MAX_FILENAME_LENGTH:
+        return video_name
+    start_length = MAX_FILENAME_LENGTH * 2 // 3  # Hiển thị nhiều hơn ở đầu
+    end_length = MAX_FILENAME_LENGTH - start_length - 3  # 3 là độ dài của dấu "..."
+    return video_name[:start_length] + "..." + video_name[-end_length:]
+
 def update_video_list_ui(self):
     """Update video list UI with current videos"""
     if not hasattr(self, 'video_list'):
         return
     
+    # Danh sách ảo hóa: không phân trang, chỉ các hàng đang hiển thị được vẽ
+    if getattr(self, 'video_list_model', None) is not None:
+        self.update_virtual_video_list()
+        return
+    
     try:
         # Calculate pagination
         items_per_page = 10
@@ -41,102 +79,69 @@ def update_video_list_ui(self):
         # Get videos for current page
         current_videos = self.all_videos[start_idx:end_idx]
         display_count = len(current_videos)
+        self.page_videos = current_videos
         
-        # Debug log
-        logger.info(f"Hiển thị {display_count} video từ vị trí {start_idx} đến {end_idx}")
-        logger.info(f"Tổng số video: {len(self.all_videos)}")
+        # Metadata được đọc lười: ưu tiên các video của trang đang xem
+        self.request_visible_metadata(current_videos)
         
-        # Đảm bảo tất cả các hàng được xử lý (ẩn/hiện, cập nhật nội dung)
-        for i in range(1, 11):
-            # Get widgets
-            row = self.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}")
-            label = self.video_list.findChild(QtWidgets.QLabel, f"label{i}")
-            status = self.video_list.findChild(QtWidgets.QLabel, f"status{i}")
-            checkbox = self.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
-            
-            # Kiểm tra xem tất cả các widget cần thiết đã được tìm thấy chưa
-            if row is None or label is None or status is None or checkbox is None:
-                logger.warning(f"Không tìm thấy đủ các widget cho hàng {i}")
-                continue
-                
-            # Xử lý hiển thị hoặc ẩn các hàng
-            if i <= display_count:
-                # Hiển thị hàng
-                row.setVisible(True)
+        logger.debug(f"Hiển thị {display_count} video từ vị trí {start_idx} đến {end_idx} (tổng {len(self.all_videos)})")
+        
+        # Các nhãn trạng thái đổi class, được polish lại một lần sau vòng lặp
+        repolish = []
+        
+        # Tạm ngưng vẽ để cả trang chỉ được vẽ lại một lần
+        self.video_list.setUpdatesEnabled(False)
+        try:
+            # Đảm bảo tất cả các hàng được xử lý (ẩn/hiện, cập nhật nội dung)
+            for i, widgets in enumerate(self.video_rows, 1):
+                if widgets is None:
+                    continue
+                row, label, status, checkbox = widgets
                 
-                # Lấy thông tin video và cập nhật nội dung
-                video_idx = i - 1
-                if video_idx < len(current_videos):
-                    video = current_videos[video_idx]
+                # Xử lý hiển thị hoặc ẩn các hàng
+                if i <= display_count:
+                    video = current_videos[i - 1]
                     
                     # Cập nhật tên và thiết lập tooltip hiển thị đầy đủ
                     video_name = video.get("name", "")
                     
                     # Lưu trữ tên đầy đủ của video vào thuộc tính của label
                     label.setProperty("fullVideoName", video_name)
-                    
-                    # Để các tên file dài sẽ hiển thị theo max-width 800px trong CSS
-                    # Chỉ rút gọn nếu quá dài (trên 120 ký tự, tương đương với khoảng 800px)
-                    MAX_FILENAME_LENGTH = 120  # Tăng độ dài tối đa trước khi cắt ngắn (tương ứng với 800px)
-                    
-                    # Chỉ cắt ngắn nếu tên file quá dài
-                    if len(video_name) > MAX_FILENAME_LENGTH:
-                        # Cắt giữa với dấu 3 chấm rõ ràng (hiển thị đầu và cuối của filename)
-                        start_length = MAX_FILENAME_LENGTH * 2 // 3  # Hiển thị nhiều hơn ở đầu
-                        end_length = MAX_FILENAME_LENGTH - start_length - 3  # 3 là dộ dài của dấu "..."
-                        display_name = video_name[:start_length] + "..." + video_name[-end_length:]
-                        label.setText(display_name)
-                    else:
-                        # Tên file đủ ngắn để hiển thị hoàn toàn
-                        label.setText(video_name)
+                    label.setText(_display_name(video_name))
                     
                     # Luôn thiết lập tooltip để hiển thị tên đầy đủ khi hover
                     label.setToolTip(video_name)
                     
                     # Cập nhật trạng thái
-                    status_text = "Mới"
-                    status_class = "statusNew"
-                    
-                    if video.get("status") == "uploaded":
-                        status_text = "Đã tải"
-                        status_class = "statusUploaded"
-                    elif video.get("status") == "duplicate":
-                        status_text = "Trùng"
-                        status_class = "statusDuplicate"
-                    
+                    status_text, status_class = STATUS_DISPLAY.get(video.get("status"), STATUS_DISPLAY["new"])
                     status.setText(status_text)
-                    status.setProperty("class", status_class)
-                    
-                    # Cập nhật style
-                    status.style().unpolish(status)
-                    status.style().polish(status)
+                    if status.property("class") != status_class:
+                        status.setProperty("class", status_class)
+                        repolish.append(status)
                     
                     # Đặt trạng thái checkbox
                     checkbox.setChecked(video.get("status") == "new")
                     
-                    logger.debug(f"Hiển thị video {i}: {video.get('name')}, Trạng thái: {status_text}")
+                    row.setVisible(True)
                 else:
-                    logger.warning(f"Chỉ số video không hợp lệ: {video_idx} >= {len(current_videos)}")
-            else:
-                # Ẩn hàng
-                row.setVisible(False)
-                
-                # Xóa nội dung hiện tại
-                label.setText("")
-                status.setText("")
-                checkbox.setChecked(False)
-                
-                logger.debug(f"Ẩn hàng {i}")
-        
-        # Đảm bảo pagination frame hiển thị
-        pagination_frame = self.video_list.findChild(QtWidgets.QFrame, "paginationFrame")
-        if pagination_frame:
-            pagination_frame.setVisible(True)
+                    # Ẩn hàng và xóa nội dung hiện tại
+                    row.setVisible(False)
+                    label.setText("")
+                    status.setText("")
+                    checkbox.setChecked(False)
+            
+            # Cập nhật style cho các nhãn đã đổi class
+            for status in repolish:
+                status.style().unpolish(status)
+                status.style().polish(status)
+        finally:
+            self.video_list.setUpdatesEnabled(True)
         
         # Update pagination info - ĐẢM BẢO HIỂN THỊ THÔNG TIN TỔNG SỐ VIDEO
         if hasattr(self, 'pagination_info_label') and self.pagination_info_label:
-            duplicate_count = sum(1 for v in self.all_videos if v.get("status") == "duplicate")
-            uploaded_count = sum(1 for v in self.all_videos if v.get("status") == "uploaded")
+            status_counts = Counter(v.get("status") for v in self.all_videos)
+            duplicate_count = status_counts["duplicate"]
+            uploaded_count = status_counts["uploaded"]
             
             if len(self.all_videos) > 0:
                 info_text = f"Hiển thị {start_idx+1}-{end_idx} trên tổng {len(self.all_videos)} videos"
@@ -168,6 +173,60 @@ def update_video_list_ui(self):
         import traceback
         logger.error(traceback.format_exc())
 
+def update_virtual_video_list(self):
+    """Update the virtualised video list with current videos"""
+    try:
+        if self.video_list_model.videos is not self.all_videos:
+            # Danh sách mới (quét lại, lọc): đặt lại model
+            self.video_list_model.set_videos(self.all_videos)
+        else:
+            # Cùng danh sách, đã được sắp xếp hoặc cập nhật trạng thái tại chỗ
+            self.video_list_model.refresh()
+        
+        self.update_selection_count()
+        
+        # Update folder stats
+        if hasattr(self, 'folder_stats_label'):
+            total_size = sum(video.get("file_size_bytes", 0) for video in self.all_videos)
+            size_str = self.format_file_size(total_size)
+            self.folder_stats_label.setText(f"Tổng dung lượng: {size_str} | {len(self.all_videos)} videos")
+            self.folder_stats_label.setVisible(True)
+        
+        # Metadata được đọc lười: ưu tiên các video đang hiển thị
+        self.visible_metadata_timer.start()
+    except Exception as e:
+        logger.error(f"Lỗi trong update_virtual_video_list: {str(e)}")
+        logger.error(traceback.format_exc())
+
+def request_virtual_visible_metadata(self):
+    """Ask the scan worker for the metadata of the rows currently on screen"""
+    view = getattr(self, 'video_list_view', None)
+    if view is None or self.video_list_model.rowCount() == 0:
+        return
+    
+    viewport = view.viewport().rect()
+    first = view.indexAt(viewport.topLeft())
+    last = view.indexAt(viewport.bottomLeft())
+    if not first.isValid():
+        return
+    
+    first_row = first.row()
+    last_row = last.row() if last.isValid() else self.video_list_model.rowCount() - 1
+    self.request_visible_metadata(self.video_list_model.videos[first_row:last_row + 1])
+
+def on_virtual_row_clicked(self, index):
+    """Handle click on a row of the virtualised list: toggle its checkbox and select the video"""
+    if not index.isValid():
+        return
+    
+    checked = index.data(Qt.CheckStateRole) == Qt.Checked
+    self.video_list_model.setData(index, Qt.Unchecked if checked else Qt.Checked, Qt.CheckStateRole)
+    self.update_selection_count()
+    
+    self.selected_video = index.data(Qt.DisplayRole)
+    logger.info(f"Selected video: {self.selected_video}")
+    self.display_selected_video()
+
 def debug_video_list_issue(self):
     """
     Hàm để kiểm tra và debug vấn đề chỉ hiển thị 1 video trong danh sách.
@@ -245,23 +304,28 @@ def update_selection_count(self):
     self.selected_video_count = 0
     self.selected_videos_size = 0
     
+    # Danh sách ảo hóa: trạng thái chọn nằm trong thông tin video
+    if getattr(self, 'video_list_model', None) is not None:
+        selected = self.video_list_model.selected_videos()
+        self.selected_video_count = len(selected)
+        self.selected_videos_size = sum(video.get("file_size_bytes", 0) for video in selected)
+        size_str = self.format_file_size(self.selected_videos_size)
+        self.selection_label.setText(f"Đã chọn: {self.selected_video_count} video | Tổng dung lượng: {size_str}")
+        return
+    
     # Count selected videos
-    for i in range(1, 11):  # Assuming up to 10 videos displayed at once
-        checkbox = self.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
-        row = self.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}")
+    for i, widgets in enumerate(self.video_rows, 1):
+        if widgets is None:
+            continue
+        row, _, _, checkbox = widgets
         
-        # Only count if checkbox exists, is checked, and row is visible
-        if checkbox and row and checkbox.isChecked() and row.isVisible():
+        # Only count if checkbox is checked and row is visible
+        if checkbox.isChecked() and row.isVisible():
             self.selected_video_count += 1
             
-            # Find video info in all_videos
-            label = self.video_list.findChild(QtWidgets.QLabel, f"label{i}")
-            if label:
-                video_name = label.text()
-                for video in self.all_videos:
-                    if video.get("name") == video_name:
-                        self.selected_videos_size += video.get("file_size_bytes", 0)
-                        break
+            # Row i shows the i-th video of the current page
+            if i <= len(self.page_videos):
+                self.selected_videos_size += self.page_videos[i - 1].get("file_size_bytes", 0)
     
     # Format total size
     size_str = self.format_file_size(self.selected_videos_size)
@@ -282,17 +346,19 @@ def format_file_size(self, size_in_bytes):
 
 def on_video_row_clicked(self, idx):
     """Handle click on a video row"""
+    widgets = self.video_rows[idx - 1] if 0 < idx <= len(self.video_rows) else None
+    if widgets is None:
+        return
+    _, label, _, checkbox = widgets
+    
     # Toggle checkbox
-    checkbox = self.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{idx}")
-    if checkbox:
-        checkbox.setChecked(not checkbox.isChecked())
-        logger.info(f"Toggled checkbox {idx}: {checkbox.isChecked()}")
-        
-        # Update selection count
-        self.update_selection_count()
+    checkbox.setChecked(not checkbox.isChecked())
+    logger.debug(f"Toggled checkbox {idx}: {checkbox.isChecked()}")
+    
+    # Update selection count
+    self.update_selection_count()
     
     # Get video name (use the full name stored in property instead of displayed text)
-    label = self.video_list.findChild(QtWidgets.QLabel, f"label{idx}")
     if label:
         # Lấy tên đầy đủ của video từ thuộc tính đã lưu trữ
         full_video_name = label.property("fullVideoName")
@@ -317,6 +383,8 @@ def display_selected_video(self):
     for video in self.all_videos:
         if video.get("name") == self.selected_video:
             video_path = video.get("path")
+            # Have the scan worker probe the selected video ahead of the visible page
+            self.request_visible_metadata([video])
             break
     
     if not video_path or not os.path.exists(video_path):
@@ -455,44 +523,25 @@ def sort_videos(self, index):
         return
     
     try:
-        logger.info(f"Sắp xếp videos theo tùy chọn: {index}")
-        
-        # Lấy text option từ combobox nếu có
-        sort_text = self.sort_combo_box.currentText() if hasattr(self, 'sort_combo_box') else ""
-        
-        # Sắp xếp dựa trên tùy chọn
-        if index == 0 or "tên (A-Z)" in sort_text:  # Tên (A-Z)
-            self.all_videos.sort(key=lambda v: v.get("name", "").lower())
-        elif index == 1 or "tên (Z-A)" in sort_text:  # Tên (Z-A)
-            self.all_videos.sort(key=lambda v: v.get("name", "").lower(), reverse=True)
-        elif index == 2 or "lớn → nhỏ" in sort_text:  # Kích thước (lớn → nhỏ)
-            self.all_videos.sort(key=lambda v: v.get("file_size_bytes", 0), reverse=True)
-        elif index == 3 or "nhỏ → lớn" in sort_text:  # Kích thước (nhỏ → lớn)
-            self.all_videos.sort(key=lambda v: v.get("file_size_bytes", 0))
-        elif index == 4 or "dài → ngắn" in sort_text:  # Thời lượng (dài → ngắn)
-            self.all_videos.sort(key=lambda v: v.get("duration", 0), reverse=True)
-        elif index == 5 or "ngắn → dài" in sort_text:  # Thời lượng (ngắn → dài)
-            self.all_videos.sort(key=lambda v: v.get("duration", 0))
-        elif index == 6 or "mới → cũ" in sort_text:  # Ngày tạo (mới → cũ)
-            # Sử dụng os.path.getctime để lấy thời gian tạo file
-            self.all_videos.sort(
-                key=lambda v: os.path.getctime(v.get("path", "")) if os.path.exists(v.get("path", "")) else 0, 
-                reverse=True
-            )
-        elif index == 7 or "cũ → mới" in sort_text:  # Ngày tạo (cũ → mới)
-            self.all_videos.sort(
-                key=lambda v: os.path.getctime(v.get("path", "")) if os.path.exists(v.get("path", "")) else 0
-            )
-        elif index == 8 or "Trạng thái" in sort_text:  # Trạng thái
-            # Sắp xếp theo trạng thái (uploaded, duplicate, new)
-            status_order = {"uploaded": 0, "duplicate": 1, "new": 2}
-            self.all_videos.sort(key=lambda v: status_order.get(v.get("status", "new"), 3))
+        logger.debug(f"Sắp xếp videos theo tùy chọn: {index}")
+        
+        if not 0 <= index < len(SORT_OPTIONS):
+            return
+        self.sort_key, self.sort_reverse = SORT_OPTIONS[index]
+        
+        # Danh sách đã sắp xếp được lấy từ chỉ mục (khóa tính sẵn, kết quả được lưu lại)
+        self._sync_video_index()
+        self.all_videos[:] = self.video_index.sorted(self.sort_key, self.sort_reverse)
         
         # Reset về trang đầu tiên
         self.current_page = 1
         
-        # Cập nhật UI
-        self.update_video_list_ui()
+        # Giữ bộ lọc tìm kiếm đang dùng
+        search_text = self.search_line_edit.text() if getattr(self, 'search_line_edit', None) else ""
+        if search_text:
+            self.filter_videos(search_text)
+        else:
+            self.update_video_list_ui()
         
         logger.info(f"Đã sắp xếp {len(self.all_videos)} videos")
     except Exception as e:
@@ -506,9 +555,10 @@ def filter_videos(self, text):
         self.update_video_list_ui()
         return
     
-    # Filter videos by name (case insensitive)
-    text = text.lower()
-    filtered_videos = [v for v in self.all_videos if text in v["name"].lower()]
+    # Filter videos by name (case insensitive), in the current sort order.
+    # The index narrows the previous result while the query only grows.
+    self._sync_video_index()
+    filtered_videos = self.video_index.filter(text, self.sort_key, self.sort_reverse)
     
     # Replace all_videos temporarily for UI update
     saved_videos = self.all_videos
@@ -517,6 +567,11 @@ def filter_videos(self, text):
     self.update_video_list_ui()
     self.all_videos = saved_videos
 
+def _sync_video_index(self):
+    """Rebuild the sort/search index if it no longer holds the videos of all_videos"""
+    if not self.video_index.holds(self.all_videos):
+        self.video_index.rebuild(self.all_videos)
+
 def find_pagination_frame(self):
     """Find and validate the pagination frame"""
     pagination_frame = self.video_list.findChild(QtWidgets.QFrame, "paginationFrame")
@@ -540,8 +595,13 @@ def _update_pagination_ui(self, total_pages):
         total_pages: Tổng số trang
     """
     try:
-        # Ghi log để debug
-        logger.info(f"update_pagination_ui được gọi với tổng số trang: {total_pages}")
+        logger.debug(f"update_pagination_ui được gọi với tổng số trang: {total_pages}")
+        
+        # Pagination frame đã được tìm/load ở lần gọi trước
+        pagination_frame = getattr(self, 'pagination_frame', None)
+        if pagination_frame is not None:
+            self.pagination_manager.update_pagination(self.current_page, total_pages)
+            return
         
         # Tìm container cho phân trang
         pagination_container = self.video_list.findChild(QtWidgets.QWidget, "paginationContainer")
@@ -704,13 +764,14 @@ def _update_pagination_ui(self, total_pages):
         # Update the pagination with current state
         if self.pagination_manager:
             self.pagination_manager.update_pagination(self.current_page, total_pages)
+            # Các lần gọi sau chỉ cần cập nhật pagination manager
+            self.pagination_frame = pagination_frame
         
         # Ensure frame visibility
         pagination_frame.update()
         pagination_frame.show()
         
-        # Log update completion
-        logger.info(f"Cập nhật phân trang hoàn tất: trang {self.current_page}/{total_pages}")
+        logger.debug(f"Cập nhật phân trang hoàn tất: trang {self.current_page}/{total_pages}")
             
     except Exception as e:
         logger.error(f"Lỗi cập nhật UI phân trang: {str(e)}")
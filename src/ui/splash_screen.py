@@ -6,10 +6,9 @@ from PyQt6.QtCore import Qt, pyqtSignal
 import os
 import sys
 import logging
-import time
+import threading
 import configparser
 import traceback
-import requests
 import shutil
 import platform
 import subprocess
@@ -25,6 +24,8 @@ try:
     from src.utils.disk_space_checker import DiskSpaceChecker
     from src.utils.update_checker import UpdateChecker
     from src.utils.performance_optimizer import PerformanceOptimizer
+    from src.utils.startup_pipeline import StartupPipeline
+    from src.utils.startup_fingerprint import StartupFingerprint
 except ModuleNotFoundError:
     # Khi chạy trực tiếp từ src/main.py
     import sys
@@ -36,9 +37,42 @@ except ModuleNotFoundError:
     from src.utils.disk_space_checker import DiskSpaceChecker
     from src.utils.update_checker import UpdateChecker
     from src.utils.performance_optimizer import PerformanceOptimizer
+    from src.utils.startup_pipeline import StartupPipeline
+    from src.utils.startup_fingerprint import StartupFingerprint
 
 logger = logging.getLogger(__name__)
 
+# Chỉ số các bước cài đặt (theo thứ tự hiển thị)
+STEP_INTERNET = 0
+STEP_SYSTEM = 1
+STEP_SSL = 2
+STEP_RESOURCES = 3
+STEP_FFMPEG = 4
+STEP_TELEGRAM = 5
+STEP_UI = 6
+STEP_DISK = 7
+STEP_UPDATE = 8
+STEP_OPTIMIZE = 9
+
+# Các bước phải xong trước khi một bước được bắt đầu; các bước còn lại chạy đồng thời
+STEP_DEPENDENCIES = {
+    STEP_INTERNET: (),
+    STEP_SYSTEM: (),
+    STEP_SSL: (),
+    STEP_RESOURCES: (),
+    STEP_FFMPEG: (),
+    STEP_TELEGRAM: (STEP_RESOURCES,),  # Cần config.ini
+    STEP_UI: (),
+    STEP_DISK: (STEP_RESOURCES,),  # Kiểm tra quyền ghi thư mục làm việc
+    STEP_UPDATE: (STEP_INTERNET,),
+    STEP_OPTIMIZE: (STEP_RESOURCES, STEP_DISK),  # Dọn cache/temp sau khi đo dung lượng
+}
+
+# Bước lỗi được chạy lại sau STEP_RETRY_DELAY ms, tối đa STEP_MAX_RETRIES lần;
+# hết lượt thì bước kết thúc với trạng thái lỗi để các bước sau vẫn chạy tiếp
+STEP_MAX_RETRIES = 3
+STEP_RETRY_DELAY = 5000
+
 class SplashScreen(QtWidgets.QWidget):
     """
     Màn hình chào hiện đại với thanh cuộn và các indicator tròn
@@ -48,6 +82,8 @@ class SplashScreen(QtWidgets.QWidget):
     finished = pyqtSignal(bool)
     # Tín hiệu khi người dùng hủy
     canceled = pyqtSignal()
+    # Gửi một hàm về luồng giao diện (phát từ luồng phụ sẽ được xếp hàng)
+    ui_call = pyqtSignal(object)
 
     def __init__(self, app=None):
         super().__init__()
@@ -86,6 +122,13 @@ class SplashScreen(QtWidgets.QWidget):
         # Biến kiểm soát để đảm bảo tín hiệu finished chỉ được phát một lần
         self.has_emitted_finished = False
 
+        # Pipeline chạy các bước, các bước đã xong và thời gian từng bước
+        self.pipeline = None
+        self.completed_steps = set()
+        self.step_attempts = {}  # {bước: số lần đã lỗi}
+        self.step_timings = {}
+        self.ui_call.connect(self._invoke_on_ui)
+
         # Nạp giao diện từ file UI
         self.setup_ui_manually()
 
@@ -116,6 +159,20 @@ class SplashScreen(QtWidgets.QWidget):
         self.ffmpeg_status_timer = QtCore.QTimer(self)
         self.ffmpeg_status_timer.timeout.connect(self.update_ffmpeg_download_status)
 
+        # Hàm bắt đầu của từng bước, theo chỉ số
+        self.step_handlers = [
+            self.step_check_internet,
+            self.step_check_system,
+            self.step_setup_ssl,
+            self.step_init_resources,
+            self.step_prepare_ffmpeg,
+            self.step_check_telegram,
+            self.step_load_ui,
+            self.step_check_disk_space,
+            self.step_check_updates,
+            self.step_optimize
+        ]
+
     def setup_ui_manually(self):
         """Thiết lập UI theo cách thủ công"""
         # Thiết lập kích thước
@@ -439,9 +496,9 @@ class SplashScreen(QtWidgets.QWidget):
         )
 
         if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-            # Dừng các timer
-            if hasattr(self, 'process_timer') and self.process_timer.isActive():
-                self.process_timer.stop()
+            # Dừng các timer và pipeline
+            if self.pipeline is not None:
+                self.pipeline.shutdown()
 
             if hasattr(self, 'ffmpeg_status_timer') and self.ffmpeg_status_timer.isActive():
                 self.ffmpeg_status_timer.stop()
@@ -500,8 +557,9 @@ class SplashScreen(QtWidgets.QWidget):
         # Tính toán phần trăm của các bước đã hoàn thành
         completed_steps_percent = self.current_step * percent_per_step
 
-        # Nếu đang ở bước tải FFmpeg (bước thứ 5) và đang tải
-        if self.current_step == 4 and self.ffmpeg_manager and self.ffmpeg_manager.is_downloading:
+        # Nếu bước tải FFmpeg (bước thứ 5) chưa xong và đang tải
+        if (STEP_FFMPEG not in self.completed_steps and self.ffmpeg_manager
+                and self.ffmpeg_manager.is_downloading):
             # Tính phần trăm của bước hiện tại dựa trên tiến trình tải FFmpeg
             ffmpeg_progress_percent = (self.ffmpeg_manager.download_progress / 100) * percent_per_step
 
@@ -549,7 +607,7 @@ class SplashScreen(QtWidgets.QWidget):
                     self.networkInfoLabel.setText(info)
                 else:
                     self.networkInfoLabel.setText("Đang phân tích tốc độ mạng...")
-        elif self.ffmpeg_manager and self.ffmpeg_manager.is_available and self.current_step == 4:
+        elif self.ffmpeg_manager and self.ffmpeg_manager.is_available and STEP_FFMPEG not in self.completed_steps:
             # FFmpeg đã tải xong và sẵn sàng
             self.ffmpeg_status_timer.stop()
 
@@ -557,14 +615,10 @@ class SplashScreen(QtWidgets.QWidget):
             if hasattr(self, 'networkInfoLabel'):
                 self.networkInfoLabel.hide()
 
-            # Đánh dấu bước 4 là hoàn thành và chuyển sang bước tiếp theo
+            # Đánh dấu bước tải FFmpeg là hoàn thành, các bước phụ thuộc được bắt đầu
             self.update_status("Đã tải và cài đặt FFmpeg thành công")
-            self.update_indicator(self.current_step, "success")
-
-            # Đảm bảo chỉ tăng current_step nếu chưa phát tín hiệu finished
             if not self.has_emitted_finished:
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
+                self.complete_step(STEP_FFMPEG)
         else:
             # Nếu không còn tải nữa, dừng timer
             self.ffmpeg_status_timer.stop()
@@ -573,6 +627,10 @@ class SplashScreen(QtWidgets.QWidget):
             if hasattr(self, 'networkInfoLabel'):
                 self.networkInfoLabel.hide()
 
+            # Tải thất bại: chạy lại bước (tải tiếp phần còn thiếu)
+            if self.ffmpeg_manager and STEP_FFMPEG not in self.completed_steps and not self.has_emitted_finished:
+                self.fail_step(STEP_FFMPEG, f"Tải FFmpeg thất bại: {self.ffmpeg_manager.download_status}")
+
     def _format_speed(self, speed_bytes):
         """Định dạng tốc độ tải thành chuỗi dễ đọc"""
         if speed_bytes < 1024:
@@ -590,24 +648,137 @@ class SplashScreen(QtWidgets.QWidget):
             if error_message:
                 self.update_status(error_message)
 
+    def fail_step(self, index, error_message=None):
+        """
+        Đánh dấu một bước bị lỗi và chạy lại bước sau STEP_RETRY_DELAY;
+        sau STEP_MAX_RETRIES lần lỗi, bước kết thúc với trạng thái lỗi
+
+        Args:
+            index (int): Chỉ số của bước (0-based)
+            error_message (str, optional): Thông báo lỗi
+        """
+        self.mark_step_error(index, error_message)
+
+        attempts = self.step_attempts.get(index, 0) + 1
+        self.step_attempts[index] = attempts
+        if attempts <= STEP_MAX_RETRIES:
+            logger.warning(f"Bước {self.setup_items[index]!r} lỗi, thử lại lần {attempts}/{STEP_MAX_RETRIES}")
+            QtCore.QTimer.singleShot(STEP_RETRY_DELAY, lambda: self.start_step(index))
+        else:
+            logger.error(f"Bước {self.setup_items[index]!r} vẫn lỗi sau {STEP_MAX_RETRIES} lần thử lại, bỏ qua")
+            self.complete_step(index, "error")
+
     def start_setup_process(self, ffmpeg_manager=None):
         """
         Bắt đầu quy trình cài đặt
 
+        Các bước được chạy theo đồ thị phụ thuộc STEP_DEPENDENCIES: mỗi bước bắt
+        đầu ngay khi các bước nó cần đã xong, các bước độc lập chạy đồng thời.
+
         Args:
             ffmpeg_manager: Đối tượng quản lý FFmpeg
         """
         self.ffmpeg_manager = ffmpeg_manager
 
-        # Khởi tạo tiến trình với bước đầu tiên
         self.current_step = 0
-        self.update_indicator(0, "active")
-        self.update_status(f"Đang {self.setup_items[0].lower()}...")
+        self.completed_steps = set()
+        self.pipeline = StartupPipeline(self.ui_call.emit, on_finished=self.on_setup_finished)
+
+        for index, deps in STEP_DEPENDENCIES.items():
+            # Bắt đầu qua vòng lặp sự kiện để các hộp thoại của một bước
+            # không chạy lồng trong lúc pipeline đang lập lịch
+            self.pipeline.add_step(
+                index,
+                lambda index=index: QtCore.QTimer.singleShot(0, lambda: self.start_step(index)),
+                deps
+            )
+
+        self.pipeline.run()
+
+    def _invoke_on_ui(self, func):
+        """Chạy hàm được gửi về luồng giao diện qua tín hiệu ui_call"""
+        func()
+
+    def run_blocking(self, func, callback):
+        """
+        Chạy một phần việc chặn: trên luồng phụ khi pipeline đang chạy,
+        ngay tại chỗ nếu không
+
+        Args:
+            func (callable): Hàm không tham số, không được đụng đến giao diện
+            callback (callable): callback(result, error) - gọi trên luồng giao diện
+        """
+        if self.pipeline is not None and not self.pipeline.done:
+            self.pipeline.submit(func, callback)
+            return
+
+        try:
+            result, error = func(), None
+        except Exception as e:
+            result, error = None, e
+        callback(result, error)
+
+    def start_step(self, index):
+        """
+        Bắt đầu một bước cài đặt
+
+        Args:
+            index (int): Chỉ số của bước (0-based)
+        """
+        if index in self.completed_steps or self.has_emitted_finished:
+            return
+
+        self.update_indicator(index, "active")
+        self.update_status(f"Đang {self.setup_items[index].lower()}...")
+        self.step_handlers[index]()
+
+    def complete_step(self, index, status="success"):
+        """
+        Đánh dấu một bước đã xong và cập nhật tiến trình
+
+        Args:
+            index (int): Chỉ số của bước (0-based)
+            status (str): 'success' hoặc 'error' (bước lỗi nhưng vẫn tiếp tục)
+        """
+        if index in self.completed_steps:
+            return
+
+        self.completed_steps.add(index)
+        if status != "error":
+            # Bước lỗi đã được đánh dấu bởi mark_step_error
+            self.update_indicator(index, status)
+        self.current_step += 1
+        self.update_progress(self.calculate_overall_progress())
+
+        if self.pipeline is not None:
+            self.pipeline.finish(index, status)
+
+    def on_setup_finished(self):
+        """Xử lý khi pipeline đã chạy xong mọi bước"""
+        self.step_timings = self.pipeline.timings()
+        logger.info(self.pipeline.timing_report(dict(enumerate(self.setup_items))))
+
+        # Lưu dấu vân tay môi trường sau một lần khởi động không lỗi để lần sau khởi động nhanh
+        if (all(info['status'] == "success" for info in self.step_timings.values())
+                and self.ffmpeg_manager and self.ffmpeg_manager.is_available):
+            threading.Thread(
+                target=StartupFingerprint().record,
+                args=(self.ffmpeg_manager.get_ffmpeg_path(),),
+                name="StartupFingerprint",
+                daemon=True
+            ).start()
+
+        self.emit_finished()
+
+    def emit_finished(self):
+        """Phát tín hiệu finished (chỉ một lần)"""
+        if self.has_emitted_finished:
+            return
 
-        # Tạo timer để cập nhật các bước
-        self.process_timer = QtCore.QTimer(self)
-        self.process_timer.timeout.connect(self.process_next_step)
-        self.process_timer.start(1000)  # 1 giây mỗi bước
+        self.has_emitted_finished = True
+        self.update_progress(100)
+        logger.info("Tất cả các bước cài đặt đã hoàn thành, phát tín hiệu finished")
+        self.finished.emit(self.telegram_configured)
 
     def check_internet_connection(self):
         """Kiểm tra kết nối Internet"""
@@ -619,26 +790,46 @@ class SplashScreen(QtWidgets.QWidget):
 
     def retry_connection_auto(self):
         """Tự động thử lại kết nối Internet không cần người dùng tương tác"""
+        if self.has_emitted_finished or STEP_INTERNET in self.completed_steps:
+            return
+
         # Cập nhật trạng thái
         self.update_status("Đang thử kết nối lại...")
-        self.update_indicator(0, "active")
+        self.update_indicator(STEP_INTERNET, "active")
 
         # Kiểm tra lại kết nối
-        if self.check_internet_connection():
+        self.run_blocking(self.check_internet_connection, self.on_internet_checked)
+
+    def on_internet_checked(self, connected, error=None):
+        """
+        Xử lý kết quả kiểm tra kết nối Internet
+
+        Args:
+            connected (bool): Có kết nối hay không
+            error (Exception, optional): Lỗi khi kiểm tra
+        """
+        self.is_connected = bool(connected)
+        if error is not None:
+            self.mark_step_error(STEP_INTERNET, f"Lỗi kiểm tra kết nối Internet: {str(error)}")
+        elif connected:
             self.update_status("Kết nối Internet OK")
-            self.update_indicator(0, "success")
-            self.current_step += 1
-            self.update_progress(self.calculate_overall_progress())
-            # Tiếp tục quy trình
-            QtCore.QTimer.singleShot(500, self.process_next_step)
+            self.complete_step(STEP_INTERNET)
+            return
         else:
-            # Vẫn không kết nối được
-            self.mark_step_error(0, "Không thể kết nối Internet. Vui lòng kiểm tra kết nối của bạn.")
-            # Lặp lại việc thử kết nối sau một khoảng thời gian
-            QtCore.QTimer.singleShot(5000, self.retry_connection_auto)
+            self.mark_step_error(STEP_INTERNET, "Không thể kết nối Internet. Vui lòng kiểm tra kết nối của bạn.")
 
-    def check_pip_installation(self):
-        """Kiểm tra cài đặt pip và các thư viện cần thiết"""
+        # Các bước cần Internet chờ đến khi kết nối lại được
+        self.retry_count += 1
+        QtCore.QTimer.singleShot(5000, self.retry_connection_auto)
+
+    def probe_pip_installation(self):
+        """
+        Kiểm tra pip và các thư viện cần thiết, không đụng đến giao diện
+        (chạy được trên luồng phụ)
+
+        Returns:
+            tuple: (pip_available, missing_modules)
+        """
         pip_available = False
         try:
             subprocess.run(
@@ -649,6 +840,29 @@ class SplashScreen(QtWidgets.QWidget):
             )
             pip_available = True
         except:
+            pass
+
+        # Kiểm tra các thư viện cần thiết
+        required_modules = ["PyQt6", "requests", "configparser", "psutil"]
+        missing_modules = []
+
+        for module in required_modules:
+            try:
+                __import__(module)
+            except ImportError:
+                missing_modules.append(module)
+
+        return pip_available, missing_modules
+
+    def check_pip_installation(self, probe=None):
+        """
+        Kiểm tra cài đặt pip và các thư viện cần thiết
+
+        Args:
+            probe (tuple, optional): Kết quả probe_pip_installation đã chạy trên luồng phụ
+        """
+        pip_available, missing_modules = probe or self.probe_pip_installation()
+        if not pip_available:
             self.update_status("Không tìm thấy pip. Đang cài đặt...")
             # Cố gắng cài đặt pip
             try:
@@ -667,16 +881,6 @@ class SplashScreen(QtWidgets.QWidget):
                 )
                 return False
 
-        # Kiểm tra các thư viện cần thiết
-        required_modules = ["PyQt6", "requests", "configparser", "psutil"]
-        missing_modules = []
-
-        for module in required_modules:
-            try:
-                __import__(module)
-            except ImportError:
-                missing_modules.append(module)
-
         if missing_modules and pip_available:
             # Hỏi người dùng có muốn cài đặt các thư viện thiếu không
             reply = QtWidgets.QMessageBox.question(
@@ -771,9 +975,9 @@ class SplashScreen(QtWidgets.QWidget):
             return False
 
     def setup_ssl_automatically(self):
-        """Thiết lập SSL tự động."""
+        """Thiết lập SSL tự động (không đụng đến giao diện, chạy được trên luồng phụ)."""
         if platform.system() != "Windows":
-            self.update_status("Không cần cài đặt SSL trên hệ điều hành này")
+            logger.info("Không cần cài đặt SSL trên hệ điều hành này")
             return True
 
         # Thử cài đặt tự động
@@ -783,767 +987,575 @@ class SplashScreen(QtWidgets.QWidget):
 
             # Thiết lập SSL
             if setup_ssl():
-                self.update_status("SSL đã được cấu hình thành công")
+                logger.info("SSL đã được cấu hình thành công")
                 return True
             else:
-                self.update_status("Không thể cấu hình SSL tự động, Telethon có thể hoạt động chậm hơn")
+                logger.warning("Không thể cấu hình SSL tự động, Telethon có thể hoạt động chậm hơn")
                 return False
         except Exception as e:
-            self.update_status(f"Lỗi khi thiết lập SSL: {str(e)}")
+            logger.error(f"Lỗi khi thiết lập SSL: {str(e)}")
             return False
 
-    def process_next_step(self):
-        """Xử lý bước tiếp theo trong tiến trình cài đặt"""
-        # Nếu đã hoàn thành hoặc có lỗi, dừng timer
-        if self.current_step >= self.total_steps:
-            if hasattr(self, 'process_timer') and self.process_timer.isActive():
-                self.process_timer.stop()
+    def step_check_internet(self):
+        """Bước 1: Kiểm tra kết nối Internet"""
+        self.update_status("Đang kiểm tra kết nối Internet...")
+        self.run_blocking(self.check_internet_connection, self.on_internet_checked)
 
-            # Chỉ phát tín hiệu hoàn thành nếu chưa phát và tất cả các bước đã hoàn thành
-            if not self.has_emitted_finished:
-                self.has_emitted_finished = True
-                logger.info("Tất cả các bước cài đặt đã hoàn thành, phát tín hiệu finished")
-                # Phát tín hiệu hoàn thành sau 1 giây
-                QtCore.QTimer.singleShot(1000, lambda: self.finished.emit(self.telegram_configured))
-            return
+    def probe_system(self):
+        """
+        Thu thập thông tin hệ thống (chạy trên luồng phụ)
 
-        # Đánh dấu các bước đang tiến hành hoặc lỗi
-        self.update_indicator(self.current_step, "active")
+        Returns:
+            dict: Phiên bản Python, hệ điều hành và kết quả probe_pip_installation
+        """
+        python_version = sys.version.split()[0]
+        min_python_version = "3.7.0"
+
+        # So sánh phiên bản bằng cách chia thành các thành phần số
+        def parse_version(version_str):
+            parts = version_str.split('.')
+            return [int(part) for part in parts]
+
+        python_version_parts = parse_version(python_version)
+        min_version_parts = parse_version(min_python_version)
+
+        # So sánh từng phần của phiên bản
+        is_outdated = False
+        for i in range(min(len(python_version_parts), len(min_version_parts))):
+            if python_version_parts[i] < min_version_parts[i]:
+                is_outdated = True
+                break
+            elif python_version_parts[i] > min_version_parts[i]:
+                break
+
+        return {
+            'python_version': python_version,
+            'is_outdated': is_outdated,
+            'os_name': platform.system(),
+            'os_version': platform.version(),
+            'pip': self.probe_pip_installation()
+        }
 
-        # Xử lý logic cho từng bước
-        if self.current_step == 0:  # Kiểm tra kết nối Internet
-            try:
-                # Kiểm tra kết nối internet
-                self.update_status("Đang kiểm tra kết nối Internet...")
-
-                # Thử kiểm tra kết nối ngay lập tức (tự động)
-                if not self.check_internet_connection():
-                    # Nếu không kết nối được, chờ 3 giây và thử lại
-                    QtCore.QTimer.singleShot(3000, lambda: self.retry_connection_auto())
-                    return
-
-                # Nếu kết nối thành công, tiếp tục bước tiếp theo
-                self.update_status("Kết nối Internet OK")
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-                # Tự động chuyển sang bước tiếp theo
-                QtCore.QTimer.singleShot(500, self.process_next_step)
-            except Exception as e:
-                self.mark_step_error(0, f"Lỗi kiểm tra kết nối Internet: {str(e)}")
+    def step_check_system(self):
+        """Bước 2: Kiểm tra cấu hình hệ thống"""
+        self.run_blocking(self.probe_system, self.on_system_checked)
+
+    def on_system_checked(self, info, error=None):
+        """Xử lý kết quả kiểm tra hệ thống (hỏi cài đặt thư viện thiếu nếu cần)"""
+        try:
+            if error is not None:
+                raise error
+
+            self.update_status(f"Hệ điều hành: {info['os_name']} {info['os_version']}")
+
+            # Kiểm tra pip có cài đặt không và các thư viện cần thiết
+            pip_available = self.check_pip_installation(info['pip'])
+            if not pip_available:
+                # Người dùng đã được thông báo (hoặc từ chối cài đặt): tiếp tục với trạng thái lỗi
+                self.complete_step(STEP_SYSTEM, "error")
                 return
 
-        elif self.current_step == 1:  # Kiểm tra cấu hình hệ thống
-            try:
-                # Kiểm tra phiên bản Python
-                python_version = sys.version.split()[0]
-                min_python_version = "3.7.0"
-
-                self.update_status(f"Kiểm tra phiên bản Python: {python_version}")
-
-                # So sánh phiên bản bằng cách chia thành các thành phần số
-                def parse_version(version_str):
-                    parts = version_str.split('.')
-                    return [int(part) for part in parts]
-
-                python_version_parts = parse_version(python_version)
-                min_version_parts = parse_version(min_python_version)
-
-                # So sánh từng phần của phiên bản
-                is_outdated = False
-                for i in range(min(len(python_version_parts), len(min_version_parts))):
-                    if python_version_parts[i] < min_version_parts[i]:
-                        is_outdated = True
-                        break
-                    elif python_version_parts[i] > min_version_parts[i]:
-                        break
-
-                # Kiểm tra hệ điều hành
-                os_name = platform.system()
-                os_version = platform.version()
-                self.update_status(f"Hệ điều hành: {os_name} {os_version}")
-
-                # Kiểm tra pip có cài đặt không và các thư viện cần thiết
-                pip_available = self.check_pip_installation()
-                if not pip_available:
-                    return
-
-                self.update_status("Hệ thống đạt yêu cầu")
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except Exception as e:
-                self.mark_step_error(1, f"Lỗi: {str(e)}")
+            self.update_status("Hệ thống đạt yêu cầu")
+            self.complete_step(STEP_SYSTEM)
+        except Exception as e:
+            self.fail_step(STEP_SYSTEM, f"Lỗi: {str(e)}")
 
-        elif self.current_step == 2:  # Thiết lập SSL cho Telethon
-            try:
-                self.update_status("Kiểm tra và cài đặt SSL...")
-                if platform.system() == "Windows":
-                    # Kiểm tra SSL và cài đặt nếu cần
-                    ssl_setup_success = self.setup_ssl_automatically()
-
-                    if not ssl_setup_success:
-                        # Hiển thị thông báo và hỏi người dùng
-                        reply = QtWidgets.QMessageBox.question(
-                            self,
-                            "Vấn đề với SSL",
-                            "Không thể cài đặt SSL tự động. Điều này có thể ảnh hưởng đến tốc độ tải lên.\n\n"
-                            "Bạn có muốn tiếp tục không? Chọn No sẽ hiển thị hướng dẫn cài đặt thủ công.",
-                            QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
-                            QtWidgets.QMessageBox.StandardButton.Yes
-                        )
+    def step_setup_ssl(self):
+        """Bước 3: Thiết lập SSL cho Telethon"""
+        self.update_status("Kiểm tra và cài đặt SSL...")
+        if platform.system() != "Windows":
+            self.update_status("Không cần cài đặt SSL trên hệ điều hành này")
+            self.complete_step(STEP_SSL)
+            return
 
-                        if reply == QtWidgets.QMessageBox.StandardButton.No:
-                            # Hiển thị hướng dẫn
-                            QtWidgets.QMessageBox.information(
-                                self,
-                                "Hướng dẫn cài đặt SSL thủ công",
-                                "1. Tải OpenSSL từ https://slproweb.com/products/Win32OpenSSL.html\n"
-                                "2. Cài đặt OpenSSL vào đường dẫn mặc định\n"
-                                "3. Sao chép các file libssl*.dll và libcrypto*.dll từ thư mục bin của OpenSSL\n"
-                                "4. Dán các file này vào thư mục Python của bạn\n"
-                                "5. Khởi động lại ứng dụng",
-                                QtWidgets.QMessageBox.StandardButton.Ok
-                            )
-                else:
-                    self.update_status("Không cần cài đặt SSL trên hệ điều hành này")
+        self.run_blocking(self.setup_ssl_automatically, self.on_ssl_setup)
 
-                self.update_status("SSL được thiết lập")
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except Exception as e:
-                self.mark_step_error(2, f"Lỗi kiểm tra SSL: {str(e)}")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
+    def on_ssl_setup(self, ssl_setup_success, error=None):
+        """Xử lý kết quả thiết lập SSL"""
+        try:
+            if error is not None:
+                raise error
 
-        elif self.current_step == 3:  # Khởi tạo tài nguyên ứng dụng
-            try:
-                # Lấy đường dẫn tới thư mục gốc của dự án (parent của src)
-                src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                app_root = os.path.dirname(src_dir)  # Lên một cấp từ src để tới thư mục gốc
-
-                # Tạo các thư mục cần thiết ở thư mục gốc
-                data_dir = os.path.join(app_root, 'data')
-                cache_dir = os.path.join(app_root, 'cache')
-                temp_dir = os.path.join(app_root, 'temp')
-                logs_dir = os.path.join(app_root, 'logs')
-
-                # Đảm bảo các thư mục tồn tại
-                os.makedirs(data_dir, exist_ok=True)
-                os.makedirs(cache_dir, exist_ok=True)
-                os.makedirs(temp_dir, exist_ok=True)
-                os.makedirs(logs_dir, exist_ok=True)
-
-                self.update_status("Đã tạo các thư mục làm việc")
-
-                # Tạo file lịch sử tải lên nếu chưa có
-                history_file = os.path.join(data_dir, 'upload_history.json')
-                if not os.path.exists(history_file):
-                    try:
-                        with open(history_file, 'w', encoding='utf-8') as f:
-                            f.write('[]')  # Tạo một mảng JSON rỗng
-                        self.update_status(f"Đã tạo file lịch sử tải lên: {history_file}")
-                        logger.info(f"Đã tạo file lịch sử tải lên: {history_file}")
-                    except Exception as e:
-                        logger.error(f"Lỗi khi tạo file lịch sử: {str(e)}")
-                        self.mark_step_error(3, f"Không thể tạo file lịch sử: {str(e)}")
-                        return
-
-                # Kiểm tra lại xem file có tồn tại không
-                if not os.path.exists(history_file):
-                    logger.error(f"File lịch sử vẫn không tồn tại sau khi tạo: {history_file}")
-                    self.mark_step_error(3, "Không thể tạo file lịch sử tải lên")
-                    return
-
-                # Kiểm tra file cấu hình
-                config_path = os.path.join(app_root, "config.ini")
-                if not os.path.exists(config_path):
-                    # Tạo file config mẫu nếu chưa có
-                    import configparser
-                    config = configparser.ConfigParser()
-                    config['APP'] = {
-                        'first_run': 'true',
-                        'theme': 'light',
-                        'language': 'vi'
-                    }
-                    config['PATHS'] = {
-                        'cache_dir': cache_dir,
-                        'temp_dir': temp_dir,
-                        'logs_dir': logs_dir
-                    }
-                    config['TELEGRAM'] = {
-                        'bot_token': '',
-                        'chat_id': '',
-                        'notification_chat_id': ''
-                    }
-                    config['TELETHON'] = {
-                        'api_id': '',
-                        'api_hash': '',
-                        'phone': '',
-                        'use_telethon': 'false',
-                        'otp_verified': 'false'
-                    }
+            if not ssl_setup_success:
+                # Hiển thị thông báo và hỏi người dùng
+                reply = QtWidgets.QMessageBox.question(
+                    self,
+                    "Vấn đề với SSL",
+                    "Không thể cài đặt SSL tự động. Điều này có thể ảnh hưởng đến tốc độ tải lên.\n\n"
+                    "Bạn có muốn tiếp tục không? Chọn No sẽ hiển thị hướng dẫn cài đặt thủ công.",
+                    QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
+                    QtWidgets.QMessageBox.StandardButton.Yes
+                )
 
-                    try:
-                        with open(config_path, 'w', encoding='utf-8') as f:
-                            config.write(f)
-                        self.update_status("Đã tạo file cấu hình mẫu")
-                    except Exception as e:
-                        logger.error(f"Lỗi khi tạo file cấu hình: {str(e)}")
-                        self.mark_step_error(3, f"Không thể tạo file cấu hình: {str(e)}")
-                        return
-                else:
-                    # Nếu file config đã tồn tại, cập nhật đường dẫn
-                    try:
-                        import configparser
-                        config = configparser.ConfigParser()
-                        # Đọc file config hiện tại
-                        with open(config_path, 'r', encoding='utf-8') as f:
-                            config.read_file(f)
+                if reply == QtWidgets.QMessageBox.StandardButton.No:
+                    # Hiển thị hướng dẫn
+                    QtWidgets.QMessageBox.information(
+                        self,
+                        "Hướng dẫn cài đặt SSL thủ công",
+                        "1. Tải OpenSSL từ https://slproweb.com/products/Win32OpenSSL.html\n"
+                        "2. Cài đặt OpenSSL vào đường dẫn mặc định\n"
+                        "3. Sao chép các file libssl*.dll và libcrypto*.dll từ thư mục bin của OpenSSL\n"
+                        "4. Dán các file này vào thư mục Python của bạn\n"
+                        "5. Khởi động lại ứng dụng",
+                        QtWidgets.QMessageBox.StandardButton.Ok
+                    )
 
-                        # Cập nhật đường dẫn
-                        if 'PATHS' not in config:
-                            config['PATHS'] = {}
-                        config['PATHS']['cache_dir'] = cache_dir
-                        config['PATHS']['temp_dir'] = temp_dir
-                        config['PATHS']['logs_dir'] = logs_dir
-
-                        # Lưu lại file config
-                        with open(config_path, 'w', encoding='utf-8') as f:
-                            config.write(f)
-                        self.update_status("Đã cập nhật file cấu hình")
-                    except Exception as e:
-                        logger.error(f"Lỗi khi cập nhật file cấu hình: {str(e)}")
-                        self.mark_step_error(3, f"Không thể cập nhật file cấu hình: {str(e)}")
-                        return
-
-                # Kiểm tra lại xem file cấu hình có tồn tại không
-                if not os.path.exists(config_path):
-                    logger.error(f"File cấu hình vẫn không tồn tại sau khi tạo: {config_path}")
-                    self.mark_step_error(3, "Không thể tạo file cấu hình")
-                    return
-
-                self.update_status("Đã khởi tạo tài nguyên ứng dụng")
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except Exception as e:
-                self.mark_step_error(3, f"Lỗi khởi tạo tài nguyên: {str(e)}")
-                logger.error(f"Chi tiết lỗi khởi tạo tài nguyên: {traceback.format_exc()}")
-                return
+            self.update_status("SSL được thiết lập")
+            self.complete_step(STEP_SSL)
+        except Exception as e:
+            self.mark_step_error(STEP_SSL, f"Lỗi kiểm tra SSL: {str(e)}")
+            self.complete_step(STEP_SSL, "error")
 
-        elif self.current_step == 4:  # Chuẩn bị bộ phân tích video
-            if self.ffmpeg_manager:
-                # Kiểm tra FFmpeg đã tải về chưa
-                if self.ffmpeg_manager.is_available:
-                    # FFmpeg đã sẵn sàng, chuyển sang bước tiếp theo
-                    self.update_status("Đã tải và cài đặt FFmpeg thành công")
-                    self.update_indicator(self.current_step, "success")
-                    self.current_step += 1
-                    self.update_progress(self.calculate_overall_progress())
-                elif self.ffmpeg_manager.is_downloading:
-                    # Đang tải FFmpeg, hiển thị trạng thái và KHÔNG chuyển bước
-                    self.update_status("Đang tải FFmpeg, vui lòng đợi...")
-
-                    # Khi bắt đầu tải FFmpeg, khởi động timer để cập nhật trạng thái
-                    if not self.ffmpeg_status_timer.isActive():
-                        self.ffmpeg_status_timer.start(500)  # Cập nhật mỗi 500ms
-
-                    # QUAN TRỌNG: KHÔNG tăng current_step ở đây,
-                    # chỉ tăng khi tải hoàn tất trong hàm update_ffmpeg_download_status
-
-                    # Dừng quá trình xử lý ở đây, không xử lý các bước tiếp theo
-                    # cho đến khi FFmpeg được tải xong
-                    return
-                else:
-                    # Chưa tải FFmpeg, bắt đầu tải
-                    # Kiểm tra kết nối internet trước khi tải
-                    if self.check_internet_connection():
-                        # Bắt đầu tải
-                        self.update_status("Đang tải FFmpeg...")
-                        self.ffmpeg_manager.setup_ffmpeg()
-
-                        # Bắt đầu timer cập nhật trạng thái tải
-                        if not self.ffmpeg_status_timer.isActive():
-                            self.ffmpeg_status_timer.start(500)
-                    else:
-                        self.mark_step_error(4, "Không thể kết nối Internet để tải FFmpeg")
-                        return
-            else:
-                # Không có ffmpeg_manager, bỏ qua
-                self.update_status("FFmpeg đã sẵn sàng")
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-
-        elif self.current_step == 5:  # Kiểm tra kết nối Telegram
-            # Bước này sẽ được triển khai chi tiết sau, bây giờ chỉ là bước nháp
-            # Kiểm tra cấu hình Telegram
-            self.telegram_configured = False  # Mặc định là chưa cấu hình
-            # Biến theo dõi trạng thái cấu hình đã hoàn thành hay chưa
-            self.config_completed = False
-            import configparser
+    def init_app_resources(self):
+        """
+        Tạo các thư mục làm việc và file cấu hình (chạy trên luồng phụ). Lịch sử tải
+        lên (data/upload_history.db) do UploadHistory tạo khi mở lần đầu.
+
+        Raises:
+            RuntimeError: Khi không tạo được file cần thiết
+        """
+        # Lấy đường dẫn tới thư mục gốc của dự án (parent của src)
+        src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        app_root = os.path.dirname(src_dir)  # Lên một cấp từ src để tới thư mục gốc
+
+        # Tạo các thư mục cần thiết ở thư mục gốc
+        data_dir = os.path.join(app_root, 'data')
+        cache_dir = os.path.join(app_root, 'cache')
+        temp_dir = os.path.join(app_root, 'temp')
+        logs_dir = os.path.join(app_root, 'logs')
+
+        # Đảm bảo các thư mục tồn tại
+        os.makedirs(data_dir, exist_ok=True)
+        os.makedirs(cache_dir, exist_ok=True)
+        os.makedirs(temp_dir, exist_ok=True)
+        os.makedirs(logs_dir, exist_ok=True)
+
+        # Kiểm tra file cấu hình
+        config_path = os.path.join(app_root, "config.ini")
+        if not os.path.exists(config_path):
+            # Tạo file config mẫu nếu chưa có
+            config = configparser.ConfigParser()
+            config['APP'] = {
+                'first_run': 'true',
+                'theme': 'light',
+                'language': 'vi'
+            }
+            config['PATHS'] = {
+                'cache_dir': cache_dir,
+                'temp_dir': temp_dir,
+                'logs_dir': logs_dir
+            }
+            config['TELEGRAM'] = {
+                'bot_token': '',
+                'chat_id': '',
+                'notification_chat_id': ''
+            }
+            config['TELETHON'] = {
+                'api_id': '',
+                'api_hash': '',
+                'phone': '',
+                'use_telethon': 'false',
+                'otp_verified': 'false'
+            }
 
             try:
-                app_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                config_path = os.path.join(app_root, "config.ini")
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    config.write(f)
+                logger.info("Đã tạo file cấu hình mẫu")
+            except Exception as e:
+                logger.error(f"Lỗi khi tạo file cấu hình: {str(e)}")
+                raise RuntimeError(f"Không thể tạo file cấu hình: {str(e)}")
+        else:
+            # Nếu file config đã tồn tại, cập nhật đường dẫn
+            try:
+                config = configparser.ConfigParser()
+                # Đọc file config hiện tại
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config.read_file(f)
+
+                # Cập nhật đường dẫn
+                if 'PATHS' not in config:
+                    config['PATHS'] = {}
+                config['PATHS']['cache_dir'] = cache_dir
+                config['PATHS']['temp_dir'] = temp_dir
+                config['PATHS']['logs_dir'] = logs_dir
+
+                # Lưu lại file config
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    config.write(f)
+            except Exception as e:
+                logger.error(f"Lỗi khi cập nhật file cấu hình: {str(e)}")
+                raise RuntimeError(f"Không thể cập nhật file cấu hình: {str(e)}")
+
+        # Kiểm tra lại xem file cấu hình có tồn tại không
+        if not os.path.exists(config_path):
+            logger.error(f"File cấu hình vẫn không tồn tại sau khi tạo: {config_path}")
+            raise RuntimeError("Không thể tạo file cấu hình")
+
+    def step_init_resources(self):
+        """Bước 4: Khởi tạo tài nguyên ứng dụng"""
+        self.run_blocking(self.init_app_resources, self.on_resources_initialized)
+
+    def on_resources_initialized(self, result, error=None):
+        """Xử lý kết quả khởi tạo tài nguyên"""
+        if isinstance(error, RuntimeError):
+            self.fail_step(STEP_RESOURCES, str(error))
+            return
+        if error is not None:
+            self.fail_step(STEP_RESOURCES, f"Lỗi khởi tạo tài nguyên: {str(error)}")
+            logger.error("Chi tiết lỗi khởi tạo tài nguyên: " + "".join(
+                traceback.format_exception(type(error), error, error.__traceback__)))
+            return
 
-                if os.path.exists(config_path):
-                    config = configparser.ConfigParser()
-                    # Thêm tham số encoding để tránh lỗi UnicodeDecodeError
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        config.read_file(f)
+        self.update_status("Đã khởi tạo tài nguyên ứng dụng")
+        self.complete_step(STEP_RESOURCES)
 
-                    # Kiểm tra nếu đã cấu hình Telegram Bot hoặc Telethon
-                    if config.has_section('TELEGRAM') and config.has_option('TELEGRAM', 'bot_token') and config.has_option('TELEGRAM', 'chat_id'):
-                        bot_token = config.get('TELEGRAM', 'bot_token')
-                        chat_id = config.get('TELEGRAM', 'chat_id')
+    def step_prepare_ffmpeg(self):
+        """Bước 5: Chuẩn bị bộ phân tích video"""
+        if not self.ffmpeg_manager:
+            # Không có ffmpeg_manager, bỏ qua
+            self.update_status("FFmpeg đã sẵn sàng")
+            self.complete_step(STEP_FFMPEG)
+            return
 
-                        if bot_token and chat_id:
-                            self.telegram_configured = True
-                            self.config_completed = True
+        # Kiểm tra FFmpeg đã tải về chưa
+        if self.ffmpeg_manager.is_available:
+            # FFmpeg đã sẵn sàng, chuyển sang bước tiếp theo
+            self.update_status("Đã tải và cài đặt FFmpeg thành công")
+            self.complete_step(STEP_FFMPEG)
+        elif self.ffmpeg_manager.is_downloading:
+            # Đang tải FFmpeg: bước kết thúc trong update_ffmpeg_download_status
+            self.update_status("Đang tải FFmpeg, vui lòng đợi...")
+            if not self.ffmpeg_status_timer.isActive():
+                self.ffmpeg_status_timer.start(500)  # Cập nhật mỗi 500ms
+        else:
+            # Chưa tải FFmpeg: kiểm tra kết nối internet trước khi tải
+            self.run_blocking(self.check_internet_connection, self.on_ffmpeg_connection_checked)
 
-                    # Kiểm tra xác thực Telethon
-                    telethon_configured = False
-                    otp_verified = False
+    def on_ffmpeg_connection_checked(self, connected, error=None):
+        """Bắt đầu tải FFmpeg nếu có kết nối Internet"""
+        if not connected:
+            self.fail_step(STEP_FFMPEG, "Không thể kết nối Internet để tải FFmpeg")
+            return
 
-                    if config.has_section('TELETHON') and config.has_option('TELETHON', 'api_id') and config.has_option('TELETHON', 'api_hash'):
-                        api_id = config.get('TELETHON', 'api_id')
-                        api_hash = config.get('TELETHON', 'api_hash')
+        # Bắt đầu tải
+        self.update_status("Đang tải FFmpeg...")
+        self.ffmpeg_manager.setup_ffmpeg()
 
-                        if api_id and api_hash:
-                            telethon_configured = True
+        # Bắt đầu timer cập nhật trạng thái tải
+        if not self.ffmpeg_status_timer.isActive():
+            self.ffmpeg_status_timer.start(500)
 
-                            # Kiểm tra trạng thái OTP
-                            if config.has_option('TELETHON', 'otp_verified'):
-                                otp_verified = config.getboolean('TELETHON', 'otp_verified', fallback=False)
+    def step_check_telegram(self):
+        """Bước 6: Kiểm tra kết nối Telegram"""
+        # Kiểm tra cấu hình Telegram
+        self.telegram_configured = False  # Mặc định là chưa cấu hình
+        # Biến theo dõi trạng thái cấu hình đã hoàn thành hay chưa
+        self.config_completed = False
 
-                    # Cập nhật trạng thái cấu hình
-                    if telethon_configured:
-                        self.telegram_configured = True
+        try:
+            app_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            config_path = os.path.join(app_root, "config.ini")
 
-                        # Nếu cấu hình Telethon nhưng chưa xác thực OTP, hiển thị modal OTP
-                        if not otp_verified:
-                            self.update_status("Cần xác thực lại Telethon API")
-
-                            # Tạm dừng process_timer để tránh xung đột
-                            was_timer_active = False
-                            if hasattr(self, 'process_timer') and self.process_timer.isActive():
-                                was_timer_active = True
-                                self.process_timer.stop()
-
-                            # Hiển thị modal OTP
-                            from ui.telegram.telegram_ui_otp_modal import OTPModal
-                            otp_modal = OTPModal(self, api_id=api_id, api_hash=api_hash, phone=config.get('TELETHON', 'phone', fallback=''))
-
-                            # Hiển thị modal
-                            result = otp_modal.exec()
-
-                            # Kiểm tra kết quả xác thực
-                            if result == QtWidgets.QDialog.DialogCode.Accepted:
-                                # Cập nhật trạng thái xác thực OTP trong config
-                                if not config.has_section('TELETHON'):
-                                    config.add_section('TELETHON')
-                                config['TELETHON']['otp_verified'] = 'true'
-
-                                # Lưu cấu hình
-                                with open(config_path, 'w', encoding='utf-8') as f:
-                                    config.write(f)
-
-                                self.update_status("Xác thực Telethon API thành công")
-                            else:
-                                # Không xác thực được
-                                self.update_status("Xác thực Telethon API không thành công")
-
-                            # Khởi động lại timer nếu đã dừng
-                            if was_timer_active:
-                                self.process_timer.start()
-
-                # Hiển thị dialog cấu hình nếu chưa cấu hình Telegram
-                if not self.telegram_configured:
-                    self.update_status("Cần cấu hình Telegram để tiếp tục")
-
-                    # Tạm dừng process_timer để tránh xung đột
-                    was_timer_active = False
-                    if hasattr(self, 'process_timer') and self.process_timer.isActive():
-                        was_timer_active = True
-                        self.process_timer.stop()
-
-                    # Hiển thị thông báo cho người dùng
-                    self.update_status("Đang mở cửa sổ cấu hình Telegram...")
-                    QtCore.QCoreApplication.processEvents()  # Cập nhật UI ngay lập tức
-
-                    # Import và hiển thị ConfigModal
-                    from ui.telegram.telegram_ui import ConfigModal
-                    # Để hệ thống tự chọn UI từ file Qt Designer nếu có thể
-                    config_modal = ConfigModal(self, app=self.app, force_manual_ui=False)
-
-                    # Kết nối tín hiệu configSaved để biết khi nào cấu hình được lưu
-                    config_modal.configSaved.connect(self.on_config_saved)
-
-                    # Hiển thị modal
-                    config_modal.exec()
-
-                    # Kiểm tra lại cấu hình sau khi dialog đóng
-                    if hasattr(config_modal, 'telegram_connected') and config_modal.telegram_connected:
-                        self.telegram_configured = True
-                        self.config_completed = True
-                        self.update_status("Cấu hình Telegram đã sẵn sàng")
-                    elif hasattr(config_modal, 'telethon_connected') and config_modal.telethon_connected:
+            if os.path.exists(config_path):
+                config = configparser.ConfigParser()
+                # Thêm tham số encoding để tránh lỗi UnicodeDecodeError
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config.read_file(f)
+
+                # Kiểm tra nếu đã cấu hình Telegram Bot hoặc Telethon
+                if config.has_section('TELEGRAM') and config.has_option('TELEGRAM', 'bot_token') and config.has_option('TELEGRAM', 'chat_id'):
+                    bot_token = config.get('TELEGRAM', 'bot_token')
+                    chat_id = config.get('TELEGRAM', 'chat_id')
+
+                    if bot_token and chat_id:
                         self.telegram_configured = True
                         self.config_completed = True
-                        self.update_status("Cấu hình Telethon đã sẵn sàng")
-
-                        # Thêm cờ xác thực OTP
-                        if not config.has_section('TELETHON'):
-                            config.add_section('TELETHON')
-                        config['TELETHON']['otp_verified'] = 'true'
-
-                        # Lưu cấu hình
-                        with open(config_path, 'w', encoding='utf-8') as f:
-                            config.write(f)
-                    else:
-                        # Không cấu hình được, nhưng vẫn tiếp tục
-                        self.update_status("Cấu hình Telegram bị hủy. Một số tính năng có thể không hoạt động.")
-                        # Đánh dấu là đã hoàn thành quá trình cấu hình (dù thành công hay không)
-                        self.config_completed = True
 
-                    # Khởi động lại timer nếu đã dừng
-                    if was_timer_active:
-                        self.process_timer.start()
+                # Kiểm tra xác thực Telethon
+                telethon_configured = False
+                otp_verified = False
 
-                    # QUAN TRỌNG: Trả về mà không tăng current_step
-                    # Bước tiếp theo sẽ được xử lý trong lần gọi process_next_step sau
-                    return
-                else:
-                    self.update_status("Cấu hình Telegram đã sẵn sàng")
-                    self.config_completed = True
-            except Exception as e:
-                logger.error(f"Lỗi khi đọc cấu hình: {str(e)}")
-                self.mark_step_error(5, f"Lỗi đọc cấu hình: {str(e)}")
-                return
+                if config.has_section('TELETHON') and config.has_option('TELETHON', 'api_id') and config.has_option('TELETHON', 'api_hash'):
+                    api_id = config.get('TELETHON', 'api_id')
+                    api_hash = config.get('TELETHON', 'api_hash')
 
-            # Chỉ tiếp tục khi đã hoàn thành quá trình cấu hình
-            if self.config_completed:
-                self.update_status("Kết nối Telegram OK")
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
+                    if api_id and api_hash:
+                        telethon_configured = True
 
-        elif self.current_step == 6:  # Tải các thành phần giao diện
-            try:
-                # Cập nhật trạng thái
-                self.update_status("Đang nạp các thành phần giao diện...")
-
-                # Tải các module UI cần thiết - giả lập bằng một độ trễ
-                imported_count = 0
-                total_components = 5  # Giả sử có 5 thành phần cần nạp
-
-                # Các thành phần UI cần nạp
-                ui_components = [
-                    "Main Window Components",
-                    "Dialog Components",
-                    "Tab Components",
-                    "Custom Controls",
-                    "Icon Resources"
-                ]
-
-                # Nạp từng thành phần và cập nhật trạng thái
-                for component in ui_components:
-                    # Giả lập việc nạp thành phần
-                    self.update_status(f"Đang nạp {component}...")
-
-                    # Thêm độ trễ để người dùng thấy được tiến trình
-                    QtCore.QCoreApplication.processEvents()
-                    time.sleep(0.3)  # 300ms cho mỗi thành phần
-
-                    imported_count += 1
-
-                    # Cập nhật tiến trình
-                    component_progress = int((imported_count / total_components) * 10) + 60  # 60-70%
-                    self.update_progress(component_progress)
-
-                # Nạp thành công
-                self.update_status("Đã nạp các thành phần giao diện")
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except Exception as e:
-                logger.error(f"Lỗi khi nạp thành phần giao diện: {str(e)}")
-                logger.error(traceback.format_exc())
-                self.mark_step_error(6, f"Lỗi khi nạp UI: {str(e)}")
+                        # Kiểm tra trạng thái OTP
+                        if config.has_option('TELETHON', 'otp_verified'):
+                            otp_verified = config.getboolean('TELETHON', 'otp_verified', fallback=False)
 
-                # Mặc dù có lỗi, vẫn tiếp tục bước tiếp theo
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
+                # Cập nhật trạng thái cấu hình
+                if telethon_configured:
+                    self.telegram_configured = True
 
-        elif self.current_step == 7:  # Kiểm tra không gian lưu trữ
-            try:
-                # Cập nhật trạng thái
-                self.update_status("Đang kiểm tra không gian lưu trữ...")
+                    # Nếu cấu hình Telethon nhưng chưa xác thực OTP, hiển thị modal OTP
+                    if not otp_verified:
+                        self.update_status("Cần xác thực lại Telethon API")
 
-                # Tạo đối tượng kiểm tra không gian
-                disk_checker = DiskSpaceChecker()
+                        # Hiển thị modal OTP
+                        from ui.telegram.telegram_ui_otp_modal import OTPModal
+                        otp_modal = OTPModal(self, api_id=api_id, api_hash=api_hash, phone=config.get('TELETHON', 'phone', fallback=''))
 
-                # Kiểm tra không gian
-                space_info = disk_checker.check_all()
+                        # Hiển thị modal
+                        result = otp_modal.exec()
 
-                # Hiển thị thông tin không gian đĩa
-                disk_space = space_info['disk_space']
-                free_space_gb = disk_space['free'] / (1024 * 1024 * 1024)
+                        # Kiểm tra kết quả xác thực
+                        if result == QtWidgets.QDialog.DialogCode.Accepted:
+                            # Cập nhật trạng thái xác thực OTP trong config
+                            if not config.has_section('TELETHON'):
+                                config.add_section('TELETHON')
+                            config['TELETHON']['otp_verified'] = 'true'
 
-                self.update_status(f"Không gian trống: {disk_space['formatted']['free']} ({disk_space['percent_free']}%)")
+                            # Lưu cấu hình
+                            with open(config_path, 'w', encoding='utf-8') as f:
+                                config.write(f)
 
-                # Kiểm tra nếu không gian không đủ
-                if not space_info['has_sufficient_space']:
-                    # Hiển thị cảnh báo không gian không đủ
-                    warning_msg = f"Cảnh báo: Không gian trống ({disk_space['formatted']['free']}) thấp hơn yêu cầu tối thiểu (1GB)"
-                    self.update_status(warning_msg)
+                            self.update_status("Xác thực Telethon API thành công")
+                        else:
+                            # Không xác thực được
+                            self.update_status("Xác thực Telethon API không thành công")
 
-                    # Hiển thị dialog cảnh báo
-                    QtWidgets.QMessageBox.warning(
-                        self,
-                        "Cảnh báo không gian lưu trữ",
-                        f"{warning_msg}\n\nỨng dụng có thể không hoạt động đúng cách.\nVui lòng giải phóng thêm không gian đĩa.",
-                        QtWidgets.QMessageBox.StandardButton.Ok
-                    )
+            # Hiển thị dialog cấu hình nếu chưa cấu hình Telegram
+            if not self.telegram_configured:
+                # Hiển thị thông báo cho người dùng
+                self.update_status("Đang mở cửa sổ cấu hình Telegram...")
+                QtCore.QCoreApplication.processEvents()  # Cập nhật UI ngay lập tức
 
-                # Kiểm tra quyền ghi
-                if not space_info['write_permission']:
-                    # Hiển thị cảnh báo không có quyền ghi
-                    warning_msg = "Cảnh báo: Không có quyền ghi vào thư mục làm việc"
-                    self.update_status(warning_msg)
+                # Để hệ thống tự chọn UI từ file Qt Designer nếu có thể
+                config_modal = ConfigModal(self, app=self.app, force_manual_ui=False)
 
-                    # Hiển thị dialog cảnh báo
-                    QtWidgets.QMessageBox.warning(
-                        self,
-                        "Cảnh báo quyền ghi",
-                        f"{warning_msg}\n\nỨng dụng có thể không hoạt động đúng cách.\nVui lòng chạy ứng dụng với quyền admin hoặc kiểm tra lại quyền truy cập.",
-                        QtWidgets.QMessageBox.StandardButton.Ok
-                    )
+                # Kết nối tín hiệu configSaved để biết khi nào cấu hình được lưu
+                config_modal.configSaved.connect(self.on_config_saved)
 
-                # Cập nhật UI với thông tin tốt đẹp
-                if space_info['has_sufficient_space'] and space_info['write_permission']:
-                    success_msg = f"Kiểm tra không gian lưu trữ OK: {disk_space['formatted']['free']} trống"
-                    self.update_status(success_msg)
+                # Hiển thị modal
+                config_modal.exec()
 
-                # Hoàn thành bước này
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except ImportError:
-                # Không tìm thấy module disk_space_checker
-                logger.warning("Module disk_space_checker không tìm thấy, bỏ qua kiểm tra không gian lưu trữ")
-                self.update_status("Bỏ qua kiểm tra không gian lưu trữ")
-
-                # Đánh dấu bước này là thành công và chuyển sang bước tiếp theo
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except Exception as e:
-                logger.error(f"Lỗi khi kiểm tra không gian lưu trữ: {str(e)}")
-                logger.error(traceback.format_exc())
-
-                # Đánh dấu lỗi nhưng vẫn tiếp tục
-                self.mark_step_error(7, f"Lỗi kiểm tra không gian: {str(e)}")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-        elif self.current_step == 8:  # Tìm kiếm cập nhật
-            try:
-                # Cập nhật trạng thái
-                self.update_status("Đang kiểm tra cập nhật...")
+                # Kiểm tra lại cấu hình sau khi dialog đóng
+                if hasattr(config_modal, 'telegram_connected') and config_modal.telegram_connected:
+                    self.telegram_configured = True
+                    self.update_status("Cấu hình Telegram đã sẵn sàng")
+                elif hasattr(config_modal, 'telethon_connected') and config_modal.telethon_connected:
+                    self.telegram_configured = True
+                    self.update_status("Cấu hình Telethon đã sẵn sàng")
 
-                # Tạo đối tượng kiểm tra cập nhật
-                update_checker = UpdateChecker()
+                    # Thêm cờ xác thực OTP (đọc lại vì modal vừa lưu cấu hình)
+                    config = configparser.ConfigParser()
+                    if os.path.exists(config_path):
+                        with open(config_path, 'r', encoding='utf-8') as f:
+                            config.read_file(f)
+                    if not config.has_section('TELETHON'):
+                        config.add_section('TELETHON')
+                    config['TELETHON']['otp_verified'] = 'true'
 
-                # Flag theo dõi trạng thái kiểm tra
-                self.update_check_complete = False
+                    # Lưu cấu hình
+                    with open(config_path, 'w', encoding='utf-8') as f:
+                        config.write(f)
+                else:
+                    # Không cấu hình được, nhưng vẫn tiếp tục
+                    self.update_status("Cấu hình Telegram bị hủy. Một số tính năng có thể không hoạt động.")
 
-                # Hàm callback khi kiểm tra hoàn tất
-                def on_update_check_complete(result):
-                    try:
-                        # Cập nhật biến trạng thái
-                        self.update_check_complete = True
-
-                        # Kiểm tra kết quả
-                        if 'error' in result:
-                            # Hiển thị thông báo lỗi
-                            self.update_status(f"Lỗi kiểm tra cập nhật: {result['error']}")
-                            logger.error(f"Lỗi kiểm tra cập nhật: {result['error']}")
-                        else:
-                            # Kiểm tra xem có cập nhật không
-                            if result['has_update']:
-                                # Có cập nhật mới
-                                update_msg = f"Có phiên bản mới: {result['latest_version']} (hiện tại: {result['current_version']})"
-                                self.update_status(update_msg)
-
-                                # Hiển thị thông báo cập nhật
-                                reply = QtWidgets.QMessageBox.information(
-                                    self,
-                                    "Cập nhật mới",
-                                    f"{update_msg}\n\n{result.get('update_notes', '')}\n\nBạn có muốn tải cập nhật không?",
-                                    QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
-                                    QtWidgets.QMessageBox.StandardButton.No
-                                )
-
-                                if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-                                    # Mở trang tải cập nhật
-                                    import webbrowser
-                                    webbrowser.open(result['update_url'])
-
-                                    # Đánh dấu đã thông báo
-                                    update_checker.mark_as_notified()
-                            else:
-                                # Không có cập nhật
-                                self.update_status(f"Phần mềm đã cập nhật (phiên bản {result['current_version']})")
-
-                        # Hoàn thành bước này
-                        self.update_indicator(self.current_step, "success")
-                        self.current_step += 1
-                        self.update_progress(self.calculate_overall_progress())
-
-                        # Tiếp tục xử lý các bước tiếp theo
-                        self.process_next_step()
-                    except Exception as e:
-                        logger.error(f"Lỗi trong callback kiểm tra cập nhật: {str(e)}")
-                        logger.error(traceback.format_exc())
+                # Đánh dấu là đã hoàn thành quá trình cấu hình (dù thành công hay không)
+                self.config_completed = True
+            else:
+                self.update_status("Cấu hình Telegram đã sẵn sàng")
+                self.config_completed = True
+        except Exception as e:
+            logger.error(f"Lỗi khi đọc cấu hình: {str(e)}")
+            self.fail_step(STEP_TELEGRAM, f"Lỗi đọc cấu hình: {str(e)}")
+            return
 
-                        # Đánh dấu bước này là thành công và chuyển sang bước tiếp theo
-                        self.update_indicator(self.current_step, "success")
-                        self.current_step += 1
-                        self.update_progress(self.calculate_overall_progress())
+        # Chỉ tiếp tục khi đã hoàn thành quá trình cấu hình
+        if self.config_completed:
+            self.update_status("Kết nối Telegram OK")
+            self.complete_step(STEP_TELEGRAM)
 
-                        # Tiếp tục xử lý các bước tiếp theo
-                        self.process_next_step()
+    def step_load_ui(self):
+        """Bước 7: Tải các thành phần giao diện (được nạp cùng cửa sổ chính, không cần chờ)"""
+        self.update_status("Đã nạp các thành phần giao diện")
+        self.complete_step(STEP_UI)
 
-                # Kiểm tra cập nhật bất đồng bộ
-                update_checker.check_for_updates_async(callback=on_update_check_complete)
+    def step_check_disk_space(self):
+        """Bước 8: Kiểm tra không gian lưu trữ"""
+        self.update_status("Đang kiểm tra không gian lưu trữ...")
+        self.run_blocking(lambda: DiskSpaceChecker().check_all(), self.on_disk_space_checked)
 
-                # QUAN TRỌNG: Dừng xử lý ở đây và đợi callback
-                return
+    def on_disk_space_checked(self, space_info, error=None):
+        """Hiển thị kết quả kiểm tra không gian lưu trữ (cảnh báo nếu thiếu)"""
+        try:
+            if error is not None:
+                raise error
 
-            except ImportError:
-                # Không tìm thấy module update_checker
-                logger.warning("Module update_checker không tìm thấy, bỏ qua kiểm tra cập nhật")
-                self.update_status("Bỏ qua kiểm tra cập nhật")
-
-                # Đánh dấu bước này là thành công và chuyển sang bước tiếp theo
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except Exception as e:
-                logger.error(f"Lỗi khi kiểm tra cập nhật: {str(e)}")
-                logger.error(traceback.format_exc())
-
-                # Đánh dấu lỗi nhưng vẫn tiếp tục
-                self.mark_step_error(8, f"Lỗi kiểm tra cập nhật: {str(e)}")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-        elif self.current_step == 9:  # Tối ưu hóa hiệu suất
-            try:
-                # Cập nhật trạng thái
-                self.update_status("Đang tối ưu hóa hiệu suất...")
+            # Hiển thị thông tin không gian đĩa
+            disk_space = space_info['disk_space']
 
-                # Tạo đối tượng tối ưu hóa
-                optimizer = PerformanceOptimizer()
+            self.update_status(f"Không gian trống: {disk_space['formatted']['free']} ({disk_space['percent_free']}%)")
 
-                # Flag theo dõi trạng thái tối ưu hóa
-                self.optimization_complete = False
+            # Kiểm tra nếu không gian không đủ
+            if not space_info['has_sufficient_space']:
+                # Hiển thị cảnh báo không gian không đủ
+                warning_msg = f"Cảnh báo: Không gian trống ({disk_space['formatted']['free']}) thấp hơn yêu cầu tối thiểu (1GB)"
+                self.update_status(warning_msg)
 
-                # Hàm callback khi tối ưu hóa hoàn tất
-                def on_optimization_complete(result):
-                    try:
-                        # Cập nhật biến trạng thái
-                        self.optimization_complete = True
-
-                        # Kiểm tra kết quả
-                        if result['success']:
-                            # Hiển thị thông tin tối ưu hóa
-                            self.update_status(result['message'])
-
-                            # Log thông tin chi tiết
-                            logger.info(f"Tối ưu hóa bộ nhớ: Giải phóng {result['memory']['freed']['formatted']}")
-                            logger.info(f"Dọn dẹp cache: {result['cache']['message']}")
-                            logger.info(f"Dọn dẹp logs: {result['logs']['message']}")
-                            logger.info(f"Dọn dẹp temp: {result['temp']['message']}")
-                        else:
-                            # Hiển thị thông báo lỗi
-                            self.update_status(f"Lỗi tối ưu hóa: {result.get('error', 'Unknown error')}")
-                            logger.error(f"Lỗi tối ưu hóa: {result.get('error', 'Unknown error')}")
+                # Hiển thị dialog cảnh báo
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Cảnh báo không gian lưu trữ",
+                    f"{warning_msg}\n\nỨng dụng có thể không hoạt động đúng cách.\nVui lòng giải phóng thêm không gian đĩa.",
+                    QtWidgets.QMessageBox.StandardButton.Ok
+                )
 
-                        # Hoàn thành bước này
-                        self.update_indicator(self.current_step, "success")
-                        self.current_step += 1
-                        self.update_progress(self.calculate_overall_progress())
+            # Kiểm tra quyền ghi
+            if not space_info['write_permission']:
+                # Hiển thị cảnh báo không có quyền ghi
+                warning_msg = "Cảnh báo: Không có quyền ghi vào thư mục làm việc"
+                self.update_status(warning_msg)
 
-                        # Tiếp tục xử lý các bước tiếp theo
-                        self.process_next_step()
-                    except Exception as e:
-                        logger.error(f"Lỗi trong callback tối ưu hóa: {str(e)}")
-                        logger.error(traceback.format_exc())
+                # Hiển thị dialog cảnh báo
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Cảnh báo quyền ghi",
+                    f"{warning_msg}\n\nỨng dụng có thể không hoạt động đúng cách.\nVui lòng chạy ứng dụng với quyền admin hoặc kiểm tra lại quyền truy cập.",
+                    QtWidgets.QMessageBox.StandardButton.Ok
+                )
 
-                        # Đánh dấu bước này là thành công và chuyển sang bước tiếp theo
-                        self.update_indicator(self.current_step, "success")
-                        self.current_step += 1
-                        self.update_progress(self.calculate_overall_progress())
+            # Cập nhật UI với thông tin tốt đẹp
+            if space_info['has_sufficient_space'] and space_info['write_permission']:
+                success_msg = f"Kiểm tra không gian lưu trữ OK: {disk_space['formatted']['free']} trống"
+                self.update_status(success_msg)
+
+            # Hoàn thành bước này
+            self.complete_step(STEP_DISK)
+        except ImportError:
+            # Không tìm thấy module disk_space_checker
+            logger.warning("Module disk_space_checker không tìm thấy, bỏ qua kiểm tra không gian lưu trữ")
+            self.update_status("Bỏ qua kiểm tra không gian lưu trữ")
+            self.complete_step(STEP_DISK)
+        except Exception as e:
+            logger.error(f"Lỗi khi kiểm tra không gian lưu trữ: {str(e)}")
+            logger.error(traceback.format_exc())
 
-                        # Tiếp tục xử lý các bước tiếp theo
-                        self.process_next_step()
+            # Đánh dấu lỗi nhưng vẫn tiếp tục
+            self.mark_step_error(STEP_DISK, f"Lỗi kiểm tra không gian: {str(e)}")
+            self.complete_step(STEP_DISK, "error")
 
-                # Thực hiện tối ưu hóa bất đồng bộ
-                optimizer.optimize_async(callback=on_optimization_complete)
+    def step_check_updates(self):
+        """Bước 9: Tìm kiếm cập nhật"""
+        try:
+            # Cập nhật trạng thái
+            self.update_status("Đang kiểm tra cập nhật...")
 
-                # QUAN TRỌNG: Dừng xử lý ở đây và đợi callback
-                return
+            # Tạo đối tượng kiểm tra cập nhật
+            update_checker = UpdateChecker()
 
-            except ImportError:
-                # Không tìm thấy module performance_optimizer
-                logger.warning("Module performance_optimizer không tìm thấy, bỏ qua tối ưu hóa hiệu suất")
-                self.update_status("Bỏ qua tối ưu hóa hiệu suất")
-
-                # Đánh dấu bước này là thành công và chuyển sang bước tiếp theo
-                self.update_indicator(self.current_step, "success")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-            except Exception as e:
-                logger.error(f"Lỗi khi tối ưu hóa hiệu suất: {str(e)}")
-                logger.error(traceback.format_exc())
-
-                # Đánh dấu lỗi nhưng vẫn tiếp tục
-                self.mark_step_error(9, f"Lỗi tối ưu hóa: {str(e)}")
-                self.current_step += 1
-                self.update_progress(self.calculate_overall_progress())
-
-    def complete_ui_loading(self):
-        """Hoàn tất việc tải giao diện"""
-        self.update_status("Đã tải giao diện thành công")
-        self.update_indicator(self.current_step, "success")
-        self.current_step += 1
-        self.update_progress(self.calculate_overall_progress())
+            # Callback được gọi từ thread kiểm tra: chuyển kết quả về luồng giao diện
+            update_checker.check_for_updates_async(
+                callback=lambda result: self.ui_call.emit(
+                    lambda: self.on_update_check_complete(update_checker, result)
+                )
+            )
+        except ImportError:
+            # Không tìm thấy module update_checker
+            logger.warning("Module update_checker không tìm thấy, bỏ qua kiểm tra cập nhật")
+            self.update_status("Bỏ qua kiểm tra cập nhật")
+            self.complete_step(STEP_UPDATE)
+        except Exception as e:
+            logger.error(f"Lỗi khi kiểm tra cập nhật: {str(e)}")
+            logger.error(traceback.format_exc())
 
-        # Tiếp tục xử lý các bước tiếp theo
-        self.process_next_step()
+            # Đánh dấu lỗi nhưng vẫn tiếp tục
+            self.mark_step_error(STEP_UPDATE, f"Lỗi kiểm tra cập nhật: {str(e)}")
+            self.complete_step(STEP_UPDATE, "error")
 
-    def complete_update_check(self):
-        """Hoàn tất việc kiểm tra cập nhật"""
-        self.update_status("Phần mềm đã được cập nhật")
-        self.update_indicator(self.current_step, "success")
-        self.current_step += 1
-        self.update_progress(self.calculate_overall_progress())
+    def on_update_check_complete(self, update_checker, result):
+        """Hiển thị kết quả kiểm tra cập nhật"""
+        try:
+            # Kiểm tra kết quả
+            if 'error' in result:
+                # Hiển thị thông báo lỗi
+                self.update_status(f"Lỗi kiểm tra cập nhật: {result['error']}")
+                logger.error(f"Lỗi kiểm tra cập nhật: {result['error']}")
+            elif result['has_update']:
+                # Có cập nhật mới
+                update_msg = f"Có phiên bản mới: {result['latest_version']} (hiện tại: {result['current_version']})"
+                self.update_status(update_msg)
+
+                # Hiển thị thông báo cập nhật
+                reply = QtWidgets.QMessageBox.information(
+                    self,
+                    "Cập nhật mới",
+                    f"{update_msg}\n\n{result.get('update_notes', '')}\n\nBạn có muốn tải cập nhật không?",
+                    QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
+                    QtWidgets.QMessageBox.StandardButton.No
+                )
 
-        # Tiếp tục xử lý các bước tiếp theo
-        self.process_next_step()
+                if reply == QtWidgets.QMessageBox.StandardButton.Yes:
+                    # Mở trang tải cập nhật
+                    webbrowser.open(result['update_url'])
 
-    def complete_optimization(self):
-        """Hoàn tất việc tối ưu hóa hiệu suất"""
-        self.update_status("Hiệu suất đã được tối ưu hóa")
-        self.update_indicator(self.current_step, "success")
-        self.current_step += 1
-        self.update_progress(self.calculate_overall_progress())
+                    # Đánh dấu đã thông báo
+                    update_checker.mark_as_notified()
+            else:
+                # Không có cập nhật
+                self.update_status(f"Phần mềm đã cập nhật (phiên bản {result['current_version']})")
+        except Exception as e:
+            logger.error(f"Lỗi trong callback kiểm tra cập nhật: {str(e)}")
+            logger.error(traceback.format_exc())
+
+        # Hoàn thành bước này
+        self.complete_step(STEP_UPDATE)
+
+    def step_optimize(self):
+        """Bước 10: Tối ưu hóa hiệu suất"""
+        try:
+            # Cập nhật trạng thái
+            self.update_status("Đang tối ưu hóa hiệu suất...")
+
+            # Tạo đối tượng tối ưu hóa
+            optimizer = PerformanceOptimizer()
+
+            # Callback được gọi từ thread tối ưu hóa: chuyển kết quả về luồng giao diện
+            optimizer.optimize_async(
+                callback=lambda result: self.ui_call.emit(lambda: self.on_optimization_complete(result))
+            )
+        except ImportError:
+            # Không tìm thấy module performance_optimizer
+            logger.warning("Module performance_optimizer không tìm thấy, bỏ qua tối ưu hóa hiệu suất")
+            self.update_status("Bỏ qua tối ưu hóa hiệu suất")
+            self.complete_step(STEP_OPTIMIZE)
+        except Exception as e:
+            logger.error(f"Lỗi khi tối ưu hóa hiệu suất: {str(e)}")
+            logger.error(traceback.format_exc())
+
+            # Đánh dấu lỗi nhưng vẫn tiếp tục
+            self.mark_step_error(STEP_OPTIMIZE, f"Lỗi tối ưu hóa: {str(e)}")
+            self.complete_step(STEP_OPTIMIZE, "error")
+
+    def on_optimization_complete(self, result):
+        """Hiển thị kết quả tối ưu hóa hiệu suất"""
+        try:
+            # Kiểm tra kết quả
+            if result['success']:
+                # Hiển thị thông tin tối ưu hóa
+                self.update_status(result['message'])
+
+                # Log thông tin chi tiết
+                logger.info(f"Tối ưu hóa bộ nhớ: Giải phóng {result['memory']['freed']['formatted']}")
+                logger.info(f"Dọn dẹp cache: {result['cache']['message']}")
+                logger.info(f"Dọn dẹp logs: {result['logs']['message']}")
+                logger.info(f"Dọn dẹp temp: {result['temp']['message']}")
+            else:
+                # Hiển thị thông báo lỗi
+                self.update_status(f"Lỗi tối ưu hóa: {result.get('error', 'Unknown error')}")
+                logger.error(f"Lỗi tối ưu hóa: {result.get('error', 'Unknown error')}")
+        except Exception as e:
+            logger.error(f"Lỗi trong callback tối ưu hóa: {str(e)}")
+            logger.error(traceback.format_exc())
 
-        # Không cần gọi process_next_step() vì đây là bước cuối cùng
-        # Tiến trình sẽ phát tín hiệu finished trong lần gọi process_next_step tiếp theo
+        # Hoàn thành bước này
+        self.complete_step(STEP_OPTIMIZE)
 
     def on_config_saved(self, success):
         """
@@ -1,27 +1,50 @@
 """
 Module tiện ích cho Telegram Video Uploader.
-"""
-
-from .telegram_api import TelegramAPI
-from .video_analyzer import VideoAnalyzer
-from .auto_uploader import AutoUploader, FileWatcher, BulkUploader
-from .pagination_utils import PaginationManager
 
-# Import các module mới
-from .disk_space_checker import DiskSpaceChecker
-from .update_checker import UpdateChecker
-from .performance_optimizer import PerformanceOptimizer
+Các lớp bên dưới được nạp khi dùng lần đầu (from utils import VideoAnalyzer vẫn
+hoạt động như cũ), để việc import một module con như utils.ssl_helper không kéo
+theo cv2, telebot, telethon... ngay lúc khởi động.
+"""
+import importlib
 
-try:
-    from .video_splitter import VideoSplitter
-except ImportError:
-    pass  # Bỏ qua nếu không có module video_splitter
+# {tên lớp: module con chứa lớp đó}
+_EXPORTS = {
+    'TelegramAPI': 'telegram_api',
+    'VideoAnalyzer': 'video_analyzer',
+    'AutoUploader': 'auto_uploader',
+    'FileWatcher': 'auto_uploader',
+    'BulkUploader': 'auto_uploader',
+    'PaginationManager': 'pagination_utils',
+    'DiskSpaceChecker': 'disk_space_checker',
+    'UpdateChecker': 'update_checker',
+    'PerformanceOptimizer': 'performance_optimizer',
+    'UploadJobQueue': 'upload_job_queue',
+    'VideoSplitter': 'video_splitter',
+    'TelethonUploader': 'telethon_uploader',
+}
 
-try:
-    from .telethon_uploader import TelethonUploader
-except ImportError:
-    pass  # Bỏ qua nếu không có module telethon_uploader
+# Các module có thể không có (bỏ qua nếu import lỗi)
+_OPTIONAL = {'VideoSplitter', 'TelethonUploader'}
 
 __all__ = ['TelegramAPI', 'VideoAnalyzer', 'AutoUploader', 'FileWatcher',
            'BulkUploader', 'VideoSplitter', 'TelethonUploader', 'PaginationManager',
-           'DiskSpaceChecker', 'UpdateChecker', 'PerformanceOptimizer']
\ No newline at end of file
+           'DiskSpaceChecker', 'UpdateChecker', 'PerformanceOptimizer', 'UploadJobQueue']
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    except ImportError:
+        if name in _OPTIONAL:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        raise
+
+    # Lần sau lấy thẳng, không qua __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
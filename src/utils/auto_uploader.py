@@ -5,34 +5,107 @@ import os
 import time
 import logging
 import threading
-from queue import Queue, Empty
+from queue import Empty
 from datetime import datetime
 import tkinter as tk
 from tkinter import messagebox
 
+from .upload_job_queue import UploadJobQueue, SOURCE_AUTO, SOURCE_BULK, STATUS_PENDING
+from . import inotify_watcher
+from .folder_scanner import FolderScanner
+
 logger = logging.getLogger("AutoUploader")
 
+def _resolve_job_queue(job_queue, telegram_uploader):
+    """
+    Hàng đợi dùng cho worker nền: hàng đợi được truyền vào, hàng đợi của ứng dụng,
+    hoặc hàng đợi tại data/upload_jobs.db (không tạo file trong thư mục hiện hành)
+    """
+    if job_queue is not None:
+        return job_queue
+    app_queue = getattr(telegram_uploader, 'upload_job_queue', None)
+    if app_queue is not None:
+        return app_queue
+    logger.warning("Không có hàng đợi tải lên của ứng dụng, dùng hàng đợi mặc định trong thư mục data")
+    return UploadJobQueue()
+
+class AppVideoSender:
+    """
+    Gửi video qua TelegramAPI của ứng dụng Qt, theo giao diện upload_single_video(file_path)
+    mà BulkUploader/AutoUploader dùng. Video gửi thành công được ghi vào lịch sử.
+    """
+    def __init__(self, application):
+        """
+        Khởi tạo AppVideoSender
+        
+        Args:
+            application: Đối tượng TelegramUploaderApp (config, telegram_api,
+                         upload_history, video_analyzer, upload_job_queue)
+        """
+        self.application = application
+        self.upload_job_queue = getattr(application, 'upload_job_queue', None)
+    
+    def upload_single_video(self, file_path):
+        """
+        Gửi một video tới chat đã cấu hình
+        
+        Args:
+            file_path (str): Đường dẫn video
+            
+        Returns:
+            bool: True nếu gửi thành công
+        """
+        application = self.application
+        telegram_api = getattr(application, 'telegram_api', None)
+        chat_id = application.config['TELEGRAM'].get('chat_id') if 'TELEGRAM' in application.config else None
+        if not telegram_api or not chat_id:
+            logger.error("Chưa kết nối Telegram, không thể tải lên")
+            return False
+        
+        video_name = os.path.basename(file_path)
+        caption = f"📹 {video_name}\n📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        if not telegram_api.send_video(chat_id, file_path, caption=caption):
+            return False
+        
+        upload_history = getattr(application, 'upload_history', None)
+        video_analyzer = getattr(application, 'video_analyzer', None)
+        if upload_history and video_analyzer:
+            video_hash = video_analyzer.calculate_video_hash(file_path)
+            if video_hash:
+                upload_history.add_upload(video_hash, video_name, file_path, os.path.getsize(file_path),
+                                          upload_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        return True
+
 class FileWatcher:
     """
     Theo dõi thư mục để phát hiện file mới và thay đổi
     """
-    def __init__(self, folder_path, extensions=None, callback=None, check_interval=60):
+    def __init__(self, folder_path, extensions=None, callback=None, check_interval=60, use_inotify=True,
+                 settle_time=5):
         """
         Khởi tạo FileWatcher
         
         Args:
             folder_path (str): Đường dẫn thư mục cần theo dõi
             extensions (list): Danh sách phần mở rộng file cần theo dõi (mặc định None -> theo dõi tất cả)
-            callback (function): Hàm callback được gọi khi phát hiện file mới
-            check_interval (int): Thời gian kiểm tra định kỳ (giây)
+            callback (function): Hàm callback được gọi khi phát hiện file mới đã ghi xong
+            check_interval (int): Thời gian kiểm tra định kỳ (giây), chỉ dùng ở chế độ quét định kỳ
+            use_inotify (bool): Dùng inotify nếu hệ thống hỗ trợ (mặc định True)
+            settle_time (float): Số giây kích thước/thời gian sửa đổi phải giữ nguyên
+                                 trước khi file được coi là ghi xong
         """
         self.folder_path = folder_path
         self.extensions = extensions if extensions else []
         self.callback = callback
         self.check_interval = check_interval
+        self.use_inotify = use_inotify
+        self.settle_time = settle_time
         self.running = False
         self.watcher_thread = None
         self.watched_files = {}  # Dict lưu trạng thái các file đã biết
+        self.settling_files = {}  # {path: (size, mtime, stable_since)} các file đang chờ ghi xong
+        self.inotify = None  # InotifyWatcher khi dùng chế độ sự kiện
+        self._stop_event = threading.Event()
         
     def is_valid_file(self, file_path):
         """
@@ -47,10 +120,22 @@ class FileWatcher:
         if not os.path.isfile(file_path):
             return False
             
+        return self._has_valid_extension(file_path)
+    
+    def _has_valid_extension(self, file_name):
+        """
+        Kiểm tra phần mở rộng của file có nằm trong danh sách theo dõi không
+        
+        Args:
+            file_name (str): Tên hoặc đường dẫn file
+            
+        Returns:
+            bool: True nếu file cần theo dõi
+        """
         if not self.extensions:  # Nếu không chỉ định phần mở rộng -> theo dõi tất cả
             return True
             
-        ext = os.path.splitext(file_path)[1].lower()
+        ext = os.path.splitext(file_name)[1].lower()
         return ext in self.extensions
     
     def scan_folder(self):
@@ -68,13 +153,18 @@ class FileWatcher:
         new_files = []
         
         try:
-            # Quét thư mục
-            for file_name in os.listdir(self.folder_path):
-                file_path = os.path.join(self.folder_path, file_name)
-                
-                if self.is_valid_file(file_path):
+            # Quét thư mục bằng scandir: loại file và stat lấy từ DirEntry,
+            # không cần gọi isfile/stat riêng cho từng file
+            with os.scandir(self.folder_path) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not self._has_valid_extension(entry.name):
+                        continue
+                    
+                    file_name = entry.name
+                    file_path = entry.path
+                    
                     # Lấy thông tin file
-                    file_stat = os.stat(file_path)
+                    file_stat = entry.stat()
                     file_size = file_stat.st_size
                     file_mtime = file_stat.st_mtime
                     
@@ -114,52 +204,237 @@ class FileWatcher:
             return
             
         self.running = True
-        self.watcher_thread = threading.Thread(target=self._watch_folder)
+        self._stop_event.clear()
+        
+        # Ưu tiên inotify, quay về quét định kỳ nếu không khả dụng
+        self.inotify = None
+        if self.use_inotify and inotify_watcher.is_supported():
+            try:
+                self.inotify = inotify_watcher.InotifyWatcher(self.folder_path)
+            except OSError as e:
+                logger.warning(f"Không thể dùng inotify cho {self.folder_path}, chuyển sang quét định kỳ: {str(e)}")
+        
+        target = self._watch_events if self.inotify else self._watch_folder
+        self.watcher_thread = threading.Thread(target=target)
         self.watcher_thread.daemon = True
         self.watcher_thread.start()
         
-        logger.info(f"Bắt đầu theo dõi thư mục: {self.folder_path}")
+        mode = "inotify" if self.inotify else f"quét mỗi {self.check_interval} giây"
+        logger.info(f"Bắt đầu theo dõi thư mục ({mode}): {self.folder_path}")
     
     def stop(self):
         """
         Dừng theo dõi thư mục
         """
         self.running = False
+        self._stop_event.set()
+        if self.inotify:
+            self.inotify.wake()
+        
         if self.watcher_thread and self.watcher_thread.is_alive():
             self.watcher_thread.join(timeout=1.0)
             
         logger.info(f"Đã dừng theo dõi thư mục: {self.folder_path}")
     
+    def _handle_event(self, mask, file_path):
+        """
+        Xử lý một sự kiện inotify
+        
+        Args:
+            mask (int): Cờ sự kiện
+            file_path (str): Đường dẫn file liên quan
+            
+        Returns:
+            bool: True nếu file là file mới/thay đổi cần báo cho callback
+        """
+        if mask & (inotify_watcher.IN_DELETE | inotify_watcher.IN_MOVED_FROM):
+            self.watched_files.pop(file_path, None)
+            return False
+        
+        if mask & inotify_watcher.IN_ISDIR or not self.is_valid_file(file_path):
+            return False
+        
+        if mask & (inotify_watcher.IN_CLOSE_WRITE | inotify_watcher.IN_MOVED_TO):
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                # File bị xóa/đổi tên ngay sau sự kiện
+                self.watched_files.pop(file_path, None)
+                return False
+            previous = self.watched_files.get(file_path)
+            self.watched_files[file_path] = {
+                'size': file_stat.st_size,
+                'mtime': file_stat.st_mtime
+            }
+            
+            # Bỏ qua file chỉ được mở/đóng mà không thay đổi nội dung
+            if previous and previous['size'] == file_stat.st_size and previous['mtime'] == file_stat.st_mtime:
+                return False
+            
+            # File rỗng (mới tạo): chờ sự kiện ghi nội dung tiếp theo
+            if file_stat.st_size == 0:
+                return False
+            
+            logger.info(f"Phát hiện file {'thay đổi' if previous else 'mới'}: {os.path.basename(file_path)}")
+            return True
+        
+        return False
+    
+    def _queue_for_settle(self, file_paths):
+        """
+        Đưa file vào giai đoạn chờ ổn định (file có thể vẫn đang được sao chép/ghi)
+        
+        Args:
+            file_paths (list): Danh sách đường dẫn file mới hoặc thay đổi
+        """
+        now = time.monotonic()
+        for file_path in file_paths:
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                continue
+            self.settling_files[file_path] = (file_stat.st_size, file_stat.st_mtime, now)
+    
+    def _collect_settled(self):
+        """
+        Kiểm tra các file đang chờ ổn định. File được coi là ghi xong khi kích thước
+        và thời gian sửa đổi không đổi trong settle_time giây. File vẫn rỗng sau
+        settle_time giây bị bỏ khỏi danh sách chờ; nếu sau đó được ghi nội dung,
+        file sẽ được phát hiện lại như file thay đổi.
+        
+        Returns:
+            list: Danh sách file đã ghi xong, sẵn sàng gửi cho callback
+        """
+        settled = []
+        now = time.monotonic()
+        
+        for file_path, (size, mtime, stable_since) in list(self.settling_files.items()):
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                # File đã bị xóa hoặc đổi tên trước khi ghi xong
+                del self.settling_files[file_path]
+                continue
+            
+            if file_stat.st_size != size or file_stat.st_mtime != mtime:
+                # File vẫn đang được ghi: đặt lại mốc thời gian ổn định
+                self.settling_files[file_path] = (file_stat.st_size, file_stat.st_mtime, now)
+            elif now - stable_since >= self.settle_time:
+                del self.settling_files[file_path]
+                self.watched_files[file_path] = {'size': size, 'mtime': mtime}
+                if size > 0:
+                    settled.append(file_path)
+                else:
+                    logger.debug(f"Bỏ qua file rỗng: {os.path.basename(file_path)}")
+        
+        return settled
+    
+    def _settle_wait_time(self):
+        """Thời gian chờ tới lần kiểm tra ổn định kế tiếp (None nếu không có file chờ)"""
+        if not self.settling_files:
+            return None
+        return max(0.1, min(1.0, self.settle_time / 2))
+    
+    def _notify(self, file_paths):
+        """Gọi callback cho các file đã sẵn sàng"""
+        if file_paths and self.callback:
+            for file_path in file_paths:
+                if not self.running:
+                    break
+                self.callback(file_path)
+    
+    def _watch_events(self):
+        """
+        Hàm chạy trong thread theo dõi thư mục bằng inotify.
+        Thread bị chặn trong select() khi thư mục không có thay đổi.
+        Nếu watch bị hủy (thư mục bị xóa, di chuyển hoặc unmount) thì chuyển sang
+        quét định kỳ trên cùng thread.
+        """
+        # Quét lần đầu để ghi nhận trạng thái ban đầu
+        self.scan_folder()
+        watch_lost = False
+        
+        try:
+            while self.running:
+                try:
+                    events = self.inotify.read_events(timeout=self._settle_wait_time())
+                    
+                    for mask, file_path in events:
+                        if not self.running:
+                            break
+                        
+                        if mask & inotify_watcher.IN_Q_OVERFLOW:
+                            # Hàng đợi sự kiện bị tràn: quét lại toàn bộ để không bỏ sót file.
+                            # Không biết file đã ghi xong chưa nên phải chờ ổn định.
+                            logger.warning("Hàng đợi inotify bị tràn, quét lại thư mục")
+                            self._queue_for_settle(self.scan_folder())
+                        elif mask & (inotify_watcher.IN_DELETE_SELF | inotify_watcher.IN_MOVE_SELF | inotify_watcher.IN_IGNORED):
+                            logger.warning(f"Thư mục theo dõi đã bị xóa hoặc di chuyển, chuyển sang quét định kỳ: {self.folder_path}")
+                            watch_lost = True
+                            break
+                        else:
+                            try:
+                                changed = self._handle_event(mask, file_path)
+                            except OSError as e:
+                                # Lỗi của một file không làm mất các sự kiện còn lại trong lô
+                                logger.warning(f"Bỏ qua sự kiện của {file_path}: {str(e)}")
+                                continue
+                            if changed:
+                                # IN_CLOSE_WRITE/IN_MOVED_TO: file đã được ghi xong
+                                self.settling_files.pop(file_path, None)
+                                self._notify([file_path])
+                    
+                    if watch_lost:
+                        break
+                    self._notify(self._collect_settled())
+                
+                except Exception as e:
+                    logger.error(f"Lỗi trong thread theo dõi: {str(e)}")
+                    self._stop_event.wait(1)
+        finally:
+            self.inotify.close()
+        
+        if watch_lost and self.running:
+            self.inotify = None
+            self._watch_folder()
+    
     def _watch_folder(self):
         """
-        Hàm chạy trong thread theo dõi thư mục
+        Hàm chạy trong thread theo dõi thư mục (chế độ quét định kỳ)
         """
         # Quét lần đầu để ghi nhận trạng thái ban đầu
         self.scan_folder()
+        next_scan = time.monotonic() + self.check_interval
         
         # Vòng lặp theo dõi
         while self.running:
             try:
-                # Ngủ trước khi quét lại
-                time.sleep(self.check_interval)
+                # Ngủ tới lần quét kế tiếp, hoặc ngắn hơn nếu có file đang chờ ổn định
+                # (thoát ngay khi stop() được gọi)
+                wait_time = max(0, next_scan - time.monotonic())
+                settle_wait = self._settle_wait_time()
+                if settle_wait is not None:
+                    wait_time = min(wait_time, settle_wait)
+                if self._stop_event.wait(wait_time):
+                    break
                 
-                # Quét thư mục
-                new_files = self.scan_folder()
+                # Quét thư mục khi tới hạn
+                if time.monotonic() >= next_scan:
+                    self._queue_for_settle(self.scan_folder())
+                    next_scan = time.monotonic() + self.check_interval
                 
-                # Gọi callback cho mỗi file mới
-                if new_files and self.callback:
-                    for file_path in new_files:
-                        self.callback(file_path)
+                # Chỉ gọi callback cho các file đã ghi xong
+                self._notify(self._collect_settled())
                 
             except Exception as e:
                 logger.error(f"Lỗi trong thread theo dõi: {str(e)}")
-                time.sleep(5)  # Đợi một chút trước khi thử lại
+                self._stop_event.wait(5)  # Đợi một chút trước khi thử lại
 
 class BulkUploader:
     """
     Quản lý việc tải lên hàng loạt các video có sẵn trong thư mục
     """
-    def __init__(self, telegram_uploader, video_analyzer=None, upload_history=None):
+    def __init__(self, telegram_uploader, video_analyzer=None, upload_history=None, job_queue=None):
         """
         Khởi tạo BulkUploader
         
@@ -167,11 +442,12 @@ class BulkUploader:
             telegram_uploader: Đối tượng quản lý tải lên Telegram
             video_analyzer: Đối tượng phân tích video (có thể None)
             upload_history: Đối tượng quản lý lịch sử tải lên (có thể None)
+            job_queue: Hàng đợi tải lên bền vững (mặc định dùng hàng đợi của ứng dụng)
         """
         self.telegram_uploader = telegram_uploader
         self.video_analyzer = video_analyzer
         self.upload_history = upload_history
-        self.upload_queue = Queue()
+        self.job_queue = _resolve_job_queue(job_queue, telegram_uploader)
         self.upload_thread = None
         self.running = False
         self.check_duplicates = True
@@ -231,13 +507,8 @@ class BulkUploader:
             # Quét thư mục
             self.log(f"Đang quét thư mục: {folder_path}")
             
-            videos = []
-            for file_name in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, file_name)
-                if os.path.isfile(file_path):
-                    ext = os.path.splitext(file_path)[1].lower()
-                    if ext in extensions:
-                        videos.append(file_path)
+            scanner = FolderScanner(extensions=extensions, recursive=False)
+            videos = [file_info["path"] for file_info in scanner.scan(folder_path)]
             
             if not videos:
                 self.log(f"Không tìm thấy video nào trong thư mục: {folder_path}")
@@ -284,6 +555,10 @@ class BulkUploader:
                 already_uploaded = set()
                 
                 for video_path in videos.copy():  # Sử dụng copy để tránh lỗi khi sửa đổi danh sách đang lặp
+                    # Bỏ qua file đã nằm trong hàng đợi từ lần chạy trước (đã được kiểm tra)
+                    if self.job_queue.is_active(video_path):
+                        continue
+                    
                     try:
                         # Tính hash của video
                         video_hash = self.video_analyzer.calculate_video_hash(video_path)
@@ -302,14 +577,14 @@ class BulkUploader:
                 self.log("Không còn video nào để tải lên sau khi lọc")
                 return False
             
-            # Bắt đầu tải lên
-            self.start()
-            
-            # Thêm các video vào hàng đợi
+            # Thêm các video vào hàng đợi bền vững trước khi khởi động worker
             for video in videos:
-                self.upload_queue.put(video)
+                self.job_queue.enqueue(video, source=SOURCE_BULK)
             
             self.log(f"Đã thêm {len(videos)} video vào hàng đợi tải lên")
+            
+            # Bắt đầu tải lên
+            self.start()
             return True
             
         except Exception as e:
@@ -318,6 +593,20 @@ class BulkUploader:
             self.log(traceback.format_exc())
             return False
     
+    def resume(self):
+        """
+        Tiếp tục các công việc tải lên hàng loạt còn dang dở từ phiên trước
+        mà không cần quét lại thư mục
+        
+        Returns:
+            int: Số video được tiếp tục tải lên
+        """
+        pending_count = self.job_queue.count(STATUS_PENDING, source=SOURCE_BULK)
+        if pending_count:
+            self.log(f"Tiếp tục {pending_count} video còn trong hàng đợi từ phiên trước")
+            self.start()
+        return pending_count
+    
     def start(self):
         """
         Bắt đầu quá trình tải lên
@@ -337,18 +626,24 @@ class BulkUploader:
         
         self.log("Bắt đầu quá trình tải lên hàng loạt")
     
-    def stop(self):
+    def stop(self, wait=False):
         """
         Dừng quá trình tải lên
+        
+        Args:
+            wait (bool): Chờ video đang tải lên xong và thread kết thúc hẳn
+                         (gọi trước khi đóng lịch sử và hàng đợi tải lên)
         """
         if not self.running:
+            if wait and self.upload_thread and self.upload_thread.is_alive():
+                self.upload_thread.join()
             return
             
         self.running = False
         
         # Đợi thread tải lên kết thúc
         if self.upload_thread and self.upload_thread.is_alive():
-            self.upload_thread.join(timeout=1.0)
+            self.upload_thread.join(timeout=None if wait else 1.0)
             
         self.log("Đã dừng quá trình tải lên hàng loạt")
     
@@ -356,15 +651,19 @@ class BulkUploader:
         """
         Thread xử lý hàng đợi tải lên
         """
-        total_count = self.upload_queue.qsize()
         processed_count = 0
+        self.job_queue.attach_worker(SOURCE_BULK)
         
         while self.running:
             try:
-                # Lấy video từ hàng đợi với timeout
-                try:
-                    file_path = self.upload_queue.get(timeout=1.0)
-                except Empty:
+                # Chỉ nhận việc hàng loạt; bộ lập lịch chia lượt với worker tự động tải lên
+                # (file mới phát hiện được ưu tiên hơn phần tồn đọng), file nhỏ đi trước file lớn
+                job = self.job_queue.claim_next(sources=SOURCE_BULK, yield_to_manual=True)
+                if not job and self.job_queue.count(STATUS_PENDING, source=SOURCE_BULK) > 0:
+                    # Đang nhường lượt cho video tải lên thủ công hoặc tự động tải lên
+                    time.sleep(1.0)
+                    continue
+                if not job:
                     # Hàng đợi đã xử lý hết
                     if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                         app = self.telegram_uploader.app
@@ -375,6 +674,8 @@ class BulkUploader:
                     self.running = False
                     break
                 
+                file_path = job['file_path']
+                
                 try:
                     # Kiểm tra trùng lặp nếu được yêu cầu
                     is_duplicate = False
@@ -421,6 +722,7 @@ class BulkUploader:
                         success = self.telegram_uploader.upload_single_video(file_path)
                         
                         if success:
+                            self.job_queue.complete(job['id'])
                             if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                                 app = self.telegram_uploader.app
                                 app.root.after(0, lambda msg=f"Đã tải lên thành công: {os.path.basename(file_path)}": 
@@ -428,20 +730,25 @@ class BulkUploader:
                             else:
                                 logger.info(f"Đã tải lên thành công: {os.path.basename(file_path)}")
                         else:
+                            self.job_queue.fail(job['id'], "Tải lên thất bại")
                             if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                                 app = self.telegram_uploader.app
                                 app.root.after(0, lambda msg=f"Tải lên thất bại: {os.path.basename(file_path)}": 
                                             self.log_callback(msg))
                             else:
                                 logger.error(f"Tải lên thất bại: {os.path.basename(file_path)}")
+                    else:
+                        # Video bị bỏ qua (trùng lặp hoặc đã tải lên) coi như hoàn tất
+                        self.job_queue.complete(job['id'])
                     
                     # Đánh dấu file đã được xử lý
                     self.processed_files.add(file_path)
                     
-                    # Cập nhật tiến trình
+                    # Cập nhật tiến trình (tổng = đã xử lý + còn lại trong hàng đợi)
                     processed_count += 1
+                    total_count = processed_count + self.job_queue.count(STATUS_PENDING, source=SOURCE_BULK)
                     if self.progress_callback and total_count > 0:
-                        progress = int(processed_count / total_count * 100)
+                        progress = min(99, int(processed_count / total_count * 100))
                         
                         if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                             app = self.telegram_uploader.app
@@ -451,6 +758,7 @@ class BulkUploader:
                             self.progress_callback(progress)
                 
                 except Exception as e:
+                    self.job_queue.fail(job['id'], str(e))
                     if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                         app = self.telegram_uploader.app
                         app.root.after(0, lambda msg=f"Lỗi khi xử lý file {os.path.basename(file_path)}: {str(e)}": 
@@ -458,9 +766,6 @@ class BulkUploader:
                     else:
                         logger.error(f"Lỗi khi xử lý file {os.path.basename(file_path)}: {str(e)}")
                 
-                # Đánh dấu task hoàn thành
-                self.upload_queue.task_done()
-                
                 # Chờ một chút trước khi xử lý file tiếp theo
                 time.sleep(1)
                 
@@ -473,6 +778,8 @@ class BulkUploader:
                     else:
                         logger.error(f"Lỗi trong thread tải lên: {str(e)}")
         
+        self.job_queue.detach_worker(SOURCE_BULK)
+        
         # Đảm bảo tiến trình đạt 100% khi hoàn tất
         if self.progress_callback:
             if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
@@ -486,7 +793,7 @@ class AutoUploader:
     """
     Quản lý việc tự động tải video lên Telegram
     """
-    def __init__(self, telegram_uploader, video_analyzer=None, upload_history=None):
+    def __init__(self, telegram_uploader, video_analyzer=None, upload_history=None, job_queue=None):
         """
         Khởi tạo AutoUploader
         
@@ -494,12 +801,13 @@ class AutoUploader:
             telegram_uploader: Đối tượng quản lý tải lên Telegram
             video_analyzer: Đối tượng phân tích video (có thể None)
             upload_history: Đối tượng quản lý lịch sử tải lên (có thể None)
+            job_queue: Hàng đợi tải lên bền vững (mặc định dùng hàng đợi của ứng dụng)
         """
         self.telegram_uploader = telegram_uploader
         self.video_analyzer = video_analyzer
         self.upload_history = upload_history
         self.file_watcher = None
-        self.upload_queue = Queue()
+        self.job_queue = _resolve_job_queue(job_queue, telegram_uploader)
         self.upload_thread = None
         self.running = False
         self.check_duplicates = True
@@ -528,7 +836,8 @@ class AutoUploader:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self.log_callback(f"[{timestamp}] {message}")
     
-    def start(self, folder_path, extensions, check_interval=60, check_duplicates=True, check_history=True):
+    def start(self, folder_path, extensions, check_interval=60, check_duplicates=True, check_history=True,
+              settle_time=5):
         """
         Bắt đầu tự động tải lên
         
@@ -538,6 +847,7 @@ class AutoUploader:
             check_interval (int): Thời gian kiểm tra định kỳ (giây)
             check_duplicates (bool): Có kiểm tra video trùng lặp không
             check_history (bool): Có kiểm tra video trong lịch sử tải lên không
+            settle_time (float): Số giây file phải không thay đổi trước khi được tải lên
         """
         if self.running:
             return
@@ -551,7 +861,8 @@ class AutoUploader:
             folder_path=folder_path,
             extensions=extensions,
             callback=self._on_new_file,
-            check_interval=check_interval
+            check_interval=check_interval,
+            settle_time=settle_time
         )
         
         # Bắt đầu thread tải lên
@@ -568,11 +879,17 @@ class AutoUploader:
         self.log(f"Kiểm tra trùng lặp: {'Bật' if check_duplicates else 'Tắt'}")
         self.log(f"Kiểm tra lịch sử: {'Bật' if check_history else 'Tắt'}")
     
-    def stop(self):
+    def stop(self, wait=False):
         """
         Dừng tự động tải lên
+        
+        Args:
+            wait (bool): Chờ video đang tải lên xong và thread kết thúc hẳn
+                         (gọi trước khi đóng lịch sử và hàng đợi tải lên)
         """
         if not self.running:
+            if wait and self.upload_thread and self.upload_thread.is_alive():
+                self.upload_thread.join()
             return
             
         self.running = False
@@ -583,7 +900,7 @@ class AutoUploader:
             
         # Đợi thread tải lên kết thúc
         if self.upload_thread and self.upload_thread.is_alive():
-            self.upload_thread.join(timeout=1.0)
+            self.upload_thread.join(timeout=None if wait else 1.0)
             
         self.log("Đã dừng tự động tải lên")
     
@@ -615,22 +932,26 @@ class AutoUploader:
             except Exception as e:
                 logger.error(f"Lỗi khi kiểm tra lịch sử video {os.path.basename(file_path)}: {str(e)}")
         
-        # Thêm vào hàng đợi tải lên
-        self.upload_queue.put(file_path)
+        # Thêm vào hàng đợi tải lên bền vững
+        self.job_queue.enqueue(file_path, source=SOURCE_AUTO)
     
     def _upload_worker(self):
         """
         Thread xử lý hàng đợi tải lên
         """
+        self.job_queue.attach_worker(SOURCE_AUTO)
+        
         while self.running:
             try:
-                # Lấy file từ hàng đợi với timeout
-                try:
-                    file_path = self.upload_queue.get(timeout=1.0)
-                except Empty:
-                    time.sleep(0.5)
+                # Chỉ nhận việc tự động tải lên (kể cả công việc dang dở từ phiên trước);
+                # bộ lập lịch chia lượt với phần tồn đọng hàng loạt
+                job = self.job_queue.claim_next(sources=SOURCE_AUTO, yield_to_manual=True)
+                if not job:
+                    time.sleep(1.0)
                     continue  # Tiếp tục vòng lặp để chờ video mới
                 
+                file_path = job['file_path']
+                
                 try:
                     # Kiểm tra trùng lặp nếu được yêu cầu
                     is_duplicate = False
@@ -686,6 +1007,7 @@ class AutoUploader:
                         success = self.telegram_uploader.upload_single_video(file_path)
                         
                         if success:
+                            self.job_queue.complete(job['id'])
                             if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                                 app = self.telegram_uploader.app
                                 msg = f"Đã tải lên thành công: {os.path.basename(file_path)}"
@@ -693,17 +1015,22 @@ class AutoUploader:
                             else:
                                 logger.info(f"Đã tải lên thành công: {os.path.basename(file_path)}")
                         else:
+                            self.job_queue.fail(job['id'], "Tải lên thất bại")
                             if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                                 app = self.telegram_uploader.app
                                 msg = f"Tải lên thất bại: {os.path.basename(file_path)}"
                                 app.root.after(0, lambda m=msg: self.log_callback(m))
                             else:
                                 logger.error(f"Tải lên thất bại: {os.path.basename(file_path)}")
+                    else:
+                        # Video bị bỏ qua (trùng lặp hoặc đã tải lên) coi như hoàn tất
+                        self.job_queue.complete(job['id'])
                     
                     # Đánh dấu file đã được xử lý
                     self.processed_files.add(file_path)
                 
                 except Exception as e:
+                    self.job_queue.fail(job['id'], str(e))
                     if hasattr(self, 'telegram_uploader') and hasattr(self.telegram_uploader, 'app'):
                         app = self.telegram_uploader.app
                         msg = f"Lỗi khi xử lý file {os.path.basename(file_path)}: {str(e)}"
@@ -711,9 +1038,6 @@ class AutoUploader:
                     else:
                         logger.error(f"Lỗi khi xử lý file {os.path.basename(file_path)}: {str(e)}")
                 
-                # Đánh dấu task hoàn thành
-                self.upload_queue.task_done()
-                
                 # Chờ một chút trước khi xử lý file tiếp theo
                 time.sleep(1)
                 
@@ -725,6 +1049,8 @@ class AutoUploader:
                         app.root.after(0, lambda m=msg: self.log_callback(m))
                     else:
                         logger.error(f"Lỗi trong thread tải lên: {str(e)}")
+        
+        self.job_queue.detach_worker(SOURCE_AUTO)
 
 if __name__ == "__main__":
     # Mã kiểm thử
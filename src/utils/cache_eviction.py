@@ -0,0 +1,418 @@
+"""
+Module quản lý và dọn dẹp thư mục cache theo ngân sách từng loại.
+
+Mỗi file cache được ghi vào một chỉ mục SQLite (kích thước, lần truy cập cuối,
+loại: ảnh thu nhỏ, dấu vân tay, phần video đã chia, kết quả ffprobe...). Khi một
+loại vượt ngân sách, các file lâu không dùng nhất (LRU) bị xóa dần theo từng lô
+nhỏ, có thể chạy trong một thread nền. Số lần trúng/trượt cache và số file bị
+xóa được đếm lại để theo dõi. Phần dung lượng các loại riêng chưa dùng tới được
+nhường cho file không phân loại.
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+from .size_accountant import get_accountant
+
+logger = logging.getLogger("CacheEviction")
+
+# Loại cache, tương ứng với thư mục con cùng tên trong thư mục cache
+CATEGORY_THUMBNAILS = 'thumbnails'
+CATEGORY_FINGERPRINTS = 'fingerprints'
+CATEGORY_SPLIT_PARTS = 'split_parts'
+CATEGORY_PROBE_RESULTS = 'probe_results'
+CATEGORY_OTHER = 'other'
+
+CATEGORIES = [
+    CATEGORY_THUMBNAILS,
+    CATEGORY_FINGERPRINTS,
+    CATEGORY_SPLIT_PARTS,
+    CATEGORY_PROBE_RESULTS,
+    CATEGORY_OTHER
+]
+
+# Ngân sách mặc định của từng loại, tính theo tỉ lệ tổng dung lượng cache cho phép
+DEFAULT_BUDGET_SHARES = {
+    CATEGORY_THUMBNAILS: 0.30,
+    CATEGORY_FINGERPRINTS: 0.10,
+    CATEGORY_SPLIT_PARTS: 0.45,
+    CATEGORY_PROBE_RESULTS: 0.05,
+    CATEGORY_OTHER: 0.10
+}
+
+# Khi dọn dẹp, xóa cho tới khi còn dưới tỉ lệ này của ngân sách
+LOW_WATERMARK = 0.8
+
+# Số file tối đa bị xóa trong một lô
+EVICTION_BATCH = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(category, last_access);
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+METRIC_NAMES = ['hits', 'misses', 'evictions', 'bytes_evicted']
+
+class CacheEvictionEngine:
+    """
+    Chỉ mục và bộ dọn dẹp LRU cho thư mục cache, có ngân sách theo loại.
+    An toàn khi dùng từ nhiều thread.
+    """
+
+    def __init__(self, cache_dir, db_file, max_total=100 * 1024 * 1024, budgets=None):
+        """
+        Khởi tạo
+
+        Args:
+            cache_dir (str): Thư mục cache
+            db_file (str): File SQLite lưu chỉ mục (nên nằm ngoài thư mục cache)
+            max_total (int): Tổng dung lượng cache cho phép (bytes)
+            budgets (dict, optional): {loại: bytes}, mặc định chia max_total theo DEFAULT_BUDGET_SHARES
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.db_file = db_file
+        self.max_total = max_total
+        self.budgets = budgets or {
+            category: int(max_total * share) for category, share in DEFAULT_BUDGET_SHARES.items()
+        }
+
+        self._lock = threading.RLock()
+        self._pending_metrics = dict.fromkeys(METRIC_NAMES, 0)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        if db_file != ':memory:' and os.path.dirname(db_file):
+            os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        if db_file != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _relative(self, path):
+        """Đường dẫn tương đối trong thư mục cache (dấu "/")"""
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.cache_dir)
+        return path.replace(os.sep, '/')
+
+    def category_of(self, path):
+        """Loại cache của một file, theo thư mục con đầu tiên"""
+        first = self._relative(path).split('/', 1)[0]
+        return first if first in self.budgets and first != CATEGORY_OTHER else CATEGORY_OTHER
+
+    def path_for(self, category, name):
+        """
+        Đường dẫn để ghi một file cache mới thuộc loại category (tạo thư mục nếu cần)
+
+        Returns:
+            str: Đường dẫn tuyệt đối
+        """
+        directory = os.path.join(self.cache_dir, category)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+    def put(self, path):
+        """
+        Ghi nhận một file vừa được ghi vào cache
+
+        Args:
+            path (str): Đường dẫn file (tuyệt đối hoặc tương đối trong thư mục cache)
+
+        Returns:
+            bool: True nếu đã ghi nhận
+        """
+        relative = self._relative(path)
+        try:
+            size = os.path.getsize(os.path.join(self.cache_dir, relative))
+        except OSError:
+            return False
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE path = ?", (relative,)).fetchone()
+            self._conn.execute(
+                "INSERT INTO entries (path, category, size, last_access, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size, last_access = excluded.last_access",
+                (relative, self.category_of(relative), size, now, now)
+            )
+        added = size - (row[0] if row else 0)
+        if added:
+            get_accountant().record_added(os.path.join(self.cache_dir, relative), added)
+        return True
+
+    def get(self, path):
+        """
+        Tra cứu một file cache; cập nhật lần truy cập cuối nếu có
+
+        Returns:
+            str: Đường dẫn tuyệt đối nếu file còn trong cache, None nếu không
+        """
+        relative = self._relative(path)
+        full_path = os.path.join(self.cache_dir, relative)
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM entries WHERE path = ?", (relative,)).fetchone()
+            if row is not None and os.path.exists(full_path):
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE path = ?", (time.time(), relative))
+                self._pending_metrics['hits'] += 1
+                return full_path
+
+            if row is not None:
+                # File đã bị xóa từ bên ngoài
+                self._conn.execute("DELETE FROM entries WHERE path = ?", (relative,))
+            self._pending_metrics['misses'] += 1
+            return None
+
+    def remove(self, path):
+        """Xóa một file khỏi cache và chỉ mục"""
+        relative = self._relative(path)
+        try:
+            os.remove(os.path.join(self.cache_dir, relative))
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE path = ?", (relative,))
+
+    def sync(self):
+        """
+        Đối chiếu chỉ mục với thư mục cache: thêm file chưa có trong chỉ mục (lần
+        truy cập lấy theo thời điểm sửa), bỏ các dòng của file không còn tồn tại
+
+        Returns:
+            tuple: (số file thêm, số dòng bỏ)
+        """
+        on_disk = {}
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(full_path)
+                except OSError:
+                    continue
+                on_disk[self._relative(full_path)] = stat
+
+        with self._lock:
+            indexed = {row[0]: row[1] for row in self._conn.execute("SELECT path, size FROM entries")}
+            missing = [(path,) for path in indexed if path not in on_disk]
+            added = [
+                (path, self.category_of(path), stat.st_size, stat.st_mtime, stat.st_mtime)
+                for path, stat in on_disk.items() if path not in indexed
+            ]
+            resized = [
+                (stat.st_size, path) for path, stat in on_disk.items()
+                if path in indexed and indexed[path] != stat.st_size
+            ]
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM entries WHERE path = ?", missing)
+            self._conn.executemany(
+                "INSERT INTO entries (path, category, size, last_access, created_at) VALUES (?, ?, ?, ?, ?)", added)
+            self._conn.executemany("UPDATE entries SET size = ? WHERE path = ?", resized)
+            self._conn.execute("COMMIT")
+
+        if added or missing:
+            logger.info(f"Đồng bộ chỉ mục cache: thêm {len(added)} file, bỏ {len(missing)} file không còn tồn tại")
+        return len(added), len(missing)
+
+    def usage(self):
+        """
+        Dung lượng đang dùng của từng loại (theo chỉ mục, không quét đĩa)
+
+        Returns:
+            dict: {loại: bytes}
+        """
+        with self._lock:
+            usage = dict.fromkeys(self.budgets, 0)
+            for category, size in self._conn.execute("SELECT category, SUM(size) FROM entries GROUP BY category"):
+                usage[category] = size or 0
+            return usage
+
+    def total_size(self):
+        """Tổng dung lượng cache theo chỉ mục"""
+        return sum(self.usage().values())
+
+    def _effective_budgets(self, usage):
+        """
+        Ngân sách áp dụng cho lượt dọn dẹp này: "other" được dùng phần max_total mà
+        các loại riêng chưa dùng tới (không ít hơn ngân sách của nó), nên ngân sách
+        của "other" giảm dần khi các loại riêng lớn lên thay vì giảm đột ngột
+        """
+        budgets = dict(self.budgets)
+        if CATEGORY_OTHER in budgets and self.max_total:
+            categorized = sum(size for category, size in usage.items() if category != CATEGORY_OTHER)
+            budgets[CATEGORY_OTHER] = max(budgets[CATEGORY_OTHER], self.max_total - categorized)
+        return budgets
+
+    def _over_budget(self):
+        """Các loại đang vượt ngân sách: {loại: số byte cần giải phóng} (None = toàn bộ cache)"""
+        usage = self.usage()
+        budgets = self._effective_budgets(usage)
+        excess = {
+            category: size - int(budgets[category] * LOW_WATERMARK)
+            for category, size in usage.items()
+            if category in budgets and size > budgets[category]
+        }
+        total = sum(usage.values())
+        if self.max_total and total > self.max_total:
+            excess[None] = total - int(self.max_total * LOW_WATERMARK)
+        return excess
+
+    def evict_batch(self, limit=EVICTION_BATCH):
+        """
+        Xóa một lô file LRU của các loại đang vượt ngân sách
+
+        Args:
+            limit (int): Số file tối đa bị xóa trong lô này
+
+        Returns:
+            tuple: (số file đã xóa, số byte đã giải phóng); (0, 0) nếu không loại nào vượt ngân sách
+        """
+        removed = 0
+        freed = 0
+        with self._lock:
+            for category, needed in self._over_budget().items():
+                if category is None:
+                    # Tổng vượt max_total: trừ phần các loại đã giải phóng ở trên
+                    needed -= freed
+                    if needed <= 0:
+                        continue
+                    rows = self._conn.execute(
+                        "SELECT path, size FROM entries ORDER BY last_access LIMIT ?", (limit - removed,))
+                else:
+                    rows = self._conn.execute(
+                        "SELECT path, size FROM entries WHERE category = ? ORDER BY last_access LIMIT ?",
+                        (category, limit - removed))
+
+                category_freed = 0
+                for path, size in rows.fetchall():
+                    if category_freed >= needed or removed >= limit:
+                        break
+                    full_path = os.path.join(self.cache_dir, path)
+                    try:
+                        os.remove(full_path)
+                        get_accountant().record_removed(full_path, size)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning(f"Không thể xóa file cache {path}: {str(e)}")
+                        continue
+                    self._conn.execute("DELETE FROM entries WHERE path = ?", (path,))
+                    removed += 1
+                    freed += size
+                    category_freed += size
+
+                if removed >= limit:
+                    break
+
+            self._pending_metrics['evictions'] += removed
+            self._pending_metrics['bytes_evicted'] += freed
+        return removed, freed
+
+    def evict(self, pause=0):
+        """
+        Dọn dẹp cho tới khi mọi loại nằm trong ngân sách, theo từng lô
+
+        Args:
+            pause (float): Số giây nghỉ giữa các lô (để không chiếm đĩa khi chạy nền)
+
+        Returns:
+            tuple: (số file đã xóa, số byte đã giải phóng)
+        """
+        total_removed = 0
+        total_freed = 0
+        while True:
+            removed, freed = self.evict_batch()
+            total_removed += removed
+            total_freed += freed
+            if removed == 0:
+                break
+            # Khi chạy nền: nghỉ giữa các lô, dừng ngay nếu được yêu cầu
+            if pause and self._stop_event.wait(pause):
+                break
+
+        self.flush_metrics()
+        if total_removed:
+            logger.info(f"Đã xóa {total_removed} file cache, giải phóng {total_freed} bytes")
+        return total_removed, total_freed
+
+    def flush_metrics(self):
+        """Cộng các bộ đếm trong bộ nhớ vào bảng metrics"""
+        with self._lock:
+            pending = {name: value for name, value in self._pending_metrics.items() if value}
+            if not pending:
+                return
+            self._conn.executemany(
+                "INSERT INTO metrics (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                list(pending.items())
+            )
+            self._pending_metrics = dict.fromkeys(METRIC_NAMES, 0)
+
+    def metrics(self):
+        """
+        Số liệu cache từ trước tới nay
+
+        Returns:
+            dict: {'hits', 'misses', 'evictions', 'bytes_evicted', 'hit_rate', 'usage', 'budgets'}
+        """
+        with self._lock:
+            stored = dict(self._conn.execute("SELECT name, value FROM metrics").fetchall())
+            result = {name: stored.get(name, 0) + self._pending_metrics[name] for name in METRIC_NAMES}
+        lookups = result['hits'] + result['misses']
+        result['hit_rate'] = round(result['hits'] / lookups, 4) if lookups else None
+        result['usage'] = self.usage()
+        result['budgets'] = self._effective_budgets(result['usage'])
+        return result
+
+    def start_background(self, interval=300, pause=0.05):
+        """
+        Chạy dọn dẹp định kỳ trong một thread nền (đồng bộ chỉ mục một lần khi bắt đầu)
+
+        Args:
+            interval (int): Số giây giữa hai lượt kiểm tra
+            pause (float): Số giây nghỉ giữa các lô xóa
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+
+            def run():
+                try:
+                    self.sync()
+                except Exception as e:
+                    logger.error(f"Lỗi khi đồng bộ chỉ mục cache: {str(e)}")
+                while not self._stop_event.is_set():
+                    try:
+                        self.evict(pause=pause)
+                    except Exception as e:
+                        logger.error(f"Lỗi khi dọn dẹp cache: {str(e)}")
+                    self._stop_event.wait(interval)
+
+            self._thread = threading.Thread(target=run, name="CacheEviction", daemon=True)
+            self._thread.start()
+
+    def stop_background(self, timeout=5):
+        """Dừng thread dọn dẹp nền"""
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        self.flush_metrics()
+
+    def close(self):
+        """Dừng thread nền và đóng kết nối SQLite"""
+        self.stop_background()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,217 @@
+"""
+Module đặt trước dung lượng đĩa cho các tác vụ chia nhỏ/nén video.
+
+Mỗi tác vụ đặt trước kích thước đầu ra ước tính trước khi ghi file. Nếu ổ đĩa
+không còn đủ chỗ (sau khi trừ phần các tác vụ khác đã đặt), tác vụ phải chờ
+tới khi có chỗ thay vì ghi dở rồi tạo ra các phần video bị cắt cụt. Khi một
+phần đã ghi xong, phần đặt trước tương ứng được chuyển thành dung lượng thực
+trên đĩa (consume); khi phần đó được tải lên và xóa, dung lượng được trả lại
+và các tác vụ đang chờ được đánh thức. Nếu không còn phần đặt trước hay file
+tạm nào có thể giải phóng mà vẫn không đủ chỗ, tác vụ báo lỗi ngay thay vì chờ.
+"""
+import os
+import shutil
+import logging
+import threading
+import time
+
+logger = logging.getLogger("DiskReservation")
+
+# Luôn chừa lại dung lượng này trên mỗi ổ đĩa (bytes)
+SAFETY_MARGIN = 256 * 1024 * 1024
+
+# Số giây giữa hai lần kiểm tra lại dung lượng trống khi đang chờ
+POLL_INTERVAL = 2
+
+# Thời gian chờ tối đa mặc định (giây) trước khi báo lỗi thiếu dung lượng
+DEFAULT_TIMEOUT = 600
+
+class InsufficientDiskSpaceError(OSError):
+    """Không thể đặt trước đủ dung lượng đĩa"""
+
+def free_space(path):
+    """Dung lượng trống (bytes) trên ổ đĩa chứa path"""
+    return shutil.disk_usage(path).free
+
+def _device_of(path):
+    """Định danh ổ đĩa chứa path (thư mục cha gần nhất đang tồn tại)"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.stat(path).st_dev, path
+
+class Reservation:
+    """
+    Dung lượng đã đặt trước cho một tác vụ. Dùng được với "with": phần chưa dùng
+    được trả lại khi ra khỏi khối.
+    """
+
+    def __init__(self, reserver, device, directory, size):
+        self._reserver = reserver
+        self.device = device
+        self.directory = directory
+        self.size = size
+        self.remaining = size
+
+    def consume(self, nbytes):
+        """
+        Ghi nhận đã ghi nbytes ra đĩa: phần này giờ nằm trong dung lượng đã dùng
+        của ổ đĩa nên không cần giữ chỗ nữa
+
+        Args:
+            nbytes (int): Số byte vừa ghi
+        """
+        nbytes = min(nbytes, self.remaining)
+        self._reserver._adjust(self, nbytes, written=nbytes)
+
+    def release(self):
+        """Trả lại toàn bộ phần đặt trước chưa dùng"""
+        self._reserver._adjust(self, self.remaining)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+class DiskSpaceReserver:
+    """
+    Quản lý dung lượng đặt trước theo từng ổ đĩa. An toàn khi gọi từ nhiều thread.
+    """
+
+    def __init__(self, margin=SAFETY_MARGIN, poll_interval=POLL_INTERVAL):
+        """
+        Khởi tạo
+
+        Args:
+            margin (int): Dung lượng luôn chừa lại trên mỗi ổ đĩa (bytes)
+            poll_interval (float): Số giây giữa hai lần kiểm tra lại khi đang chờ
+        """
+        self.margin = margin
+        self.poll_interval = poll_interval
+        self._reserved = {}  # {ổ đĩa: tổng số byte đang đặt trước}
+        self._written = {}  # {ổ đĩa: số byte đã ghi (consume) và chưa xóa bằng release_file}
+        self._condition = threading.Condition()
+
+    def reserved(self, directory):
+        """Tổng dung lượng đang được đặt trước trên ổ đĩa chứa directory"""
+        device, _ = _device_of(directory)
+        with self._condition:
+            return self._reserved.get(device, 0)
+
+    def available(self, directory):
+        """Dung lượng còn có thể đặt trước trên ổ đĩa chứa directory"""
+        device, existing = _device_of(directory)
+        with self._condition:
+            return free_space(existing) - self.margin - self._reserved.get(device, 0)
+
+    def reserve(self, directory, size, timeout=DEFAULT_TIMEOUT):
+        """
+        Đặt trước size byte trên ổ đĩa chứa directory, chờ (xếp hàng) nếu chưa đủ chỗ
+
+        Args:
+            directory (str): Thư mục sẽ ghi file
+            size (int): Số byte cần đặt trước
+            timeout (float): Số giây chờ tối đa, None để chờ mãi
+
+        Returns:
+            Reservation: Phần đã đặt trước
+
+        Raises:
+            InsufficientDiskSpaceError: Nếu không có đủ chỗ sau thời gian chờ, hoặc
+                ngay lập tức nếu không tác vụ nào có thể giải phóng thêm chỗ
+        """
+        size = max(0, int(size))
+        device, existing = _device_of(directory)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+
+        with self._condition:
+            while True:
+                free = free_space(existing)
+                if free - self.margin - self._reserved.get(device, 0) >= size:
+                    self._reserved[device] = self._reserved.get(device, 0) + size
+                    if waited:
+                        logger.info(f"Đã có đủ dung lượng, tiếp tục tác vụ tại {directory}")
+                    return Reservation(self, device, directory, size)
+
+                # Không còn gì để chờ giải phóng: yêu cầu không bao giờ vừa
+                pending = self._reserved.get(device, 0) + self._written.get(device, 0)
+                never_fits = not pending and free - self.margin < size
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if never_fits or (remaining is not None and remaining <= 0):
+                    raise InsufficientDiskSpaceError(
+                        f"Không đủ dung lượng trống tại {directory}: cần {size} bytes, "
+                        f"còn {free} bytes ({self._reserved.get(device, 0)} bytes đang được đặt trước)"
+                    )
+
+                if not waited:
+                    logger.warning(f"Chưa đủ dung lượng tại {directory} (cần {size} bytes), chờ tác vụ khác giải phóng")
+                    waited = True
+                # Dung lượng có thể được giải phóng từ bên ngoài nên vẫn kiểm tra lại định kỳ
+                wait = self.poll_interval if remaining is None else min(self.poll_interval, remaining)
+                self._condition.wait(wait)
+
+    def _adjust(self, reservation, nbytes, written=0):
+        """
+        Bớt nbytes khỏi một phần đặt trước và đánh thức các tác vụ đang chờ.
+        written là số byte trong đó đã được ghi ra đĩa (chờ release_file).
+        """
+        if nbytes <= 0:
+            return
+        with self._condition:
+            if written:
+                self._written[reservation.device] = self._written.get(reservation.device, 0) + written
+            reservation.remaining -= nbytes
+            left = self._reserved.get(reservation.device, 0) - nbytes
+            if left > 0:
+                self._reserved[reservation.device] = left
+            else:
+                self._reserved.pop(reservation.device, None)
+            self._condition.notify_all()
+
+    def release_file(self, path):
+        """
+        Xóa một file tạm đã dùng xong (ví dụ phần video đã tải lên) và đánh thức
+        các tác vụ đang chờ dung lượng
+
+        Args:
+            path (str): Đường dẫn file
+
+        Returns:
+            bool: True nếu đã xóa
+        """
+        try:
+            device, _ = _device_of(path)
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        with self._condition:
+            left = self._written.get(device, 0) - size
+            if left > 0:
+                self._written[device] = left
+            else:
+                self._written.pop(device, None)
+            self._condition.notify_all()
+        return True
+
+_reserver = None
+_reserver_lock = threading.Lock()
+
+def get_reserver():
+    """
+    Bộ quản lý dung lượng đặt trước dùng chung cho toàn ứng dụng
+
+    Returns:
+        DiskSpaceReserver: Đối tượng dùng chung
+    """
+    global _reserver
+    with _reserver_lock:
+        if _reserver is None:
+            _reserver = DiskSpaceReserver()
+        return _reserver
@@ -10,6 +10,8 @@ import tempfile
 import platform
 from pathlib import Path
 
+from .size_accountant import get_accountant
+
 logger = logging.getLogger(__name__)
 
 class DiskSpaceChecker:
@@ -173,7 +175,8 @@ class DiskSpaceChecker:
     
     def _get_dir_size(self, path):
         """
-        Tính tổng kích thước của một thư mục
+        Tính tổng kích thước của một thư mục (dùng cache chung, chỉ quét lại
+        các thư mục con đã thay đổi)
         
         Args:
             path (str): Đường dẫn tới thư mục
@@ -181,14 +184,7 @@ class DiskSpaceChecker:
         Returns:
             int: Kích thước thư mục tính bằng bytes
         """
-        total_size = 0
-        with os.scandir(path) as it:
-            for entry in it:
-                if entry.is_file():
-                    total_size += entry.stat().st_size
-                elif entry.is_dir():
-                    total_size += self._get_dir_size(entry.path)
-        return total_size
+        return get_accountant().get_size(path)
     
     def check_temp_write_permission(self):
         """
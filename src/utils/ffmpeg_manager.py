@@ -3,7 +3,6 @@ Module quản lý FFmpeg và đảm bảo FFmpeg có sẵn cho ứng dụng.
 """
 import os
 import sys
-import subprocess
 import logging
 import urllib.request
 import zipfile
@@ -14,6 +13,9 @@ import threading
 from pathlib import Path
 from datetime import timedelta
 
+from .ffmpeg_registry import FFmpegRegistry, get_registry
+from .range_downloader import RangeDownloader, parse_checksums
+
 logger = logging.getLogger("FFmpegManager")
 
 class FFmpegManager:
@@ -29,6 +31,15 @@ class FFmpegManager:
         'darwin': "https://evermeet.cx/ffmpeg/getrelease/ffmpeg/zip"  # macOS
     }
     
+    # File SHA-256 đi kèm bản build (không có thì bỏ qua bước kiểm tra)
+    FFMPEG_CHECKSUM_URLS = {
+        'windows': "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/checksums.sha256",
+        'linux': "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/checksums.sha256"
+    }
+    
+    # Số kết nối song song khi tải FFmpeg
+    DOWNLOAD_CONNECTIONS = 4
+    
     def __init__(self, app_dir=None):
         """
         Khởi tạo FFmpegManager
@@ -69,6 +80,10 @@ class FFmpegManager:
         self.last_update_time = 0
         self.last_download_size = 0
         
+        # Thông tin FFmpeg (đường dẫn, phiên bản, muxer, encoder) dùng chung,
+        # được cache trên đĩa để không phải chạy "ffmpeg -version" mỗi lần
+        self.registry = get_registry() if app_dir is None else FFmpegRegistry(self.ffmpeg_dir)
+        
         # Tạo thư mục nếu chưa tồn tại
         os.makedirs(self.ffmpeg_dir, exist_ok=True)
         
@@ -102,16 +117,9 @@ class FFmpegManager:
             bool: True nếu đã cài đặt
         """
         try:
-            # Thử chạy lệnh ffmpeg
-            proc = subprocess.run(
-                ["ffmpeg", "-version"], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                check=False  # Không raises exception nếu lỗi
-            )
-            
-            if proc.returncode == 0:
-                logger.info("Đã tìm thấy FFmpeg trong hệ thống")
+            # Dùng thông tin đã cache, chỉ chạy ffmpeg khi file thực thi thay đổi
+            if self.registry.is_available():
+                logger.info(f"Đã tìm thấy FFmpeg trong hệ thống: {self.registry.ffmpeg_path}")
                 self.is_available = True
                 return True
             
@@ -119,6 +127,15 @@ class FFmpegManager:
         except Exception:
             return False
     
+    def get_capabilities(self):
+        """
+        Lấy thông tin FFmpeg đang dùng
+        
+        Returns:
+            dict: {'ffmpeg', 'ffprobe', 'ffmpeg_version', 'muxers', 'encoders', ...}
+        """
+        return self.registry.resolve()
+    
     def setup_ffmpeg(self):
         """
         Thiết lập FFmpeg, đảm bảo có sẵn để sử dụng bằng cách:
@@ -141,7 +158,9 @@ class FFmpegManager:
         # Nếu không có, tải FFmpeg
         logger.info("Không tìm thấy FFmpeg, tiến hành tải về...")
         
-        # Tải bất đồng bộ để không chặn giao diện
+        # Tải bất đồng bộ để không chặn giao diện; đánh dấu đang tải ngay để
+        # người theo dõi không coi là đã tải xong trước khi thread kịp chạy
+        self.is_downloading = True
         download_thread = threading.Thread(target=self._download_ffmpeg)
         download_thread.daemon = True
         download_thread.start()
@@ -185,6 +204,7 @@ class FFmpegManager:
         if current_os not in self.FFMPEG_URLS:
             logger.error(f"Không hỗ trợ hệ điều hành: {current_os}")
             self.download_status = f"Lỗi: Không hỗ trợ hệ điều hành {current_os}"
+            self.is_downloading = False
             return False
         
         url = self.FFMPEG_URLS[current_os]
@@ -200,70 +220,37 @@ class FFmpegManager:
             file_ext = '.zip' if current_os in ['windows', 'darwin'] else '.tar.xz'
             download_file = os.path.join(temp_dir, f"ffmpeg{file_ext}")
             
-            # Class để báo cáo tiến trình tải
-            class DownloadProgressReporter:
-                def __init__(self, manager):
-                    self.manager = manager
-                    self.manager.last_update_time = time.time()
-                    self.manager.last_download_size = 0
-                
-                def __call__(self, block_num, block_size, total_size):
-                    self.manager.total_size = total_size
-                    downloaded = block_num * block_size
-                    self.manager.downloaded_size = downloaded
-                    
-                    if total_size > 0:
-                        # Tính phần trăm hoàn thành
-                        percent = min(100, downloaded * 100 / total_size)
-                        self.manager.download_progress = percent
-                        
-                        # Tính tốc độ tải
-                        current_time = time.time()
-                        time_diff = current_time - self.manager.last_update_time
-                        
-                        if time_diff >= 0.5:  # Cập nhật mỗi 0.5 giây
-                            size_diff = downloaded - self.manager.last_download_size
-                            
-                            if time_diff > 0:
-                                speed = size_diff / time_diff
-                                self.manager.download_speed = speed
-                                
-                                # Tính thời gian còn lại
-                                if speed > 0:
-                                    remaining_bytes = total_size - downloaded
-                                    est_time = remaining_bytes / speed
-                                    self.manager.estimated_time = self.manager._format_time(est_time)
-                                else:
-                                    self.manager.estimated_time = "Đang tính..."
-                            
-                            # Cập nhật trạng thái
-                            status = f"Đang tải: {percent:.1f}% - "
-                            status += f"{self.manager._format_size(downloaded)}/{self.manager._format_size(total_size)} - "
-                            status += f"{self.manager._format_speed(self.manager.download_speed)}"
-                            
-                            if percent < 100:
-                                status += f" - Còn: {self.manager.estimated_time}"
-                                
-                            self.manager.download_status = status
-                            
-                            # Cập nhật các giá trị theo dõi
-                            self.manager.last_update_time = current_time
-                            self.manager.last_download_size = downloaded
+            # Thư mục giải nén riêng, xóa phần giải nén dở của lần trước
+            extract_dir = os.path.join(temp_dir, 'extracted')
+            shutil.rmtree(extract_dir, ignore_errors=True)
+            os.makedirs(extract_dir, exist_ok=True)
             
-            # Tải file
-            progress_reporter = DownloadProgressReporter(self)
+            # Tải bằng HTTP Range: tải tiếp phần đã tải dở, nhiều kết nối song song
+            self.last_update_time = time.time()
+            self.last_download_size = 0
+            downloader = RangeDownloader(
+                url, download_file,
+                connections=self.DOWNLOAD_CONNECTIONS,
+                expected_sha256=self._fetch_expected_sha256(current_os, url),
+                progress=self._report_download_progress
+            )
             logger.info(f"Bắt đầu tải FFmpeg từ {url}")
             
-            self.download_status = "Đang tải FFmpeg..."
-            urllib.request.urlretrieve(url, download_file, progress_reporter)
-            
-            # Giải nén file
-            self.download_status = "Đang giải nén FFmpeg..."
-            if current_os == 'windows' or current_os == 'darwin':
+            if file_ext == '.tar.xz':
+                # Giải nén ngay trong lúc tải, chỉ lấy ffmpeg và ffprobe
+                self.download_status = "Đang tải và giải nén FFmpeg..."
+                downloader.download_and_extract_tar(
+                    extract_dir,
+                    member_filter=lambda member: os.path.basename(member.name) in ('ffmpeg', 'ffprobe')
+                )
+            else:
+                self.download_status = "Đang tải FFmpeg..."
+                downloader.download()
+                
+                # Giải nén file
+                self.download_status = "Đang giải nén FFmpeg..."
                 with zipfile.ZipFile(download_file, 'r') as zip_ref:
-                    zip_ref.extractall(temp_dir)
-            else:  # Linux
-                subprocess.run(['tar', '-xf', download_file, '-C', temp_dir], check=True)
+                    zip_ref.extractall(extract_dir)
             
             # Dọn dẹp thư mục ffmpeg cũ nếu có
             if os.path.exists(self.ffmpeg_dir):
@@ -273,7 +260,7 @@ class FFmpegManager:
             # Di chuyển file ffmpeg và ffprobe vào thư mục ứng dụng
             if current_os == 'windows':
                 # Tìm thư mục bin sau khi giải nén
-                for root, dirs, files in os.walk(temp_dir):
+                for root, dirs, files in os.walk(extract_dir):
                     if 'bin' in dirs:
                         bin_dir = os.path.join(root, 'bin')
                         
@@ -286,7 +273,7 @@ class FFmpegManager:
                         break
             elif current_os == 'darwin':
                 # macOS: Tìm ffmpeg và ffprobe
-                for root, dirs, files in os.walk(temp_dir):
+                for root, dirs, files in os.walk(extract_dir):
                     for file in files:
                         if file == 'ffmpeg' or file == 'ffprobe':
                             src_file = os.path.join(root, file)
@@ -295,7 +282,7 @@ class FFmpegManager:
                             os.chmod(dst_file, 0o755)  # Thêm quyền thực thi
             else:
                 # Linux: Tìm ffmpeg và ffprobe
-                for root, dirs, files in os.walk(temp_dir):
+                for root, dirs, files in os.walk(extract_dir):
                     for file in files:
                         if file == 'ffmpeg' or file == 'ffprobe':
                             src_file = os.path.join(root, file)
@@ -309,6 +296,8 @@ class FFmpegManager:
             # Kiểm tra xem đã có FFmpeg chưa
             if self._check_bundled_ffmpeg():
                 self._add_to_path()
+                # Đọc trước khả năng của bản vừa tải để các lần dùng sau lấy từ cache
+                self.registry.resolve(refresh=True)
                 self.download_status = "Đã tải và cài đặt FFmpeg thành công"
                 logger.info("Đã tải và cài đặt FFmpeg thành công")
                 return True
@@ -318,10 +307,76 @@ class FFmpegManager:
                 return False
                 
         except Exception as e:
-            self.is_downloading = False
             self.download_status = f"Lỗi khi tải FFmpeg: {str(e)}"
             logger.error(f"Lỗi khi tải FFmpeg: {str(e)}")
             return False
+        finally:
+            # Phần đã tải dở vẫn nằm trong thư mục tạm để lần sau tải tiếp
+            self.is_downloading = False
+    
+    def _fetch_expected_sha256(self, current_os, url):
+        """
+        Lấy SHA-256 của bản build từ file checksum đi kèm
+        
+        Returns:
+            str: Mã SHA-256, None nếu không có (khi đó bỏ qua bước kiểm tra)
+        """
+        checksum_url = self.FFMPEG_CHECKSUM_URLS.get(current_os)
+        if not checksum_url:
+            return None
+        
+        try:
+            request = urllib.request.Request(checksum_url, headers={'User-Agent': "TelegramVideoUploader"})
+            with urllib.request.urlopen(request, timeout=15) as response:
+                text = response.read().decode('utf-8', errors='replace')
+            expected = parse_checksums(text, url.rsplit('/', 1)[-1])
+            if not expected:
+                logger.warning("Không tìm thấy SHA-256 của FFmpeg trong file checksum")
+            return expected
+        except Exception as e:
+            logger.warning(f"Không tải được file checksum FFmpeg, bỏ qua kiểm tra: {str(e)}")
+            return None
+    
+    def _report_download_progress(self, downloaded, total_size):
+        """Cập nhật tiến trình, tốc độ và thời gian còn lại (gọi từ các luồng tải)"""
+        self.total_size = total_size
+        self.downloaded_size = downloaded
+        
+        if total_size <= 0:
+            return
+        
+        # Tính phần trăm hoàn thành
+        percent = min(100, downloaded * 100 / total_size)
+        self.download_progress = percent
+        
+        # Tính tốc độ tải
+        current_time = time.time()
+        time_diff = current_time - self.last_update_time
+        
+        if time_diff >= 0.5:  # Cập nhật mỗi 0.5 giây
+            size_diff = downloaded - self.last_download_size
+            speed = size_diff / time_diff
+            self.download_speed = speed
+            
+            # Tính thời gian còn lại
+            if speed > 0:
+                self.estimated_time = self._format_time((total_size - downloaded) / speed)
+            else:
+                self.estimated_time = "Đang tính..."
+            
+            # Cập nhật trạng thái
+            status = f"Đang tải: {percent:.1f}% - "
+            status += f"{self._format_size(downloaded)}/{self._format_size(total_size)} - "
+            status += f"{self._format_speed(self.download_speed)}"
+            
+            if percent < 100:
+                status += f" - Còn: {self.estimated_time}"
+                
+            self.download_status = status
+            
+            # Cập nhật các giá trị theo dõi
+            self.last_update_time = current_time
+            self.last_download_size = downloaded
     
     def _add_to_path(self):
         """Thêm thư mục FFmpeg vào PATH"""
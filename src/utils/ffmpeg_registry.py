@@ -0,0 +1,248 @@
+"""
+Module đăng ký khả năng FFmpeg dùng chung cho toàn ứng dụng.
+Xác định một lần đường dẫn ffmpeg/ffprobe, phiên bản, các muxer và encoder được
+hỗ trợ, rồi lưu kết quả ra đĩa theo kích thước và thời điểm sửa của file thực thi.
+Các lần kiểm tra sau chỉ cần os.stat, không phải chạy lại "ffmpeg -version".
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import platform
+import threading
+import subprocess
+
+logger = logging.getLogger("FFmpegRegistry")
+
+# Phiên bản định dạng file cache, tăng khi đổi cấu trúc để bỏ cache cũ
+REGISTRY_VERSION = 1
+
+def default_app_dir():
+    """Thư mục gốc ứng dụng (thư mục chứa file thực thi nếu đóng gói bằng PyInstaller)"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# File cache mặc định: <thư mục gốc>/data/ffmpeg_capabilities.json
+DEFAULT_CACHE_FILE = os.path.join(default_app_dir(), 'data', 'ffmpeg_capabilities.json')
+
+def run_ffmpeg(path, *args):
+    """
+    Chạy ffmpeg/ffprobe và lấy stdout
+
+    Returns:
+        str: Nội dung stdout, None nếu không chạy được
+    """
+    try:
+        proc = subprocess.run([path, "-hide_banner", *args], stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, check=False, timeout=10)
+        if proc.returncode != 0:
+            return None
+        return proc.stdout.decode('utf-8', errors='replace')
+    except Exception:
+        return None
+
+def parse_version(output):
+    """Dòng đầu tiên của "ffmpeg -version", ví dụ "ffmpeg version 6.1 ..." """
+    lines = (output or "").strip().splitlines()
+    return lines[0].strip() if lines else None
+
+def parse_names(output):
+    """
+    Lấy tên từ bảng của "ffmpeg -muxers" / "ffmpeg -encoders".
+    Mỗi dòng sau dòng gạch ngang ("--" hoặc "------") có dạng "<cờ> <tên> <mô tả>".
+
+    Returns:
+        list: Các tên đã sắp xếp
+    """
+    names = set()
+    in_table = False
+    for line in (output or "").splitlines():
+        parts = line.split()
+        if not in_table:
+            in_table = len(parts) == 1 and set(parts[0]) == {'-'}
+            continue
+        if len(parts) >= 2:
+            # Một muxer có thể có nhiều tên, ví dụ "matroska,webm"
+            names.update(name for name in parts[1].split(',') if name)
+    return sorted(names)
+
+def file_key(path):
+    """
+    Khóa nhận dạng file thực thi: đường dẫn, kích thước, thời điểm sửa
+
+    Returns:
+        dict: None nếu không đọc được file
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return {'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+class FFmpegRegistry:
+    """
+    Thông tin FFmpeg dùng chung: đường dẫn, phiên bản, muxer, encoder.
+    An toàn khi gọi từ nhiều thread.
+    """
+
+    def __init__(self, ffmpeg_dir=None, cache_file=None):
+        """
+        Khởi tạo
+
+        Args:
+            ffmpeg_dir (str, optional): Thư mục FFmpeg đi kèm ứng dụng (ưu tiên hơn PATH)
+            cache_file (str, optional): File cache, mặc định data/ffmpeg_capabilities.json
+        """
+        self.ffmpeg_dir = ffmpeg_dir or os.path.join(default_app_dir(), 'ffmpeg')
+        self.cache_file = cache_file or DEFAULT_CACHE_FILE
+        self._lock = threading.RLock()
+        self._info = None
+        self._disk_loaded = False
+
+    def _find_binary(self, name):
+        """Tìm file thực thi: thư mục đi kèm ứng dụng trước, sau đó PATH"""
+        exe_ext = ".exe" if platform.system().lower() == "windows" else ""
+        bundled = os.path.join(self.ffmpeg_dir, f"{name}{exe_ext}")
+        if os.path.isfile(bundled):
+            return bundled
+        return shutil.which(name)
+
+    def _current_key(self):
+        """Khóa của ffmpeg/ffprobe hiện tại (chỉ dùng os.stat, không chạy ffmpeg)"""
+        return {
+            'ffmpeg': file_key(self._find_binary("ffmpeg")),
+            'ffprobe': file_key(self._find_binary("ffprobe"))
+        }
+
+    def _probe(self, key):
+        """Chạy ffmpeg để đọc phiên bản, muxer và encoder"""
+        ffmpeg_path = (key['ffmpeg'] or {}).get('path')
+        ffprobe_path = (key['ffprobe'] or {}).get('path')
+
+        version = parse_version(run_ffmpeg(ffmpeg_path, "-version")) if ffmpeg_path else None
+        info = {
+            'version': REGISTRY_VERSION,
+            'key': key,
+            'ffmpeg': ffmpeg_path if version else None,
+            'ffprobe': ffprobe_path,
+            'ffmpeg_version': version,
+            'muxers': [],
+            'encoders': []
+        }
+        if version:
+            info['muxers'] = parse_names(run_ffmpeg(ffmpeg_path, "-muxers"))
+            info['encoders'] = parse_names(run_ffmpeg(ffmpeg_path, "-encoders"))
+            logger.info(f"Đã xác định FFmpeg: {ffmpeg_path} ({version}), "
+                        f"{len(info['muxers'])} muxer, {len(info['encoders'])} encoder")
+        else:
+            logger.warning("Không tìm thấy FFmpeg chạy được")
+        return info
+
+    def _load_cache(self):
+        """Đọc cache trên đĩa (một lần)"""
+        self._disk_loaded = True
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(stored, dict) or stored.get('version') != REGISTRY_VERSION:
+            return None
+        return stored
+
+    def _save_cache(self, info):
+        """Ghi cache ra file tạm rồi thay thế"""
+        temp_path = self.cache_file + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(info, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.cache_file)
+        except Exception as e:
+            logger.error(f"Lỗi khi lưu cache FFmpeg: {str(e)}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def resolve(self, refresh=False):
+        """
+        Thông tin FFmpeg hiện tại. Chỉ chạy ffmpeg khi file thực thi đổi
+        (khác đường dẫn, kích thước hoặc thời điểm sửa) hoặc khi refresh=True.
+
+        Args:
+            refresh (bool): Bỏ qua cache, chạy lại ffmpeg
+
+        Returns:
+            dict: {'ffmpeg', 'ffprobe', 'ffmpeg_version', 'muxers', 'encoders', ...};
+                'ffmpeg' là None nếu không có FFmpeg
+        """
+        with self._lock:
+            key = self._current_key()
+            if not refresh:
+                if self._info is None and not self._disk_loaded:
+                    self._info = self._load_cache()
+                if self._info is not None and self._info.get('key') == key:
+                    return self._info
+
+            self._info = self._probe(key)
+            self._save_cache(self._info)
+            return self._info
+
+    def invalidate(self):
+        """Bỏ thông tin đã lưu, lần resolve() sau sẽ chạy lại ffmpeg"""
+        with self._lock:
+            self._info = None
+            self._disk_loaded = True
+            try:
+                os.remove(self.cache_file)
+            except OSError:
+                pass
+
+    def is_available(self):
+        """
+        Returns:
+            bool: True nếu có ffmpeg chạy được
+        """
+        return self.resolve()['ffmpeg'] is not None
+
+    @property
+    def ffmpeg_path(self):
+        """Đường dẫn đầy đủ của ffmpeg, None nếu không có"""
+        return self.resolve()['ffmpeg']
+
+    @property
+    def ffprobe_path(self):
+        """Đường dẫn đầy đủ của ffprobe, None nếu không có"""
+        return self.resolve()['ffprobe']
+
+    @property
+    def version(self):
+        """Dòng phiên bản ffmpeg, None nếu không có"""
+        return self.resolve()['ffmpeg_version']
+
+    def has_muxer(self, name):
+        """ffmpeg có hỗ trợ định dạng đầu ra (muxer) name không, ví dụ "mp4" """
+        return name in self.resolve()['muxers']
+
+    def has_encoder(self, name):
+        """ffmpeg có encoder name không, ví dụ "libx264" """
+        return name in self.resolve()['encoders']
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """
+    Registry FFmpeg dùng chung cho mọi thành phần của ứng dụng
+
+    Returns:
+        FFmpegRegistry: Đối tượng dùng chung
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = FFmpegRegistry()
+        return _registry
@@ -0,0 +1,145 @@
+"""
+Module đọc một đoạn byte của file như một file riêng, để tải lên từng phần của
+video lớn trực tiếp từ file gốc mà không ghi các phần ra đĩa.
+
+Chỉ dùng cho định dạng cắt theo byte vẫn phát được: MPEG-TS gồm các packet kích
+thước cố định (188 byte, hoặc 192 byte với M2TS), nên mỗi đoạn cắt đúng ranh giới
+packet là một luồng TS hợp lệ, không cần FFmpeg ghép lại (remux).
+"""
+import io
+import os
+import logging
+
+logger = logging.getLogger("FileRange")
+
+# Byte đồng bộ đầu mỗi packet MPEG-TS
+TS_SYNC_BYTE = 0x47
+
+# Số packet liên tiếp cần kiểm tra để nhận dạng MPEG-TS
+TS_PROBE_PACKETS = 8
+
+def detect_ts_packet_size(path):
+    """
+    Nhận dạng file MPEG-TS theo byte đồng bộ
+
+    Args:
+        path (str): Đường dẫn file
+
+    Returns:
+        int: 188 (TS) hoặc 192 (M2TS), None nếu không phải MPEG-TS
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(192 * TS_PROBE_PACKETS)
+    except OSError:
+        return None
+
+    # M2TS: mỗi packet có 4 byte timestamp đứng trước byte đồng bộ
+    for packet_size, sync_offset in ((188, 0), (192, 4)):
+        positions = range(sync_offset, packet_size * TS_PROBE_PACKETS, packet_size)
+        if len(head) >= packet_size * TS_PROBE_PACKETS and all(head[i] == TS_SYNC_BYTE for i in positions):
+            return packet_size
+    return None
+
+def plan_ranges(total_size, max_part_size, align=1):
+    """
+    Chia [0, total_size) thành các đoạn liên tiếp không vượt max_part_size byte,
+    ranh giới các đoạn là bội số của align
+
+    Returns:
+        list: Danh sách (offset, length)
+    """
+    part_size = max(align, max_part_size - max_part_size % align)
+    return [(offset, min(part_size, total_size - offset)) for offset in range(0, total_size, part_size)]
+
+class FileRange:
+    """
+    Một đoạn byte [offset, offset + length) của file gốc, tải lên như một file riêng.
+    Không phải đường dẫn: không bao giờ bị xóa như file tạm.
+    """
+
+    def __init__(self, path, offset, length, name):
+        """
+        Khởi tạo
+
+        Args:
+            path (str): File gốc
+            offset (int): Vị trí bắt đầu (byte)
+            length (int): Số byte
+            name (str): Tên file hiển thị khi tải lên
+        """
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.name = name
+
+    def open(self):
+        """Mở đoạn để đọc, mỗi lần mở (ví dụ khi thử lại) đọc lại từ đầu đoạn"""
+        return FileRangeReader(self)
+
+    def __repr__(self):
+        return f"FileRange({self.path!r}, offset={self.offset}, length={self.length})"
+
+class FileRangeReader(io.RawIOBase):
+    """
+    File chỉ đọc trên một đoạn của file gốc. Đọc bằng os.preadv/os.pread (không dùng
+    chung vị trí đọc của file), không sao chép dữ liệu ra file tạm.
+    """
+
+    def __init__(self, file_range):
+        super().__init__()
+        self.range = file_range
+        # Tên file dùng cho phần multipart khi tải lên
+        self.name = file_range.name
+        self._fd = os.open(file_range.path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        self._pos = 0
+
+    def __len__(self):
+        # requests dùng len() để tính Content-Length của phần còn lại
+        return self.range.length - self._pos
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = self.range.length + offset
+        else:
+            raise ValueError(f"whence không hợp lệ: {whence}")
+        self._pos = max(0, min(position, self.range.length))
+        return self._pos
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.range.length - self._pos)
+        if count <= 0:
+            return 0
+        position = self.range.offset + self._pos
+        if hasattr(os, 'preadv'):
+            # Đọc thẳng vào bộ đệm của người gọi
+            read = os.preadv(self._fd, [memoryview(buffer)[:count]], position)
+            self._pos += read
+            return read
+        if hasattr(os, 'pread'):
+            data = os.pread(self._fd, count, position)
+        else:
+            # Windows không có pread
+            os.lseek(self._fd, position, os.SEEK_SET)
+            data = os.read(self._fd, count)
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            os.close(self._fd)
+        super().close()
@@ -0,0 +1,165 @@
+"""
+Module quét thư mục tìm file video.
+Dùng os.scandir để tận dụng thông tin có sẵn trong DirEntry (loại file, stat)
+thay vì gọi isfile/getsize/stat riêng lẻ cho từng file, và hỗ trợ quét lại tăng dần
+chỉ đọc lại các thư mục có mtime thay đổi.
+"""
+import os
+import logging
+
+logger = logging.getLogger("FolderScanner")
+
+# Các định dạng video được hỗ trợ
+DEFAULT_VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg')
+
+class FolderScanner:
+    """
+    Quét thư mục (đệ quy hoặc không) và trả về danh sách file video.
+    Giữ bộ nhớ đệm theo từng thư mục để lần quét sau chỉ đọc lại các thư mục
+    đã thay đổi (thêm, xóa, đổi tên file).
+    """
+
+    def __init__(self, extensions=None, recursive=True):
+        """
+        Khởi tạo FolderScanner
+
+        Args:
+            extensions (list): Danh sách phần mở rộng cần lấy (mặc định DEFAULT_VIDEO_EXTENSIONS)
+            recursive (bool): Có quét cả thư mục con không
+        """
+        self.extensions = tuple(ext.strip().lower() for ext in (extensions or DEFAULT_VIDEO_EXTENSIONS) if ext.strip())
+        self.recursive = recursive
+        self._dir_cache = {}  # {dir_path: (mtime_ns, files, subdirs)}
+
+    def is_video_name(self, file_name):
+        """
+        Kiểm tra tên file có phần mở rộng cần lấy không
+
+        Args:
+            file_name (str): Tên file
+
+        Returns:
+            bool: True nếu phần mở rộng nằm trong danh sách
+        """
+        return os.path.splitext(file_name)[1].lower() in self.extensions
+
+    def _read_dir(self, dir_path):
+        """
+        Đọc một thư mục bằng os.scandir
+
+        Args:
+            dir_path (str): Đường dẫn thư mục
+
+        Returns:
+            tuple: (danh sách file, danh sách thư mục con)
+        """
+        files = []
+        subdirs = []
+
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        # Lọc theo phần mở rộng trước để không stat các file không cần
+                        if not self.is_video_name(entry.name):
+                            continue
+                        stat = entry.stat()
+                        files.append({
+                            "name": entry.name,
+                            "path": entry.path,
+                            "file_size_bytes": stat.st_size,
+                            "mtime": stat.st_mtime
+                        })
+                    elif self.recursive and entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except OSError as e:
+                    logger.debug(f"Bỏ qua {entry.path}: {str(e)}")
+
+        return files, subdirs
+
+    def iter_scan(self, folder_path, incremental=False):
+        """
+        Duyệt thư mục một lượt và trả về từng file video ngay khi tìm thấy
+
+        Args:
+            folder_path (str): Thư mục gốc cần quét
+            incremental (bool): Dùng lại kết quả đệm của các thư mục không thay đổi mtime
+
+        Yields:
+            dict: Thông tin file (name, path, file_size_bytes, mtime)
+        """
+        if not folder_path or not os.path.isdir(folder_path):
+            logger.error(f"Thư mục không hợp lệ: {folder_path}")
+            return
+
+        new_cache = {}
+        stack = [folder_path]
+
+        while stack:
+            dir_path = stack.pop()
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+                cached = self._dir_cache.get(dir_path) if incremental else None
+
+                if cached and cached[0] == mtime_ns:
+                    files, subdirs = cached[1], cached[2]
+                else:
+                    files, subdirs = self._read_dir(dir_path)
+            except OSError as e:
+                logger.error(f"Lỗi khi quét thư mục {dir_path}: {str(e)}")
+                continue
+
+            new_cache[dir_path] = (mtime_ns, files, subdirs)
+
+            for file_info in files:
+                yield dict(file_info)
+
+            # Đảo ngược để duyệt thư mục con theo thứ tự đã liệt kê
+            stack.extend(reversed(subdirs))
+
+        # Chỉ giữ các thư mục còn tồn tại để bộ đệm không phình to
+        self._dir_cache = new_cache
+
+    def scan(self, folder_path, incremental=False):
+        """
+        Quét thư mục và trả về danh sách file video
+
+        Args:
+            folder_path (str): Thư mục gốc cần quét
+            incremental (bool): Chỉ đọc lại các thư mục có mtime thay đổi so với lần quét trước
+
+        Returns:
+            list: Danh sách thông tin file video
+        """
+        return list(self.iter_scan(folder_path, incremental=incremental))
+
+    def rescan(self, folder_path):
+        """
+        Quét lại tăng dần (tương đương scan(folder_path, incremental=True))
+
+        Lưu ý: mtime của thư mục chỉ đổi khi có file được thêm, xóa hoặc đổi tên.
+        Kích thước của file đang được ghi đè tại chỗ sẽ không được cập nhật.
+
+        Args:
+            folder_path (str): Thư mục gốc cần quét
+
+        Returns:
+            list: Danh sách thông tin file video
+        """
+        return self.scan(folder_path, incremental=True)
+
+    def count(self, folder_path):
+        """
+        Đếm số file video trong thư mục
+
+        Args:
+            folder_path (str): Thư mục gốc cần đếm
+
+        Returns:
+            int: Số file video
+        """
+        return sum(1 for _ in self.iter_scan(folder_path, incremental=True))
+
+    def clear_cache(self):
+        """Xóa bộ nhớ đệm thư mục"""
+        self._dir_cache = {}
@@ -0,0 +1,433 @@
+"""
+Module lưu trữ (archive) lịch sử tải lên cũ.
+Các mục cũ được chuyển khỏi lịch sử chính vào các "segment" nén gzip, chỉ đọc.
+Khi khởi động chỉ đọc file manifest nhỏ chứa bộ lọc Bloom của từng segment;
+segment chỉ được giải nén khi bộ lọc cho biết hash có thể nằm trong đó. Mỗi
+segment còn có bộ lọc Bloom các trigram của trường tìm kiếm, nên tìm kiếm chỉ
+giải nén các segment có thể chứa chuỗi cần tìm.
+Segment nhỏ được gộp với lần lưu trữ kế tiếp để số segment không tăng theo số
+lần khởi động; xóa một mục đã lưu trữ ghi lại segment chứa nó.
+"""
+import os
+import json
+import gzip
+import math
+import stat
+import base64
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from .video_list_index import trigrams, NGRAM_SIZE
+
+logger = logging.getLogger("HistoryArchive")
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 2
+
+# Các trường được tìm kiếm (tên file, đường dẫn, ngày tải lên)
+SEARCH_FIELDS = ('filename', 'path', 'upload_date')
+
+# Tỷ lệ dương tính giả mục tiêu của bộ lọc Bloom
+BLOOM_ERROR_RATE = 0.01
+
+# Số segment đã giải nén được giữ trong bộ nhớ
+SEGMENT_CACHE_SIZE = 2
+
+# Segment mới nhất còn ít hơn số video này được gộp với lần lưu trữ kế tiếp
+SEGMENT_TARGET_SIZE = 5000
+
+class BloomFilter:
+    """
+    Bộ lọc Bloom: kiểm tra thành viên gọn nhẹ, có thể trả lời "có thể có"
+    khi không có (dương tính giả) nhưng không bao giờ bỏ sót phần tử đã thêm.
+    """
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE, bits=None, hash_count=None, data=None):
+        """
+        Khởi tạo bộ lọc
+
+        Args:
+            capacity (int): Số phần tử dự kiến
+            error_rate (float): Tỷ lệ dương tính giả mong muốn
+            bits (int, optional): Số bit (khi nạp lại bộ lọc đã lưu)
+            hash_count (int, optional): Số hàm băm (khi nạp lại bộ lọc đã lưu)
+            data (bytes, optional): Dữ liệu bit (khi nạp lại bộ lọc đã lưu)
+        """
+        capacity = max(1, capacity)
+        if bits is None:
+            bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        if hash_count is None:
+            hash_count = max(1, int(round(bits / capacity * math.log(2))))
+
+        self.bits = max(8, bits)
+        self.hash_count = hash_count
+        self.data = bytearray(data) if data is not None else bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key):
+        """Các vị trí bit của một khóa (double hashing)"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hash_count))
+
+    def add(self, key):
+        """Thêm một khóa"""
+        for position in self._positions(key):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def to_dict(self):
+        """Chuyển bộ lọc thành dict để lưu vào manifest"""
+        return {
+            'bits': self.bits,
+            'hash_count': self.hash_count,
+            'data': base64.b64encode(bytes(self.data)).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Nạp bộ lọc từ dict trong manifest"""
+        return cls(1, bits=data['bits'], hash_count=data['hash_count'],
+                   data=base64.b64decode(data['data']))
+
+def _gram_filter(uploads):
+    """Bộ lọc Bloom các trigram của trường tìm kiếm (viết thường) của một segment"""
+    grams = set()
+    for info in uploads.values():
+        for field in SEARCH_FIELDS:
+            grams |= trigrams(str(info.get(field, '') or '').lower())
+    gram_filter = BloomFilter(len(grams))
+    for gram in grams:
+        gram_filter.add(gram)
+    return gram_filter
+
+class HistoryArchive:
+    """
+    Kho lưu trữ các mục lịch sử cũ dưới dạng segment gzip chỉ đọc.
+    An toàn khi dùng từ nhiều thread.
+    """
+
+    def __init__(self, archive_dir):
+        """
+        Khởi tạo kho lưu trữ và đọc manifest
+
+        Args:
+            archive_dir (str): Thư mục chứa các segment
+        """
+        self.archive_dir = archive_dir
+        self._lock = threading.RLock()
+        self._segments = []  # [{file, count, oldest, newest, bloom, grams}], mới nhất ở cuối
+        self._cache = OrderedDict()  # {file: uploads} các segment đã giải nén gần đây
+        self._load_manifest()
+
+    def _manifest_path(self):
+        """Đường dẫn file manifest"""
+        return os.path.join(self.archive_dir, MANIFEST_FILE)
+
+    def _load_manifest(self):
+        """Đọc manifest (danh sách segment và bộ lọc Bloom)"""
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            for segment in manifest.get('segments', []):
+                segment = dict(segment)
+                segment['bloom'] = BloomFilter.from_dict(segment['bloom'])
+                # Manifest phiên bản 1 chưa có bộ lọc trigram: tạo khi tìm kiếm lần đầu
+                if segment.get('grams'):
+                    segment['grams'] = BloomFilter.from_dict(segment['grams'])
+                else:
+                    segment['grams'] = None
+                self._segments.append(segment)
+            logger.info(f"Đã đọc {len(self._segments)} segment lưu trữ ({self.count()} video)")
+        except Exception as e:
+            logger.error(f"Lỗi khi đọc manifest lưu trữ: {str(e)}")
+
+    def _save_manifest(self):
+        """Ghi manifest một cách nguyên tử (file tạm + đổi tên)"""
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'segments': [
+                dict(segment, bloom=segment['bloom'].to_dict(),
+                     grams=segment['grams'].to_dict() if segment['grams'] is not None else None)
+                for segment in self._segments
+            ]
+        }
+        fd, temp_path = tempfile.mkstemp(prefix='.manifest.', suffix='.tmp', dir=self.archive_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self._manifest_path())
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def count(self):
+        """
+        Đếm số video trong kho lưu trữ
+
+        Returns:
+            int: Tổng số video của các segment
+        """
+        return sum(segment['count'] for segment in self._segments)
+
+    def add_segment(self, uploads):
+        """
+        Ghi các mục lịch sử vào kho lưu trữ (nén, chỉ đọc). Nếu segment mới nhất
+        còn nhỏ, các mục được gộp vào đó thay vì tạo thêm segment.
+
+        Args:
+            uploads (dict): {hash: thông tin video}
+
+        Returns:
+            str: Tên file segment, None nếu không có gì để ghi
+        """
+        if not uploads:
+            return None
+
+        with self._lock:
+            os.makedirs(self.archive_dir, exist_ok=True)
+
+            merged = None
+            if self._segments and self._segments[-1]['count'] + len(uploads) <= SEGMENT_TARGET_SIZE:
+                merged = self._segments[-1]
+                uploads = dict(self._read_segment(merged['file']), **uploads)
+
+            segment = self._write_segment(uploads)
+            if merged is not None:
+                self._segments[-1] = segment
+            else:
+                self._segments.append(segment)
+            self._save_manifest()
+
+            # Chỉ xóa segment cũ sau khi manifest đã trỏ sang segment mới
+            if merged is not None:
+                self._remove_segment_file(merged['file'])
+
+        logger.info(f"Đã lưu trữ {len(uploads)} video vào {segment['file']}")
+        return segment['file']
+
+    def _write_segment(self, uploads):
+        """Ghi một file segment mới (phải giữ self._lock), trả về mục manifest của nó"""
+        index = len(self._segments)
+        while True:
+            name = f"segment_{datetime.now().strftime('%Y%m%d%H%M%S')}_{index:04d}.json.gz"
+            path = os.path.join(self.archive_dir, name)
+            if not os.path.exists(path):
+                break
+            index += 1
+
+        # Ghi ra file tạm rồi đổi tên để không để lại segment dở dang
+        temp_path = path + '.tmp'
+        payload = json.dumps({'uploads': uploads}, ensure_ascii=False).encode('utf-8')
+        with gzip.open(temp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+        os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+        bloom = BloomFilter(len(uploads))
+        for video_hash in uploads:
+            bloom.add(video_hash)
+
+        dates = [info.get('upload_date') for info in uploads.values() if info.get('upload_date')]
+        return {
+            'file': name,
+            'count': len(uploads),
+            'oldest': min(dates) if dates else None,
+            'newest': max(dates) if dates else None,
+            'bloom': bloom,
+            'grams': _gram_filter(uploads)
+        }
+
+    def _remove_segment_file(self, name):
+        """Xóa file của một segment không còn trong manifest"""
+        self._cache.pop(name, None)
+        path = os.path.join(self.archive_dir, name)
+        try:
+            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Không thể xóa segment {name}: {str(e)}")
+
+    def _read_segment(self, name):
+        """Giải nén một segment (có bộ nhớ đệm LRU nhỏ)"""
+        uploads = self._cache.get(name)
+        if uploads is not None:
+            self._cache.move_to_end(name)
+            return uploads
+
+        try:
+            with gzip.open(os.path.join(self.archive_dir, name), 'rt', encoding='utf-8') as f:
+                uploads = json.load(f).get('uploads', {})
+        except Exception as e:
+            logger.error(f"Lỗi khi đọc segment {name}: {str(e)}")
+            uploads = {}
+
+        self._cache[name] = uploads
+        while len(self._cache) > SEGMENT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return uploads
+
+    def remove(self, video_hash):
+        """
+        Xóa một video khỏi kho lưu trữ (ghi lại segment chứa nó)
+
+        Args:
+            video_hash (str): Hash của video
+
+        Returns:
+            bool: True nếu video có trong kho lưu trữ và đã được xóa
+        """
+        if not video_hash:
+            return False
+
+        stale = []
+        with self._lock:
+            segments = []
+            for segment in self._segments:
+                uploads = self._read_segment(segment['file']) if video_hash in segment['bloom'] else {}
+                if video_hash not in uploads:
+                    segments.append(segment)
+                    continue
+
+                stale.append(segment['file'])
+                remaining = {h: info for h, info in uploads.items() if h != video_hash}
+                if remaining:
+                    segments.append(self._write_segment(remaining))
+
+            if not stale:
+                return False
+
+            self._segments = segments
+            self._save_manifest()
+            for name in stale:
+                self._remove_segment_file(name)
+
+        logger.info(f"Đã xóa video khỏi kho lưu trữ: hash {video_hash[:8]}...")
+        return True
+
+    def search(self, term):
+        """
+        Tìm các video có một trong các trường SEARCH_FIELDS chứa chuỗi tìm kiếm.
+        Chỉ giải nén các segment mà bộ lọc trigram cho biết có thể chứa mọi trigram
+        của chuỗi; chuỗi ngắn hơn một trigram không được tìm trong kho lưu trữ.
+
+        Args:
+            term (str): Chuỗi tìm kiếm đã viết thường
+
+        Returns:
+            dict: {hash: thông tin video}
+        """
+        result = {}
+        if len(term or '') < NGRAM_SIZE:
+            return result
+        grams = trigrams(term)
+
+        with self._lock:
+            indexed = False
+            # Segment cũ trước để bản mới nhất của một video ghi đè bản cũ
+            for segment in self._segments:
+                if segment['grams'] is None:
+                    segment['grams'] = _gram_filter(self._read_segment(segment['file']))
+                    indexed = True
+                if not all(gram in segment['grams'] for gram in grams):
+                    continue
+                for video_hash, info in self._read_segment(segment['file']).items():
+                    if any(term in str(info.get(field, '')).lower() for field in SEARCH_FIELDS):
+                        result[video_hash] = info
+
+            if indexed:
+                self._save_manifest()
+        return result
+
+    def get(self, video_hash):
+        """
+        Tìm thông tin một video trong kho lưu trữ
+
+        Args:
+            video_hash (str): Hash của video
+
+        Returns:
+            dict/None: Thông tin video nếu có
+        """
+        if not video_hash:
+            return None
+
+        with self._lock:
+            # Segment mới nhất trước: nếu một video được lưu trữ nhiều lần, lấy bản mới nhất
+            for segment in reversed(self._segments):
+                if video_hash in segment['bloom']:
+                    info = self._read_segment(segment['file']).get(video_hash)
+                    if info is not None:
+                        return info
+        return None
+
+    def contains(self, video_hash):
+        """
+        Kiểm tra video có trong kho lưu trữ không
+
+        Args:
+            video_hash (str): Hash của video
+
+        Returns:
+            bool: True nếu có
+        """
+        return self.get(video_hash) is not None
+
+    def get_many(self, hashes):
+        """
+        Tìm nhiều video, mỗi segment chỉ giải nén một lần
+
+        Args:
+            hashes (iterable): Danh sách hash
+
+        Returns:
+            dict: {hash: thông tin video} cho các hash có trong kho lưu trữ
+        """
+        remaining = set(h for h in hashes if h)
+        result = {}
+
+        with self._lock:
+            for segment in reversed(self._segments):
+                if not remaining:
+                    break
+                candidates = [h for h in remaining if h in segment['bloom']]
+                if not candidates:
+                    continue
+                uploads = self._read_segment(segment['file'])
+                for video_hash in candidates:
+                    info = uploads.get(video_hash)
+                    if info is not None:
+                        result[video_hash] = info
+                        remaining.discard(video_hash)
+
+        return result
+
+    def clear(self):
+        """Xóa toàn bộ kho lưu trữ"""
+        with self._lock:
+            for segment in self._segments:
+                path = os.path.join(self.archive_dir, segment['file'])
+                try:
+                    os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+                    os.remove(path)
+                except OSError as e:
+                    logger.error(f"Không thể xóa segment {segment['file']}: {str(e)}")
+            self._segments = []
+            self._cache.clear()
+            if os.path.isdir(self.archive_dir):
+                self._save_manifest()
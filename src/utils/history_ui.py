@@ -223,23 +223,17 @@ class UploadHistoryDialog:
         # Lấy danh sách tất cả video đã tải lên
         uploads = self.upload_history.get_all_uploads()
         
+        # Tìm qua chỉ mục từ khóa thay vì duyệt toàn bộ lịch sử mỗi lần gõ phím
+        matches = self.upload_history.search(search_term) if search_term else uploads
+        
         filtered_count = 0
-        for hash_value, info in uploads.items():
-            filename = info.get('filename', 'Không rõ').lower()
-            file_path = info.get('path', '').lower()
-            upload_date = info.get('upload_date', '').lower()
+        for hash_value, info in matches.items():
+            file_size = info.get('file_size', 0)
+            size_text = self.format_size(file_size)
             
-            # Lọc theo từ khóa
-            if (search_term in filename or 
-                search_term in file_path or 
-                search_term in upload_date):
-                
-                file_size = info.get('file_size', 0)
-                size_text = self.format_size(file_size)
-                
-                # Thêm vào treeview
-                self.history_tree.insert("", tk.END, iid=hash_value, values=(info['filename'], size_text, info['upload_date']))
-                filtered_count += 1
+            # Thêm vào treeview
+            self.history_tree.insert("", tk.END, iid=hash_value, values=(info['filename'], size_text, info['upload_date']))
+            filtered_count += 1
         
         # Cập nhật tổng số
         if search_term:
@@ -303,15 +297,9 @@ class UploadHistoryDialog:
         # Xóa danh sách hiện tại
         self.duplicate_listbox.delete(0, tk.END)
         
-        # Lấy danh sách hash của các video trùng lặp
-        duplicate_hashes = self.upload_history.get_duplicates_of(video_hash)
-        
-        # Thêm các video mà video hiện tại trùng lặp với
-        for hash_list in self.upload_history.duplicates.values():
-            if video_hash in hash_list and hash_list != duplicate_hashes:
-                for h in hash_list:
-                    if h != video_hash and h not in duplicate_hashes:
-                        duplicate_hashes.append(h)
+        # Lấy danh sách hash của các video trùng lặp (kể cả các video đánh dấu
+        # trùng với video hiện tại), tra qua chỉ mục ngược
+        duplicate_hashes = self.upload_history.get_related_duplicates(video_hash)
         
         if not duplicate_hashes:
             self.duplicate_listbox.insert(tk.END, "Không có video trùng lặp")
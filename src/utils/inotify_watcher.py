@@ -0,0 +1,185 @@
+"""
+Module theo dõi thư mục bằng inotify (Linux).
+Dùng ctypes gọi trực tiếp libc nên không cần thư viện ngoài. Trên hệ điều hành
+không hỗ trợ, is_supported() trả về False và FileWatcher quay về chế độ quét định kỳ.
+"""
+import os
+import sys
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+
+logger = logging.getLogger("InotifyWatcher")
+
+# Các cờ sự kiện inotify (xem <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Sự kiện mặc định: file ghi xong, file được chuyển vào, file bị xóa/chuyển đi
+DEFAULT_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+_libc = None
+
+def _load_libc():
+    """Nạp libc và kiểm tra có các hàm inotify không"""
+    global _libc
+    if _libc is not None:
+        return _libc or None
+
+    _libc = False
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_init1.restype = ctypes.c_int
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_add_watch.restype = ctypes.c_int
+        _libc = libc
+    except (OSError, AttributeError) as e:
+        logger.info(f"Không thể sử dụng inotify: {str(e)}")
+        return None
+
+    return _libc
+
+def is_supported():
+    """
+    Kiểm tra hệ thống có hỗ trợ inotify không
+
+    Returns:
+        bool: True nếu có thể dùng InotifyWatcher
+    """
+    return _load_libc() is not None
+
+class InotifyWatcher:
+    """
+    Theo dõi một thư mục bằng inotify. Đọc sự kiện bằng select() nên thread
+    theo dõi không tốn CPU khi thư mục không có thay đổi.
+    """
+
+    def __init__(self, folder_path, mask=DEFAULT_MASK):
+        """
+        Khởi tạo InotifyWatcher
+
+        Args:
+            folder_path (str): Đường dẫn thư mục cần theo dõi
+            mask (int): Các cờ sự kiện cần theo dõi
+        """
+        libc = _load_libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify không được hỗ trợ trên hệ thống này")
+
+        self.folder_path = folder_path
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self.wd = libc.inotify_add_watch(self.fd, os.fsencode(folder_path), mask)
+        if self.wd < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, os.strerror(err), folder_path)
+
+        # Pipe dùng để đánh thức select() khi cần dừng
+        self._wake_r, self._wake_w = os.pipe()
+        self.closed = False
+
+    def fileno(self):
+        """Trả về file descriptor inotify"""
+        return self.fd
+
+    def read_events(self, timeout=None):
+        """
+        Chờ và đọc các sự kiện inotify
+
+        Args:
+            timeout (float, optional): Thời gian chờ tối đa (giây), None để chờ vô hạn
+
+        Returns:
+            list: Danh sách (mask, đường dẫn đầy đủ). Danh sách rỗng nếu hết thời gian chờ
+                  hoặc watcher bị đánh thức bởi wake()
+        """
+        if self.closed:
+            return []
+
+        try:
+            readable, _, _ = select.select([self.fd, self._wake_r], [], [], timeout)
+        except (OSError, ValueError):
+            return []
+
+        if self._wake_r in readable:
+            try:
+                os.read(self._wake_r, 1024)
+            except OSError:
+                pass
+
+        if self.fd not in readable:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        return self._parse_events(data)
+
+    def _parse_events(self, data):
+        """
+        Phân tích dữ liệu thô thành danh sách sự kiện
+
+        Args:
+            data (bytes): Dữ liệu đọc từ file descriptor inotify
+
+        Returns:
+            list: Danh sách (mask, đường dẫn đầy đủ)
+        """
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            path = os.path.join(self.folder_path, os.fsdecode(name)) if name else self.folder_path
+            events.append((mask, path))
+
+        return events
+
+    def wake(self):
+        """Đánh thức thread đang chờ trong read_events()"""
+        try:
+            os.write(self._wake_w, b'x')
+        except OSError:
+            pass
+
+    def close(self):
+        """Đóng watcher và giải phóng file descriptor"""
+        if self.closed:
+            return
+
+        self.closed = True
+        for fd in (self.fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
@@ -0,0 +1,96 @@
+"""
+Module hỗ trợ nạp trễ các thư viện nặng (cv2, numpy, PIL, imagehash, telebot, telethon).
+Thư viện chỉ được import khi dùng lần đầu, hoặc được nạp sẵn trong một thread
+nền sau khi cửa sổ chính đã hiển thị, để không làm chậm lúc khởi động.
+"""
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger("LazyImport")
+
+# Các thư viện nặng được nạp sẵn trong nền sau khi giao diện đã hiển thị
+HEAVY_MODULES = [
+    "numpy",
+    "cv2",
+    "PIL.Image",
+    "imagehash",
+    "telebot",
+    "telethon",
+]
+
+class LazyModule:
+    """
+    Đại diện cho một module chưa được import.
+    Lần truy cập thuộc tính đầu tiên sẽ import module thật; lỗi ImportError
+    (thiếu thư viện) chỉ xuất hiện lúc đó.
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): Tên module đầy đủ, ví dụ "cv2" hoặc "telebot.apihelper"
+        """
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        """Import module thật (một lần)"""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self):
+        """Module đã được import hay chưa"""
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        # Chỉ được gọi với các thuộc tính không có sẵn trên proxy
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "đã nạp" if self._module is not None else "chưa nạp"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+def lazy_import(name):
+    """
+    Tạo proxy nạp trễ cho một module
+
+    Args:
+        name (str): Tên module đầy đủ
+
+    Returns:
+        LazyModule: Dùng như module thật (lazy_import("cv2").VideoCapture(...))
+    """
+    return LazyModule(name)
+
+def warm_up(modules=None):
+    """
+    Nạp sẵn các thư viện nặng trong một thread nền
+
+    Args:
+        modules (list, optional): Tên các module, mặc định HEAVY_MODULES
+
+    Returns:
+        threading.Thread: Thread đang nạp (daemon)
+    """
+    modules = list(modules or HEAVY_MODULES)
+
+    def load_all():
+        for name in modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                logger.debug(f"Đã nạp sẵn {name} trong {(time.perf_counter() - start) * 1000:.0f} ms")
+            except Exception as e:
+                # Thiếu thư viện tùy chọn: sẽ báo lỗi khi thật sự dùng đến
+                logger.debug(f"Không nạp sẵn được {name}: {str(e)}")
+
+    thread = threading.Thread(target=load_all, name="ImportWarmUp", daemon=True)
+    thread.start()
+    return thread
@@ -4,6 +4,8 @@ Main tab module utils for Telegram Video Uploader PyQt5 version.
 from .video_manager import (
     refresh_video_list,
     scan_folder_for_videos,
+    probe_video_metadata,
+    ensure_video_metadata,
     get_video_info,
     check_duplicates,
     check_upload_history,
@@ -12,12 +14,16 @@ from .video_manager import (
     select_unuploaded_videos
 )
 
+from .folder_scan_worker import FolderScanWorker
+from .video_list_model import VideoListModel, VideoItemDelegate
+
 from .upload_manager import (
     upload_selected_videos,
     upload_single_video,
     check_duplicates_and_uploaded,
     show_upload_confirmation,
-    show_upload_progress
+    show_upload_progress,
+    resume_pending_uploads
 )
 
 from .ui_helpers import (
@@ -34,17 +40,23 @@ from .ui_helpers import (
 __all__ = [
     'refresh_video_list',
     'scan_folder_for_videos',
+    'probe_video_metadata',
+    'ensure_video_metadata',
     'get_video_info',
     'check_duplicates',
     'check_upload_history',
     'select_all_videos',
     'deselect_all_videos',
     'select_unuploaded_videos',
+    'FolderScanWorker',
+    'VideoListModel',
+    'VideoItemDelegate',
     'upload_selected_videos',
     'upload_single_video',
     'check_duplicates_and_uploaded',
     'show_upload_confirmation',
     'show_upload_progress',
+    'resume_pending_uploads',
     'display_video_frames',
     'display_video_info',
     'update_video_status',
@@ -0,0 +1,233 @@
+"""
+Background folder scanning for the main tab in PyQt5 UI.
+
+The worker runs in its own QThread: the directory listing is streamed to the UI
+in batches (the first batch is one page so the list becomes usable right away),
+then video metadata is probed file by file and reported back in batches.
+Metadata is lazy: paths passed to prioritize() (the visible page, the selected
+video) are probed first, even while the listing is still running.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+from .video_manager import probe_video_metadata, calculate_video_hash, format_file_size
+
+logger = logging.getLogger("FolderScanWorker")
+
+# Size of the first listing batch (one page of the video list)
+FIRST_BATCH_SIZE = 10
+# Size of the following listing batches
+SCAN_BATCH_SIZE = 500
+# Size of the metadata batches
+METADATA_BATCH_SIZE = 20
+# Maximum time (seconds) a partial batch is held back before being emitted
+BATCH_INTERVAL = 0.2
+
+class FolderScanWorker(QtCore.QObject):
+    """
+    Worker object that scans a folder off the UI thread
+    """
+    # Emitted with a list of video info dictionaries
+    batch_ready = pyqtSignal(list)
+    # Emitted with the total number of videos once the listing is complete
+    scan_finished = pyqtSignal(int)
+    # Emitted with a {path: metadata} dictionary
+    metadata_ready = pyqtSignal(dict)
+    # Emitted when the worker is done (also after stop())
+    finished = pyqtSignal()
+    # Emitted with an error message
+    error = pyqtSignal(str)
+
+    def __init__(self, folder_path, scanner, probe_metadata=True, compute_hash=False):
+        """
+        Initializes the worker
+
+        Args:
+            folder_path: Folder to scan
+            scanner: FolderScanner instance (its directory cache is reused between scans)
+            probe_metadata: Whether to read resolution/duration with OpenCV
+            compute_hash: Whether to calculate the video hash (for duplicate/history checks)
+        """
+        super().__init__()
+        self.folder_path = folder_path
+        self.scanner = scanner
+        self.probe_metadata = probe_metadata
+        self.compute_hash = compute_hash
+
+        # Flag to stop the worker
+        self.running = True
+
+        # Paths to probe before the others, filled from the UI thread
+        self._priority = deque()
+        self._priority_lock = threading.Lock()
+        # Paths whose metadata has already been probed
+        self._probed = set()
+
+    def stop(self):
+        """Requests the worker to stop as soon as possible"""
+        self.running = False
+
+    def prioritize(self, paths):
+        """
+        Asks the worker to probe the given videos next (thread-safe)
+
+        Args:
+            paths: Video paths, in the order they should be probed
+        """
+        with self._priority_lock:
+            # The most recent request (usually the page being looked at) goes first
+            self._priority.extendleft(reversed(list(paths)))
+
+    def _next_priority_path(self, known_paths):
+        """
+        Pops the next prioritized path that still needs probing
+
+        Args:
+            known_paths: Paths found by the listing so far
+
+        Returns:
+            str: Path to probe, or None if there is no pending priority request
+        """
+        with self._priority_lock:
+            while self._priority:
+                path = self._priority.popleft()
+                if path in known_paths and path not in self._probed:
+                    return path
+        return None
+
+    def _probe(self, path):
+        """
+        Probes metadata (and hash) for one video
+
+        Args:
+            path: Video path
+
+        Returns:
+            dict: Metadata to merge into the video info dictionary
+        """
+        metadata = probe_video_metadata(path) if self.probe_metadata else {}
+        if self.compute_hash:
+            metadata["hash"] = calculate_video_hash(path)
+        metadata["metadata_loaded"] = True
+        self._probed.add(path)
+        return metadata
+
+    def _probe_prioritized(self, known_paths):
+        """
+        Probes every pending prioritized video and emits the results at once
+
+        Args:
+            known_paths: Paths found by the listing so far
+        """
+        results = {}
+        while self.running:
+            path = self._next_priority_path(known_paths)
+            if path is None:
+                break
+            results[path] = self._probe(path)
+
+        if results:
+            self.metadata_ready.emit(results)
+
+    def run(self):
+        """Scans the folder, then probes metadata for every video found"""
+        try:
+            paths = self._scan_listing()
+            if self.running and (self.probe_metadata or self.compute_hash):
+                self._probe_all(paths)
+        except Exception as e:
+            logger.error(f"Error scanning folder {self.folder_path}: {str(e)}")
+            self.error.emit(str(e))
+        finally:
+            self.finished.emit()
+
+    def _scan_listing(self):
+        """
+        Streams the directory listing in batches
+
+        Returns:
+            list: Paths of the videos found
+        """
+        paths = []
+        known_paths = set()
+        batch = []
+        batch_size = FIRST_BATCH_SIZE
+        last_emit = time.monotonic()
+
+        for file_info in self.scanner.iter_scan(self.folder_path, incremental=True):
+            if not self.running:
+                # Leave the generator unfinished: the scanner keeps its previous cache
+                return paths
+
+            file_info.update({
+                "status": "new",  # Default status (new, duplicate, uploaded)
+                "info": "",
+                "selected": False,
+                "file_size": format_file_size(file_info["file_size_bytes"]),
+                "metadata_loaded": False
+            })
+            batch.append(file_info)
+            paths.append(file_info["path"])
+            known_paths.add(file_info["path"])
+
+            if len(batch) >= batch_size or time.monotonic() - last_emit >= BATCH_INTERVAL:
+                self.batch_ready.emit(batch)
+                batch = []
+                batch_size = SCAN_BATCH_SIZE
+
+                # Rows already on screen get their metadata without waiting for the full listing
+                if self.probe_metadata or self.compute_hash:
+                    self._probe_prioritized(known_paths)
+                last_emit = time.monotonic()
+
+        if batch:
+            self.batch_ready.emit(batch)
+
+        self.scan_finished.emit(len(paths))
+        return paths
+
+    def _probe_all(self, paths):
+        """
+        Probes metadata (and hash) for the given videos, prioritized ones first,
+        reporting results in batches
+
+        Args:
+            paths: Paths of the videos to probe, in listing order
+        """
+        known_paths = set(paths)
+        results = {}
+        index = 0
+        last_emit = time.monotonic()
+
+        while self.running:
+            path = self._next_priority_path(known_paths)
+            if path is not None:
+                # Flush what is pending so the prioritized result is not held back
+                if results:
+                    self.metadata_ready.emit(results)
+                    results = {}
+                self.metadata_ready.emit({path: self._probe(path)})
+                last_emit = time.monotonic()
+                continue
+
+            # Skip videos already probed on request
+            while index < len(paths) and paths[index] in self._probed:
+                index += 1
+            if index >= len(paths):
+                break
+
+            path = paths[index]
+            index += 1
+            results[path] = self._probe(path)
+
+            if len(results) >= METADATA_BATCH_SIZE or time.monotonic() - last_emit >= BATCH_INTERVAL:
+                self.metadata_ready.emit(results)
+                results = {}
+                last_emit = time.monotonic()
+
+        if results:
+            self.metadata_ready.emit(results)
@@ -2,7 +2,6 @@
 UI helper utilities for displaying video information and frames.
 """
 import os
-import cv2
 import logging
 import tempfile
 import traceback
@@ -11,6 +10,13 @@ import time
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import Qt
 
+from ..lazy_import import lazy_import
+from ..ffmpeg_registry import get_registry
+from ..video_list_index import SORT_STATUS
+
+# OpenCV is only loaded when a frame is first read
+cv2 = lazy_import("cv2")
+
 logger = logging.getLogger("UIHelpers")
 
 def display_video_info(main_ui, video_path):
@@ -561,7 +567,8 @@ def extract_frames_ffmpeg(video_path):
     """
     try:
         # Kiểm tra nếu FFmpeg đã được cài đặt
-        if not check_ffmpeg_installed():
+        ffmpeg_info = get_registry().resolve()
+        if not ffmpeg_info['ffmpeg']:
             logger.error("FFmpeg không được cài đặt")
             return []
         
@@ -584,7 +591,7 @@ def extract_frames_ffmpeg(video_path):
         # Tính thời lượng video
         import subprocess
         duration_cmd = [
-            "ffprobe", 
+            ffmpeg_info['ffprobe'] or "ffprobe", 
             "-v", "error", 
             "-show_entries", "format=duration", 
             "-of", "default=noprint_wrappers=1:nokey=1", 
@@ -622,7 +629,7 @@ def extract_frames_ffmpeg(video_path):
             
             # Tạo lệnh FFmpeg
             ffmpeg_cmd = [
-                "ffmpeg", 
+                ffmpeg_info['ffmpeg'], 
                 "-y",  # Ghi đè file nếu tồn tại
                 "-ss", str(time_pos),  # Vị trí thời gian
                 "-i", video_path,  # Input file
@@ -691,22 +698,15 @@ def check_opencv_support(video_path):
 
 def check_ffmpeg_installed():
     """
-    Kiểm tra xem FFmpeg có được cài đặt không
+    Check whether FFmpeg is available, using the shared FFmpeg registry
+    (ffmpeg is only run again when the binary changes)
     
     Returns:
-        bool: True nếu FFmpeg được cài đặt, ngược lại False
+        bool: True if FFmpeg is available, otherwise False
     """
     try:
-        # Thử chạy lệnh ffmpeg -version
-        import subprocess
-        result = subprocess.run(
-            ["ffmpeg", "-version"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            timeout=2
-        )
-        return result.returncode == 0
-    except:
+        return get_registry().is_available()
+    except Exception:
         return False
 
 def display_video_frames_placeholder(main_ui, message="Không thể hiển thị khung hình xem trước"):
@@ -1095,6 +1095,9 @@ def update_video_status(main_ui, video_name, status="uploaded"):
                     else:
                         main_ui.all_videos[i]["info"] = ""
                     
+                    # The cached status sort order is stale now
+                    if getattr(main_ui, 'video_index', None) is not None:
+                        main_ui.video_index.invalidate(SORT_STATUS)
                     break
     except Exception as e:
         logger.error(f"Error updating video status: {str(e)}")
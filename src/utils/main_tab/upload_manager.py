@@ -9,6 +9,10 @@ import datetime
 import tempfile
 from PyQt5 import QtWidgets, QtCore, QtGui
 
+from ..upload_job_queue import SOURCE_MANUAL, STATUS_PENDING
+from ..video_list_index import SORT_STATUS
+from .video_manager import get_video_rows
+
 logger = logging.getLogger("UploadManager")
 
 def upload_selected_videos(main_ui):
@@ -64,15 +68,20 @@ def get_selected_videos(main_ui):
     """
     selected_videos = []
     
-    if hasattr(main_ui, 'video_list'):
+    model = getattr(main_ui, 'video_list_model', None)
+    if model is not None:
+        # Virtualised list: the checkbox state is kept in the video info
+        selected_videos = [(video["name"], video["path"]) for video in model.selected_videos()
+                           if os.path.exists(video["path"])]
+    else:
         # Loop through checkboxes and get selected videos
-        for i in range(1, 11):  # Assuming we have up to 10 videos displayed at once
-            checkbox = main_ui.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
-            label = main_ui.video_list.findChild(QtWidgets.QLabel, f"label{i}")
-            row = main_ui.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}")
+        for widgets in get_video_rows(main_ui):
+            if widgets is None:
+                continue
+            row, label, _, checkbox = widgets
             
-            if checkbox and label and row and row.isVisible() and checkbox.isChecked():
-                video_name = label.text()
+            if row.isVisible() and checkbox.isChecked():
+                video_name = label.property("fullVideoName") or label.text()
                 
                 # Find video path from main_ui.videos dictionary if available
                 if hasattr(main_ui, 'videos') and video_name in main_ui.videos:
@@ -154,15 +163,24 @@ def check_duplicates_and_uploaded(main_ui, selected_videos):
     uploaded_videos = []
     
     # First check UI status labels
-    if hasattr(main_ui, 'video_list'):
-        for i in range(1, 11):  # Assuming we have up to 10 videos
-            checkbox = main_ui.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
-            label = main_ui.video_list.findChild(QtWidgets.QLabel, f"label{i}")
-            status = main_ui.video_list.findChild(QtWidgets.QLabel, f"status{i}")
-            row = main_ui.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}")
+    model = getattr(main_ui, 'video_list_model', None)
+    if model is not None:
+        # Virtualised list: statuses are read from the video info
+        for video in model.selected_videos():
+            if video.get("status") == "duplicate":
+                has_duplicates = True
+                duplicate_videos.append(video["name"])
+            elif video.get("status") == "uploaded":
+                has_uploaded = True
+                uploaded_videos.append(video["name"])
+    else:
+        for widgets in get_video_rows(main_ui):
+            if widgets is None:
+                continue
+            row, label, status, checkbox = widgets
             
-            if checkbox and label and status and row and row.isVisible() and checkbox.isChecked():
-                video_name = label.text()
+            if row.isVisible() and checkbox.isChecked():
+                video_name = label.property("fullVideoName") or label.text()
                 
                 # Check status
                 if status.text() == "Trùng":
@@ -394,6 +412,47 @@ def show_upload_progress(main_ui, videos_to_upload):
     # Return to indicate dialog was closed
     return upload_completed[0]
 
+def resume_pending_uploads(main_ui):
+    """
+    Offers to resume manual uploads left unfinished by a previous session
+    
+    Args:
+        main_ui: MainUI instance
+        
+    Returns:
+        bool: True if pending uploads were resumed
+    """
+    job_queue = getattr(getattr(main_ui, 'app', None), 'upload_job_queue', None)
+    if not job_queue:
+        return False
+    
+    pending_jobs = job_queue.get_jobs(status=STATUS_PENDING, source=SOURCE_MANUAL)
+    videos = [
+        (os.path.basename(job['file_path']), job['file_path'])
+        for job in pending_jobs
+        if os.path.exists(job['file_path'])
+    ]
+    
+    if not videos:
+        job_queue.cancel_pending(source=SOURCE_MANUAL)
+        return False
+    
+    reply = QtWidgets.QMessageBox.question(
+        main_ui,
+        "Tiếp tục tải lên",
+        f"Có {len(videos)} video chưa tải lên xong ở phiên trước. Bạn có muốn tiếp tục không?",
+        QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+        QtWidgets.QMessageBox.Yes
+    )
+    
+    if reply != QtWidgets.QMessageBox.Yes:
+        job_queue.cancel_pending(source=SOURCE_MANUAL)
+        return False
+    
+    logger.info(f"Resuming {len(videos)} unfinished uploads from previous session")
+    show_upload_progress(main_ui, videos)
+    return True
+
 def upload_videos_thread(main_ui, videos_to_upload, tracker, is_cancelled):
     """
     Thread function that handles the actual upload process
@@ -404,6 +463,12 @@ def upload_videos_thread(main_ui, videos_to_upload, tracker, is_cancelled):
         tracker: UploadTracker instance
         is_cancelled: List with a boolean indicating if the upload was cancelled
     """
+    # Record every video in the durable job queue so an interrupted batch can be resumed
+    job_queue = getattr(getattr(main_ui, 'app', None), 'upload_job_queue', None)
+    job_ids = []
+    if job_queue:
+        job_ids = [job_queue.enqueue(video_path, source=SOURCE_MANUAL) for _, video_path in videos_to_upload]
+    
     # Get rate limit delay from config if available
     upload_delay = 5  # Default delay
     if hasattr(main_ui, 'app') and hasattr(main_ui.app, 'config'):
@@ -415,19 +480,31 @@ def upload_videos_thread(main_ui, videos_to_upload, tracker, is_cancelled):
     
     rate_limit_delay = max(8, upload_delay)  # Minimum 8 seconds
     
+    # Upload small files first so the first posts appear quickly while large ones wait
+    upload_order = sorted(range(len(videos_to_upload)), key=lambda idx: _get_file_size(videos_to_upload[idx][1]))
+    
     # For each video
-    for i, (video_name, video_path) in enumerate(videos_to_upload):
+    for position, i in enumerate(upload_order):
+        video_name, video_path = videos_to_upload[i]
+        job_id = job_ids[i] if job_ids else None
+        
         # Check if cancelled
         if is_cancelled[0]:
             tracker.update_status(i, "error", "Đã hủy tải lên")
+            if job_id:
+                job_queue.fail(job_id, "Đã hủy tải lên", retry=False)
             continue
         
         # Signal start of upload
         tracker.start_new_video(i)
+        if job_id:
+            job_queue.start_job(job_id)
         
         # Check if file exists
         if not os.path.exists(video_path) or not os.path.isfile(video_path):
             tracker.update_status(i, "error", "File không tồn tại")
+            if job_id:
+                job_queue.fail(job_id, "File không tồn tại", retry=False)
             continue
         
         # Prepare caption
@@ -502,6 +579,8 @@ def upload_videos_thread(main_ui, videos_to_upload, tracker, is_cancelled):
                         
                         # Update status
                         tracker.update_status(i, "success")
+                        if job_id:
+                            job_queue.complete(job_id)
                         
                         # Update video status in the list
                         update_video_status_in_ui(main_ui, video_name)
@@ -514,6 +593,8 @@ def upload_videos_thread(main_ui, videos_to_upload, tracker, is_cancelled):
                     time.sleep(1)
                     upload_success = True
                     tracker.update_status(i, "success")
+                    if job_id:
+                        job_queue.complete(job_id)
                     
                     # Update video status in the list
                     update_video_status_in_ui(main_ui, video_name)
@@ -523,10 +604,26 @@ def upload_videos_thread(main_ui, videos_to_upload, tracker, is_cancelled):
                 if retry_count >= max_retries:
                     tracker.update_status(i, "error", f"Lỗi: {str(e)[:50]}")
         
+        # Retries are exhausted or the batch was cancelled
+        if job_id and not upload_success:
+            job_queue.fail(job_id, "Tải lên thất bại", retry=False)
+        
         # Add delay between uploads if not the last video and not cancelled
-        if i < len(videos_to_upload) - 1 and not is_cancelled[0] and upload_success:
+        if position < len(upload_order) - 1 and not is_cancelled[0] and upload_success:
             time.sleep(rate_limit_delay)
 
+def _get_file_size(video_path):
+    """
+    Returns the file size, or 0 if the file cannot be accessed
+    
+    Args:
+        video_path: Path to the video file
+    """
+    try:
+        return os.path.getsize(video_path)
+    except OSError:
+        return 0
+
 def update_video_status_in_ui(main_ui, video_name):
     """
     Updates the status of a video in the UI after upload
@@ -555,6 +652,9 @@ def update_video_status_in_ui(main_ui, video_name):
                         if video.get("name") == video_name:
                             main_ui.all_videos[j]["status"] = "uploaded"
                             main_ui.all_videos[j]["info"] = "Đã tải lên mới đây"
+                            # The cached status sort order is stale now
+                            if getattr(main_ui, 'video_index', None) is not None:
+                                main_ui.video_index.invalidate(SORT_STATUS)
                             break
                 
                 logger.info(f"Updated UI status for {video_name} to uploaded")
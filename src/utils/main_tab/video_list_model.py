@@ -0,0 +1,276 @@
+"""
+Virtualised video list for the main tab in PyQt5 UI.
+
+VideoListModel exposes the video info dictionaries to a QListView without
+copying them, and VideoItemDelegate paints each row directly, so only the rows
+on screen cost anything: scrolling through tens of thousands of videos stays
+smooth, unlike the fixed 10 row widgets of the paginated list.
+"""
+import logging
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import Qt
+
+from .video_manager import format_file_size
+
+logger = logging.getLogger("VideoListModel")
+
+# Height of one row (pixels)
+ROW_HEIGHT = 48
+# Horizontal padding inside a row
+ROW_PADDING = 15
+# Width of the status badge
+STATUS_WIDTH = 70
+
+# Custom data roles
+VideoRole = Qt.UserRole + 1   # The video info dictionary
+StatusRole = Qt.UserRole + 2  # "new", "uploaded" or "duplicate"
+PathRole = Qt.UserRole + 3    # Full path of the video
+
+# Status text and colors (text, foreground, border, background), same as the paginated list
+STATUS_STYLES = {
+    "new": ("Mới", "#3498DB", "#BFDBFE", "#EBF5FB"),
+    "uploaded": ("Đã tải", "#10B981", "#D1FAE5", "#ECFDF5"),
+    "duplicate": ("Trùng", "#E74C3C", "#FECACA", "#FEF2F2"),
+}
+
+ROW_COLORS = ("#FFFFFF", "#E1F0FA")
+HOVER_COLOR = "#F5F9FF"
+CURRENT_COLOR = "#D6EAF8"
+BORDER_COLOR = "#F1F5F9"
+NAME_COLOR = "#1E293B"
+DETAIL_COLOR = "#64748B"
+
+class VideoListModel(QtCore.QAbstractListModel):
+    """
+    List model over a list of video info dictionaries.
+    The "selected" key of each dictionary holds the checkbox state.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._videos = []
+        # Number of rows the view knows about
+        self._row_count = 0
+        # Maps video paths to rows, rebuilt lazily after a reset or a reorder
+        self._rows = None
+
+    @property
+    def videos(self):
+        """The list currently shown (shared with the caller, not copied)"""
+        return self._videos
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._row_count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._row_count:
+            return None
+
+        video = self._videos[index.row()]
+        if role == Qt.DisplayRole:
+            return video.get("name", "")
+        if role == Qt.ToolTipRole:
+            return video.get("path", video.get("name", ""))
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if video.get("selected") else Qt.Unchecked
+        if role == VideoRole:
+            return video
+        if role == StatusRole:
+            return video.get("status", "new")
+        if role == PathRole:
+            return video.get("path", "")
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+
+        self._videos[index.row()]["selected"] = (value == Qt.Checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def set_videos(self, videos):
+        """
+        Shows a new list of videos
+
+        Args:
+            videos: List of video info dictionaries (kept by reference)
+        """
+        self.beginResetModel()
+        self._videos = videos
+        self._row_count = len(videos)
+        self._rows = None
+        self.endResetModel()
+
+    def append_videos(self, videos):
+        """
+        Appends videos to the shown list, keeping the scroll position
+
+        Args:
+            videos: Video info dictionaries to append
+        """
+        if not videos:
+            return
+
+        first = self._row_count
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(videos) - 1)
+        self._videos.extend(videos)
+        self._row_count = len(self._videos)
+        if self._rows is not None:
+            for row, video in enumerate(videos, first):
+                self._rows[video.get("path")] = row
+        self.endInsertRows()
+
+    def refresh(self):
+        """
+        Notifies the view that the shown list was changed in place
+        (sorted, statuses updated, selection changed)
+        """
+        if len(self._videos) != self._row_count:
+            # Rows were added or removed behind the model's back
+            self.set_videos(self._videos)
+            return
+
+        self._rows = None
+        self.layoutAboutToBeChanged.emit()
+        self.layoutChanged.emit()
+
+    def row_of(self, path):
+        """
+        Finds the row of a video
+
+        Args:
+            path: Video path
+
+        Returns:
+            int: Row index, or -1 if the video is not shown
+        """
+        if self._rows is None:
+            self._rows = {video.get("path"): row for row, video in enumerate(self._videos)}
+        return self._rows.get(path, -1)
+
+    def update_paths(self, paths):
+        """
+        Repaints the rows of the given videos (e.g. after metadata was loaded)
+
+        Args:
+            paths: Paths of the changed videos
+        """
+        rows = [row for row in (self.row_of(path) for path in paths) if row >= 0]
+        if not rows:
+            return
+
+        # One signal for the whole span: the view only repaints what is visible
+        self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+
+    def set_all_selected(self, selected, predicate=None):
+        """
+        Checks or unchecks every shown video
+
+        Args:
+            selected: New checkbox state
+            predicate: Optional function(video) -> bool; videos it rejects get the opposite state
+        """
+        for video in self._videos:
+            video["selected"] = selected if predicate is None or predicate(video) else not selected
+
+        if self._row_count:
+            self.dataChanged.emit(self.index(0), self.index(self._row_count - 1), [Qt.CheckStateRole])
+
+    def selected_videos(self):
+        """
+        Returns:
+            list: Shown videos whose checkbox is checked
+        """
+        return [video for video in self._videos if video.get("selected")]
+
+class VideoItemDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Paints a video row: checkbox, name, size/duration and status badge
+    """
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width(), ROW_HEIGHT)
+
+    def _checkbox_rect(self, rect):
+        """Area of the checkbox inside a row"""
+        return QtCore.QRect(rect.left() + ROW_PADDING, rect.center().y() - 10, 20, 20)
+
+    def paint(self, painter, option, index):
+        video = index.data(VideoRole)
+        if video is None:
+            return
+
+        painter.save()
+        rect = option.rect
+
+        # Background: alternating rows, hover and current row
+        if option.state & QtWidgets.QStyle.State_Selected:
+            background = CURRENT_COLOR
+        elif option.state & QtWidgets.QStyle.State_MouseOver:
+            background = HOVER_COLOR
+        else:
+            background = ROW_COLORS[index.row() % 2]
+        painter.fillRect(rect, QtGui.QColor(background))
+        painter.setPen(QtGui.QColor(BORDER_COLOR))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        # Checkbox
+        check_rect = self._checkbox_rect(rect)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        if video.get("selected"):
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QtGui.QColor("#3498DB"))
+            painter.drawRoundedRect(check_rect, 4, 4)
+            painter.setPen(QtGui.QPen(QtGui.QColor("#FFFFFF"), 2))
+            painter.drawPolyline(QtGui.QPolygon([
+                QtCore.QPoint(check_rect.left() + 5, check_rect.center().y()),
+                QtCore.QPoint(check_rect.left() + 9, check_rect.bottom() - 5),
+                QtCore.QPoint(check_rect.right() - 4, check_rect.top() + 5),
+            ]))
+        else:
+            painter.setPen(QtGui.QColor("#CBD5E1"))
+            painter.setBrush(QtGui.QColor("#F1F5F9"))
+            painter.drawRoundedRect(check_rect, 4, 4)
+
+        # Status badge (right)
+        text, foreground, border, badge = STATUS_STYLES.get(video.get("status"), STATUS_STYLES["new"])
+        status_rect = QtCore.QRect(rect.right() - ROW_PADDING - STATUS_WIDTH, rect.center().y() - 12,
+                                   STATUS_WIDTH, 24)
+        painter.setPen(QtGui.QColor(border))
+        painter.setBrush(QtGui.QColor(badge))
+        painter.drawRoundedRect(status_rect, 4, 4)
+        small_font = QtGui.QFont(option.font)
+        small_font.setPixelSize(11)
+        painter.setFont(small_font)
+        painter.setPen(QtGui.QColor(foreground))
+        painter.drawText(status_rect, Qt.AlignCenter, text)
+
+        # Size and duration (left of the badge)
+        details = video.get("file_size") or format_file_size(video.get("file_size_bytes", 0))
+        if video.get("duration_str"):
+            details = f"{details} | {video['duration_str']}"
+        details_width = painter.fontMetrics().horizontalAdvance(details) + ROW_PADDING
+        details_rect = QtCore.QRect(status_rect.left() - details_width, rect.top(),
+                                    details_width - 5, rect.height())
+        painter.setPen(QtGui.QColor(DETAIL_COLOR))
+        painter.drawText(details_rect, Qt.AlignRight | Qt.AlignVCenter, details)
+
+        # Name (fills the rest, elided in the middle like the paginated list)
+        name_font = QtGui.QFont(option.font)
+        name_font.setPixelSize(14)
+        painter.setFont(name_font)
+        name_rect = QtCore.QRect(check_rect.right() + 12, rect.top(),
+                                 details_rect.left() - check_rect.right() - 24, rect.height())
+        name = painter.fontMetrics().elidedText(video.get("name", ""), Qt.ElideMiddle, name_rect.width())
+        painter.setPen(QtGui.QColor(NAME_COLOR))
+        painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
+
+        painter.restore()
@@ -3,10 +3,15 @@ Video management utilities for the main tab in PyQt5 UI.
 """
 import os
 import logging
-import cv2
 import hashlib
 from PyQt5 import QtWidgets, QtCore, QtGui
 
+from ..folder_scanner import FolderScanner
+from ..lazy_import import lazy_import
+
+# OpenCV is only loaded when video info is first read
+cv2 = lazy_import("cv2")
+
 logger = logging.getLogger("VideoManager")
 
 def refresh_video_list(main_ui, folder_path):
@@ -54,12 +59,16 @@ def refresh_video_list(main_ui, folder_path):
     logger.info(f"Found {len(videos)} videos in {folder_path}")
     return videos
 
-def scan_folder_for_videos(folder_path):
+def scan_folder_for_videos(folder_path, probe_metadata=False):
     """
     Scans a folder for video files
     
+    Only name and size are read by default; resolution/duration are filled in
+    later with ensure_video_metadata() for the rows that need them.
+    
     Args:
         folder_path: Path to folder
+        probe_metadata: Open every video with OpenCV right away
         
     Returns:
         list: List of video file info dictionaries
@@ -68,73 +77,99 @@ def scan_folder_for_videos(folder_path):
         logger.error(f"Invalid folder path: {folder_path}")
         return []
     
-    # List of common video extensions
-    video_extensions = ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg']
-    
     video_files = []
     
     try:
-        for file in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, file)
-            if os.path.isfile(file_path):
-                ext = os.path.splitext(file)[1].lower()
-                if ext in video_extensions:
-                    # Get file size
-                    file_size = os.path.getsize(file_path)
-                    
-                    # Get video info
-                    video_info = {
-                        "name": file,
-                        "path": file_path,
-                        "status": "new",  # Default status (new, duplicate, uploaded)
-                        "info": "",
-                        "selected": False,
-                        "file_size_bytes": file_size
-                    }
-                    
-                    # Try to get more info with OpenCV
-                    try:
-                        cap = cv2.VideoCapture(file_path)
-                        if cap.isOpened():
-                            # Get video properties
-                            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                            fps = cap.get(cv2.CAP_PROP_FPS)
-                            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                            duration = frame_count / fps if fps > 0 else 0
-                            
-                            # Format duration string
-                            hours = int(duration // 3600)
-                            minutes = int((duration % 3600) // 60)
-                            seconds = int(duration % 60)
-                            duration_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                            
-                            # Update video info
-                            video_info.update({
-                                "width": width,
-                                "height": height,
-                                "resolution": f"{width}x{height}",
-                                "fps": fps,
-                                "frame_count": frame_count,
-                                "duration": duration,
-                                "duration_str": duration_str,
-                            })
-                            
-                            # Release capture
-                            cap.release()
-                    except Exception as e:
-                        logger.error(f"Error getting video info for {file_path}: {str(e)}")
-                    
-                    # Format file size
-                    video_info["file_size"] = format_file_size(file_size)
-                    
-                    # Add to video list
-                    video_files.append(video_info)
+        # Single scandir pass: type and size come from the cached DirEntry data
+        for file_info in FolderScanner(recursive=False).iter_scan(folder_path):
+            file_path = file_info["path"]
+            file_size = file_info["file_size_bytes"]
+            
+            # Get video info
+            video_info = {
+                "name": file_info["name"],
+                "path": file_path,
+                "status": "new",  # Default status (new, duplicate, uploaded)
+                "info": "",
+                "selected": False,
+                "file_size_bytes": file_size,
+                "metadata_loaded": False
+            }
+            
+            # Try to get more info with OpenCV
+            if probe_metadata:
+                ensure_video_metadata(video_info)
+            
+            # Format file size
+            video_info["file_size"] = format_file_size(file_size)
+            
+            # Add to video list
+            video_files.append(video_info)
     except Exception as e:
         logger.error(f"Error scanning folder {folder_path}: {str(e)}")
     
     return video_files
 
+def probe_video_metadata(video_path):
+    """
+    Reads resolution, frame rate and duration of a video with OpenCV
+    
+    Args:
+        video_path: Path to video file
+        
+    Returns:
+        dict: Video metadata (empty if the video cannot be opened)
+    """
+    try:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return {}
+        
+        try:
+            # Get video properties
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            # Release capture
+            cap.release()
+        
+        duration = frame_count / fps if fps > 0 else 0
+        
+        # Format duration string
+        hours = int(duration // 3600)
+        minutes = int((duration % 3600) // 60)
+        seconds = int(duration % 60)
+        
+        return {
+            "width": width,
+            "height": height,
+            "resolution": f"{width}x{height}",
+            "fps": fps,
+            "frame_count": frame_count,
+            "duration": duration,
+            "duration_str": f"{hours:02d}:{minutes:02d}:{seconds:02d}",
+        }
+    except Exception as e:
+        logger.error(f"Error getting video info for {video_path}: {str(e)}")
+        return {}
+
+def ensure_video_metadata(video):
+    """
+    Probes metadata for a video info dictionary if it has not been loaded yet
+    
+    Args:
+        video: Video info dictionary (updated in place)
+        
+    Returns:
+        dict: The same video info dictionary
+    """
+    if not video.get("metadata_loaded"):
+        video.update(probe_video_metadata(video["path"]))
+        video["metadata_loaded"] = True
+    return video
+
 def get_video_info(video_path):
     """
     Gets information about a video file
@@ -285,7 +320,8 @@ def check_duplicates(main_ui, videos):
     # First pass: generate hashes and find duplicates
     for i, video in enumerate(videos):
         video_path = video["path"]
-        video_hash = calculate_video_hash(video_path)
+        # Reuse the hash computed by the background scan if available
+        video_hash = video.get("hash") or calculate_video_hash(video_path)
         
         if video_hash:
             # Store hash in video info
@@ -348,25 +384,57 @@ def check_upload_history(main_ui, videos):
     if hasattr(main_ui, 'app') and hasattr(main_ui.app, 'upload_history'):
         upload_history = main_ui.app.upload_history
         
-        for i, video in enumerate(videos):
-            video_hash = video.get("hash")
-            if not video_hash:
-                video_hash = calculate_video_hash(video["path"])
-                videos[i]["hash"] = video_hash
+        # Hashes normally come from the background scan; compute only the missing ones
+        for video in videos:
+            if not video.get("hash"):
+                video["hash"] = calculate_video_hash(video["path"])
+        
+        # One lookup for the whole list instead of two calls per video
+        uploaded = upload_history.lookup_many(video["hash"] for video in videos)
+        
+        for video in videos:
+            upload_info = uploaded.get(video["hash"]) if video["hash"] else None
+            if upload_info is None:
+                continue
             
-            if video_hash and upload_history.is_uploaded(video_hash):
-                videos[i]["status"] = "uploaded"
-                
-                # Get upload date if available
-                upload_info = upload_history.get_upload_by_hash(video_hash)
-                if upload_info and "upload_date" in upload_info:
-                    videos[i]["info"] = f"Đã tải lên vào {upload_info['upload_date']}"
-                else:
-                    videos[i]["info"] = "Đã tải lên trước đó"
+            video["status"] = "uploaded"
+            
+            # Get upload date if available
+            if "upload_date" in upload_info:
+                video["info"] = f"Đã tải lên vào {upload_info['upload_date']}"
+            else:
+                video["info"] = "Đã tải lên trước đó"
     
     logger.info(f"Found {sum(1 for v in videos if v['status'] == 'uploaded')} previously uploaded videos")
     return videos
 
+def get_video_rows(main_ui):
+    """
+    Gets the widgets of the paginated list rows
+    
+    Args:
+        main_ui: MainUI instance
+        
+    Returns:
+        list: (row, label, status, checkbox) tuple per row, None for rows with missing widgets
+    """
+    rows = getattr(main_ui, 'video_rows', None)
+    if rows:
+        return rows
+    
+    # Registry not built (older callers): look the widgets up
+    rows = []
+    if hasattr(main_ui, 'video_list'):
+        for i in range(1, 11):
+            widgets = (
+                main_ui.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}"),
+                main_ui.video_list.findChild(QtWidgets.QLabel, f"label{i}"),
+                main_ui.video_list.findChild(QtWidgets.QLabel, f"status{i}"),
+                main_ui.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
+            )
+            rows.append(None if None in widgets else widgets)
+    return rows
+
 def select_all_videos(main_ui):
     """
     Selects all videos in the list
@@ -374,13 +442,15 @@ def select_all_videos(main_ui):
     Args:
         main_ui: MainUI instance
     """
-    if hasattr(main_ui, 'video_list'):
+    model = getattr(main_ui, 'video_list_model', None)
+    if model is not None:
+        # Virtualised list: every video of the list, not only the visible rows
+        model.set_all_selected(True)
+    else:
         # Update all checkboxes in the UI
-        for i in range(1, 11):  # Assuming we have up to 10 videos displayed at once
-            checkbox = main_ui.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
-            row = main_ui.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}")
-            if checkbox and row and row.isVisible():
-                checkbox.setChecked(True)
+        for widgets in get_video_rows(main_ui):
+            if widgets and widgets[0].isVisible():
+                widgets[3].setChecked(True)
     logger.info("Selected all videos")
 
 def deselect_all_videos(main_ui):
@@ -390,12 +460,14 @@ def deselect_all_videos(main_ui):
     Args:
         main_ui: MainUI instance
     """
-    if hasattr(main_ui, 'video_list'):
+    model = getattr(main_ui, 'video_list_model', None)
+    if model is not None:
+        model.set_all_selected(False)
+    else:
         # Update all checkboxes in the UI
-        for i in range(1, 11):
-            checkbox = main_ui.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
-            if checkbox:
-                checkbox.setChecked(False)
+        for widgets in get_video_rows(main_ui):
+            if widgets:
+                widgets[3].setChecked(False)
     logger.info("Deselected all videos")
 
 def select_unuploaded_videos(main_ui):
@@ -405,15 +477,35 @@ def select_unuploaded_videos(main_ui):
     Args:
         main_ui: MainUI instance
     """
-    if hasattr(main_ui, 'video_list'):
+    model = getattr(main_ui, 'video_list_model', None)
+    if model is not None:
+        # Virtualised list: check the whole list against the upload history in one call
+        uploaded = {}
+        if hasattr(main_ui, 'app') and hasattr(main_ui.app, 'upload_history'):
+            uploaded = main_ui.app.upload_history.lookup_many(video.get("hash") for video in model.videos)
+        model.set_all_selected(
+            True,
+            lambda video: video.get("hash") not in uploaded and video.get("status") != "uploaded"
+        )
+    else:
+        # Videos shown on the current page, in row order
+        page_videos = getattr(main_ui, 'page_videos', None)
+        if page_videos is None:
+            items_per_page = 10
+            start_idx = (max(1, getattr(main_ui, 'current_page', 1)) - 1) * items_per_page
+            page_videos = getattr(main_ui, 'all_videos', [])[start_idx:start_idx + items_per_page]
+        
+        # Check the whole page against the upload history in one call
+        uploaded = {}
+        if hasattr(main_ui, 'app') and hasattr(main_ui.app, 'upload_history'):
+            uploaded = main_ui.app.upload_history.lookup_many(video.get("hash") for video in page_videos)
+        
         # Update checkboxes based on upload status
-        for i in range(1, 11):
-            status_label = main_ui.video_list.findChild(QtWidgets.QLabel, f"status{i}")
-            checkbox = main_ui.video_list.findChild(QtWidgets.QCheckBox, f"checkBox{i}")
-            row = main_ui.video_list.findChild(QtWidgets.QFrame, f"videoItem{i}")
-            
-            if status_label and checkbox and row and row.isVisible():
-                # Check if the status is not "uploaded" (Đã tải)
-                is_uploaded = status_label.text() == "Đã tải"
+        for i, widgets in enumerate(get_video_rows(main_ui), 1):
+            if widgets and widgets[0].isVisible():
+                _, _, status_label, checkbox = widgets
+                # Uploaded if the history knows the hash or the row is already marked (Đã tải)
+                video = page_videos[i - 1] if i - 1 < len(page_videos) else {}
+                is_uploaded = video.get("hash") in uploaded or status_label.text() == "Đã tải"
                 checkbox.setChecked(not is_uploaded)
-    logger.info("Selected unuploaded videos")
\ No newline at end of file
+    logger.info("Selected unuploaded videos")
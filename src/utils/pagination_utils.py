@@ -302,7 +302,7 @@ class PaginationManager:
             self.current_page = max(1, min(current_page, max(1, total_pages)))
             self.total_pages = max(1, total_pages)
             
-            logger.info(f"Updating pagination: current={self.current_page}, total={self.total_pages}")
+            logger.debug(f"Updating pagination: current={self.current_page}, total={self.total_pages}")
             
             # Ẩn tất cả các nút trang và ellipsis đầu tiên
             self._hide_all_buttons()
@@ -357,11 +357,11 @@ class PaginationManager:
                     # Cập nhật số trang hiển thị
                     btn.setText(str(page_num))
                     
-                    # Set style phù hợp
-                    if page_num == self.current_page:
-                        btn.setStyleSheet(self.active_page_style)
-                    else:
-                        btn.setStyleSheet(self.inactive_page_style)
+                    # Set style phù hợp (chỉ khi thay đổi: setStyleSheet buộc widget polish lại)
+                    active = page_num == self.current_page
+                    if btn.property("pageActive") != active:
+                        btn.setProperty("pageActive", active)
+                        btn.setStyleSheet(self.active_page_style if active else self.inactive_page_style)
             
             # Trường hợp đơn giản: 7 trang hoặc ít hơn, hiển thị tất cả các trang
             if self.total_pages <= 7:
@@ -373,7 +373,7 @@ class PaginationManager:
                 for ellipsis in self.ellipsis_labels:
                     ellipsis.setVisible(False)
                 
-                logger.info(f"Hiển thị tất cả {self.total_pages} trang")
+                logger.debug(f"Hiển thị tất cả {self.total_pages} trang")
                 return
             
             # Trường hợp có nhiều trang, hiển thị theo kiểu: 1 ... 4 5 6 ... 10 (ở vị trí trang 5)
@@ -397,7 +397,7 @@ class PaginationManager:
                 if self.total_pages - 1 < num_buttons:
                     self.page_buttons[self.total_pages - 1].setVisible(True)
                 
-                logger.info(f"Hiển thị phân trang kiểu đầu: 1-5 ... {self.total_pages}")
+                logger.debug(f"Hiển thị phân trang kiểu đầu: 1-5 ... {self.total_pages}")
                 
             elif self.current_page >= self.total_pages - 3:
                 # Trang hiện tại gần cuối: hiển thị 1 ... 6 7 8 9 10
@@ -412,7 +412,7 @@ class PaginationManager:
                     if idx < num_buttons:
                         self.page_buttons[idx].setVisible(True)
                 
-                logger.info(f"Hiển thị phân trang kiểu cuối: 1 ... {self.total_pages-4}-{self.total_pages}")
+                logger.debug(f"Hiển thị phân trang kiểu cuối: 1 ... {self.total_pages-4}-{self.total_pages}")
                 
             else:
                 # Trang hiện tại ở giữa: hiển thị 1 ... 4 5 6 ... 10
@@ -434,7 +434,7 @@ class PaginationManager:
                 if self.total_pages - 1 < num_buttons:
                     self.page_buttons[self.total_pages - 1].setVisible(True)
                 
-                logger.info(f"Hiển thị phân trang kiểu giữa: 1 ... {self.current_page-1} {self.current_page} {self.current_page+1} ... {self.total_pages}")
+                logger.debug(f"Hiển thị phân trang kiểu giữa: 1 ... {self.current_page-1} {self.current_page} {self.current_page+1} ... {self.total_pages}")
             
             # Cập nhật giao diện container
             self.button_container.updateGeometry()
@@ -508,9 +508,10 @@ class PaginationManager:
             button: The button to update
             enabled: Whether the button is enabled
         """
-        if not button:
+        if not button or button.property("navEnabled") == enabled:
             return
-            
+        
+        button.setProperty("navEnabled", enabled)
         if enabled:
             button.setStyleSheet(self.inactive_page_style)
         else:
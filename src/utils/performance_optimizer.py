@@ -13,6 +13,10 @@ import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from .size_accountant import get_accountant
+from .cache_eviction import CacheEvictionEngine
+from .video_metadata import get_metadata_service
+
 logger = logging.getLogger(__name__)
 
 class PerformanceOptimizer:
@@ -49,6 +53,10 @@ class PerformanceOptimizer:
         # Kích thước tối đa của thư mục cache (100MB)
         self.max_cache_size = 100 * 1024 * 1024
         
+        # Chỉ mục cache (nằm ngoài thư mục cache), tạo khi cần lần đầu
+        self.cache_index_file = os.path.join(self.app_dir, 'data', 'cache_index.db')
+        self._cache_engine = None
+        
         # Số ngày để giữ file logs
         self.log_retention_days = 7
         
@@ -110,9 +118,52 @@ class PerformanceOptimizer:
             size_bytes /= 1024.0
         return f"{size_bytes:.2f} PB"
     
+    def get_cache_engine(self):
+        """
+        Lấy bộ dọn dẹp cache (chỉ mục LRU, ngân sách theo loại)
+        
+        Returns:
+            CacheEvictionEngine: Đối tượng dùng cho thư mục cache của ứng dụng
+        """
+        if self._cache_engine is None:
+            self._cache_engine = CacheEvictionEngine(
+                self.cache_dir, self.cache_index_file, max_total=self.max_cache_size
+            )
+        return self._cache_engine
+    
+    def start_cache_maintenance(self, interval=300):
+        """
+        Dọn dẹp cache định kỳ trong nền, xóa dần theo từng lô nhỏ
+        
+        Args:
+            interval (int): Số giây giữa hai lượt kiểm tra
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        engine = self.get_cache_engine()
+        # Kết quả ffprobe được lưu vào cache để dùng lại ở lần khởi động sau
+        get_metadata_service().set_disk_cache(engine)
+        engine.start_background(interval=interval)
+    
+    def stop_cache_maintenance(self):
+        """Dừng dọn dẹp cache nền và đóng chỉ mục"""
+        if self._cache_engine is not None:
+            get_metadata_service().set_disk_cache(None)
+            self._cache_engine.close()
+            self._cache_engine = None
+    
+    def get_cache_metrics(self):
+        """
+        Số liệu cache: số lần trúng/trượt, số file đã xóa, dung lượng từng loại
+        
+        Returns:
+            dict: Kết quả CacheEvictionEngine.metrics()
+        """
+        return self.get_cache_engine().metrics()
+    
     def cleanup_cache(self):
         """
-        Dọn dẹp thư mục cache
+        Dọn dẹp thư mục cache: xóa các file lâu không dùng nhất của những loại
+        vượt ngân sách (theo chỉ mục, không quét lại toàn bộ thư mục)
         
         Returns:
             dict: Thông tin về kết quả dọn dẹp
@@ -123,52 +174,28 @@ class PerformanceOptimizer:
                 os.makedirs(self.cache_dir, exist_ok=True)
                 return {'success': True, 'message': 'Thư mục cache mới được tạo'}
             
-            # Tính kích thước trước khi dọn dẹp
+            # Tính kích thước trước khi dọn dẹp (có cache theo thư mục)
             before_size = self._get_dir_size(self.cache_dir)
             
-            # Nếu kích thước cache nhỏ hơn kích thước tối đa, không cần dọn dẹp
-            if before_size < self.max_cache_size:
+            engine = self.get_cache_engine()
+            # Chỉ quét thư mục cache khi có thay đổi ngoài chỉ mục
+            if engine.total_size() != before_size:
+                engine.sync()
+            
+            files_removed, space_freed = engine.evict()
+            
+            # Nếu không loại nào vượt ngân sách, không cần dọn dẹp
+            if files_removed == 0:
                 return {
                     'success': True,
                     'cache_size': {
                         'before': before_size,
                         'formatted': self._format_size(before_size)
                     },
+                    'metrics': engine.metrics(),
                     'message': f"Cache đang ở mức cho phép ({self._format_size(before_size)})"
                 }
             
-            # Lấy danh sách các file theo thời gian sửa đổi
-            files_info = []
-            for root, _, files in os.walk(self.cache_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    try:
-                        mtime = os.path.getmtime(file_path)
-                        size = os.path.getsize(file_path)
-                        files_info.append((file_path, mtime, size))
-                    except (FileNotFoundError, PermissionError):
-                        pass
-            
-            # Sắp xếp theo thời gian sửa đổi (cũ nhất trước)
-            files_info.sort(key=lambda x: x[1])
-            
-            # Xóa các file cũ nhất cho đến khi kích thước cache dưới ngưỡng cho phép
-            files_removed = 0
-            space_freed = 0
-            current_size = before_size
-            
-            for file_path, _, size in files_info:
-                if current_size <= self.max_cache_size * 0.8:  # Giữ cache dưới 80% ngưỡng
-                    break
-                
-                try:
-                    os.remove(file_path)
-                    files_removed += 1
-                    space_freed += size
-                    current_size -= size
-                except (FileNotFoundError, PermissionError) as e:
-                    logger.warning(f"Không thể xóa {file_path}: {str(e)}")
-            
             # Tính kích thước sau khi dọn dẹp
             after_size = self._get_dir_size(self.cache_dir)
             
@@ -184,6 +211,7 @@ class PerformanceOptimizer:
                     'formatted_before': self._format_size(before_size),
                     'formatted_after': self._format_size(after_size)
                 },
+                'metrics': engine.metrics(),
                 'message': f"Đã dọn dẹp {files_removed} file, giải phóng {self._format_size(space_freed)}"
             }
         except Exception as e:
@@ -198,7 +226,8 @@ class PerformanceOptimizer:
     
     def _get_dir_size(self, path):
         """
-        Tính tổng kích thước của một thư mục
+        Tính tổng kích thước của một thư mục (dùng cache chung, chỉ quét lại
+        các thư mục con đã thay đổi)
         
         Args:
             path (str): Đường dẫn tới thư mục
@@ -206,15 +235,7 @@ class PerformanceOptimizer:
         Returns:
             int: Kích thước thư mục tính bằng bytes
         """
-        total_size = 0
-        for dirpath, _, filenames in os.walk(path):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                try:
-                    total_size += os.path.getsize(file_path)
-                except (FileNotFoundError, PermissionError):
-                    pass
-        return total_size
+        return get_accountant().get_size(path)
     
     def cleanup_logs(self):
         """
@@ -250,6 +271,7 @@ class PerformanceOptimizer:
                         if mtime < cutoff_time:
                             size = os.path.getsize(file_path)
                             os.remove(file_path)
+                            get_accountant().record_removed(file_path, size)
                             files_removed += 1
                             space_freed += size
                     except (FileNotFoundError, PermissionError) as e:
@@ -308,6 +330,7 @@ class PerformanceOptimizer:
                     if os.path.isfile(item_path):
                         size = os.path.getsize(item_path)
                         os.unlink(item_path)
+                        get_accountant().record_removed(item_path, size)
                         files_removed += 1
                         space_freed += size
                     elif os.path.isdir(item_path):
@@ -0,0 +1,438 @@
+"""
+Module tải file qua HTTP có thể tải tiếp khi bị ngắt (HTTP Range), tải song song
+nhiều đoạn, kiểm tra SHA-256 và giải nén file tar ngay trong lúc tải.
+
+Phần đã tải nằm trong "<file>.part", tiến trình từng đoạn được ghi vào
+"<file>.part.json"; lần tải sau với cùng URL sẽ tiếp tục từ đó.
+"""
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import tarfile
+import threading
+import urllib.request
+
+logger = logging.getLogger("RangeDownloader")
+
+USER_AGENT = "TelegramVideoUploader"
+
+# Kích thước mỗi lần đọc từ mạng
+CHUNK_SIZE = 256 * 1024
+
+# Đoạn nhỏ hơn mức này không được chia tiếp cho kết nối khác
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+
+# Khoảng thời gian tối thiểu giữa hai lần ghi file trạng thái (giây)
+STATE_SAVE_INTERVAL = 1.0
+
+def sha256_file(path):
+    """SHA-256 (hex) của một file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def parse_checksums(text, file_name):
+    """
+    Tìm SHA-256 của một file trong nội dung kiểu "sha256sum" ("<hash>  <tên file>")
+
+    Returns:
+        str: Mã hash (chữ thường), None nếu không có
+    """
+    for line in (text or "").splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[-1].lstrip('*') == file_name and len(parts[0]) == 64:
+            return parts[0].lower()
+    return None
+
+def is_safe_member(member):
+    """Chỉ giải nén file/thư mục thường, không có đường dẫn tuyệt đối hay ".." """
+    name = member.name.replace('\\', '/')
+    return ((member.isfile() or member.isdir()) and not name.startswith('/')
+            and '..' not in name.split('/'))
+
+class RangeDownloader:
+    """
+    Tải một file qua HTTP, tải tiếp và tải song song bằng header Range nếu máy chủ hỗ trợ
+    """
+
+    def __init__(self, url, dest_path, connections=4, expected_sha256=None,
+                 progress=None, timeout=30, retries=3):
+        """
+        Khởi tạo
+
+        Args:
+            url (str): URL cần tải
+            dest_path (str): Đường dẫn file đích
+            connections (int): Số kết nối song song tối đa
+            expected_sha256 (str, optional): SHA-256 mong đợi, None để bỏ qua kiểm tra
+            progress (callable, optional): Hàm progress(downloaded, total) gọi khi có dữ liệu mới
+            timeout (int): Thời gian chờ mỗi kết nối (giây)
+            retries (int): Số lần thử lại mỗi đoạn khi lỗi mạng
+        """
+        self.url = url
+        self.dest_path = dest_path
+        self.part_path = dest_path + '.part'
+        self.state_path = dest_path + '.part.json'
+        self.connections = max(1, connections)
+        self.expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        self.progress = progress
+        self.timeout = timeout
+        self.retries = retries
+
+        self.total_size = None
+        self.accept_ranges = False
+        self.validator = None
+        self.downloaded = 0
+        self.segments = []
+
+        self._lock = threading.Lock()
+        self._last_state_save = 0
+
+    def _open(self, start=None, end=None):
+        """Mở kết nối, có header Range nếu start được chỉ định"""
+        request = urllib.request.Request(self.url, headers={'User-Agent': USER_AGENT})
+        if start is not None:
+            request.add_header('Range', f"bytes={start}-{'' if end is None else end}")
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def probe(self):
+        """
+        Đọc kích thước file và kiểm tra máy chủ có hỗ trợ Range không
+
+        Returns:
+            int: Kích thước file, None nếu máy chủ không cho biết
+        """
+        with self._open(0, 0) as response:
+            content_range = response.headers.get('Content-Range', '')
+            total = content_range.rsplit('/', 1)[-1] if '/' in content_range else ''
+            if response.status == 206 and total.isdigit():
+                self.total_size = int(total)
+                self.accept_ranges = True
+            else:
+                length = response.headers.get('Content-Length', '')
+                self.total_size = int(length) if length.isdigit() else None
+                self.accept_ranges = False
+            self.validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+        return self.total_size
+
+    def _load_state(self):
+        """Đọc trạng thái tải dở, None nếu không có hoặc không còn dùng được"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (state.get('url') != self.url or state.get('total') != self.total_size
+                or state.get('validator') != self.validator or not state.get('segments')):
+            return None
+        try:
+            part_size = os.path.getsize(self.part_path)
+        except OSError:
+            return None
+        if part_size < max(start + done for start, end, done in state['segments']):
+            return None
+        return state
+
+    def _save_state(self, force=False):
+        """Ghi tiến trình các đoạn (gọi khi đang giữ _lock)"""
+        now = time.time()
+        if not force and now - self._last_state_save < STATE_SAVE_INTERVAL:
+            return
+        self._last_state_save = now
+
+        state = {
+            'url': self.url,
+            'total': self.total_size,
+            'validator': self.validator,
+            'segments': self.segments
+        }
+        temp_path = self.state_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Không lưu được trạng thái tải: {str(e)}")
+
+    def _discard_partial(self):
+        """Xóa phần đã tải dở"""
+        for path in (self.part_path, self.state_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _add_progress(self, segment, size):
+        """Cập nhật tiến trình sau khi ghi size byte của một đoạn"""
+        with self._lock:
+            segment[2] += size
+            self.downloaded += size
+            self._save_state()
+        if self.progress:
+            self.progress(self.downloaded, self.total_size or 0)
+
+    def _plan_segments(self):
+        """Chia file thành tối đa self.connections đoạn [start, end, đã tải]"""
+        count = max(1, min(self.connections, self.total_size // MIN_SEGMENT_SIZE))
+        size = -(-self.total_size // count)
+        return [[start, min(start + size, self.total_size) - 1, 0]
+                for start in range(0, self.total_size, size)]
+
+    def _prepare(self, sequential):
+        """
+        Xác định các đoạn cần tải: tiếp tục phần tải dở nếu còn dùng được,
+        nếu không thì bắt đầu lại
+        """
+        self.probe()
+        state = self._load_state() if self.accept_ranges else None
+        if state and sequential and len(state['segments']) != 1:
+            state = None
+
+        if state:
+            self.segments = state['segments']
+            self.downloaded = sum(done for start, end, done in self.segments)
+            logger.info(f"Tải tiếp {os.path.basename(self.dest_path)} từ {self.downloaded}/{self.total_size} byte")
+        else:
+            self._discard_partial()
+            self.downloaded = 0
+            if self.accept_ranges and not sequential and self.total_size:
+                self.segments = self._plan_segments()
+                # Tạo sẵn file đủ kích thước để các đoạn ghi đúng vị trí
+                with open(self.part_path, 'wb') as f:
+                    f.truncate(self.total_size)
+            else:
+                self.segments = [[0, (self.total_size or 0) - 1, 0]]
+                open(self.part_path, 'wb').close()
+
+        with self._lock:
+            self._save_state(force=True)
+
+    def _download_segment(self, segment, errors):
+        """Tải một đoạn vào đúng vị trí trong file .part, thử lại khi lỗi mạng"""
+        attempt = 0
+        while True:
+            start = segment[0] + segment[2]
+            if start > segment[1]:
+                return
+            try:
+                with self._open(start, segment[1]) as response:
+                    if response.status != 206:
+                        raise IOError(f"Máy chủ không trả về đoạn {start}-{segment[1]} (HTTP {response.status})")
+                    with open(self.part_path, 'r+b') as f:
+                        f.seek(start)
+                        while True:
+                            chunk = response.read(min(CHUNK_SIZE, segment[1] + 1 - segment[0] - segment[2]))
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            self._add_progress(segment, len(chunk))
+                if segment[0] + segment[2] <= segment[1]:
+                    raise IOError("Kết nối bị đóng trước khi tải xong đoạn")
+                return
+            except Exception as e:
+                attempt += 1
+                if attempt > self.retries:
+                    errors.append(e)
+                    return
+                logger.warning(f"Lỗi khi tải đoạn {segment[0]}-{segment[1]}, thử lại lần {attempt}: {str(e)}")
+                time.sleep(min(2 ** attempt, 10))
+
+    def _finish(self):
+        """Kiểm tra SHA-256 và đổi .part thành file đích"""
+        with self._lock:
+            self._save_state(force=True)
+
+        if self.expected_sha256:
+            actual = sha256_file(self.part_path)
+            if actual != self.expected_sha256:
+                self._discard_partial()
+                raise ValueError(f"SHA-256 không khớp: mong đợi {self.expected_sha256}, nhận được {actual}")
+            logger.info(f"Đã kiểm tra SHA-256 của {os.path.basename(self.dest_path)}")
+
+        os.replace(self.part_path, self.dest_path)
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+        return self.dest_path
+
+    def download(self):
+        """
+        Tải toàn bộ file, song song nhiều đoạn nếu máy chủ hỗ trợ Range.
+        Nếu bị lỗi, phần đã tải được giữ lại để lần gọi sau tải tiếp.
+
+        Returns:
+            str: Đường dẫn file đích
+
+        Raises:
+            ValueError: SHA-256 không khớp
+            IOError/URLError: Lỗi mạng sau khi đã thử lại
+        """
+        self._prepare(sequential=False)
+
+        if not self.accept_ranges:
+            # Máy chủ không hỗ trợ Range: tải tuần tự một luồng
+            stream = ResumableStream(self, self.segments[0])
+            try:
+                while stream.read(CHUNK_SIZE):
+                    pass
+            finally:
+                stream.close()
+            return self._finish()
+
+        errors = []
+        workers = [threading.Thread(target=self._download_segment, args=(segment, errors),
+                                    name="RangeDownload", daemon=True)
+                   for segment in self.segments if segment[2] < segment[1] - segment[0] + 1]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        if errors:
+            with self._lock:
+                self._save_state(force=True)
+            raise errors[0]
+        return self._finish()
+
+    def download_and_extract_tar(self, extract_dir, member_filter=None):
+        """
+        Tải file tar (tar.xz, tar.gz...) và giải nén ngay trong lúc tải.
+        File vẫn được ghi ra .part để có thể tải tiếp và kiểm tra SHA-256.
+
+        Args:
+            extract_dir (str): Thư mục giải nén
+            member_filter (callable, optional): Hàm member_filter(TarInfo) -> bool chọn file cần giải nén
+
+        Returns:
+            list: Đường dẫn các file đã giải nén
+
+        Raises:
+            ValueError: SHA-256 không khớp (các file đã giải nén bị xóa)
+        """
+        self._prepare(sequential=True)
+        stream = ResumableStream(self, self.segments[0])
+        extract_options = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
+        extracted = []
+        try:
+            with tarfile.open(fileobj=stream, mode='r|*') as archive:
+                for member in archive:
+                    if not is_safe_member(member) or not member.isfile():
+                        continue
+                    if member_filter is not None and not member_filter(member):
+                        continue
+                    archive.extract(member, extract_dir, **extract_options)
+                    extracted.append(os.path.join(extract_dir, member.name))
+
+            # Đọc nốt phần còn lại (padding cuối tar) để có đủ file cho SHA-256
+            while stream.read(CHUNK_SIZE):
+                pass
+        finally:
+            stream.close()
+            # Lưu tiến trình ngay cả khi bị lỗi, để lần sau tải tiếp
+            with self._lock:
+                self._save_state(force=True)
+
+        try:
+            self._finish()
+        except ValueError:
+            for path in extracted:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            raise
+        return extracted
+
+class ResumableStream(io.RawIOBase):
+    """
+    Luồng đọc tuần tự một đoạn: đọc lại phần đã có trong file .part trước, sau đó
+    tải tiếp từ mạng (ghi thêm vào .part). Tự kết nối lại khi lỗi mạng.
+    """
+
+    def __init__(self, downloader, segment):
+        self.downloader = downloader
+        self.segment = segment
+        self.position = 0
+        self.response = None
+        self.local = open(downloader.part_path, 'r+b')
+        self.attempt = 0
+
+    def readable(self):
+        return True
+
+    def _connect(self):
+        """Mở kết nối từ vị trí hiện tại (bỏ qua phần đầu nếu máy chủ không hỗ trợ Range)"""
+        downloader = self.downloader
+        if downloader.accept_ranges and self.position > 0:
+            self.response = downloader._open(self.position)
+            if self.response.status == 206:
+                return
+            self.response.close()
+
+        self.response = downloader._open()
+        skip = self.position
+        while skip > 0:
+            data = self.response.read(min(skip, CHUNK_SIZE))
+            if not data:
+                raise IOError("Kết nối bị đóng khi đang bỏ qua phần đã tải")
+            skip -= len(data)
+
+    def readinto(self, buffer):
+        done = self.segment[2]
+        if self.position < done:
+            # Còn dữ liệu đã tải trong file .part
+            self.local.seek(self.position)
+            data = self.local.read(min(len(buffer), done - self.position))
+        else:
+            data = self._read_remote(len(buffer))
+            if data:
+                self.local.seek(self.position)
+                self.local.write(data)
+                self.downloader._add_progress(self.segment, len(data))
+
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def _read_remote(self, size):
+        """Đọc từ mạng, kết nối lại khi lỗi"""
+        total = self.downloader.total_size
+        while True:
+            if total and self.position >= total:
+                return b""
+            try:
+                if self.response is None:
+                    self._connect()
+                data = self.response.read(size)
+                if not data and total and self.position < total:
+                    raise IOError("Kết nối bị đóng trước khi tải xong")
+                self.attempt = 0
+                return data
+            except Exception as e:
+                self.close_response()
+                self.attempt += 1
+                if self.attempt > self.downloader.retries:
+                    raise
+                logger.warning(f"Lỗi khi tải, kết nối lại lần {self.attempt}: {str(e)}")
+                time.sleep(min(2 ** self.attempt, 10))
+
+    def close_response(self):
+        if self.response is not None:
+            try:
+                self.response.close()
+            except Exception:
+                pass
+            self.response = None
+
+    def close(self):
+        self.close_response()
+        self.local.close()
+        super().close()
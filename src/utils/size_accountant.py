@@ -0,0 +1,226 @@
+"""
+Module tính kích thước thư mục có cache, dùng chung cho DiskSpaceChecker và
+PerformanceOptimizer.
+
+Mỗi thư mục lưu tổng kích thước các file nằm trực tiếp trong nó cùng danh sách
+thư mục con, theo thời điểm sửa (mtime) của thư mục. Khi tính lại, chỉ những
+thư mục có mtime thay đổi (có file được thêm/xóa/đổi tên) mới bị quét lại; các
+thay đổi do chính ứng dụng thực hiện được cập nhật trực tiếp qua record_added/
+record_removed mà không cần quét. Cache được lưu ra đĩa để dùng lại ở lần khởi
+động sau.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger("SizeAccountant")
+
+# Phiên bản định dạng file cache, tăng khi đổi cấu trúc để bỏ cache cũ
+CACHE_VERSION = 1
+
+# Thư mục sửa đổi gần đây hơn mức này (giây) chưa được tin là đã ổn định:
+# mtime có thể không đổi nếu có thêm file trong cùng một nhịp đồng hồ
+MTIME_SETTLE_SECONDS = 2
+
+def default_cache_file():
+    """<thư mục gốc>/data/dir_sizes.json (thư mục chứa file thực thi nếu đóng gói bằng PyInstaller)"""
+    if getattr(sys, 'frozen', False):
+        app_dir = os.path.dirname(sys.executable)
+    else:
+        app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(app_dir, 'data', 'dir_sizes.json')
+
+class DirectorySizeAccountant:
+    """
+    Kích thước thư mục có cache theo mtime từng thư mục. An toàn khi gọi từ nhiều thread.
+    """
+
+    def __init__(self, cache_file=None, max_age=3600):
+        """
+        Khởi tạo
+
+        Args:
+            cache_file (str, optional): File lưu cache, None để không lưu ra đĩa
+            max_age (int): Số giây tối đa tin vào kích thước đã lưu của một thư mục.
+                File được ghi thêm tại chỗ (ví dụ file log) không làm đổi mtime thư mục,
+                nên thư mục được quét lại sau khoảng thời gian này.
+        """
+        self.cache_file = cache_file
+        self.max_age = max_age
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._loaded = False
+        self.scanned_dirs = 0  # Số lần quét thư mục (để theo dõi hiệu quả cache)
+
+    def _load(self):
+        """Đọc cache trên đĩa (một lần)"""
+        self._loaded = True
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(stored, dict) and stored.get('version') == CACHE_VERSION:
+            self._entries = stored.get('entries', {})
+
+    def save(self):
+        """Ghi cache ra đĩa nếu có thay đổi (ghi ra file tạm rồi thay thế)"""
+        with self._lock:
+            if not self.cache_file or not self._dirty:
+                return
+            data = {'version': CACHE_VERSION, 'entries': self._entries}
+            temp_path = self.cache_file + '.tmp'
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.cache_file)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"Không lưu được cache kích thước thư mục: {str(e)}")
+
+    def _scan(self, path, mtime):
+        """Quét các mục nằm trực tiếp trong một thư mục"""
+        files_size = 0
+        dirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        files_size += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+
+        now = time.time()
+        # Thư mục vừa bị sửa: chưa lưu mtime để lần sau quét lại
+        settled = now - mtime / 1e9 > MTIME_SETTLE_SECONDS
+        old = self._entries.get(path)
+        if old:
+            for name in set(old['dirs']) - set(dirs):
+                self._forget_tree(os.path.join(path, name))
+
+        entry = {'mtime': mtime if settled else None, 'checked': now, 'files': files_size, 'dirs': dirs}
+        self._entries[path] = entry
+        self._dirty = True
+        self.scanned_dirs += 1
+        return entry
+
+    def _forget_tree(self, path):
+        """Bỏ cache của một thư mục và mọi thư mục con"""
+        prefix = path + os.sep
+        for key in [key for key in self._entries if key == path or key.startswith(prefix)]:
+            del self._entries[key]
+        self._dirty = True
+
+    def _dir_total(self, path):
+        """Tổng kích thước một thư mục, chỉ quét lại các thư mục đã thay đổi"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._forget_tree(path)
+            return 0
+
+        entry = self._entries.get(path)
+        if (entry is None or entry['mtime'] != mtime
+                or time.time() - entry.get('checked', 0) > self.max_age):
+            try:
+                entry = self._scan(path, mtime)
+            except OSError as e:
+                logger.warning(f"Không đọc được thư mục {path}: {str(e)}")
+                return 0
+
+        total = entry['files']
+        for name in entry['dirs']:
+            total += self._dir_total(os.path.join(path, name))
+        return total
+
+    def get_size(self, path):
+        """
+        Tổng kích thước một thư mục (bytes)
+
+        Args:
+            path (str): Đường dẫn thư mục
+
+        Returns:
+            int: Kích thước, 0 nếu thư mục không tồn tại
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            total = self._dir_total(path)
+            self.save()
+            return total
+
+    def _apply(self, file_path, delta):
+        """Cập nhật kích thước thư mục chứa file sau khi chính ứng dụng ghi/xóa file"""
+        directory = os.path.dirname(os.path.abspath(file_path))
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self._entries.get(directory)
+            if entry is None or entry['mtime'] is None:
+                return
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._forget_tree(directory)
+                return
+            entry['files'] = max(0, entry['files'] + delta)
+            # mtime mới là do thay đổi vừa ghi nhận: tin vào delta, không cần quét lại
+            # (thay đổi từ bên ngoài trong cùng nhịp đồng hồ được bắt lại sau max_age)
+            entry['mtime'] = mtime
+            self._dirty = True
+
+    def record_added(self, file_path, size):
+        """
+        Ghi nhận ứng dụng vừa tạo file (hoặc ghi thêm size byte vào file) trong thư mục đã có cache
+
+        Args:
+            file_path (str): Đường dẫn file
+            size (int): Số byte tăng thêm
+        """
+        self._apply(file_path, size)
+
+    def record_removed(self, file_path, size):
+        """
+        Ghi nhận ứng dụng vừa xóa một file
+
+        Args:
+            file_path (str): Đường dẫn file đã xóa
+            size (int): Kích thước file đã xóa
+        """
+        self._apply(file_path, -size)
+
+    def invalidate(self, path=None):
+        """Bỏ cache của một thư mục (và thư mục con), hoặc toàn bộ nếu path=None"""
+        with self._lock:
+            if path is None:
+                self._entries = {}
+                self._dirty = True
+            else:
+                self._forget_tree(os.path.abspath(path))
+
+_accountant = None
+_accountant_lock = threading.Lock()
+
+def get_accountant():
+    """
+    Đối tượng tính kích thước thư mục dùng chung, cache lưu ở data/dir_sizes.json
+
+    Returns:
+        DirectorySizeAccountant: Đối tượng dùng chung
+    """
+    global _accountant
+    with _accountant_lock:
+        if _accountant is None:
+            _accountant = DirectorySizeAccountant(default_cache_file())
+        return _accountant
@@ -8,7 +8,6 @@ import logging
 import subprocess
 import shutil
 from pathlib import Path
-import requests
 import tempfile
 import zipfile
 import site
@@ -60,6 +59,8 @@ def install_openssl_windows():
     openssl_url = "https://slproweb.com/download/Win64OpenSSL_Light-3_1_3.exe"
     
     try:
+        import requests
+
         # Tạo thư mục tạm
         with tempfile.TemporaryDirectory() as temp_dir:
             # Tải về installer
@@ -0,0 +1,255 @@
+"""
+Module lưu "dấu vân tay" môi trường khởi động.
+Sau một lần khởi động đầy đủ không lỗi, thông tin môi trường (trình thông dịch,
+phiên bản các thư viện, FFmpeg, bộ chứng chỉ certifi) được lưu lại. Ở lần chạy
+sau, nếu môi trường không đổi, ứng dụng có thể bỏ qua các bước kiểm tra của
+splash screen và kiểm tra lại trong nền.
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import subprocess
+
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:  # Python < 3.8
+    importlib_metadata = None
+
+logger = logging.getLogger("StartupFingerprint")
+
+# Phiên bản định dạng file, tăng khi đổi cấu trúc để bỏ dấu vân tay cũ
+FINGERPRINT_VERSION = 1
+
+# Các thư viện ảnh hưởng đến các bước kiểm tra khi khởi động
+FINGERPRINT_PACKAGES = [
+    "PyQt6", "PyQt5", "requests", "psutil", "certifi",
+    "telethon", "pyTelegramBotAPI", "cryptg", "pyOpenSSL"
+]
+
+# File mặc định: <thư mục gốc>/data/startup_fingerprint.json
+DEFAULT_FINGERPRINT_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'data', 'startup_fingerprint.json'
+)
+
+def package_versions(packages=FINGERPRINT_PACKAGES):
+    """
+    Phiên bản đã cài của các thư viện
+
+    Returns:
+        dict: {tên: phiên bản hoặc None nếu chưa cài}
+    """
+    versions = {}
+    for name in packages:
+        try:
+            versions[name] = importlib_metadata.version(name) if importlib_metadata else None
+        except Exception:
+            versions[name] = None
+    return versions
+
+def certifi_bundle_hash():
+    """
+    SHA-256 của bộ chứng chỉ certifi (None nếu không có certifi)
+    """
+    try:
+        import certifi
+        with open(certifi.where(), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except Exception:
+        return None
+
+def ffmpeg_version(ffmpeg_path):
+    """
+    Dòng phiên bản của ffmpeg (chạy "ffmpeg -version")
+
+    Returns:
+        str: Ví dụ "ffmpeg version 6.1 ...", None nếu không chạy được
+    """
+    if not ffmpeg_path:
+        return None
+    try:
+        proc = subprocess.run([ffmpeg_path, "-version"], stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, check=False, timeout=10)
+        if proc.returncode != 0:
+            return None
+        lines = proc.stdout.decode('utf-8', errors='replace').splitlines()
+        return lines[0].strip() if lines else None
+    except Exception:
+        return None
+
+def ffmpeg_info(ffmpeg_path, known=None):
+    """
+    Thông tin nhận dạng file ffmpeg
+
+    Phiên bản chỉ được đọc lại (chạy ffmpeg) khi file đổi kích thước hoặc thời
+    điểm sửa so với thông tin đã biết.
+
+    Args:
+        ffmpeg_path (str): Đường dẫn ffmpeg (None nếu không có)
+        known (dict, optional): Thông tin đã lưu lần trước
+
+    Returns:
+        dict: {'path', 'size', 'mtime', 'version'}
+    """
+    if ffmpeg_path:
+        # "ffmpeg" (trong PATH) được đổi thành đường dẫn đầy đủ
+        ffmpeg_path = shutil.which(ffmpeg_path) or ffmpeg_path
+
+    info = {'path': ffmpeg_path, 'size': None, 'mtime': None, 'version': None}
+    if not ffmpeg_path:
+        return info
+
+    try:
+        stat = os.stat(ffmpeg_path)
+        info['size'] = stat.st_size
+        info['mtime'] = stat.st_mtime_ns
+    except OSError:
+        return info
+
+    if known and all(known.get(key) == info[key] for key in ('path', 'size', 'mtime')):
+        info['version'] = known.get('version')
+    else:
+        info['version'] = ffmpeg_version(ffmpeg_path)
+    return info
+
+class StartupFingerprint:
+    """
+    Dấu vân tay môi trường khởi động, lưu trong một file JSON
+    """
+
+    def __init__(self, fingerprint_file=None):
+        """
+        Khởi tạo
+
+        Args:
+            fingerprint_file (str, optional): Đường dẫn file lưu dấu vân tay
+        """
+        self.fingerprint_file = fingerprint_file or DEFAULT_FINGERPRINT_FILE
+
+    def compute(self, ffmpeg_path=None, known=None):
+        """
+        Tính dấu vân tay của môi trường hiện tại
+
+        Args:
+            ffmpeg_path (str, optional): Đường dẫn ffmpeg đang dùng
+            known (dict, optional): Dấu vân tay đã lưu, để không phải chạy lại ffmpeg
+                khi file ffmpeg không đổi
+
+        Returns:
+            dict: Dấu vân tay
+        """
+        return {
+            'version': FINGERPRINT_VERSION,
+            'python': {
+                'executable': sys.executable,
+                'version': sys.version
+            },
+            'packages': package_versions(),
+            'ffmpeg': ffmpeg_info(ffmpeg_path, (known or {}).get('ffmpeg')),
+            'certifi': certifi_bundle_hash()
+        }
+
+    def load(self):
+        """
+        Đọc dấu vân tay đã lưu
+
+        Returns:
+            dict: Dấu vân tay, None nếu chưa có hoặc file hỏng
+        """
+        try:
+            with open(self.fingerprint_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(stored, dict) or stored.get('version') != FINGERPRINT_VERSION:
+            return None
+        return stored
+
+    def save(self, fingerprint):
+        """
+        Lưu dấu vân tay (ghi ra file tạm rồi thay thế để không để lại file dở dang)
+
+        Args:
+            fingerprint (dict): Kết quả compute()
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.fingerprint_file)), exist_ok=True)
+        temp_path = self.fingerprint_file + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(fingerprint, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.fingerprint_file)
+        except Exception as e:
+            logger.error(f"Lỗi khi lưu dấu vân tay khởi động: {str(e)}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def record(self, ffmpeg_path=None):
+        """
+        Tính và lưu dấu vân tay của môi trường hiện tại (sau một lần khởi động đầy đủ không lỗi).
+        Chạy ffmpeg để đọc phiên bản, nên được gọi trên luồng phụ.
+
+        Args:
+            ffmpeg_path (str, optional): Đường dẫn ffmpeg đang dùng
+
+        Returns:
+            dict: Dấu vân tay đã lưu
+        """
+        fingerprint = self.compute(ffmpeg_path)
+        self.save(fingerprint)
+        logger.info("Đã lưu dấu vân tay môi trường khởi động")
+        return fingerprint
+
+    def invalidate(self):
+        """Xóa dấu vân tay đã lưu: lần khởi động sau sẽ chạy đầy đủ các bước kiểm tra"""
+        try:
+            os.remove(self.fingerprint_file)
+            logger.info("Đã xóa dấu vân tay khởi động")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Lỗi khi xóa dấu vân tay khởi động: {str(e)}")
+
+    def matches(self):
+        """
+        Môi trường hiện tại có giống lần khởi động đầy đủ gần nhất không.
+        Dùng đường dẫn ffmpeg đã lưu; phiên bản ffmpeg chỉ được đọc lại khi file đổi.
+
+        Returns:
+            bool: True nếu có thể bỏ qua các bước kiểm tra khi khởi động
+        """
+        stored = self.load()
+        if stored is None or not (stored.get('ffmpeg') or {}).get('version'):
+            return False
+
+        ffmpeg_path = (stored.get('ffmpeg') or {}).get('path')
+        current = self.compute(ffmpeg_path, known=stored)
+        if current != stored:
+            changed = [key for key in current if current.get(key) != stored.get(key)]
+            logger.info(f"Môi trường khởi động đã thay đổi: {', '.join(changed)}")
+            return False
+        return True
+
+    def revalidate(self, ffmpeg_path=None):
+        """
+        Kiểm tra lại môi trường (không dùng thông tin đã lưu, chạy lại ffmpeg).
+        Nếu khác với dấu vân tay đã lưu, dấu vân tay bị xóa để lần sau chạy đầy đủ.
+
+        Args:
+            ffmpeg_path (str, optional): Đường dẫn ffmpeg đang dùng
+
+        Returns:
+            bool: True nếu môi trường vẫn khớp
+        """
+        stored = self.load()
+        current = self.compute(ffmpeg_path)
+        if stored is None or current != stored or not current['ffmpeg'].get('version'):
+            logger.warning("Kiểm tra lại môi trường khởi động không khớp, lần sau sẽ chạy đầy đủ các bước kiểm tra")
+            self.invalidate()
+            return False
+        return True
@@ -0,0 +1,186 @@
+"""
+Module chạy các bước khởi động theo đồ thị phụ thuộc.
+Mỗi bước bắt đầu ngay khi các bước nó phụ thuộc đã xong, nên các bước độc lập
+(kiểm tra mạng, kiểm tra hệ thống, không gian đĩa...) chạy đồng thời; phần việc
+chặn được đẩy sang luồng phụ, còn kết quả luôn được trả về luồng sở hữu
+(luồng giao diện) để cập nhật giao diện an toàn.
+"""
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("StartupPipeline")
+
+# Số luồng phụ tối đa cho các phần việc chặn
+DEFAULT_MAX_WORKERS = 4
+
+class StartupPipeline:
+    """
+    Đồ thị các bước khởi động.
+
+    Một bước gồm hàm start() được gọi trên luồng sở hữu khi mọi bước phụ thuộc
+    đã xong; bước kết thúc khi finish(key) được gọi (ngay trong start() hoặc sau
+    đó, ví dụ khi phần việc gửi qua submit() trả kết quả).
+    """
+
+    def __init__(self, post, max_workers=DEFAULT_MAX_WORKERS, on_finished=None):
+        """
+        Khởi tạo pipeline
+
+        Args:
+            post (callable): post(func) - chạy func trên luồng sở hữu, gọi được từ mọi luồng
+            max_workers (int): Số luồng phụ tối đa
+            on_finished (callable, optional): Hàm được gọi (trên luồng sở hữu) khi mọi bước đã xong
+        """
+        self._post = post
+        self._max_workers = max_workers
+        self._executor = None
+        self.on_finished = on_finished
+
+        self._steps = {}  # {key: (start, deps)}, theo thứ tự thêm vào
+        self._started = {}  # {key: thời điểm bắt đầu}
+        self._finished = {}  # {key: (thời điểm kết thúc, trạng thái)}
+        self._origin = None
+        self._completed = False
+
+    def add_step(self, key, start, deps=()):
+        """
+        Thêm một bước
+
+        Args:
+            key: Khóa của bước
+            start (callable): Hàm bắt đầu bước, gọi trên luồng sở hữu
+            deps (iterable): Khóa các bước phải xong trước
+        """
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._steps:
+                raise ValueError(f"Bước {key!r} phụ thuộc bước chưa khai báo: {dep!r}")
+        self._steps[key] = (start, deps)
+
+    def run(self):
+        """Bắt đầu pipeline (gọi trên luồng sở hữu)"""
+        self._origin = time.perf_counter()
+        self._schedule()
+
+    def submit(self, func, callback):
+        """
+        Chạy một phần việc chặn trên luồng phụ
+
+        Args:
+            func (callable): Hàm không tham số, không được đụng đến giao diện
+            callback (callable): callback(result, error) - gọi trên luồng sở hữu,
+                error là ngoại lệ nếu func lỗi (khi đó result là None)
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                thread_name_prefix="startup")
+
+        def task():
+            try:
+                result, error = func(), None
+            except Exception as e:
+                logger.error(f"Lỗi trong phần việc khởi động: {str(e)}")
+                result, error = None, e
+            self._post(lambda: callback(result, error))
+
+        self._executor.submit(task)
+
+    def finish(self, key, status="success"):
+        """
+        Đánh dấu một bước đã xong và bắt đầu các bước đã đủ điều kiện
+
+        Args:
+            key: Khóa của bước
+            status (str): Trạng thái kết thúc ('success', 'error', 'skipped')
+        """
+        if key in self._finished or key not in self._started:
+            return
+
+        self._finished[key] = (time.perf_counter(), status)
+        self._schedule()
+
+    def is_finished(self, key):
+        """Bước đã xong hay chưa"""
+        return key in self._finished
+
+    @property
+    def done(self):
+        """Mọi bước đã xong"""
+        return len(self._finished) == len(self._steps)
+
+    def _schedule(self):
+        """Bắt đầu các bước chưa chạy mà mọi bước phụ thuộc đã xong"""
+        # start() có thể gọi finish() ngay, nên lặp đến khi không còn bước mới
+        progressed = True
+        while progressed and not self._completed:
+            progressed = False
+            for key, (start, deps) in self._steps.items():
+                if key in self._started or not all(dep in self._finished for dep in deps):
+                    continue
+
+                self._started[key] = time.perf_counter()
+                progressed = True
+                try:
+                    start()
+                except Exception as e:
+                    logger.error(f"Lỗi khi bắt đầu bước {key!r}: {str(e)}")
+                    self.finish(key, "error")
+
+            if self.done and not self._completed:
+                self._completed = True
+                self.shutdown()
+                if self.on_finished:
+                    self.on_finished()
+
+    def shutdown(self):
+        """Giải phóng các luồng phụ (không chờ phần việc đang chạy)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def timings(self):
+        """
+        Thời gian của từng bước (giây, tính từ lúc run())
+
+        Returns:
+            dict: {key: {'start', 'end', 'duration', 'status'}}; end/duration là None nếu chưa xong
+        """
+        result = {}
+        for key in self._steps:
+            if key not in self._started:
+                continue
+            start = self._started[key] - self._origin
+            end, status = self._finished.get(key, (None, "running"))
+            if end is not None:
+                end -= self._origin
+            result[key] = {
+                'start': start,
+                'end': end,
+                'duration': end - start if end is not None else None,
+                'status': status
+            }
+        return result
+
+    def timing_report(self, names=None):
+        """
+        Báo cáo thời gian từng bước, dạng văn bản
+
+        Args:
+            names (dict, optional): {key: tên hiển thị}
+
+        Returns:
+            str: Mỗi dòng một bước: thời điểm bắt đầu, thời lượng, trạng thái
+        """
+        timings = self.timings()
+        lines = []
+        total = 0.0
+        for key, info in timings.items():
+            name = (names or {}).get(key, str(key))
+            if info['end'] is None:
+                lines.append(f"  {name:<32} bắt đầu {info['start'] * 1000:8.1f} ms   (đang chạy)")
+                continue
+            total = max(total, info['end'])
+            lines.append(f"  {name:<32} bắt đầu {info['start'] * 1000:8.1f} ms   "
+                         f"thời lượng {info['duration'] * 1000:8.1f} ms   {info['status']}")
+        return "Thời gian khởi động: {:.1f} ms\n{}".format(total * 1000, "\n".join(lines))
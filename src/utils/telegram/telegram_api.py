@@ -1,7 +1,6 @@
 """
 Module quản lý kết nối với Telegram Bot API
 """
-import requests
 import logging
 import json
 import os
@@ -170,6 +169,7 @@ class TelegramAPI:
         url = self.API_URL.format(token=self.bot_token, method=method)
         
         try:
+            import requests
             response = requests.post(url, json=params if params else {}, timeout=30)
             return response.json()
         except Exception as e:
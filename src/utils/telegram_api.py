@@ -7,12 +7,16 @@ import logging
 import tempfile
 import time
 from datetime import datetime
-import telebot
-from telebot import apihelper
-from telebot.types import InputFile
 from .video_splitter import VideoSplitter
+from .disk_reservation import get_reserver
+from .file_range import FileRange
+from .lazy_import import lazy_import
 import configparser
 
+# telebot is only loaded when the bot is first connected
+telebot = lazy_import("telebot")
+apihelper = lazy_import("telebot.apihelper")
+
 logger = logging.getLogger("TelegramAPI")
 
 class TelegramAPI:
@@ -339,7 +343,7 @@ class TelegramAPI:
 
         Args:
             chat_id (str/int): ID của cuộc trò chuyện/kênh
-            video_path (str): Đường dẫn đến file video
+            video_path (str/FileRange): Đường dẫn đến file video, hoặc một đoạn byte của file gốc
             caption (str): Chú thích cho video
             width (int): Chiều rộng video
             height (int): Chiều cao video
@@ -354,16 +358,23 @@ class TelegramAPI:
             logger.error("Chưa kết nối với Telegram API")
             return False
 
-        if not os.path.exists(video_path) or not os.path.isfile(video_path):
+        if isinstance(video_path, FileRange):
+            # Đọc thẳng từ file gốc, không có file tạm
+            video_name = video_path.name
+            open_video = video_path.open
+        elif not os.path.exists(video_path) or not os.path.isfile(video_path):
             logger.error(f"File video không tồn tại: {video_path}")
             return False
+        else:
+            video_name = os.path.basename(video_path)
+            open_video = lambda: open(video_path, 'rb')
 
         # Retry mechanism
         attempt = 0
         while attempt < retry_count:
             try:
                 # Open file in binary mode
-                with open(video_path, 'rb') as video_file:
+                with open_video() as video_file:
                     # Send video
                     message = self.bot.send_video(
                         chat_id=chat_id,
@@ -378,15 +389,15 @@ class TelegramAPI:
 
                     # Check if video was sent successfully
                     if message and message.video:
-                        logger.info(f"✅ Đã gửi video thành công: {os.path.basename(video_path)}")
+                        logger.info(f"✅ Đã gửi video thành công: {video_name}")
                         return True
                     else:
-                        logger.warning(f"⚠️ Video đã được gửi nhưng không nhận được xác nhận: {os.path.basename(video_path)}")
+                        logger.warning(f"⚠️ Video đã được gửi nhưng không nhận được xác nhận: {video_name}")
                         return True  # Consider it successful if no error was thrown
 
             except apihelper.ApiTelegramException as e:
                 if e.error_code == 413:  # Request Entity Too Large
-                    logger.error(f"❌ Video quá lớn cho Telegram Bot API: {os.path.basename(video_path)}")
+                    logger.error(f"❌ Video quá lớn cho Telegram Bot API: {video_name}")
                     return False  # No retry for this error
 
                 logger.warning(f"⚠️ Lỗi API Telegram (lần {attempt+1}/{retry_count}): {str(e)}")
@@ -401,7 +412,7 @@ class TelegramAPI:
                 logger.info(f"Thử lại sau {retry_delay} giây...")
                 time.sleep(retry_delay)
 
-        logger.error(f"❌ Không thể gửi video sau {retry_count} lần thử: {os.path.basename(video_path)}")
+        logger.error(f"❌ Không thể gửi video sau {retry_count} lần thử: {video_name}")
         return False
 
     def _send_video_split(self, chat_id, video_path, caption=None, disable_notification=False, progress_callback=None):
@@ -439,8 +450,11 @@ class TelegramAPI:
             # Split the video into parts
             logger.info(f"Video {video_name} ({video_size_mb:.2f} MB) sẽ được gửi thành nhiều phần")
 
-            # QUAN TRỌNG: Chỉ truyền một tham số tới split_video
-            video_parts = splitter.split_video(video_path)
+            # MPEG-TS: gửi từng đoạn byte của file gốc, không ghi các phần ra đĩa
+            video_parts = splitter.split_byte_ranges(video_path)
+            if not video_parts:
+                # QUAN TRỌNG: Chỉ truyền một tham số tới split_video
+                video_parts = splitter.split_video(video_path)
             if not video_parts:
                 logger.error(f"Không thể chia nhỏ video: {video_name}")
                 return False
@@ -452,7 +466,8 @@ class TelegramAPI:
 
             for part_path in video_parts:
                 part_index += 1
-                part_name = os.path.basename(part_path)
+                is_temp_file = not isinstance(part_path, FileRange) and part_path != video_path
+                part_name = part_path.name if isinstance(part_path, FileRange) else os.path.basename(part_path)
 
                 # Generate part caption
                 if caption:
@@ -489,6 +504,9 @@ class TelegramAPI:
 
                         if success:
                             successful_parts += 1
+                            # Xóa ngay phần đã gửi để trả dung lượng cho các tác vụ đang chờ
+                            if is_temp_file:
+                                get_reserver().release_file(part_path)
                             # Update progress to end of this part
                             if progress_callback:
                                 progress_callback(int(progress_end))
@@ -506,11 +524,12 @@ class TelegramAPI:
                             logger.warning(f"⚠️ Thử lại sau 10 giây...")
                             time.sleep(10)  # Wait before retrying
 
-            # Clean up temporary files
+            # Clean up temporary files (các phần gửi lỗi cũng trả lại dung lượng đã ghi)
             try:
                 for part_path in video_parts:
-                    if os.path.exists(part_path):
-                        os.remove(part_path)
+                    if isinstance(part_path, FileRange) or part_path == video_path:
+                        continue
+                    get_reserver().release_file(part_path)
             except Exception as e:
                 logger.warning(f"⚠️ Không thể xóa file tạm thời: {str(e)}")
 
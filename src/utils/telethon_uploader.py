@@ -5,13 +5,18 @@ Module for uploading videos using Telethon API
 import os
 import logging
 import asyncio
-from telethon import TelegramClient
-from telethon.tl.types import DocumentAttributeVideo, PeerChannel, PeerChat, PeerUser
 import time
 import inspect
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 
+from .lazy_import import lazy_import
+from .video_metadata import get_metadata_service
+
+# Telethon chỉ được nạp khi kết nối lần đầu
+telethon = lazy_import("telethon")
+telethon_types = lazy_import("telethon.tl.types")
+
 logger = logging.getLogger("TelethonUploader")
 
 class ChatIDEditDialog(simpledialog.Dialog):
@@ -120,7 +125,7 @@ class TelethonUploader:
                 self.client = None
             
             # Tạo client mới
-            self.client = TelegramClient(self.session_name, api_id, api_hash, loop=self.loop)
+            self.client = telethon.TelegramClient(self.session_name, api_id, api_hash, loop=self.loop)
             
             # Kết nối trước
             if hasattr(self.client, 'connect'):
@@ -260,7 +265,7 @@ class TelethonUploader:
 
     def get_video_info(self, video_path):
         """
-        Lấy thông tin video bằng ffmpeg
+        Lấy thông tin video bằng ffprobe (qua dịch vụ metadata dùng chung, có cache)
         
         Args:
             video_path (str): Đường dẫn đến file video
@@ -269,51 +274,17 @@ class TelethonUploader:
             dict: Thông tin video bao gồm duration, width, height hoặc None nếu có lỗi
         """
         try:
-            import subprocess
-            import json
-            
-            # Sử dụng ffprobe để lấy thông tin video
-            cmd = [
-                "ffprobe",
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                "-show_streams",
-                video_path
-            ]
-            
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            
-            if result.returncode != 0:
-                logger.error(f"Lỗi khi chạy ffprobe: {result.stderr}")
-                return None
-                
-            # Parse json output
-            info = json.loads(result.stdout)
-            
-            # Tìm video stream
-            video_stream = None
-            for stream in info.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    video_stream = stream
-                    break
-            
-            if not video_stream:
+            info = get_metadata_service().probe(video_path)
+            if not info:
                 logger.error("Không tìm thấy video stream trong file")
                 return None
-                
+            
             # Lấy thông tin cần thiết
-            width = int(video_stream.get('width', 1280))
-            height = int(video_stream.get('height', 720))
-            
-            # Lấy duration (thời lượng)
-            duration = float(video_stream.get('duration', 0))
-            if duration == 0:
-                # Thử lấy từ format nếu không có trong stream
-                duration = float(info.get('format', {}).get('duration', 10))
-                
+            width = info['width'] or 1280
+            height = info['height'] or 720
+            
             # Chuyển về số nguyên (yêu cầu của Telethon)
-            duration = int(duration)
+            duration = int(info['duration'] or 10)
             
             logger.info(f"Thông tin video: Thời lượng={duration}s, Kích thước={width}x{height}")
             
@@ -365,7 +336,7 @@ class TelethonUploader:
                         if isinstance(chat_id, str) and chat_id.startswith('-100'):
                             try:
                                 channel_id = int(chat_id[4:])
-                                entity = await self.client.get_entity(PeerChannel(channel_id))
+                                entity = await self.client.get_entity(telethon_types.PeerChannel(channel_id))
                             except:
                                 # Nếu vẫn không được, thử dùng trực tiếp
                                 entity = processed_chat_id
@@ -460,7 +431,7 @@ class TelethonUploader:
                             return False
                         
                         logger.info(f"TELETHON_UPLOADER: [ĐIỂM KIỂM TRA 7] Tạo client mới với api_id={self.api_id}, phone={self.phone}")
-                        self.client = TelegramClient(self.session_name, self.api_id, self.api_hash, loop=self.loop)
+                        self.client = telethon.TelegramClient(self.session_name, self.api_id, self.api_hash, loop=self.loop)
                     
                     # Kết nối client
                     logger.info(f"TELETHON_UPLOADER: [ĐIỂM KIỂM TRA 8] Thử kết nối client")
@@ -573,7 +544,7 @@ class TelethonUploader:
                         
                         # Phương pháp 2: Nếu chat_id bắt đầu bằng -100, thử tạo PeerChannel
                         (f"Cách 2: Thử với PeerChannel (bỏ -100)",
-                        lambda: self.client.get_entity(PeerChannel(int(str(chat_id)[4:]))) 
+                        lambda: self.client.get_entity(telethon_types.PeerChannel(int(str(chat_id)[4:]))) 
                         if str(chat_id).startswith('-100') else None),
                         
                         # Phương pháp 3: Thử với int
@@ -657,7 +628,7 @@ class TelethonUploader:
                                 progress_callback=progress,
                                 supports_streaming=True,
                                 silent=disable_notification,
-                                attributes=[DocumentAttributeVideo(
+                                attributes=[telethon_types.DocumentAttributeVideo(
                                     duration=duration,  # Thời lượng video tính bằng giây
                                     w=width,            # Chiều rộng video
                                     h=height,           # Chiều cao video
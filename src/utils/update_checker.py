@@ -6,7 +6,6 @@ import sys
 import json
 import time
 import logging
-import requests
 import threading
 import traceback
 import configparser
@@ -190,6 +189,9 @@ class UpdateChecker:
         Returns:
             dict: Kết quả kiểm tra cập nhật
         """
+        # Import khi dùng (thường trong thread nền) để không làm chậm lúc khởi động
+        import requests
+
         # Đọc thông tin cập nhật hiện tại
         update_info = self._load_update_info()
         
@@ -4,32 +4,114 @@ Cung cấp chức năng ghi nhớ video đã tải lên giữa các phiên làm
 """
 import os
 import json
+import time
 import logging
-from datetime import datetime
-import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from .upload_history_db import SQLiteHistoryStore
+from .history_archive import HistoryArchive, SEARCH_FIELDS
+from .video_list_index import trigrams, NGRAM_SIZE
 
 logger = logging.getLogger("UploadHistory")
 
+# Các kiểu lưu trữ lịch sử
+BACKEND_JSON = 'json'
+BACKEND_SQLITE = 'sqlite'
+
+# Chế độ ghi trễ: thời gian tối đa (giây) một thay đổi nằm trong bộ nhớ trước khi được ghi
+WRITE_BEHIND_INTERVAL = 2.0
+# Chế độ ghi trễ: số thay đổi tích lũy tối đa trước khi ghi ngay
+WRITE_BEHIND_MAX_PENDING = 200
+
 class UploadHistory:
     """
     Quản lý lịch sử tải lên video, lưu và tải thông tin video đã tải lên.
-    Sử dụng JSON để lưu trữ dữ liệu giữa các phiên làm việc.
+    Dữ liệu được lưu trong file JSON hoặc SQLite (file có đuôi .db). Với SQLite,
+    mỗi thay đổi chỉ ghi đúng dòng liên quan thay vì ghi lại toàn bộ lịch sử.
     """
     
-    def __init__(self, history_file='upload_history.json'):
+    def __init__(self, history_file='upload_history.json', backend=None, migrate_from=None,
+                 write_behind=False, flush_interval=WRITE_BEHIND_INTERVAL,
+                 max_pending=WRITE_BEHIND_MAX_PENDING, retention_days=None, archive_dir=None):
         """
         Khởi tạo quản lý lịch sử tải lên
         
         Args:
             history_file (str): Đường dẫn đến file lưu trữ lịch sử
+            backend (str, optional): BACKEND_JSON hoặc BACKEND_SQLITE, mặc định
+                                     chọn theo đuôi file (.db -> SQLite)
+            migrate_from (str, optional): File JSON cũ cần chuyển sang SQLite ở lần
+                                          chạy đầu tiên (mặc định cùng tên, đuôi .json)
+            write_behind (bool): Gom các thay đổi và ghi trong thread nền thay vì ghi
+                                 ngay trên thread gọi (cần gọi close() khi thoát)
+            flush_interval (float): Thời gian tối đa giữ thay đổi trước khi ghi (giây)
+            max_pending (int): Số thay đổi tích lũy tối đa trước khi ghi ngay
+            retention_days (int, optional): Chuyển các mục cũ hơn số ngày này vào kho lưu
+                                            trữ nén khi khởi động (None/0: giữ tất cả)
+            archive_dir (str, optional): Thư mục kho lưu trữ (mặc định <tên file>_archive)
         """
         self.history_file = history_file
         self.uploads = {}  # {hash: {filename, path, upload_date, file_size}}
         self.duplicates = {}  # {hash: [list of duplicate hashes]}
+        
+        # Chỉ mục phụ trong bộ nhớ, cập nhật cùng uploads/duplicates
+        self._duplicated_by = {}  # {hash: set(hash có hash này trong danh sách trùng lặp)}
+        self._path_index = {}  # {path: set(hash)}
+        self._filename_index = {}  # {filename: set(hash)}
+        self._gram_index = {}  # {trigram: set(hash)}
+        
+        # Khóa bảo vệ dữ liệu trong bộ nhớ khi thread ghi nền đọc ảnh chụp
+        self._lock = threading.RLock()
+        self._flush_cond = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._pending = 0  # Số thay đổi chưa được ghi
+        self._pending_ops = []  # Các thao tác SQLite chưa được ghi
+        self._closing = False
+        
+        if backend is None:
+            backend = BACKEND_SQLITE if os.path.splitext(history_file)[1].lower() == '.db' else BACKEND_JSON
+        self.backend = backend
+        
+        self.store = None
+        if backend == BACKEND_SQLITE:
+            self.store = SQLiteHistoryStore(history_file)
+            if migrate_from is None:
+                migrate_from = os.path.splitext(history_file)[0] + '.json'
+            self.store.migrate_from_json(migrate_from)
+        
         self.load_history()
+        
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        
+        # Kho lưu trữ các mục cũ: chỉ phần gần đây nằm trong bộ nhớ
+        self.retention_days = retention_days
+        self.archive = None
+        if retention_days:
+            if archive_dir is None:
+                archive_dir = os.path.splitext(history_file)[0] + '_archive'
+            self.archive = HistoryArchive(archive_dir)
+            self.compact()
+        
+        self._flush_thread = None
+        if write_behind:
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
     
     def load_history(self):
         """Tải lịch sử tải lên từ file"""
+        if self.store is not None:
+            try:
+                self.uploads, self.duplicates = self.store.load_all()
+                self._rebuild_indexes()
+                logger.info(f"Đã tải lịch sử: {len(self.uploads)} video đã tải lên")
+            except Exception as e:
+                logger.error(f"Lỗi khi tải lịch sử: {str(e)}")
+            return
+        
         if not os.path.exists(self.history_file):
             logger.info(f"Không tìm thấy file lịch sử, tạo mới: {self.history_file}")
             return
@@ -39,36 +121,193 @@ class UploadHistory:
                 data = json.load(f)
                 self.uploads = data.get('uploads', {})
                 self.duplicates = data.get('duplicates', {})
+            self._rebuild_indexes()
             
             logger.info(f"Đã tải lịch sử: {len(self.uploads)} video đã tải lên")
         except Exception as e:
             logger.error(f"Lỗi khi tải lịch sử: {str(e)}")
     
     def save_history(self):
-        """Lưu lịch sử tải lên vào file"""
+        """Lưu toàn bộ lịch sử tải lên vào file"""
         try:
-            # Tạo thư mục cha nếu không tồn tại
-            if self.history_file and os.path.dirname(self.history_file):
-                os.makedirs(os.path.dirname(os.path.abspath(self.history_file)), exist_ok=True)
-            
-            # Tạo backup trước khi ghi đè
-            if os.path.exists(self.history_file):
-                backup_file = f"{self.history_file}.bak"
-                shutil.copy2(self.history_file, backup_file)
-            
-            data = {
-                'uploads': self.uploads,
-                'duplicates': self.duplicates
-            }
+            if self.store is not None:
+                # Ghi lại toàn bộ trong một transaction
+                with self._lock:
+                    self.store.replace_all(self.uploads, self.duplicates)
+                    self._pending_ops = []
+                    self._pending = 0
+                return
             
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            with self._lock:
+                payload = self._serialize()
+                self._pending = 0
+            self._write_json(payload)
             
             logger.info(f"Đã lưu lịch sử: {len(self.uploads)} video vào {self.history_file}")
         except Exception as e:
             logger.error(f"Lỗi khi lưu lịch sử: {str(e)}")
             logger.error(f"Chi tiết lỗi: {os.path.abspath(self.history_file)}")
     
+    def _serialize(self):
+        """Chụp dữ liệu hiện tại thành chuỗi JSON (phải giữ self._lock)"""
+        data = {
+            'uploads': self.uploads,
+            'duplicates': self.duplicates
+        }
+        return json.dumps(data, indent=4, ensure_ascii=False)
+    
+    def _write_json(self, payload):
+        """
+        Ghi file JSON một cách nguyên tử: ghi ra file tạm cùng thư mục, fsync
+        rồi đổi tên đè lên file cũ. Nếu bị ngắt giữa chừng, file cũ vẫn nguyên vẹn.
+        
+        Args:
+            payload (str): Nội dung JSON
+        """
+        history_dir = os.path.dirname(os.path.abspath(self.history_file))
+        os.makedirs(history_dir, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.history_file)}.", suffix=".tmp", dir=history_dir
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.history_file)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _persist(self, operation):
+        """
+        Lưu một thay đổi: ghi ngay, hoặc đưa vào hàng chờ ở chế độ ghi trễ
+        
+        Args:
+            operation (tuple): (tên thao tác SQLiteHistoryStore, tham số)
+        """
+        self._persist_many([operation])
+    
+    def _persist_many(self, operations):
+        """
+        Lưu nhiều thay đổi cùng lúc (một transaction hoặc một lần ghi file)
+        
+        Args:
+            operations (list): Danh sách (tên thao tác SQLiteHistoryStore, tham số)
+        """
+        if self.write_behind:
+            with self._flush_cond:
+                if self.store is not None:
+                    self._pending_ops.extend(operations)
+                self._pending += len(operations)
+                self._flush_cond.notify()
+            return
+        
+        if self.store is not None:
+            try:
+                self.store.apply_batch(operations)
+            except Exception as e:
+                logger.error(f"Lỗi khi lưu lịch sử: {str(e)}")
+        else:
+            self.save_history()
+    
+    def compact(self, retention_days=None):
+        """
+        Chuyển các mục tải lên cũ hơn retention_days ngày vào kho lưu trữ nén.
+        Quan hệ trùng lặp được giữ nguyên; các mục đã lưu trữ vẫn được tìm thấy
+        qua is_uploaded, get_upload_info, lookup_many và search, và xóa được bằng
+        remove_upload.
+        
+        Args:
+            retention_days (int, optional): Số ngày giữ lại (mặc định self.retention_days)
+            
+        Returns:
+            int: Số video đã chuyển vào kho lưu trữ
+        """
+        days = retention_days or self.retention_days
+        if not days or self.archive is None:
+            return 0
+        
+        cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        
+        with self._lock:
+            old_uploads = {
+                video_hash: info for video_hash, info in self.uploads.items()
+                if info.get('upload_date') and info['upload_date'] < cutoff
+            }
+            if not old_uploads:
+                return 0
+            
+            # Ghi segment trước khi xóa khỏi lịch sử chính để không mất dữ liệu
+            try:
+                self.archive.add_segment(old_uploads)
+            except Exception as e:
+                logger.error(f"Lỗi khi lưu trữ lịch sử cũ: {str(e)}")
+                return 0
+            
+            for video_hash in old_uploads:
+                del self.uploads[video_hash]
+            
+            # Lưu trữ nhiều mục một lúc thì dựng lại chỉ mục nhanh hơn gỡ từng mục
+            if len(old_uploads) > len(self.uploads):
+                self._rebuild_indexes()
+            else:
+                for video_hash, info in old_uploads.items():
+                    self._unindex_upload(video_hash, info)
+        
+        self._persist_many([('archive_upload', (video_hash,)) for video_hash in old_uploads])
+        logger.info(f"Đã chuyển {len(old_uploads)} video cũ hơn {days} ngày vào kho lưu trữ")
+        return len(old_uploads)
+    
+    def flush(self):
+        """Ghi ngay các thay đổi đang chờ (chế độ ghi trễ)"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                count = self._pending
+                operations, self._pending_ops = self._pending_ops, []
+                self._pending = 0
+                payload = self._serialize() if self.store is None else None
+            
+            try:
+                if self.store is not None:
+                    self.store.apply_batch(operations)
+                else:
+                    self._write_json(payload)
+                logger.debug(f"Đã ghi {count} thay đổi lịch sử")
+            except Exception as e:
+                logger.error(f"Lỗi khi lưu lịch sử: {str(e)}")
+                # Giữ lại các thay đổi để lần ghi sau thử lại
+                with self._lock:
+                    self._pending_ops = operations + self._pending_ops
+                    self._pending += count
+    
+    def _flush_loop(self):
+        """Thread ghi nền: gom thay đổi theo thời gian hoặc số lượng rồi ghi một lần"""
+        while True:
+            with self._flush_cond:
+                while not self._pending and not self._closing:
+                    self._flush_cond.wait()
+                
+                # Chờ thêm thay đổi cho tới khi đủ số lượng hoặc hết thời gian
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closing and self._pending < self.max_pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._flush_cond.wait(remaining)
+                
+                closing = self._closing
+            
+            self.flush()
+            if closing:
+                return
+    
     def add_upload(self, video_hash, filename, file_path, file_size, upload_date=None):
         """
         Thêm video vào lịch sử tải lên
@@ -83,15 +322,21 @@ class UploadHistory:
         if upload_date is None:
             upload_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        self.uploads[video_hash] = {
+        info = {
             'filename': filename,
             'path': file_path,
             'upload_date': upload_date,
             'file_size': file_size
         }
+        with self._lock:
+            old_info = self.uploads.get(video_hash)
+            if old_info is not None:
+                self._unindex_upload(video_hash, old_info)
+            self.uploads[video_hash] = info
+            self._index_upload(video_hash, info)
         
         # Lưu lịch sử sau mỗi lần thêm
-        self.save_history()
+        self._persist(('put_upload', (video_hash, info)))
         
         logger.info(f"Đã thêm video vào lịch sử: {filename} (hash: {video_hash[:8]}...)")
     
@@ -103,14 +348,17 @@ class UploadHistory:
             video_hash (str): Hash video mới
             duplicate_hash (str): Hash video đã tồn tại mà nó trùng lặp với
         """
-        if video_hash not in self.duplicates:
-            self.duplicates[video_hash] = []
-        
-        if duplicate_hash not in self.duplicates[video_hash]:
-            self.duplicates[video_hash].append(duplicate_hash)
+        with self._lock:
+            if video_hash not in self.duplicates:
+                self.duplicates[video_hash] = []
             
-            logger.info(f"Đã đánh dấu hash {video_hash[:8]}... trùng lặp với {duplicate_hash[:8]}...")
-            self.save_history()
+            if duplicate_hash in self.duplicates[video_hash]:
+                return
+            self.duplicates[video_hash].append(duplicate_hash)
+            self._duplicated_by.setdefault(duplicate_hash, set()).add(video_hash)
+        
+        logger.info(f"Đã đánh dấu hash {video_hash[:8]}... trùng lặp với {duplicate_hash[:8]}...")
+        self._persist(('add_duplicate', (video_hash, duplicate_hash)))
     
     def is_uploaded(self, video_hash):
         """
@@ -122,7 +370,9 @@ class UploadHistory:
         Returns:
             bool: True nếu video đã tải lên trước đó
         """
-        return video_hash in self.uploads
+        if video_hash in self.uploads:
+            return True
+        return self.archive is not None and self.archive.contains(video_hash)
     
     def get_upload_info(self, video_hash):
         """
@@ -134,7 +384,40 @@ class UploadHistory:
         Returns:
             dict/None: Thông tin video nếu tồn tại, None nếu không
         """
-        return self.uploads.get(video_hash)
+        info = self.uploads.get(video_hash)
+        if info is None and self.archive is not None:
+            info = self.archive.get(video_hash)
+        return info
+    
+    def lookup_many(self, hashes):
+        """
+        Tra cứu nhiều video trong một lần gọi (ví dụ cả trang hoặc cả thư mục)
+        
+        Args:
+            hashes (iterable): Danh sách hash cần kiểm tra (bỏ qua giá trị rỗng)
+            
+        Returns:
+            dict: {hash: thông tin tải lên} chỉ gồm các video đã tải lên;
+                  hash không có trong kết quả nghĩa là chưa tải lên
+        """
+        result = {}
+        missing = []
+        for video_hash in hashes:
+            if not video_hash or video_hash in result:
+                continue
+            info = self.uploads.get(video_hash)
+            if info is not None:
+                result[video_hash] = info
+            else:
+                missing.append(video_hash)
+        
+        # self.uploads luôn chứa toàn bộ mục chưa lưu trữ (kể cả các thay đổi chưa
+        # ghi xuống cơ sở dữ liệu), nên chỉ còn phải tra kho lưu trữ, bộ lọc Bloom
+        # loại nhanh các hash không có
+        if missing and self.archive is not None:
+            result.update(self.archive.get_many(missing))
+        
+        return result
     
     def get_all_uploads(self):
         """
@@ -187,35 +470,212 @@ class UploadHistory:
         Returns:
             bool: True nếu xóa thành công
         """
-        if video_hash in self.uploads:
-            del self.uploads[video_hash]
+        with self._lock:
+            info = self.uploads.pop(video_hash, None)
+            if info is not None:
+                self._unindex_upload(video_hash, info)
+            # Video tải lên lại sau khi đã được lưu trữ có mặt ở cả hai nơi
+            archived = self.archive is not None and self.archive.remove(video_hash)
+            if info is None and not archived:
+                return False
             
-            # Dọn dẹp các tham chiếu trong duplicates
-            for hash_value, duplicates in list(self.duplicates.items()):
-                if video_hash in duplicates:
-                    self.duplicates[hash_value].remove(video_hash)
+            # Dọn dẹp các tham chiếu trong duplicates qua chỉ mục ngược
+            for hash_value in self._duplicated_by.pop(video_hash, ()):
+                duplicates = self.duplicates.get(hash_value)
+                if duplicates and video_hash in duplicates:
+                    duplicates.remove(video_hash)
                 
                 # Xóa các mục trống
-                if not self.duplicates[hash_value]:
+                if hash_value in self.duplicates and not self.duplicates[hash_value]:
                     del self.duplicates[hash_value]
             
             # Xóa mục này khỏi duplicates nếu có
-            if video_hash in self.duplicates:
-                del self.duplicates[video_hash]
-            
-            self.save_history()
-            logger.info(f"Đã xóa video khỏi lịch sử: hash {video_hash[:8]}...")
-            return True
+            for duplicate_hash in self.duplicates.pop(video_hash, ()):
+                referrers = self._duplicated_by.get(duplicate_hash)
+                if referrers is not None:
+                    referrers.discard(video_hash)
+                    if not referrers:
+                        del self._duplicated_by[duplicate_hash]
         
-        return False
+        self._persist(('delete_upload', (video_hash,)))
+        logger.info(f"Đã xóa video khỏi lịch sử: hash {video_hash[:8]}...")
+        return True
     
     def clear_history(self):
         """Xóa toàn bộ lịch sử tải lên"""
-        self.uploads = {}
-        self.duplicates = {}
-        self.save_history()
+        with self._lock:
+            self.uploads = {}
+            self.duplicates = {}
+            self._rebuild_indexes()
+            if self.archive is not None:
+                self.archive.clear()
+        self._persist(('clear', ()))
         logger.info("Đã xóa toàn bộ lịch sử tải lên")
     
+    def _rebuild_indexes(self):
+        """Dựng lại toàn bộ chỉ mục phụ từ uploads/duplicates (phải giữ self._lock)"""
+        self._duplicated_by = {}
+        self._path_index = {}
+        self._filename_index = {}
+        self._gram_index = {}
+        
+        for video_hash, duplicate_hashes in self.duplicates.items():
+            for duplicate_hash in duplicate_hashes:
+                self._duplicated_by.setdefault(duplicate_hash, set()).add(video_hash)
+        
+        for video_hash, info in self.uploads.items():
+            self._index_upload(video_hash, info)
+    
+    def _upload_grams(self, info):
+        """Tập trigram của một video (từ tên file, đường dẫn và ngày tải lên, viết thường)"""
+        grams = set()
+        for field in SEARCH_FIELDS:
+            grams |= trigrams(str(info.get(field, '') or '').lower())
+        return grams
+    
+    def _index_upload(self, video_hash, info):
+        """Thêm một video vào chỉ mục đường dẫn, tên file và trigram (phải giữ self._lock)"""
+        self._path_index.setdefault(info.get('path'), set()).add(video_hash)
+        self._filename_index.setdefault(info.get('filename'), set()).add(video_hash)
+        for gram in self._upload_grams(info):
+            self._gram_index.setdefault(gram, set()).add(video_hash)
+    
+    def _unindex_upload(self, video_hash, info):
+        """Gỡ một video khỏi chỉ mục đường dẫn, tên file và trigram (phải giữ self._lock)"""
+        for index, key in ((self._path_index, info.get('path')), (self._filename_index, info.get('filename'))):
+            hashes = index.get(key)
+            if hashes is not None:
+                hashes.discard(video_hash)
+                if not hashes:
+                    del index[key]
+        
+        for gram in self._upload_grams(info):
+            hashes = self._gram_index.get(gram)
+            if hashes is None:
+                continue
+            hashes.discard(video_hash)
+            if not hashes:
+                del self._gram_index[gram]
+    
+    def search(self, text):
+        """
+        Tìm video có tên file, đường dẫn hoặc ngày tải lên chứa chuỗi tìm kiếm
+        (không phân biệt hoa thường). Ứng viên lấy từ chỉ mục trigram rồi kiểm
+        tra lại bằng tìm chuỗi con, nên kết quả giống hệt duyệt toàn bộ lịch sử.
+        Các mục đã lưu trữ cũng được tìm, chỉ trong các segment có thể chứa chuỗi
+        tìm kiếm (chuỗi ngắn hơn 3 ký tự chỉ tìm trong lịch sử chính).
+        
+        Args:
+            text (str): Chuỗi tìm kiếm
+            
+        Returns:
+            dict: {hash: thông tin video} theo thứ tự ngày tải lên
+        """
+        term = str(text or '').lower()
+        
+        with self._lock:
+            if not term:
+                candidates = set()
+            elif len(term) < NGRAM_SIZE:
+                # Chuỗi quá ngắn để dùng trigram: kiểm tra mọi video
+                candidates = set(self.uploads)
+            else:
+                # Giao các tập ứng viên, bắt đầu từ trigram ít gặp nhất
+                candidate_sets = sorted((self._gram_index.get(gram, set()) for gram in trigrams(term)), key=len)
+                candidates = candidate_sets[0]
+                for hashes in candidate_sets[1:]:
+                    if not candidates:
+                        break
+                    candidates = candidates & hashes
+            
+            results = []
+            for video_hash in candidates:
+                info = self.uploads.get(video_hash)
+                if info is None:
+                    continue
+                # Kiểm tra lại bằng tìm chuỗi con trên các ứng viên (ít)
+                if any(term in str(info.get(field, '')).lower() for field in SEARCH_FIELDS):
+                    results.append((info.get('upload_date') or '', video_hash, info))
+        
+        if term and self.archive is not None:
+            for video_hash, info in self.archive.search(term).items():
+                if video_hash not in self.uploads:
+                    results.append((info.get('upload_date') or '', video_hash, info))
+        
+        results.sort()
+        return {video_hash: info for _, video_hash, info in results}
+    
+    def get_related_duplicates(self, video_hash):
+        """
+        Lấy hash các video liên quan trùng lặp: các video mà video này trùng với,
+        các video đánh dấu trùng với video này và các video cùng nhóm với chúng
+        
+        Args:
+            video_hash (str): Hash của video
+            
+        Returns:
+            list: Danh sách hash (không chứa chính video_hash)
+        """
+        with self._lock:
+            related = list(self.duplicates.get(video_hash, []))
+            seen = set(related)
+            seen.add(video_hash)
+            
+            for referrer in sorted(self._duplicated_by.get(video_hash, ())):
+                for h in [referrer] + self.duplicates.get(referrer, []):
+                    if h not in seen:
+                        seen.add(h)
+                        related.append(h)
+        
+        return related
+    
+    def find_by_path(self, file_path):
+        """
+        Tìm các video đã tải lên theo đường dẫn file
+        
+        Args:
+            file_path (str): Đường dẫn file video
+            
+        Returns:
+            dict: {hash: thông tin video}
+        """
+        return {h: self.uploads[h] for h in self._path_index.get(file_path, ()) if h in self.uploads}
+    
+    def find_by_filename(self, filename):
+        """
+        Tìm các video đã tải lên theo tên file
+        
+        Args:
+            filename (str): Tên file video
+            
+        Returns:
+            dict: {hash: thông tin video}, gồm cả các mục đã lưu trữ
+        """
+        # Trả lời từ bộ nhớ như find_by_path: thấy cả các thay đổi ghi trễ chưa ghi xuống
+        with self._lock:
+            result = {h: self.uploads[h] for h in self._filename_index.get(filename, ()) if h in self.uploads}
+        
+        if filename and self.archive is not None:
+            for video_hash, info in self.archive.search(filename.lower()).items():
+                if info.get('filename') == filename and video_hash not in result:
+                    result[video_hash] = info
+        return result
+    
+    def close(self):
+        """Ghi các thay đổi đang chờ, dừng thread ghi nền và đóng kho lưu trữ"""
+        if self._flush_thread is not None:
+            with self._flush_cond:
+                self._closing = True
+                self._flush_cond.notify()
+            self._flush_thread.join()
+            self._flush_thread = None
+        
+        self.flush()
+        self.write_behind = False
+        
+        if self.store is not None:
+            self.store.close()
+    
     def get_upload_by_hash(self, video_hash):
         """
         Tìm thông tin tải lên dựa trên hash của video
@@ -228,14 +688,8 @@ class UploadHistory:
         """
         if not video_hash:
             return None
-            
-        uploads = self.get_all_uploads()
-        
-        for upload_hash, upload_info in uploads.items():
-            if upload_hash == video_hash:
-                return upload_info
         
-        return None
+        return self.get_upload_info(video_hash)
 
 if __name__ == "__main__":
     # Mã kiểm thử
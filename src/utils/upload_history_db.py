@@ -0,0 +1,383 @@
+"""
+Module lưu trữ lịch sử tải lên trong SQLite.
+Mỗi thay đổi (thêm, xóa, đánh dấu trùng lặp) chỉ ghi đúng các dòng liên quan
+thay vì ghi lại toàn bộ file JSON, và các truy vấn theo hash, đường dẫn, tên file
+hoặc ngày tải lên đều dùng chỉ mục.
+"""
+import os
+import json
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger("UploadHistoryDB")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    hash TEXT PRIMARY KEY,
+    filename TEXT,
+    path TEXT,
+    upload_date TEXT,
+    file_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_path ON uploads(path);
+CREATE INDEX IF NOT EXISTS idx_uploads_filename ON uploads(filename);
+CREATE INDEX IF NOT EXISTS idx_uploads_date ON uploads(upload_date);
+CREATE TABLE IF NOT EXISTS duplicates (
+    hash TEXT NOT NULL,
+    duplicate_hash TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (hash, duplicate_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_duplicates_reverse ON duplicates(duplicate_hash);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPLOAD_COLUMNS = "hash, filename, path, upload_date, file_size"
+
+# Số tham số tối đa trong một câu lệnh (giới hạn mặc định của SQLite cũ là 999)
+_MAX_SQL_PARAMS = 900
+
+def _row_to_info(row):
+    """Chuyển một dòng của bảng uploads thành dict thông tin (cùng dạng với bản JSON)"""
+    return {
+        'filename': row['filename'],
+        'path': row['path'],
+        'upload_date': row['upload_date'],
+        'file_size': row['file_size']
+    }
+
+class SQLiteHistoryStore:
+    """
+    Kho lưu trữ lịch sử tải lên trong SQLite (chế độ WAL).
+    An toàn khi dùng từ nhiều thread.
+    """
+
+    def __init__(self, db_file='upload_history.db'):
+        """
+        Khởi tạo kho lưu trữ
+
+        Args:
+            db_file (str): Đường dẫn đến file SQLite
+        """
+        self.db_file = db_file
+        self._lock = threading.RLock()
+
+        if db_file != ':memory:' and os.path.dirname(db_file):
+            os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if db_file != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def load_all(self):
+        """
+        Đọc toàn bộ lịch sử
+
+        Returns:
+            tuple: (uploads, duplicates) cùng dạng với dữ liệu JSON
+        """
+        with self._lock:
+            uploads = {
+                row['hash']: _row_to_info(row)
+                for row in self._conn.execute(f"SELECT {_UPLOAD_COLUMNS} FROM uploads")
+            }
+
+            duplicates = {}
+            for row in self._conn.execute(
+                "SELECT hash, duplicate_hash FROM duplicates ORDER BY hash, position"
+            ):
+                duplicates.setdefault(row['hash'], []).append(row['duplicate_hash'])
+
+        return uploads, duplicates
+
+    def count(self):
+        """
+        Đếm số video trong lịch sử
+
+        Returns:
+            int: Số video đã tải lên
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+
+    def put_upload(self, video_hash, info):
+        """
+        Thêm hoặc cập nhật một video
+
+        Args:
+            video_hash (str): Hash của video
+            info (dict): Thông tin video (filename, path, upload_date, file_size)
+        """
+        with self._lock:
+            self._put_upload(video_hash, info)
+
+    def delete_upload(self, video_hash):
+        """
+        Xóa một video và mọi quan hệ trùng lặp liên quan tới nó
+
+        Args:
+            video_hash (str): Hash của video
+        """
+        self.apply_batch([('delete_upload', (video_hash,))])
+
+    def add_duplicate(self, video_hash, duplicate_hash):
+        """
+        Ghi nhận video_hash trùng lặp với duplicate_hash
+
+        Args:
+            video_hash (str): Hash video mới
+            duplicate_hash (str): Hash video đã tồn tại
+        """
+        with self._lock:
+            self._add_duplicate(video_hash, duplicate_hash)
+
+    def apply_batch(self, operations):
+        """
+        Thực hiện nhiều thay đổi trong một transaction (group commit)
+
+        Args:
+            operations (list): Danh sách (tên thao tác, tham số), tên thao tác là
+                               'put_upload', 'delete_upload', 'archive_upload',
+                               'add_duplicate' hoặc 'clear'
+        """
+        if not operations:
+            return
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for name, args in operations:
+                    getattr(self, f"_{name}")(*args)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _put_upload(self, video_hash, info):
+        """Ghi một dòng vào bảng uploads (không tự mở transaction)"""
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO uploads ({_UPLOAD_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+            (video_hash, info.get('filename'), info.get('path'),
+             info.get('upload_date'), info.get('file_size'))
+        )
+
+    def _delete_upload(self, video_hash):
+        """Xóa một video và các quan hệ trùng lặp (không tự mở transaction)"""
+        self._conn.execute("DELETE FROM uploads WHERE hash = ?", (video_hash,))
+        self._conn.execute(
+            "DELETE FROM duplicates WHERE hash = ? OR duplicate_hash = ?",
+            (video_hash, video_hash)
+        )
+
+    def _archive_upload(self, video_hash):
+        """Xóa một video đã được chuyển vào kho lưu trữ, giữ quan hệ trùng lặp (không tự mở transaction)"""
+        self._conn.execute("DELETE FROM uploads WHERE hash = ?", (video_hash,))
+
+    def _add_duplicate(self, video_hash, duplicate_hash):
+        """Thêm quan hệ trùng lặp vào cuối danh sách (không tự mở transaction)"""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO duplicates (hash, duplicate_hash, position) "
+            "SELECT ?, ?, COALESCE(MAX(position) + 1, 0) FROM duplicates WHERE hash = ?",
+            (video_hash, duplicate_hash, video_hash)
+        )
+
+    def _clear(self):
+        """Xóa dữ liệu của cả hai bảng (không tự mở transaction)"""
+        self._conn.execute("DELETE FROM uploads")
+        self._conn.execute("DELETE FROM duplicates")
+
+    def get_upload(self, video_hash):
+        """
+        Lấy thông tin một video theo hash
+
+        Args:
+            video_hash (str): Hash của video
+
+        Returns:
+            dict/None: Thông tin video nếu tồn tại
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_UPLOAD_COLUMNS} FROM uploads WHERE hash = ?", (video_hash,)
+            ).fetchone()
+        return _row_to_info(row) if row else None
+
+    def get_many(self, hashes):
+        """
+        Lấy thông tin nhiều video theo hash bằng truy vấn IN
+
+        Args:
+            hashes (iterable): Danh sách hash
+
+        Returns:
+            dict: {hash: thông tin video} cho các hash có trong lịch sử
+        """
+        hashes = list(dict.fromkeys(h for h in hashes if h))
+        result = {}
+        # SQLite giới hạn số tham số trong một câu lệnh
+        for start in range(0, len(hashes), _MAX_SQL_PARAMS):
+            chunk = hashes[start:start + _MAX_SQL_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            result.update(self._select(f"WHERE hash IN ({placeholders})", chunk))
+        return result
+
+    def find_by_path(self, file_path):
+        """
+        Tìm các video theo đường dẫn
+
+        Args:
+            file_path (str): Đường dẫn file video
+
+        Returns:
+            dict: {hash: thông tin video}
+        """
+        return self._select("WHERE path = ?", (file_path,))
+
+    def find_by_filename(self, filename):
+        """
+        Tìm các video theo tên file
+
+        Args:
+            filename (str): Tên file video
+
+        Returns:
+            dict: {hash: thông tin video}
+        """
+        return self._select("WHERE filename = ?", (filename,))
+
+    def find_by_date_range(self, start_date=None, end_date=None):
+        """
+        Tìm các video tải lên trong khoảng thời gian (định dạng "%Y-%m-%d %H:%M:%S")
+
+        Args:
+            start_date (str, optional): Thời điểm bắt đầu (bao gồm)
+            end_date (str, optional): Thời điểm kết thúc (không bao gồm)
+
+        Returns:
+            dict: {hash: thông tin video}, sắp xếp theo ngày tải lên
+        """
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("upload_date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("upload_date < ?")
+            params.append(end_date)
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return self._select(f"{where}ORDER BY upload_date", params)
+
+    def _select(self, clause, params):
+        """Chạy truy vấn trên bảng uploads và trả về {hash: thông tin video}"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_UPLOAD_COLUMNS} FROM uploads {clause}", params
+            ).fetchall()
+        return {row['hash']: _row_to_info(row) for row in rows}
+
+    def replace_all(self, uploads, duplicates):
+        """
+        Ghi đè toàn bộ lịch sử trong một transaction
+
+        Args:
+            uploads (dict): {hash: thông tin video}
+            duplicates (dict): {hash: [danh sách hash trùng lặp]}
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._clear()
+                self._insert_many(uploads, duplicates)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _insert_many(self, uploads, duplicates):
+        """Chèn hàng loạt (phải được gọi trong transaction)"""
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO uploads ({_UPLOAD_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+            [
+                (video_hash, info.get('filename'), info.get('path'),
+                 info.get('upload_date'), info.get('file_size'))
+                for video_hash, info in uploads.items()
+            ]
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO duplicates (hash, duplicate_hash, position) VALUES (?, ?, ?)",
+            [
+                (video_hash, duplicate_hash, position)
+                for video_hash, duplicate_hashes in duplicates.items()
+                for position, duplicate_hash in enumerate(duplicate_hashes)
+            ]
+        )
+
+    def clear(self):
+        """Xóa toàn bộ lịch sử"""
+        self.apply_batch([('clear', ())])
+
+    def migrate_from_json(self, json_file):
+        """
+        Chuyển dữ liệu từ file lịch sử JSON cũ sang SQLite (chỉ thực hiện một lần).
+        File JSON được giữ nguyên để có thể quay lại phiên bản cũ.
+
+        Args:
+            json_file (str): Đường dẫn file upload_history.json
+
+        Returns:
+            int: Số video đã chuyển (0 nếu đã chuyển trước đó hoặc không có file)
+        """
+        with self._lock:
+            if self._get_meta('json_migrated') is not None:
+                return 0
+
+            uploads, duplicates = {}, {}
+            if json_file and os.path.exists(json_file):
+                try:
+                    with open(json_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    # File mới tạo có thể chỉ chứa mảng rỗng
+                    if isinstance(data, dict):
+                        uploads = data.get('uploads', {}) or {}
+                        duplicates = data.get('duplicates', {}) or {}
+                except Exception as e:
+                    # Không đánh dấu đã chuyển để lần sau thử lại
+                    logger.error(f"Lỗi khi đọc lịch sử JSON để chuyển đổi: {str(e)}")
+                    return 0
+
+            self._conn.execute("BEGIN")
+            try:
+                self._insert_many(uploads, duplicates)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                    (json_file or '',)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if uploads:
+            logger.info(f"Đã chuyển {len(uploads)} video từ {json_file} sang SQLite")
+        return len(uploads)
+
+    def _get_meta(self, key):
+        """Đọc một giá trị trong bảng meta"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def close(self):
+        """Đóng kết nối cơ sở dữ liệu"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
@@ -0,0 +1,471 @@
+"""
+Module quản lý hàng đợi tải lên bền vững (lưu trên đĩa).
+Hàng đợi được lưu trong SQLite (chế độ WAL) để không mất công việc khi ứng dụng
+bị tắt đột ngột hoặc khởi động lại.
+
+Thứ tự lấy công việc được quyết định bởi bộ lập lịch ưu tiên:
+- Giữa các nguồn: chia phần công bằng theo trọng số (stride scheduling), nguồn
+  ưu tiên cao hơn (manual > auto > bulk) được phục vụ nhiều hơn nhưng nguồn thấp
+  không bị bỏ đói.
+- Trong một nguồn: file nhỏ được ưu tiên trước, có cơ chế "lão hóa" để file lớn
+  chờ lâu vẫn được đến lượt.
+"""
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger("UploadJobQueue")
+
+# Trạng thái của một công việc tải lên
+STATUS_PENDING = 'pending'
+STATUS_IN_FLIGHT = 'in_flight'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# Nguồn tạo công việc
+SOURCE_MANUAL = 'manual'
+SOURCE_AUTO = 'auto'
+SOURCE_BULK = 'bulk'
+
+# Mức ưu tiên của từng nguồn (số nhỏ hơn = ưu tiên cao hơn, dùng khi hòa)
+SOURCE_PRIORITIES = {
+    SOURCE_MANUAL: 0,
+    SOURCE_AUTO: 1,
+    SOURCE_BULK: 2
+}
+
+# Trọng số chia phần giữa các nguồn khi cùng có công việc chờ
+SOURCE_WEIGHTS = {
+    SOURCE_MANUAL: 8,
+    SOURCE_AUTO: 4,
+    SOURCE_BULK: 1
+}
+
+# Mỗi giây chờ trong hàng đợi được tính như file nhỏ đi 1 MB
+SIZE_AGING_BYTES_PER_SECOND = 1024 * 1024
+
+_STRIDE_BASE = 1000.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    file_size INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, source);
+CREATE INDEX IF NOT EXISTS idx_jobs_path ON jobs(file_path);
+"""
+
+def default_db_file():
+    """<thư mục gốc>/data/upload_jobs.db (thư mục chứa file thực thi nếu đóng gói bằng PyInstaller)"""
+    if getattr(sys, 'frozen', False):
+        app_dir = os.path.dirname(sys.executable)
+    else:
+        app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(app_dir, 'data', 'upload_jobs.db')
+
+class UploadJobQueue:
+    """
+    Hàng đợi công việc tải lên lưu trong SQLite.
+    Mỗi công việc có trạng thái (pending, in_flight, done, failed) và số lần thử.
+    An toàn khi dùng từ nhiều thread.
+    """
+
+    def __init__(self, db_file=None):
+        """
+        Khởi tạo hàng đợi và khôi phục các công việc dang dở
+
+        Args:
+            db_file (str, optional): Đường dẫn đến file SQLite lưu hàng đợi
+                (mặc định data/upload_jobs.db, không phụ thuộc thư mục hiện hành)
+        """
+        db_file = db_file or default_db_file()
+        self.db_file = db_file
+        self._lock = threading.RLock()
+        self._passes = {}  # {source: pass} cho stride scheduling
+        self._workers = {}  # {source: số worker nền đang nhận việc của nguồn này}
+        self._opened_at = time.time()
+
+        if db_file != ':memory:' and os.path.dirname(db_file):
+            os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if db_file != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        recovered = self.recover()
+        if recovered:
+            logger.info(f"Đã khôi phục {recovered} công việc đang dở dang từ phiên trước")
+
+    def recover(self):
+        """
+        Đưa các công việc đang ở trạng thái in_flight (do ứng dụng bị tắt giữa chừng)
+        về lại pending để được tải lên lại
+
+        Returns:
+            int: Số công việc được khôi phục
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (STATUS_PENDING, time.time(), STATUS_IN_FLIGHT)
+            )
+            return cursor.rowcount
+
+    def enqueue(self, file_path, source=SOURCE_MANUAL, max_attempts=3):
+        """
+        Thêm file vào hàng đợi. Nếu file đã có công việc chưa hoàn tất từ cùng nguồn
+        thì trả về công việc đó thay vì tạo mới.
+
+        Args:
+            file_path (str): Đường dẫn đến file video
+            source (str): Nguồn tạo công việc (manual, auto, bulk)
+            max_attempts (int): Số lần thử tối đa trước khi đánh dấu thất bại
+
+        Returns:
+            int: ID của công việc
+        """
+        now = time.time()
+        try:
+            file_size = os.path.getsize(file_path)
+        except OSError:
+            file_size = 0
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE file_path = ? AND source = ? AND status IN (?, ?)",
+                (file_path, source, STATUS_PENDING, STATUS_IN_FLIGHT)
+            ).fetchone()
+            if row:
+                return row['id']
+
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (file_path, source, status, attempts, max_attempts, file_size, "
+                "created_at, updated_at) VALUES (?, ?, ?, 0, ?, ?, ?, ?)",
+                (file_path, source, STATUS_PENDING, max_attempts, file_size, now, now)
+            )
+            return cursor.lastrowid
+
+    def attach_worker(self, source):
+        """
+        Đăng ký một worker nền nhận việc của nguồn source. Khi nhiều worker cùng chạy,
+        mỗi worker chỉ nhận việc của nguồn mình và claim_next chia lượt giữa các nguồn.
+        """
+        with self._lock:
+            self._workers[source] = self._workers.get(source, 0) + 1
+
+    def detach_worker(self, source):
+        """Hủy đăng ký worker nền đã gọi attach_worker"""
+        with self._lock:
+            left = self._workers.get(source, 0) - 1
+            if left > 0:
+                self._workers[source] = left
+            else:
+                self._workers.pop(source, None)
+
+    def claim_next(self, sources=None, yield_to_manual=False):
+        """
+        Lấy công việc pending tiếp theo theo bộ lập lịch ưu tiên và chuyển sang in_flight
+
+        Nguồn của các worker khác đang rảnh (đã attach_worker, không có công việc
+        in_flight) cùng tham gia chia lượt: nếu tới lượt nguồn đó, trả về None để
+        worker của nguồn đó nhận việc.
+
+        Args:
+            sources (str/list, optional): Chỉ lấy công việc từ các nguồn này
+            yield_to_manual (bool): Nhường lượt khi đang có video tải lên thủ công
+
+        Returns:
+            dict/None: Thông tin công việc hoặc None nếu không có công việc phù hợp
+        """
+        if isinstance(sources, str):
+            sources = [sources]
+
+        with self._lock:
+            if yield_to_manual and self._has_active_manual():
+                return None
+
+            source = self._pick_source(sources, self._idle_rivals(sources))
+            if not source:
+                return None
+
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND source = ? "
+                "ORDER BY file_size - (? - created_at) * ?, id LIMIT 1",
+                (STATUS_PENDING, source, time.time(), SIZE_AGING_BYTES_PER_SECOND)
+            ).fetchone()
+
+            if not row:
+                return None
+
+            return self.start_job(row['id'])
+
+    def _has_active_manual(self):
+        """
+        Kiểm tra có lượt tải lên thủ công đang chạy trong phiên này không
+        (công việc thủ công còn sót từ phiên trước không chặn các nguồn khác)
+        """
+        row = self._conn.execute(
+            "SELECT 1 FROM jobs WHERE source = ? AND "
+            "(status = ? OR (status = ? AND created_at >= ?)) LIMIT 1",
+            (SOURCE_MANUAL, STATUS_IN_FLIGHT, STATUS_PENDING, self._opened_at)
+        ).fetchone()
+        return row is not None
+
+    def _idle_rivals(self, sources):
+        """
+        Nguồn của các worker nền khác đang chờ nhận việc (không có công việc in_flight)
+        """
+        if not sources:
+            return []
+        rivals = [source for source in self._workers if source not in sources]
+        if not rivals:
+            return []
+        busy = self._conn.execute(
+            "SELECT DISTINCT source FROM jobs WHERE status = ?", (STATUS_IN_FLIGHT,)
+        ).fetchall()
+        busy = {row['source'] for row in busy}
+        return [source for source in rivals if source not in busy]
+
+    def _pick_source(self, sources=None, rivals=()):
+        """
+        Chọn nguồn được phục vụ tiếp theo bằng stride scheduling
+
+        Args:
+            sources (list, optional): Danh sách nguồn được phép chọn
+            rivals (list): Nguồn khác cùng chia lượt nhưng không được chọn ở đây
+
+        Returns:
+            str/None: Nguồn được chọn hoặc None nếu không có công việc chờ
+                hay đang tới lượt một nguồn trong rivals
+        """
+        rows = self._conn.execute(
+            "SELECT DISTINCT source FROM jobs WHERE status = ?", (STATUS_PENDING,)
+        ).fetchall()
+        ready = [row['source'] for row in rows
+                 if not sources or row['source'] in sources or row['source'] in rivals]
+        if not ready:
+            return None
+
+        # Nguồn mới có công việc bắt đầu từ mức pass thấp nhất hiện tại
+        # để không được dồn lượt bù cho thời gian nhàn rỗi
+        known_passes = [self._passes[src] for src in ready if src in self._passes]
+        floor = min(known_passes) if known_passes else 0.0
+        for src in ready:
+            self._passes[src] = max(self._passes.get(src, floor), floor)
+
+        source = min(ready, key=lambda src: (self._passes[src], SOURCE_PRIORITIES.get(src, 99)))
+        if source in rivals:
+            # Lượt của worker khác: pass chỉ tăng khi nguồn đó thật sự nhận việc
+            return None
+        self._passes[source] += _STRIDE_BASE / SOURCE_WEIGHTS.get(source, 1)
+        return source
+
+    def start_job(self, job_id):
+        """
+        Đánh dấu công việc bắt đầu tải lên (in_flight) và tăng số lần thử
+
+        Args:
+            job_id (int): ID của công việc
+
+        Returns:
+            dict/None: Thông tin công việc sau khi cập nhật
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (STATUS_IN_FLIGHT, time.time(), job_id)
+            )
+            return self.get_job(job_id)
+
+    def complete(self, job_id):
+        """
+        Đánh dấu công việc đã tải lên thành công
+
+        Args:
+            job_id (int): ID của công việc
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (STATUS_DONE, time.time(), job_id)
+            )
+
+    def fail(self, job_id, error=None, retry=True):
+        """
+        Ghi nhận một lần tải lên thất bại. Công việc quay lại pending nếu còn lượt thử,
+        ngược lại chuyển sang failed.
+
+        Args:
+            job_id (int): ID của công việc
+            error (str, optional): Mô tả lỗi
+            retry (bool): Có cho phép thử lại không
+
+        Returns:
+            str: Trạng thái mới của công việc
+        """
+        with self._lock:
+            job = self.get_job(job_id)
+            if not job:
+                return None
+
+            if retry and job['attempts'] < job['max_attempts']:
+                status = STATUS_PENDING
+            else:
+                status = STATUS_FAILED
+
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+            return status
+
+    def get_job(self, job_id):
+        """
+        Lấy thông tin công việc theo ID
+
+        Args:
+            job_id (int): ID của công việc
+
+        Returns:
+            dict/None: Thông tin công việc hoặc None nếu không tồn tại
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return dict(row) if row else None
+
+    def get_jobs(self, status=None, source=None):
+        """
+        Lấy danh sách công việc theo trạng thái và nguồn
+
+        Args:
+            status (str, optional): Lọc theo trạng thái
+            source (str, optional): Lọc theo nguồn
+
+        Returns:
+            list: Danh sách công việc (dict)
+        """
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        query += " ORDER BY id"
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def count(self, status=STATUS_PENDING, source=None):
+        """
+        Đếm số công việc theo trạng thái và nguồn
+
+        Args:
+            status (str): Trạng thái cần đếm
+            source (str, optional): Lọc theo nguồn
+
+        Returns:
+            int: Số công việc
+        """
+        with self._lock:
+            if source:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND source = ?", (status, source)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)
+                ).fetchone()
+            return row[0]
+
+    def is_active(self, file_path):
+        """
+        Kiểm tra xem file có đang nằm trong hàng đợi (pending hoặc in_flight) không
+
+        Args:
+            file_path (str): Đường dẫn đến file video
+
+        Returns:
+            bool: True nếu file đang chờ hoặc đang được tải lên
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE file_path = ? AND status IN (?, ?) LIMIT 1",
+                (file_path, STATUS_PENDING, STATUS_IN_FLIGHT)
+            ).fetchone()
+            return row is not None
+
+    def cancel_pending(self, source=None):
+        """
+        Hủy các công việc đang chờ (đánh dấu failed)
+
+        Args:
+            source (str, optional): Chỉ hủy công việc từ nguồn này
+
+        Returns:
+            int: Số công việc bị hủy
+        """
+        with self._lock:
+            query = "UPDATE jobs SET status = ?, last_error = ?, updated_at = ? WHERE status = ?"
+            params = [STATUS_FAILED, "Đã hủy", time.time(), STATUS_PENDING]
+            if source:
+                query += " AND source = ?"
+                params.append(source)
+            return self._conn.execute(query, params).rowcount
+
+    def purge_finished(self, older_than_days=7):
+        """
+        Xóa các công việc đã hoàn tất hoặc thất bại cũ hơn số ngày chỉ định
+
+        Args:
+            older_than_days (int): Số ngày giữ lại
+
+        Returns:
+            int: Số công việc đã xóa
+        """
+        cutoff = time.time() - older_than_days * 86400
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (STATUS_DONE, STATUS_FAILED, cutoff)
+            ).rowcount
+
+    def close(self):
+        """Đóng kết nối cơ sở dữ liệu"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception as e:
+                logger.error(f"Lỗi khi đóng hàng đợi tải lên: {str(e)}")
+
+if __name__ == "__main__":
+    # Mã kiểm thử
+    logging.basicConfig(level=logging.DEBUG)
+
+    job_queue = UploadJobQueue("test_upload_jobs.db")
+    job_id = job_queue.enqueue("/path/to/video1.mp4", source=SOURCE_BULK)
+    print(f"Đã thêm công việc: {job_queue.get_job(job_id)}")
+
+    job = job_queue.claim_next(sources=[SOURCE_AUTO, SOURCE_BULK])
+    print(f"Đang xử lý: {job}")
+    print(f"Trạng thái sau khi lỗi: {job_queue.fail(job['id'], 'Lỗi mạng')}")
+
+    job = job_queue.claim_next()
+    job_queue.complete(job['id'])
+    print(f"Hoàn tất: {job_queue.get_job(job['id'])}")
+    job_queue.close()
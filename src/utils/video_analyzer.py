@@ -1,17 +1,21 @@
 """
 Module phân tích và so sánh video để phát hiện nội dung trùng lặp.
 """
-import cv2
-import numpy as np
 import os
 import logging
 import hashlib
-from PIL import Image, ImageTk
-import imagehash
-import tkinter as tk
 from threading import Thread
 from queue import Queue
 
+from .lazy_import import lazy_import
+
+# Thư viện nặng, chỉ được nạp khi phân tích video lần đầu
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageTk = lazy_import("PIL.ImageTk")
+imagehash = lazy_import("imagehash")
+
 # Cấu hình logging
 logger = logging.getLogger("VideoAnalyzer")
 
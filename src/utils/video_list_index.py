@@ -0,0 +1,235 @@
+"""
+Module chỉ mục cho danh sách video của tab chính.
+Giữ sẵn khóa sắp xếp của từng video và chỉ mục trigram của tên file để sắp xếp
+và tìm kiếm khi gõ không phải duyệt lại toàn bộ danh sách mỗi lần.
+"""
+import logging
+
+logger = logging.getLogger("VideoListIndex")
+
+# Các khóa sắp xếp
+SORT_NAME = 'name'
+SORT_SIZE = 'size'
+SORT_DURATION = 'duration'
+SORT_MTIME = 'mtime'
+SORT_STATUS = 'status'
+
+# Thứ tự khi sắp xếp theo trạng thái
+STATUS_ORDER = {"uploaded": 0, "duplicate": 1, "new": 2}
+
+# Hàm tính khóa sắp xếp của một video
+SORT_KEYS = {
+    SORT_NAME: lambda video: video.get("name", "").casefold(),
+    SORT_SIZE: lambda video: video.get("file_size_bytes", 0) or 0,
+    SORT_DURATION: lambda video: video.get("duration", 0) or 0,
+    SORT_MTIME: lambda video: video.get("mtime", 0) or 0,
+    SORT_STATUS: lambda video: STATUS_ORDER.get(video.get("status", "new"), 3),
+}
+
+# Độ dài n-gram của chỉ mục tìm kiếm
+NGRAM_SIZE = 3
+
+def trigrams(text):
+    """
+    Tách chuỗi thành các trigram (không trùng lặp)
+
+    Args:
+        text (str): Chuỗi đã chuẩn hóa (casefold)
+
+    Returns:
+        set: Các chuỗi con độ dài NGRAM_SIZE
+    """
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+class VideoListIndex:
+    """
+    Chỉ mục sắp xếp và tìm kiếm cho danh sách video.
+    Mỗi video được đánh số theo thứ tự thêm vào; các danh sách đã sắp xếp được
+    lưu lại theo từng khóa cho đến khi dữ liệu tương ứng thay đổi.
+    """
+
+    def __init__(self, videos=None):
+        """
+        Khởi tạo chỉ mục
+
+        Args:
+            videos (list, optional): Danh sách video ban đầu
+        """
+        self.clear()
+        if videos:
+            self.add(videos)
+
+    def clear(self):
+        """Xóa toàn bộ chỉ mục"""
+        self._videos = []
+        self._video_ids = set()  # id() của các video đã thêm, để nhận ra danh sách bị thay thế
+        self._names = []  # Tên đã casefold, theo số thứ tự video
+        self._postings = {}  # {trigram: [số thứ tự video]} (tăng dần)
+        self._keys = {}  # {khóa: [giá trị khóa theo số thứ tự]}
+        self._views = {}  # {(khóa, đảo ngược): [số thứ tự đã sắp xếp]}
+        self._ranks = {}  # {(khóa, đảo ngược): [vị trí trong danh sách đã sắp xếp]}
+        self._last_filter = None  # (truy vấn, thứ tự, kết quả) của lần lọc trước
+
+    def __len__(self):
+        return len(self._videos)
+
+    @property
+    def videos(self):
+        """Các video theo thứ tự thêm vào"""
+        return self._videos
+
+    def add(self, videos):
+        """
+        Thêm video vào chỉ mục (ví dụ một đợt kết quả quét)
+
+        Args:
+            videos (list): Danh sách thông tin video
+        """
+        for video in videos:
+            video_id = len(self._videos)
+            name = video.get("name", "").casefold()
+            self._videos.append(video)
+            self._video_ids.add(id(video))
+            self._names.append(name)
+            for gram in trigrams(name):
+                self._postings.setdefault(gram, []).append(video_id)
+
+            for key, values in self._keys.items():
+                values.append(SORT_KEYS[key](video))
+
+        if videos:
+            # Các danh sách đã sắp xếp không còn đầy đủ
+            self._views.clear()
+            self._ranks.clear()
+            self._last_filter = None
+
+    def holds(self, videos):
+        """
+        Kiểm tra chỉ mục có đúng các video này không (thứ tự bất kỳ), để nhận ra
+        danh sách đã bị thay thế bằng các video khác cùng số lượng
+
+        Args:
+            videos (list): Danh sách thông tin video
+
+        Returns:
+            bool: True nếu chỉ mục chứa đúng các video này
+        """
+        return len(videos) == len(self._videos) and all(id(video) in self._video_ids for video in videos)
+
+    def rebuild(self, videos):
+        """
+        Xây dựng lại chỉ mục từ đầu
+
+        Args:
+            videos (list): Danh sách thông tin video
+        """
+        self.clear()
+        self.add(videos)
+
+    def invalidate(self, key=None):
+        """
+        Bỏ các khóa sắp xếp đã tính khi thông tin video thay đổi
+        (ví dụ thời lượng sau khi đọc metadata, trạng thái sau khi kiểm tra lịch sử)
+
+        Args:
+            key (str, optional): Khóa bị ảnh hưởng, None để bỏ tất cả
+        """
+        keys = [key] if key else list(self._keys)
+        for name in keys:
+            self._keys.pop(name, None)
+            for reverse in (False, True):
+                self._views.pop((name, reverse), None)
+                self._ranks.pop((name, reverse), None)
+
+        # Kết quả lọc giữ thứ tự của lần sắp xếp trước
+        if self._last_filter and (key is None or self._last_filter[1][0] == key):
+            self._last_filter = None
+
+    def _key_values(self, key):
+        """Giá trị khóa sắp xếp của mọi video (tính một lần)"""
+        values = self._keys.get(key)
+        if values is None:
+            key_func = SORT_KEYS[key]
+            values = self._keys[key] = [key_func(video) for video in self._videos]
+        return values
+
+    def _sorted_ids(self, key, reverse):
+        """Số thứ tự video theo khóa sắp xếp (có bộ nhớ đệm); key None: thứ tự thêm vào"""
+        if key is None:
+            return range(len(self._videos))
+
+        view = self._views.get((key, reverse))
+        if view is None:
+            values = self._key_values(key)
+            view = self._views[(key, reverse)] = sorted(
+                range(len(self._videos)), key=values.__getitem__, reverse=reverse
+            )
+        return view
+
+    def _rank(self, key, reverse):
+        """Vị trí của từng video trong danh sách đã sắp xếp"""
+        rank = self._ranks.get((key, reverse))
+        if rank is None:
+            rank = [0] * len(self._videos)
+            for position, video_id in enumerate(self._sorted_ids(key, reverse)):
+                rank[video_id] = position
+            self._ranks[(key, reverse)] = rank
+        return rank
+
+    def sorted(self, key, reverse=False):
+        """
+        Danh sách video đã sắp xếp
+
+        Args:
+            key (str): Một trong các khóa SORT_*
+            reverse (bool): Sắp xếp giảm dần
+
+        Returns:
+            list: Danh sách video mới (không thay đổi chỉ mục)
+        """
+        videos = self._videos
+        return [videos[video_id] for video_id in self._sorted_ids(key, reverse)]
+
+    def filter(self, query, key=None, reverse=False):
+        """
+        Tìm video có tên chứa chuỗi truy vấn (không phân biệt hoa thường)
+
+        Khi truy vấn chỉ được gõ thêm (chứa truy vấn trước), chỉ lọc lại kết quả
+        trước; nếu không, các ứng viên lấy từ trigram hiếm nhất của truy vấn.
+
+        Args:
+            query (str): Chuỗi cần tìm
+            key (str, optional): Khóa sắp xếp của kết quả, None: thứ tự thêm vào
+            reverse (bool): Sắp xếp giảm dần
+
+        Returns:
+            list: Các video khớp, theo thứ tự sắp xếp đã chọn
+        """
+        query = (query or "").casefold()
+        order = (key, reverse)
+        names = self._names
+
+        if not query:
+            self._last_filter = None
+            return self.sorted(key, reverse) if key is not None else list(self._videos)
+
+        if self._last_filter and self._last_filter[1] == order and self._last_filter[0] in query:
+            # Truy vấn dài thêm: kết quả là tập con của kết quả trước, giữ nguyên thứ tự
+            ids = [video_id for video_id in self._last_filter[2] if query in names[video_id]]
+        elif len(query) >= NGRAM_SIZE:
+            # Chỉ kiểm tra các video chứa trigram ít gặp nhất của truy vấn
+            postings = [self._postings.get(gram, ()) for gram in trigrams(query)]
+            candidates = min(postings, key=len)
+            if key is not None and len(candidates) * 4 > len(self._videos):
+                # Gần như cả danh sách khớp: duyệt theo thứ tự đã sắp xếp rẻ hơn sắp xếp lại kết quả
+                candidates = self._sorted_ids(key, reverse)
+            ids = [video_id for video_id in candidates if query in names[video_id]]
+            if key is not None and candidates is not self._views.get(order):
+                ids.sort(key=self._rank(key, reverse).__getitem__)
+        else:
+            # Truy vấn 1-2 ký tự khớp với phần lớn danh sách: duyệt trực tiếp
+            ids = [video_id for video_id in self._sorted_ids(key, reverse) if query in names[video_id]]
+
+        self._last_filter = (query, order, ids)
+        videos = self._videos
+        return [videos[video_id] for video_id in ids]
@@ -0,0 +1,310 @@
+"""
+Module dịch vụ đọc thông tin video bằng ffprobe, dùng chung cho toàn ứng dụng.
+Các yêu cầu được gom lại và chạy song song với số worker giới hạn; kết quả được
+cache theo (đường dẫn, kích thước, thời điểm sửa) nên mỗi file chỉ chạy ffprobe
+một lần cho tới khi file thay đổi. Nếu có cache trên đĩa (CacheEvictionEngine),
+kết quả còn được giữ qua các lần khởi động, trong loại "probe_results". Một lần
+ffprobe trả về đủ thông tin: codec, kích thước khung hình, thời lượng, bitrate,
+fps và khoảng cách keyframe.
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from .ffmpeg_registry import get_registry
+from .cache_eviction import CATEGORY_PROBE_RESULTS
+
+logger = logging.getLogger("VideoMetadata")
+
+# Số giây đầu video được đọc packet để ước lượng khoảng cách keyframe
+KEYFRAME_WINDOW = 20
+
+def parse_rate(value):
+    """Chuyển "30000/1001" thành 29.97 (None nếu không hợp lệ)"""
+    try:
+        num, _, den = str(value).partition('/')
+        rate = float(num) / float(den or 1)
+        return rate if rate > 0 else None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+def to_number(value, kind=float):
+    """Chuyển chuỗi số của ffprobe, None nếu không có"""
+    try:
+        return kind(float(value))
+    except (TypeError, ValueError):
+        return None
+
+def keyframe_interval(packets, stream_index):
+    """
+    Khoảng cách trung vị (giây) giữa các keyframe của một stream
+
+    Args:
+        packets (list): Danh sách packet của ffprobe (-show_entries packet=...)
+        stream_index (int): Chỉ số stream video
+
+    Returns:
+        float: None nếu có ít hơn 2 keyframe
+    """
+    times = sorted(
+        t for t in (to_number(p.get('pts_time')) for p in packets
+                    if p.get('stream_index') == stream_index and 'K' in p.get('flags', ''))
+        if t is not None
+    )
+    gaps = sorted(b - a for a, b in zip(times, times[1:]) if b > a)
+    if not gaps:
+        return None
+    return round(gaps[len(gaps) // 2], 3)
+
+def parse_probe(data):
+    """
+    Rút gọn kết quả JSON của ffprobe
+
+    Returns:
+        dict: {'codec', 'width', 'height', 'duration', 'bitrate', 'fps',
+               'keyframe_interval', 'audio_codec', 'format'}, None nếu không có stream video
+    """
+    streams = data.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    if video is None:
+        return None
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    fmt = data.get('format', {})
+
+    duration = to_number(video.get('duration')) or to_number(fmt.get('duration'))
+    return {
+        'codec': video.get('codec_name'),
+        'width': to_number(video.get('width'), int),
+        'height': to_number(video.get('height'), int),
+        'duration': duration,
+        'bitrate': to_number(fmt.get('bit_rate'), int) or to_number(video.get('bit_rate'), int),
+        'fps': parse_rate(video.get('avg_frame_rate')) or parse_rate(video.get('r_frame_rate')),
+        'keyframe_interval': keyframe_interval(data.get('packets', []), video.get('index')),
+        'audio_codec': audio.get('codec_name') if audio else None,
+        'format': fmt.get('format_name')
+    }
+
+def file_key(path):
+    """Khóa cache: (đường dẫn tuyệt đối, kích thước, thời điểm sửa), None nếu file không tồn tại"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+class VideoMetadataService:
+    """
+    Đọc thông tin video bằng ffprobe với số worker giới hạn và cache theo file.
+    An toàn khi gọi từ nhiều thread; hai yêu cầu cùng lúc cho một file chỉ chạy ffprobe một lần.
+    """
+
+    def __init__(self, max_workers=4, cache_size=2048, ffprobe_path=None):
+        """
+        Khởi tạo
+
+        Args:
+            max_workers (int): Số ffprobe chạy đồng thời tối đa
+            cache_size (int): Số file được giữ trong cache
+            ffprobe_path (str, optional): Đường dẫn ffprobe, mặc định lấy từ registry FFmpeg
+        """
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.ffprobe_path = ffprobe_path
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._disk_cache = None
+
+    def set_disk_cache(self, engine):
+        """
+        Lưu kết quả vào cache trên đĩa (None để tắt)
+
+        Args:
+            engine (CacheEvictionEngine): Chỉ mục cache của ứng dụng
+        """
+        self._disk_cache = engine
+
+    def _disk_cache_name(self, key):
+        """Đường dẫn tương đối của kết quả một file trong thư mục cache"""
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return f"{CATEGORY_PROBE_RESULTS}/{digest}.json"
+
+    def _load_from_disk(self, key):
+        """
+        Đọc kết quả đã lưu trên đĩa
+
+        Returns:
+            tuple: (True, thông tin) nếu có, (False, None) nếu không
+        """
+        engine = self._disk_cache
+        if engine is None:
+            return False, None
+        path = engine.get(self._disk_cache_name(key))
+        if path is None:
+            return False, None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return True, json.load(f)['info']
+        except (OSError, ValueError, KeyError):
+            engine.remove(path)
+            return False, None
+
+    def _save_to_disk(self, key, info):
+        """Ghi kết quả ra cache trên đĩa (file tạm + đổi tên)"""
+        engine = self._disk_cache
+        if engine is None:
+            return
+        path = engine.path_for(*self._disk_cache_name(key).split('/'))
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'info': info}, f)
+            os.replace(temp_path, path)
+            engine.put(path)
+        except OSError as e:
+            logger.warning(f"Không thể lưu kết quả ffprobe vào cache: {str(e)}")
+
+    def _get_executor(self):
+        """Tạo thread pool khi cần lần đầu"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="VideoMetadata")
+        return self._executor
+
+    def _run_ffprobe(self, path):
+        """Chạy ffprobe một lần cho một file, trả về JSON đã parse hoặc None"""
+        ffprobe = self.ffprobe_path or get_registry().ffprobe_path or "ffprobe"
+        cmd = [
+            ffprobe,
+            "-v", "error",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            "-show_entries", "packet=stream_index,pts_time,flags",
+            "-read_intervals", f"%+{KEYFRAME_WINDOW}",
+            path
+        ]
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"Không chạy được ffprobe: {str(e)}")
+            return None
+
+        if result.returncode != 0:
+            logger.error(f"Lỗi khi chạy ffprobe cho {os.path.basename(path)}: "
+                         f"{result.stderr.decode('utf-8', errors='replace').strip()}")
+            return None
+        try:
+            return json.loads(result.stdout.decode('utf-8', errors='replace'))
+        except ValueError:
+            return None
+
+    def _probe_file(self, key):
+        """Chạy trong worker: đọc thông tin, lưu cache và bỏ khỏi danh sách đang chờ"""
+        try:
+            found, info = self._load_from_disk(key)
+            if not found:
+                data = self._run_ffprobe(key[0])
+                if data is None:
+                    # Không cache khi ffprobe lỗi, lần sau sẽ thử lại
+                    return None
+
+                info = parse_probe(data)
+                if info is not None:
+                    info['size'] = key[1]
+                self._save_to_disk(key, info)
+            with self._lock:
+                self._cache[key] = info
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return info
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def submit(self, path):
+        """
+        Yêu cầu đọc thông tin một file (không chờ)
+
+        Args:
+            path (str): Đường dẫn video
+
+        Returns:
+            Future: Kết quả là dict thông tin hoặc None nếu không đọc được
+        """
+        key = file_key(path)
+        with self._lock:
+            if key is None or key in self._cache:
+                future = Future()
+                future.set_result(self._cache.get(key) if key else None)
+                if key is not None:
+                    self._cache.move_to_end(key)
+                return future
+
+            future = self._pending.get(key)
+            if future is None:
+                future = self._get_executor().submit(self._probe_file, key)
+                self._pending[key] = future
+            return future
+
+    def probe(self, path):
+        """
+        Đọc thông tin một file (chờ kết quả)
+
+        Returns:
+            dict: Thông tin video, None nếu không đọc được
+        """
+        return self.submit(path).result()
+
+    def probe_many(self, paths):
+        """
+        Đọc thông tin nhiều file song song (tối đa max_workers ffprobe cùng lúc)
+
+        Args:
+            paths (list): Danh sách đường dẫn video
+
+        Returns:
+            dict: {đường dẫn: thông tin hoặc None}
+        """
+        futures = {path: self.submit(path) for path in paths}
+        return {path: future.result() for path, future in futures.items()}
+
+    def prefetch(self, paths):
+        """Đọc trước thông tin các file trong nền, để lần probe() sau lấy từ cache"""
+        for path in paths:
+            self.submit(path)
+
+    def clear_cache(self):
+        """Xóa toàn bộ cache"""
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self, wait=False):
+        """Dừng thread pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_metadata_service():
+    """
+    Dịch vụ đọc thông tin video dùng chung
+
+    Returns:
+        VideoMetadataService: Đối tượng dùng chung
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = VideoMetadataService()
+        return _service
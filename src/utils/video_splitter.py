@@ -7,12 +7,22 @@ import logging
 import math
 import tempfile
 import shutil
-import sys
 import configparser
 from datetime import datetime
 
+from .ffmpeg_registry import get_registry
+from .video_metadata import get_metadata_service
+from .disk_reservation import get_reserver, InsufficientDiskSpaceError
+from .file_range import FileRange, detect_ts_packet_size, plan_ranges
+
 logger = logging.getLogger("VideoSplitter")
 
+# Chia bằng stream copy: tổng các phần lớn hơn file gốc một chút do phần đầu container
+SPLIT_SIZE_OVERHEAD = 1.05
+
+# Nén theo bitrate đích: kích thước thực có thể vượt đích một ít
+COMPRESS_SIZE_OVERHEAD = 1.10
+
 class VideoSplitter:
     """
     Lớp xử lý việc chia nhỏ hoặc nén video lớn để phù hợp với giới hạn Telegram.
@@ -49,38 +59,27 @@ class VideoSplitter:
         """Xóa thư mục tạm khi đối tượng bị hủy"""
         try:
             if os.path.exists(self.work_dir):
+                # Xóa từng phần qua bộ đặt trước để dung lượng đã ghi được trả lại
+                for name in os.listdir(self.work_dir):
+                    path = os.path.join(self.work_dir, name)
+                    if os.path.isfile(path):
+                        get_reserver().release_file(path)
                 shutil.rmtree(self.work_dir)
                 logger.debug(f"Đã xóa thư mục tạm: {self.work_dir}")
         except Exception as e:
             logger.error(f"Lỗi khi xóa thư mục tạm: {e}")
     
     def _setup_ffmpeg_path(self):
-        """Cài đặt đường dẫn FFmpeg cho ứng dụng đóng gói"""
+        """Xác định đường dẫn FFmpeg/FFprobe từ registry dùng chung (không chạy lại ffmpeg)"""
+        self.ffmpeg_path = "ffmpeg"
+        self.ffprobe_path = "ffprobe"
         try:
-            # Kiểm tra xem FFmpeg có sẵn trong PATH không
-            if self._check_ffmpeg():
+            info = get_registry().resolve()
+            if info['ffmpeg']:
+                self.ffmpeg_path = info['ffmpeg']
+                self.ffprobe_path = info['ffprobe'] or "ffprobe"
+                logger.info(f"Sử dụng FFmpeg: {self.ffmpeg_path}")
                 return
-
-            # Nếu không có trong PATH, thử tìm trong thư mục ứng dụng
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            
-            # Nếu đóng gói với PyInstaller
-            if getattr(sys, 'frozen', False):
-                base_dir = os.path.dirname(sys.executable)
-                
-            ffmpeg_dir = os.path.join(base_dir, 'ffmpeg')
-            
-            if os.path.exists(ffmpeg_dir):
-                logger.info(f"Tìm thấy thư mục FFmpeg trong ứng dụng: {ffmpeg_dir}")
-                
-                # Thêm vào PATH
-                os.environ["PATH"] = ffmpeg_dir + os.pathsep + os.environ["PATH"]
-                logger.info("Đã thêm FFmpeg vào PATH")
-                
-                # Kiểm tra lại
-                if self._check_ffmpeg():
-                    logger.info("FFmpeg đã được thiết lập thành công")
-                    return
             
             logger.warning("Không tìm thấy FFmpeg. Một số tính năng xử lý video lớn có thể không hoạt động.")
             
@@ -94,21 +93,19 @@ class VideoSplitter:
         Returns:
             bool: True nếu FFmpeg đã được cài đặt
         """
-        try:
-            subprocess.run(
-                ["ffmpeg", "-version"], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                check=True
-            )
+        # Registry chỉ chạy lại ffmpeg khi file thực thi thay đổi
+        info = get_registry().resolve()
+        if info['ffmpeg']:
+            self.ffmpeg_path = info['ffmpeg']
+            self.ffprobe_path = info['ffprobe'] or "ffprobe"
             return True
-        except (subprocess.SubprocessError, FileNotFoundError):
-            logger.error("FFmpeg chưa được cài đặt hoặc không tìm thấy trong PATH.")
-            return False
+        
+        logger.error("FFmpeg chưa được cài đặt hoặc không tìm thấy trong PATH.")
+        return False
     
     def get_video_duration(self, video_path):
         """
-        Lấy thời lượng của video sử dụng FFmpeg
+        Lấy thời lượng của video sử dụng FFprobe
         
         Args:
             video_path (str): Đường dẫn đến file video
@@ -120,17 +117,9 @@ class VideoSplitter:
             return None
             
         try:
-            cmd = [
-                "ffprobe", 
-                "-v", "error", 
-                "-show_entries", "format=duration", 
-                "-of", "default=noprint_wrappers=1:nokey=1", 
-                video_path
-            ]
-            
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            duration = float(result.stdout.strip())
-            return duration
+            # Dịch vụ metadata dùng chung: mỗi file chỉ chạy ffprobe một lần cho tới khi thay đổi
+            info = get_metadata_service().probe(video_path)
+            return info['duration'] if info else None
         except Exception as e:
             logger.error(f"Lỗi khi lấy thời lượng video: {e}")
             return None
@@ -257,44 +246,116 @@ class VideoSplitter:
             logger.info(f"Kích thước gốc: {file_size:.2f}MB, Thời lượng: {duration:.2f}s")
             logger.info(f"Thời lượng mỗi phần: {part_duration:.2f}s")
             
+            # Đặt trước dung lượng cho toàn bộ các phần (chờ nếu ổ đĩa chưa đủ chỗ)
+            reservation = get_reserver().reserve(
+                work_dir, os.path.getsize(video_path) * SPLIT_SIZE_OVERHEAD)
+            
             # Tạo phần đầu ra
             base_name = os.path.splitext(os.path.basename(video_path))[0]
-            output_paths = []
+            with reservation:
+                output_paths = self._split_parts(video_path, work_dir, base_name, num_parts, part_duration, reservation)
             
-            for i in range(num_parts):
-                start_time = i * part_duration
-                # Đường dẫn đầu ra - sử dụng work_dir cập nhật
-                output_path = os.path.join(work_dir, f"{base_name}_part{i+1:03d}.mp4")
-                
-                # Command để cắt video thành phần
-                cmd = [
-                    "ffmpeg",
-                    "-y",  # Ghi đè file nếu đã tồn tại
-                    "-i", video_path,
-                    "-ss", str(start_time),  # Thời gian bắt đầu
-                    "-t", str(part_duration),  # Thời lượng đoạn cắt
-                    "-c", "copy",  # Sao chép codec không mã hóa lại
-                    output_path
-                ]
-                
-                # Thực thi lệnh
-                subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                
-                # Kiểm tra xem file đã được tạo chưa
-                if os.path.exists(output_path):
-                    output_size = os.path.getsize(output_path) / (1024 * 1024)
-                    logger.info(f"Đã tạo phần {i+1}/{num_parts}: {os.path.basename(output_path)} ({output_size:.2f}MB)")
-                    output_paths.append(output_path)
-                else:
-                    logger.error(f"Không thể tạo phần {i+1}/{num_parts} của video")
+            # Đọc trước thông tin các phần trong nền, để lúc tải lên lấy từ cache
+            get_metadata_service().prefetch(output_paths)
             
             return output_paths
             
+        except InsufficientDiskSpaceError as e:
+            logger.error(f"Không thể chia nhỏ video {os.path.basename(video_path)}: {e}")
+            return []
         except Exception as e:
             logger.error(f"Lỗi khi chia nhỏ video {os.path.basename(video_path)}: {e}")
             import traceback
             logger.error(traceback.format_exc())
             return []
+    
+    def split_byte_ranges(self, video_path):
+        """
+        Chia video MPEG-TS thành các đoạn byte của file gốc (cắt đúng ranh giới
+        packet), để tải lên trực tiếp mà không tạo file tạm cho từng phần
+        
+        Args:
+            video_path (str): Đường dẫn đến file video
+            
+        Returns:
+            list: Danh sách FileRange, hoặc [] nếu định dạng không cắt theo byte được
+                (khi đó dùng split_video)
+        """
+        packet_size = detect_ts_packet_size(video_path)
+        if not packet_size:
+            return []
+        
+        file_size = os.path.getsize(video_path)
+        max_part_size = int(self.max_size_mb * 1024 * 1024)
+        if file_size <= max_part_size:
+            return []
+        
+        base_name, ext = os.path.splitext(os.path.basename(video_path))
+        ranges = plan_ranges(file_size, max_part_size, align=packet_size)
+        logger.info(f"Chia video {os.path.basename(video_path)} thành {len(ranges)} đoạn byte "
+                    f"(MPEG-TS, packet {packet_size} byte), không tạo file tạm")
+        return [
+            FileRange(video_path, offset, length, f"{base_name}_part{i+1:03d}{ext}")
+            for i, (offset, length) in enumerate(ranges)
+        ]
+    
+    def _split_parts(self, video_path, work_dir, base_name, num_parts, part_duration, reservation):
+        """
+        Cắt từng phần video bằng FFmpeg (stream copy), mỗi phần ghi xong được trừ
+        vào phần dung lượng đã đặt trước. Nếu một phần lỗi thì hủy cả lần chia:
+        tải lên thiếu phần coi như video bị hỏng.
+        
+        Returns:
+            list: Danh sách đường dẫn các phần đã tạo, [] nếu có phần bị lỗi
+        """
+        output_paths = []
+        for i in range(num_parts):
+            start_time = i * part_duration
+            # Đường dẫn đầu ra - sử dụng work_dir cập nhật
+            output_path = os.path.join(work_dir, f"{base_name}_part{i+1:03d}.mp4")
+            
+            # Command để cắt video thành phần
+            cmd = [
+                self.ffmpeg_path,
+                "-y",  # Ghi đè file nếu đã tồn tại
+                "-i", video_path,
+                "-ss", str(start_time),  # Thời gian bắt đầu
+                "-t", str(part_duration),  # Thời lượng đoạn cắt
+                "-c", "copy",  # Sao chép codec không mã hóa lại
+                output_path
+            ]
+            
+            # Thực thi lệnh
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            
+            # Kiểm tra xem file đã được tạo chưa
+            if os.path.exists(output_path):
+                output_bytes = os.path.getsize(output_path)
+                reservation.consume(output_bytes)
+                
+                # FFmpeg lỗi giữa chừng (ví dụ hết dung lượng): phần bị cắt cụt
+                if result.returncode != 0:
+                    logger.error(f"FFmpeg lỗi khi tạo phần {i+1}/{num_parts}, hủy chia nhỏ video")
+                    self._discard_parts(output_paths + [output_path])
+                    return []
+                
+                output_size = output_bytes / (1024 * 1024)
+                logger.info(f"Đã tạo phần {i+1}/{num_parts}: {os.path.basename(output_path)} ({output_size:.2f}MB)")
+                output_paths.append(output_path)
+            else:
+                logger.error(f"Không thể tạo phần {i+1}/{num_parts} của video, hủy chia nhỏ video")
+                self._discard_parts(output_paths)
+                return []
+        
+        return output_paths
+    
+    def _discard_parts(self, paths):
+        """Xóa các phần đã tạo của một lần chia bị hủy và trả lại dung lượng"""
+        for path in paths:
+            try:
+                get_reserver().release_file(path)
+            except OSError as e:
+                logger.warning(f"Không thể xóa phần {os.path.basename(path)}: {e}")
             
     def compress_video(self, video_path, target_size_mb=None):
         """
@@ -339,9 +400,13 @@ class VideoSplitter:
             logger.info(f"Kích thước gốc: {file_size:.2f}MB, Kích thước đích: {target_size}MB")
             logger.info(f"Bitrate mục tiêu: {target_bitrate}kb/s")
             
+            # Đặt trước dung lượng cho file nén (chờ nếu ổ đĩa chưa đủ chỗ)
+            reservation = get_reserver().reserve(
+                self.work_dir, target_size * 1024 * 1024 * COMPRESS_SIZE_OVERHEAD)
+            
             # Command để nén video
             cmd = [
-                "ffmpeg",
+                self.ffmpeg_path,
                 "-y",
                 "-i", video_path,
                 "-c:v", "libx264",
@@ -353,7 +418,16 @@ class VideoSplitter:
             ]
             
             # Thực thi lệnh
-            subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            with reservation:
+                result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                if os.path.exists(output_path):
+                    reservation.consume(os.path.getsize(output_path))
+            
+            # FFmpeg lỗi giữa chừng: file nén chưa hoàn chỉnh
+            if result.returncode != 0 and os.path.exists(output_path):
+                logger.error(f"FFmpeg lỗi khi nén video {os.path.basename(video_path)}, bỏ file chưa hoàn chỉnh")
+                get_reserver().release_file(output_path)
+                return None
             
             # Kiểm tra xem file đã được tạo chưa
             if os.path.exists(output_path):
@@ -368,6 +442,9 @@ class VideoSplitter:
                 logger.error(f"Không thể nén video {os.path.basename(video_path)}")
                 return None
                 
+        except InsufficientDiskSpaceError as e:
+            logger.error(f"Không thể nén video {os.path.basename(video_path)}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Lỗi khi nén video {os.path.basename(video_path)}: {e}")
             import traceback
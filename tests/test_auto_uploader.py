@@ -0,0 +1,200 @@
+"""
+Kiểm thử cho FileWatcher trong auto_uploader.py (inotify và quét định kỳ)
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import inotify_watcher
+from src.utils.auto_uploader import FileWatcher, BulkUploader
+from src.utils.upload_job_queue import UploadJobQueue, SOURCE_BULK, STATUS_DONE
+
+def wait_until(condition, timeout=5.0):
+    """Chờ tới khi condition() đúng hoặc hết thời gian"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+class FakeInotify:
+    """Watcher giả: trả về từng lô sự kiện định sẵn, sau đó chờ tới khi bị đánh thức"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.woken = threading.Event()
+        self.closed = False
+
+    def read_events(self, timeout=None):
+        if self.batches:
+            return self.batches.pop(0)
+        self.woken.wait(timeout)
+        return []
+
+    def wake(self):
+        self.woken.set()
+
+    def close(self):
+        self.closed = True
+
+class TestFileWatcher(unittest.TestCase):
+    """Test cho FileWatcher"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.root = tempfile.mkdtemp()
+        self.folder = os.path.join(self.root, 'watch')
+        os.makedirs(self.folder)
+        self.found = []
+        self.watcher = FileWatcher(self.folder, extensions=['.mp4'], callback=self.found.append,
+                                   check_interval=0.2, settle_time=0.2)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        self.watcher.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write(self, name, size=10):
+        path = os.path.join(self.folder, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        return path
+
+    def test_missing_file_does_not_drop_event_batch(self):
+        """File biến mất giữa sự kiện và stat: bỏ qua, các sự kiện khác trong lô vẫn được xử lý"""
+        good = self._write('good.mp4')
+        missing = os.path.join(self.folder, 'gone.mp4')
+        self.watcher.inotify = FakeInotify([[
+            (inotify_watcher.IN_CLOSE_WRITE, missing),
+            (inotify_watcher.IN_CLOSE_WRITE, good),
+        ]])
+        self.watcher.running = True
+
+        # is_valid_file thấy file còn tồn tại, nhưng file bị xóa trước khi stat
+        with patch.object(self.watcher, 'is_valid_file', lambda path: True), \
+                patch.object(self.watcher, 'scan_folder', lambda: []):
+            thread = threading.Thread(target=self.watcher._watch_events, daemon=True)
+            thread.start()
+            self.assertTrue(wait_until(lambda: self.found == [good]))
+            self.watcher.running = False
+            self.watcher.inotify.wake()
+            thread.join(2)
+
+        self.assertNotIn(missing, self.watcher.watched_files)
+
+    def test_empty_file_expires_after_settle_window(self):
+        """File rỗng không nằm mãi trong danh sách chờ ổn định và không bị quét lại liên tục"""
+        path = self._write('empty.mp4', size=0)
+        self.watcher._queue_for_settle(self.watcher.scan_folder())
+        self.assertEqual(self.watcher._collect_settled(), [])
+        self.assertIn(path, self.watcher.settling_files)
+
+        time.sleep(0.3)
+        self.assertEqual(self.watcher._collect_settled(), [])
+        self.assertEqual(self.watcher.settling_files, {})
+        self.assertIsNone(self.watcher._settle_wait_time())
+
+        # Các lượt quét sau không đưa file rỗng trở lại danh sách chờ
+        self.assertEqual(self.watcher.scan_folder(), [])
+        self.assertEqual(self.watcher.scan_folder(), [])
+
+    def test_empty_file_detected_once_written(self):
+        """File rỗng được ghi nội dung sau đó vẫn được phát hiện và báo đúng một lần"""
+        path = self._write('late.mp4', size=0)
+        self.watcher._queue_for_settle(self.watcher.scan_folder())
+        time.sleep(0.3)
+        self.watcher._collect_settled()
+
+        self._write('late.mp4', size=10)
+        self.watcher._queue_for_settle(self.watcher.scan_folder())
+        time.sleep(0.3)
+        self.assertEqual(self.watcher._collect_settled(), [path])
+        self.assertEqual(self.watcher.scan_folder(), [])
+
+    def test_inotify_ignores_empty_close_write(self):
+        """IN_CLOSE_WRITE của file rỗng không được báo, lần ghi nội dung sau đó thì có"""
+        path = self._write('touched.mp4', size=0)
+        self.assertFalse(self.watcher._handle_event(inotify_watcher.IN_CLOSE_WRITE, path))
+
+        self._write('touched.mp4', size=10)
+        self.assertTrue(self.watcher._handle_event(inotify_watcher.IN_CLOSE_WRITE, path))
+
+    @unittest.skipUnless(inotify_watcher.is_supported(), "inotify không khả dụng")
+    def test_inotify_reports_written_file(self):
+        """Chế độ inotify: file ghi xong (IN_CLOSE_WRITE) được báo ngay"""
+        existing = self._write('existing.mp4')
+        self.watcher.start()
+        self.assertIsNotNone(self.watcher.inotify)
+        # Chờ lượt quét đầu tiên ghi nhận trạng thái ban đầu
+        self.assertTrue(wait_until(lambda: existing in self.watcher.watched_files))
+
+        path = self._write('new.mp4')
+        self._write('notes.txt')
+        self.assertTrue(wait_until(lambda: self.found == [path]))
+
+    @unittest.skipUnless(inotify_watcher.is_supported(), "inotify không khả dụng")
+    def test_falls_back_to_polling_when_folder_is_removed(self):
+        """Thư mục theo dõi bị xóa: watcher chuyển sang quét định kỳ thay vì dừng hẳn"""
+        self.watcher.start()
+        shutil.rmtree(self.folder)
+        self.assertTrue(wait_until(lambda: self.watcher.inotify is None))
+        self.assertTrue(self.watcher.watcher_thread.is_alive())
+
+        # Thư mục được tạo lại (ví dụ ổ đĩa gắn lại): file mới vẫn được phát hiện
+        os.makedirs(self.folder)
+        path = self._write('after.mp4')
+        self.assertTrue(wait_until(lambda: self.found == [path]))
+
+
+class SlowSender:
+    """Bộ gửi giả: mỗi video mất một khoảng thời gian để tải lên"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.started = threading.Event()
+
+    def upload_single_video(self, file_path):
+        self.started.set()
+        time.sleep(self.delay)
+        return True
+
+class TestBulkUploaderStop(unittest.TestCase):
+    """Test dừng BulkUploader khi đóng ứng dụng"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.job_queue = UploadJobQueue(os.path.join(self.temp_dir, 'upload_jobs.db'))
+        self.video = os.path.join(self.temp_dir, 'a.mp4')
+        with open(self.video, 'wb') as f:
+            f.write(b'x' * 10)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        self.job_queue.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_stop_waits_for_upload_in_flight(self):
+        """stop(wait=True) chờ video đang tải lên xong để kết quả được ghi trước khi đóng hàng đợi"""
+        job_id = self.job_queue.enqueue(self.video, source=SOURCE_BULK)
+        sender = SlowSender(delay=1.5)
+        uploader = BulkUploader(sender, job_queue=self.job_queue)
+        uploader.start()
+        self.assertTrue(sender.started.wait(5))
+
+        uploader.stop(wait=True)
+        self.assertFalse(uploader.upload_thread.is_alive())
+        self.assertEqual(self.job_queue.get_job(job_id)['status'], STATUS_DONE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Kiểm thử cho cache_eviction.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.cache_eviction import CacheEvictionEngine
+
+class TestCacheEvictionEngine(unittest.TestCase):
+    """Test cho CacheEvictionEngine"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: thư mục cache và chỉ mục tạm"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        os.makedirs(self.cache_dir)
+        self.db_file = os.path.join(self.temp_dir, "data", "cache_index.db")
+        self.engine = self.make_engine()
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        self.engine.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_engine(self):
+        """Ngân sách nhỏ: thumbnails 1000 byte, split_parts 5000 byte"""
+        return CacheEvictionEngine(self.cache_dir, self.db_file, max_total=10000,
+                                   budgets={'thumbnails': 1000, 'split_parts': 5000, 'other': 4000})
+
+    def write(self, category, name, size, age=0):
+        """Tạo file cache size byte, lần sửa cuối lùi về quá khứ age giây"""
+        path = self.engine.path_for(category, name)
+        with open(path, 'wb') as f:
+            f.write(b"x" * size)
+        if age:
+            past = time.time() - age
+            os.utime(path, (past, past))
+        return path
+
+    def write_to(self, engine, category, name, size):
+        """Tạo file cache size byte trong thư mục cache của engine"""
+        path = engine.path_for(category, name)
+        with open(path, 'wb') as f:
+            f.write(b"x" * size)
+        return path
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """Chỉ loại vượt ngân sách bị dọn, file lâu không dùng nhất bị xóa trước"""
+        oldest = self.write('thumbnails', 'a.jpg', 400, age=300)
+        middle = self.write('thumbnails', 'b.jpg', 400, age=200)
+        newest = self.write('thumbnails', 'c.jpg', 400, age=100)
+        part = self.write('split_parts', 'p1.mp4', 3000, age=1000)
+        self.engine.sync()
+
+        # Dùng lại file cũ nhất: nó trở thành mới nhất
+        self.assertEqual(self.engine.get(oldest), oldest)
+
+        removed, freed = self.engine.evict()
+        self.assertEqual((removed, freed), (1, 400))
+        self.assertFalse(os.path.exists(middle))
+        self.assertTrue(os.path.exists(oldest))
+        self.assertTrue(os.path.exists(newest))
+        self.assertTrue(os.path.exists(part))
+        self.assertEqual(self.engine.usage()['thumbnails'], 800)
+
+    def test_metrics(self):
+        """Đếm số lần trúng/trượt, số file và số byte đã xóa"""
+        for name in ('a.jpg', 'b.jpg', 'c.jpg'):
+            self.engine.put(self.write('thumbnails', name, 400))
+        self.engine.get('thumbnails/b.jpg')
+        self.engine.get('thumbnails/missing.jpg')
+        self.engine.evict()
+
+        metrics = self.engine.metrics()
+        self.assertEqual((metrics['hits'], metrics['misses']), (1, 1))
+        self.assertEqual(metrics['hit_rate'], 0.5)
+        self.assertEqual((metrics['evictions'], metrics['bytes_evicted']), (1, 400))
+        self.assertEqual(metrics['usage']['thumbnails'], 800)
+
+    def test_uncategorized_files_get_unused_budget(self):
+        """File không phân loại dùng phần max_total mà các loại riêng chưa dùng tới"""
+        engine = CacheEvictionEngine(os.path.join(self.temp_dir, "flat"), ':memory:', max_total=10000)
+        self.addCleanup(engine.close)
+        for i in range(8):
+            path = os.path.join(engine.cache_dir, f"file{i}.bin")
+            os.makedirs(engine.cache_dir, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b"x" * 1000)
+            engine.put(path)
+
+        # 8000 byte: vượt 10% của "other" nhưng vẫn trong tổng 10000 byte
+        self.assertEqual(engine.evict(), (0, 0))
+        self.assertEqual(engine.metrics()['budgets']['other'], 10000)
+
+        # Một file nhỏ thuộc loại riêng chỉ bớt đúng phần nó dùng khỏi ngân sách "other"
+        engine.put(self.write_to(engine, 'thumbnails', 't.jpg', 10))
+        self.assertEqual(engine.evict(), (0, 0))
+        self.assertEqual(engine.metrics()['budgets']['other'], 9990)
+
+        # Loại riêng lớn dần: "other" chỉ bị dọn phần vượt, không xóa một lần toàn bộ
+        engine.put(self.write_to(engine, 'thumbnails', 'u.jpg', 2490))
+        self.assertEqual(engine.metrics()['budgets']['other'], 7500)
+        self.assertEqual(engine.evict(), (3, 3000))
+        self.assertEqual(engine.usage()['thumbnails'], 2500)
+        self.assertEqual(engine.usage()['other'], 5000)
+
+    def test_index_persists_between_instances(self):
+        """Chỉ mục và số liệu được lưu lại cho lần khởi động sau"""
+        path = self.write('split_parts', 'p1.mp4', 2000)
+        self.engine.put(path)
+        for name in ('a.jpg', 'b.jpg', 'c.jpg'):
+            self.engine.put(self.write('thumbnails', name, 400))
+        self.engine.evict()
+        self.engine.close()
+
+        self.engine = self.make_engine()
+        self.assertEqual(self.engine.usage()['split_parts'], 2000)
+        self.assertEqual(self.engine.metrics()['evictions'], 1)
+
+        # File bị xóa từ bên ngoài được bỏ khỏi chỉ mục khi đồng bộ
+        os.remove(path)
+        self.assertEqual(self.engine.sync(), (0, 1))
+        self.assertEqual(self.engine.usage()['split_parts'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Kiểm thử cho disk_reservation.py (dung lượng trống được giả lập)
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import disk_reservation
+from src.utils.disk_reservation import DiskSpaceReserver, InsufficientDiskSpaceError
+from src.utils import video_splitter
+from src.utils.video_splitter import VideoSplitter
+
+class TestDiskSpaceReserver(unittest.TestCase):
+    """Test cho DiskSpaceReserver"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: ổ đĩa giả còn 1000 byte trống"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.free = 1000
+        patcher = patch.object(disk_reservation, 'free_space', lambda path: self.free)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reserver = DiskSpaceReserver(margin=100, poll_interval=0.05)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_reservations_share_free_space(self):
+        """Các phần đặt trước cùng trừ vào dung lượng trống, trả lại khi ra khỏi khối with"""
+        first = self.reserver.reserve(self.temp_dir, 600)
+        self.assertEqual(self.reserver.available(self.temp_dir), 300)
+        with self.assertRaises(InsufficientDiskSpaceError):
+            self.reserver.reserve(self.temp_dir, 400, timeout=0)
+
+        with first:
+            # Ghi 200 byte: ổ đĩa giảm 200 byte, phần giữ chỗ cũng giảm 200 byte
+            self.free -= 200
+            first.consume(200)
+            self.assertEqual(self.reserver.reserved(self.temp_dir), 400)
+        self.assertEqual(self.reserver.reserved(self.temp_dir), 0)
+        self.assertEqual(self.reserver.available(self.temp_dir), 700)
+
+    def test_waits_until_space_is_released(self):
+        """Tác vụ thiếu chỗ được xếp hàng và chạy tiếp khi phần đã tải lên được xóa"""
+        # Phần đã ghi xong (consume), đang chờ tải lên
+        part = os.path.join(self.temp_dir, "part001.mp4")
+        with self.reserver.reserve(self.temp_dir, 10) as reservation:
+            with open(part, 'wb') as f:
+                f.write(b"x" * 10)
+            reservation.consume(10)
+        self.free = 300
+
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(self.reserver.reserve(self.temp_dir, 500, timeout=5)))
+        waiter.start()
+        time.sleep(0.2)
+        self.assertEqual(acquired, [])
+
+        self.free = 900
+        self.assertTrue(self.reserver.release_file(part))
+        waiter.join(2)
+        self.assertEqual(len(acquired), 1)
+        self.assertFalse(os.path.exists(part))
+        self.assertEqual(self.reserver.reserved(self.temp_dir), 500)
+
+    def test_fails_fast_when_request_can_never_fit(self):
+        """Không có gì để chờ giải phóng: báo lỗi ngay thay vì chờ hết thời gian"""
+        started = time.monotonic()
+        with self.assertRaises(InsufficientDiskSpaceError):
+            self.reserver.reserve(self.temp_dir, 950, timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+
+class TestSplitParts(unittest.TestCase):
+    """Test cho VideoSplitter._split_parts khi FFmpeg lỗi giữa chừng"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: FFmpeg giả, phần thứ 2 bị lỗi"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.reserver = DiskSpaceReserver(margin=0, poll_interval=0.05)
+        for patcher in (patch.object(disk_reservation, 'free_space', lambda path: 10 ** 9),
+                        patch.object(video_splitter, 'get_reserver', lambda: self.reserver),
+                        patch.object(video_splitter.subprocess, 'run', self.fake_run)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.splitter = VideoSplitter.__new__(VideoSplitter)
+        self.splitter.ffmpeg_path = "ffmpeg"
+        self.calls = 0
+
+    def fake_run(self, cmd, **kwargs):
+        """Ghi file đầu ra, lần gọi thứ 2 trả về mã lỗi"""
+        self.calls += 1
+        with open(cmd[-1], 'wb') as f:
+            f.write(b"x" * 100)
+        return SimpleNamespace(returncode=1 if self.calls == 2 else 0)
+
+    def test_failed_part_aborts_split(self):
+        """Một phần lỗi: hủy cả lần chia, xóa các phần đã tạo và trả lại dung lượng"""
+        reservation = self.reserver.reserve(self.temp_dir, 1000)
+        with reservation:
+            parts = self.splitter._split_parts("video.mp4", self.temp_dir, "video", 3, 10.0, reservation)
+
+        self.assertEqual(parts, [])
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        self.assertEqual(self.reserver.reserved(self.temp_dir), 0)
+        self.assertEqual(self.reserver._written, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Kiểm thử cho ffmpeg_registry.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import ffmpeg_registry
+from src.utils.ffmpeg_registry import FFmpegRegistry, parse_names
+
+MUXERS_OUTPUT = """File formats:
+ D. = Demuxing supported
+ .E = Muxing supported
+ --
+  E matroska,webm       Matroska
+  E mp4             MP4 (MPEG-4 Part 14)
+"""
+
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+def fake_run_ffmpeg(path, *args):
+    """Kết quả giả của ffmpeg theo tham số"""
+    return {
+        "-version": "ffmpeg version 6.1 Copyright (c) 2000-2023\nbuilt with gcc",
+        "-muxers": MUXERS_OUTPUT,
+        "-encoders": ENCODERS_OUTPUT
+    }[args[0]]
+
+class TestFFmpegRegistry(unittest.TestCase):
+    """Test cho FFmpegRegistry"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: thư mục ffmpeg giả và file cache tạm"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.ffmpeg_dir = os.path.join(self.temp_dir, "ffmpeg")
+        os.makedirs(self.ffmpeg_dir)
+        exe_ext = ".exe" if sys.platform == "win32" else ""
+        self.ffmpeg_path = os.path.join(self.ffmpeg_dir, f"ffmpeg{exe_ext}")
+        for name in ("ffmpeg", "ffprobe"):
+            with open(os.path.join(self.ffmpeg_dir, f"{name}{exe_ext}"), 'wb') as f:
+                f.write(name.encode())
+        self.cache_file = os.path.join(self.temp_dir, "data", "ffmpeg_capabilities.json")
+
+        patcher = patch.object(ffmpeg_registry, 'run_ffmpeg', side_effect=fake_run_ffmpeg)
+        self.run_ffmpeg = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parse_names(self):
+        """Đọc tên muxer/encoder từ bảng của ffmpeg"""
+        self.assertEqual(parse_names(MUXERS_OUTPUT), ["matroska", "mp4", "webm"])
+        self.assertEqual(parse_names(ENCODERS_OUTPUT), ["aac", "libx264"])
+
+    def test_probe_once_and_reuse_disk_cache(self):
+        """ffmpeg chỉ chạy một lần; registry mới dùng lại cache trên đĩa"""
+        registry = FFmpegRegistry(self.ffmpeg_dir, self.cache_file)
+        self.assertTrue(registry.is_available())
+        self.assertEqual(registry.ffmpeg_path, self.ffmpeg_path)
+        self.assertEqual(registry.version, "ffmpeg version 6.1 Copyright (c) 2000-2023")
+        self.assertTrue(registry.has_muxer("webm"))
+        self.assertTrue(registry.has_encoder("libx264"))
+        self.assertEqual(self.run_ffmpeg.call_count, 3)
+
+        other = FFmpegRegistry(self.ffmpeg_dir, self.cache_file)
+        self.assertTrue(other.is_available())
+        self.assertEqual(self.run_ffmpeg.call_count, 3)
+
+    def test_changed_binary_is_probed_again(self):
+        """Đổi file ffmpeg (kích thước/thời điểm sửa) thì chạy lại ffmpeg"""
+        registry = FFmpegRegistry(self.ffmpeg_dir, self.cache_file)
+        registry.resolve()
+
+        with open(self.ffmpeg_path, 'ab') as f:
+            f.write(b" updated")
+        registry.resolve()
+        self.assertEqual(self.run_ffmpeg.call_count, 6)
+
+    def test_missing_ffmpeg(self):
+        """Không có ffmpeg chạy được: không khả dụng, không chạy lại mỗi lần kiểm tra"""
+        self.run_ffmpeg.side_effect = lambda path, *args: None
+        registry = FFmpegRegistry(self.ffmpeg_dir, self.cache_file)
+        self.assertFalse(registry.is_available())
+        self.assertFalse(registry.is_available())
+        self.assertEqual(self.run_ffmpeg.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
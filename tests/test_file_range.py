@@ -0,0 +1,67 @@
+"""
+Kiểm thử cho file_range.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.file_range import FileRange, detect_ts_packet_size, plan_ranges
+
+class TestFileRange(unittest.TestCase):
+    """Test cho FileRange và các hàm chia đoạn"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: file TS giả gồm 1000 packet"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.ts_path = os.path.join(self.temp_dir, "video.ts")
+        with open(self.ts_path, 'wb') as f:
+            for i in range(1000):
+                f.write(bytes([0x47]) + bytes([i % 256]) * 187)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_detect_ts_packet_size(self):
+        """Nhận dạng MPEG-TS theo byte đồng bộ, bỏ qua file khác"""
+        self.assertEqual(detect_ts_packet_size(self.ts_path), 188)
+
+        other = os.path.join(self.temp_dir, "video.mp4")
+        with open(other, 'wb') as f:
+            f.write(b"\x00\x00\x00\x20ftypisom" + b"\x00" * 4000)
+        self.assertIsNone(detect_ts_packet_size(other))
+
+    def test_ranges_cover_file_on_packet_boundaries(self):
+        """Các đoạn liền nhau, phủ toàn bộ file và cắt đúng ranh giới packet"""
+        ranges = plan_ranges(188 * 1000, 50000, align=188)
+        self.assertEqual(ranges[0], (0, 188 * 265))
+        self.assertEqual(sum(length for _, length in ranges), 188 * 1000)
+        for (offset, length), (next_offset, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(offset + length, next_offset)
+            self.assertEqual(next_offset % 188, 0)
+
+    def test_reader_returns_only_its_range(self):
+        """Đọc một đoạn như một file riêng, đọc lại được từ đầu khi thử lại"""
+        with open(self.ts_path, 'rb') as f:
+            data = f.read()
+        part = FileRange(self.ts_path, 188 * 10, 188 * 5, "video_part002.ts")
+
+        with part.open() as reader:
+            self.assertEqual(len(reader), 188 * 5)
+            self.assertEqual(reader.read(100), data[1880:1980])
+            self.assertEqual(len(reader), 188 * 5 - 100)
+            self.assertEqual(reader.read(), data[1980:1880 + 940])
+            self.assertEqual(reader.read(), b"")
+
+            reader.seek(0)
+            self.assertEqual(reader.read(), data[1880:2820])
+        self.assertEqual(reader.name, "video_part002.ts")
+
+
+if __name__ == '__main__':
+    unittest.main()
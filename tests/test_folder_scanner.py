@@ -0,0 +1,61 @@
+"""
+Kiểm thử cho folder_scanner.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.folder_scanner import FolderScanner
+
+class TestFolderScanner(unittest.TestCase):
+    """Test cho FolderScanner"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'sub', 'deep'))
+        self._touch('a.mp4', 10)
+        self._touch('notes.txt', 5)
+        self._touch(os.path.join('sub', 'b.MKV'), 20)
+        self._touch(os.path.join('sub', 'deep', 'c.avi'), 30)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _touch(self, relative_path, size):
+        with open(os.path.join(self.root, relative_path), 'wb') as f:
+            f.write(b'\0' * size)
+
+    def test_recursive_scan_filters_extensions(self):
+        """Quét đệ quy, lọc theo phần mở rộng (không phân biệt hoa thường) và lấy kích thước"""
+        videos = FolderScanner().scan(self.root)
+
+        sizes = {video['name']: video['file_size_bytes'] for video in videos}
+        self.assertEqual(sizes, {'a.mp4': 10, 'b.MKV': 20, 'c.avi': 30})
+
+    def test_non_recursive_scan(self):
+        """Chế độ không đệ quy chỉ lấy file ở thư mục gốc"""
+        videos = FolderScanner(recursive=False).scan(self.root)
+
+        self.assertEqual([video['name'] for video in videos], ['a.mp4'])
+
+    def test_incremental_rescan_detects_changes(self):
+        """Quét lại tăng dần phát hiện file được thêm và xóa trong thư mục con"""
+        scanner = FolderScanner()
+        self.assertEqual(len(scanner.scan(self.root)), 3)
+
+        self._touch(os.path.join('sub', 'deep', 'd.mp4'), 1)
+        os.remove(os.path.join(self.root, 'sub', 'b.MKV'))
+
+        names = sorted(video['name'] for video in scanner.rescan(self.root))
+        self.assertEqual(names, ['a.mp4', 'c.avi', 'd.mp4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Kiểm thử cho lazy_import.py
+"""
+import os
+import sys
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.lazy_import import lazy_import, warm_up
+
+class TestLazyImport(unittest.TestCase):
+    """Test cho lazy_import và warm_up"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: bỏ module thử khỏi sys.modules"""
+        sys.modules.pop("colorsys", None)
+        self.addCleanup(sys.modules.pop, "colorsys", None)
+
+    def test_module_loaded_on_first_attribute_access(self):
+        """Proxy chỉ import module thật khi truy cập thuộc tính lần đầu"""
+        colorsys = lazy_import("colorsys")
+        self.assertFalse(colorsys.is_loaded)
+        self.assertNotIn("colorsys", sys.modules)
+
+        self.assertEqual(colorsys.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertTrue(colorsys.is_loaded)
+        self.assertIn("colorsys", sys.modules)
+
+    def test_missing_module_fails_only_when_used(self):
+        """Thiếu thư viện chỉ báo lỗi khi dùng đến"""
+        missing = lazy_import("module_khong_ton_tai")
+        with self.assertRaises(ImportError):
+            missing.something
+
+    def test_warm_up_imports_in_background(self):
+        """warm_up nạp sẵn module trong thread nền và bỏ qua module thiếu"""
+        thread = warm_up(["colorsys", "module_khong_ton_tai"])
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertIn("colorsys", sys.modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Kiểm thử cho range_downloader.py (dùng máy chủ HTTP cục bộ phục vụ file giả)
+"""
+import io
+import os
+import sys
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import range_downloader
+from src.utils.range_downloader import RangeDownloader
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Phục vụ server.payload, hỗ trợ header Range; server.cut_after cắt kết nối sau N byte"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        payload = self.server.payload
+        start, end = 0, len(payload) - 1
+        range_header = self.headers.get('Range')
+        if range_header:
+            first, _, last = range_header.replace('bytes=', '').partition('-')
+            start = int(first)
+            end = int(last) if last else end
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(payload)}")
+        else:
+            self.send_response(200)
+        body = payload[start:end + 1]
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"fake-archive"')
+        self.end_headers()
+
+        if self.server.cut_after is not None and len(body) > 1:
+            body = body[:self.server.cut_after]
+            self.close_connection = True
+        self.server.served += len(body)
+        self.wfile.write(body)
+
+class TestRangeDownloader(unittest.TestCase):
+    """Test cho RangeDownloader"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: máy chủ HTTP cục bộ và thư mục tạm"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+        self.server.payload = os.urandom(300 * 1024)
+        self.server.cut_after = None
+        self.server.served = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/ffmpeg.bin"
+        self.dest = os.path.join(self.temp_dir, "ffmpeg.bin")
+
+        # Chia đoạn nhỏ để file thử cũng được tải song song
+        patcher = patch.object(range_downloader, 'MIN_SEGMENT_SIZE', 64 * 1024)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parallel_download_with_checksum(self):
+        """Tải song song nhiều đoạn, kiểm tra SHA-256 và báo tiến trình"""
+        progress = []
+        expected = hashlib.sha256(self.server.payload).hexdigest()
+        downloader = RangeDownloader(self.url, self.dest, connections=4, expected_sha256=expected,
+                                     progress=lambda done, total: progress.append((done, total)))
+        downloader.download()
+
+        self.assertEqual(len(downloader.segments), 4)
+        with open(self.dest, 'rb') as f:
+            self.assertEqual(f.read(), self.server.payload)
+        self.assertEqual(progress[-1], (len(self.server.payload), len(self.server.payload)))
+        self.assertFalse(os.path.exists(downloader.part_path))
+        self.assertFalse(os.path.exists(downloader.state_path))
+
+    def test_resume_after_interruption(self):
+        """Bị ngắt giữa chừng thì lần sau chỉ tải phần còn thiếu"""
+        self.server.cut_after = 20 * 1024
+        with self.assertRaises(Exception):
+            RangeDownloader(self.url, self.dest, connections=4, retries=0).download()
+        self.assertTrue(os.path.exists(self.dest + '.part.json'))
+
+        self.server.cut_after = None
+        self.server.served = 0
+        RangeDownloader(self.url, self.dest, connections=4, retries=0).download()
+        with open(self.dest, 'rb') as f:
+            self.assertEqual(f.read(), self.server.payload)
+        self.assertLess(self.server.served, len(self.server.payload))
+
+    def test_checksum_mismatch(self):
+        """SHA-256 sai thì báo lỗi và không để lại file"""
+        downloader = RangeDownloader(self.url, self.dest, expected_sha256="0" * 64)
+        with self.assertRaises(ValueError):
+            downloader.download()
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(downloader.part_path))
+
+    def test_extract_tar_while_downloading(self):
+        """Giải nén tar.xz trong lúc tải, chỉ lấy các file được chọn"""
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode='w:xz') as tar:
+            for name, data in (("build/bin/ffmpeg", b"ffmpeg" * 1000), ("build/bin/ffplay", b"ffplay"),
+                               ("build/bin/ffprobe", os.urandom(100 * 1024))):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        self.server.payload = archive.getvalue()
+
+        extract_dir = os.path.join(self.temp_dir, "extracted")
+        downloader = RangeDownloader(self.url, self.dest + ".tar.xz",
+                                     expected_sha256=hashlib.sha256(self.server.payload).hexdigest())
+        extracted = downloader.download_and_extract_tar(
+            extract_dir, member_filter=lambda member: os.path.basename(member.name) != "ffplay")
+
+        self.assertEqual(sorted(os.path.basename(path) for path in extracted), ["ffmpeg", "ffprobe"])
+        with open(os.path.join(extract_dir, "build", "bin", "ffmpeg"), 'rb') as f:
+            self.assertEqual(f.read(), b"ffmpeg" * 1000)
+        self.assertFalse(os.path.exists(os.path.join(extract_dir, "build", "bin", "ffplay")))
+        with open(self.dest + ".tar.xz", 'rb') as f:
+            self.assertEqual(f.read(), self.server.payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Kiểm thử cho size_accountant.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.size_accountant import DirectorySizeAccountant
+
+class TestDirectorySizeAccountant(unittest.TestCase):
+    """Test cho DirectorySizeAccountant"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: cây thư mục cache giả"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, "cache")
+        for sub in ("a", "b", os.path.join("b", "c")):
+            os.makedirs(os.path.join(self.root, sub))
+        self.write("top.bin", 100)
+        self.write(os.path.join("a", "one.bin"), 200)
+        self.write(os.path.join("b", "c", "two.bin"), 300)
+        self.age_dirs()
+        self.cache_file = os.path.join(self.temp_dir, "data", "dir_sizes.json")
+        self.accountant = DirectorySizeAccountant(self.cache_file)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name, size):
+        """Tạo file size byte trong cây thư mục"""
+        path = os.path.join(self.root, name)
+        with open(path, 'wb') as f:
+            f.write(b"x" * size)
+        return path
+
+    def age_dirs(self, *names):
+        """Lùi mtime các thư mục (mặc định mọi thư mục) về quá khứ, như thể đã ổn định từ lâu"""
+        past = time.time() - (30 if names else 60)
+        paths = [os.path.join(self.root, name) for name in names] or [d for d, _, _ in os.walk(self.root)]
+        for path in paths:
+            os.utime(path, (past, past))
+
+    def test_cached_until_a_directory_changes(self):
+        """Lần đầu quét toàn bộ; sau đó chỉ quét lại thư mục có thay đổi"""
+        self.assertEqual(self.accountant.get_size(self.root), 600)
+        self.assertEqual(self.accountant.scanned_dirs, 4)
+
+        self.assertEqual(self.accountant.get_size(self.root), 600)
+        self.assertEqual(self.accountant.scanned_dirs, 4)
+
+        self.write(os.path.join("b", "c", "three.bin"), 50)
+        self.age_dirs(os.path.join("b", "c"))
+        self.assertEqual(self.accountant.get_size(self.root), 650)
+        self.assertEqual(self.accountant.scanned_dirs, 5)
+
+        shutil.rmtree(os.path.join(self.root, "b"))
+        self.age_dirs("")
+        self.assertEqual(self.accountant.get_size(self.root), 300)
+
+    def test_recorded_changes_do_not_rescan(self):
+        """Thay đổi do ứng dụng ghi nhận được cập nhật trực tiếp"""
+        self.accountant.get_size(self.root)
+        scanned = self.accountant.scanned_dirs
+
+        # Thư mục vừa bị sửa (chưa qua MTIME_SETTLE_SECONDS) nhưng thay đổi đã được ghi nhận
+        path = os.path.join(self.root, "a", "one.bin")
+        os.remove(path)
+        self.accountant.record_removed(path, 200)
+        self.assertEqual(self.accountant.get_size(self.root), 400)
+        self.assertEqual(self.accountant.scanned_dirs, scanned)
+
+        self.write(os.path.join("a", "new.bin"), 70)
+        self.accountant.record_added(os.path.join(self.root, "a", "new.bin"), 70)
+        self.assertEqual(self.accountant.get_size(self.root), 470)
+        self.assertEqual(self.accountant.scanned_dirs, scanned)
+
+    def test_cache_persists_between_instances(self):
+        """Lần khởi động sau dùng lại cache trên đĩa"""
+        self.accountant.get_size(self.root)
+
+        other = DirectorySizeAccountant(self.cache_file)
+        self.assertEqual(other.get_size(self.root), 600)
+        self.assertEqual(other.scanned_dirs, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ Kiểm thử cho splash_screen.py (PyQt6 version)
 """
 import os
 import sys
+import time
 import pytest
 import unittest
 from unittest.mock import MagicMock, patch
@@ -13,7 +14,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 # Sử dụng PyQt6 thay vì PyQt5
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt, QTimer
-from src.ui.splash_screen import SplashScreen, show_splash_screen
+from src.ui import splash_screen
+from src.ui.splash_screen import SplashScreen, show_splash_screen, STEP_DEPENDENCIES, STEP_FFMPEG
 
 # Kiểm tra xem có QApplication tồn tại không
 app = QApplication.instance()
@@ -42,9 +44,6 @@ class TestSplashScreen(unittest.TestCase):
         """Dọn dẹp sau mỗi test case"""
         if hasattr(self, 'splash'):
             # Dừng tất cả timer
-            if hasattr(self.splash, 'process_timer') and self.splash.process_timer.isActive():
-                self.splash.process_timer.stop()
-
             if hasattr(self.splash, 'ffmpeg_status_timer') and self.splash.ffmpeg_status_timer.isActive():
                 self.splash.ffmpeg_status_timer.stop()
 
@@ -73,11 +72,11 @@ class TestSplashScreen(unittest.TestCase):
         mock_check_internet.return_value = True
 
         # Gọi hàm xử lý bước đầu tiên
-        self.splash.process_next_step()
+        self.splash.start_step(0)
 
         # Kiểm tra kết quả
         mock_check_internet.assert_called_once()
-        self.assertEqual(self.splash.current_step, 1)  # Đã tăng lên bước 2
+        self.assertIn(0, self.splash.completed_steps)
 
     @patch('src.ui.splash_screen.SplashScreen.check_pip_installation')
     def test_process_step_2(self, mock_check_pip):
@@ -85,15 +84,12 @@ class TestSplashScreen(unittest.TestCase):
         # Giả lập kết quả kiểm tra pip
         mock_check_pip.return_value = True
 
-        # Thiết lập bước hiện tại là 1
-        self.splash.current_step = 1
-
         # Gọi hàm xử lý bước tiếp theo
-        self.splash.process_next_step()
+        self.splash.start_step(1)
 
         # Kiểm tra kết quả
         mock_check_pip.assert_called_once()
-        self.assertEqual(self.splash.current_step, 2)  # Đã tăng lên bước 3
+        self.assertIn(1, self.splash.completed_steps)
 
     @patch('src.ui.splash_screen.SplashScreen.setup_ssl_automatically')
     def test_process_step_3(self, mock_setup_ssl):
@@ -101,14 +97,11 @@ class TestSplashScreen(unittest.TestCase):
         # Giả lập kết quả thiết lập SSL
         mock_setup_ssl.return_value = True
 
-        # Thiết lập bước hiện tại là 2
-        self.splash.current_step = 2
-
         # Gọi hàm xử lý bước tiếp theo
-        self.splash.process_next_step()
+        self.splash.start_step(2)
 
         # Kiểm tra kết quả
-        self.assertEqual(self.splash.current_step, 3)  # Đã tăng lên bước 4
+        self.assertIn(2, self.splash.completed_steps)
 
     @patch('os.makedirs')
     @patch('os.path.exists')
@@ -118,20 +111,17 @@ class TestSplashScreen(unittest.TestCase):
         # Giả lập kết quả kiểm tra file tồn tại
         mock_exists.return_value = True
 
-        # Thiết lập bước hiện tại là 3
-        self.splash.current_step = 3
-
         # Gọi hàm xử lý bước tiếp theo
         with patch('configparser.ConfigParser') as mock_config:
             config_instance = mock_config.return_value
             config_instance.__getitem__.return_value = {}
             config_instance.has_section.return_value = True
 
-            self.splash.process_next_step()
+            self.splash.start_step(3)
 
         # Kiểm tra kết quả
         mock_makedirs.assert_called()
-        self.assertEqual(self.splash.current_step, 4)  # Đã tăng lên bước 5
+        self.assertIn(3, self.splash.completed_steps)
 
     @patch('src.ui.splash_screen.SplashScreen.check_internet_connection')
     def test_process_step_5(self, mock_check_internet):
@@ -139,23 +129,20 @@ class TestSplashScreen(unittest.TestCase):
         # Giả lập kết quả kiểm tra internet
         mock_check_internet.return_value = True
 
-        # Thiết lập ffmpeg_manager và bước hiện tại
+        # Thiết lập ffmpeg_manager
         self.splash.ffmpeg_manager = self.ffmpeg_manager
-        self.splash.current_step = 4
 
         # Gọi hàm xử lý bước tiếp theo
-        self.splash.process_next_step()
+        self.splash.start_step(4)
 
         # Kiểm tra kết quả
-        self.assertEqual(self.splash.current_step, 5)  # Đã tăng lên bước 6
+        self.assertIn(4, self.splash.completed_steps)
 
     @patch('configparser.ConfigParser')
     @patch('os.path.exists')
     @patch('builtins.open', new_callable=unittest.mock.mock_open)
     def test_process_step_6(self, mock_open, mock_exists, mock_config):
         """Kiểm tra bước 6: Kiểm tra kết nối Telegram"""
-        # Bỏ qua mock cho ConfigModal vì phức tạp
-        self.splash.current_step = 5
         self.splash.config_completed = True
 
         # Giả lập ConfigParser
@@ -170,30 +157,24 @@ class TestSplashScreen(unittest.TestCase):
             # Mock telegram_ui module
             with patch('src.ui.telegram.telegram_ui.ConfigModal'):
                 # Gọi hàm xử lý bước tiếp theo
-                self.splash.process_next_step()
+                self.splash.start_step(5)
 
         # Kiểm tra kết quả - nếu config_completed là True, nó sẽ tăng bước
-        self.assertEqual(self.splash.current_step, 6)  # Đã tăng lên bước 7
+        self.assertIn(5, self.splash.completed_steps)
 
     def test_process_step_7(self):
         """Kiểm tra bước 7: Tải các thành phần giao diện"""
-        # Thiết lập bước hiện tại
-        self.splash.current_step = 6
-
         # Thay thế time.sleep để tránh làm chậm test
         with patch('time.sleep'):
             # Gọi hàm xử lý bước tiếp theo
-            self.splash.process_next_step()
+            self.splash.start_step(6)
 
         # Kiểm tra kết quả
-        self.assertEqual(self.splash.current_step, 7)  # Đã tăng lên bước 8
+        self.assertIn(6, self.splash.completed_steps)
 
     @patch('src.ui.splash_screen.DiskSpaceChecker')
     def test_process_step_8(self, mock_disk_checker_class):
         """Kiểm tra bước 8: Kiểm tra không gian lưu trữ"""
-        # Thiết lập bước hiện tại
-        self.splash.current_step = 7
-
         # Giả lập kết quả kiểm tra không gian
         mock_instance = mock_disk_checker_class.return_value
         mock_instance.check_all.return_value = {
@@ -208,18 +189,15 @@ class TestSplashScreen(unittest.TestCase):
 
         # Gọi hàm xử lý bước tiếp theo
         with patch('PyQt6.QtWidgets.QMessageBox'):
-            self.splash.process_next_step()
+            self.splash.start_step(7)
 
         # Kiểm tra kết quả
         mock_instance.check_all.assert_called_once()
-        self.assertEqual(self.splash.current_step, 8)  # Đã tăng lên bước 9
+        self.assertIn(7, self.splash.completed_steps)
 
     @patch('src.ui.splash_screen.UpdateChecker')
     def test_process_step_9(self, mock_update_checker_class):
         """Kiểm tra bước 9: Tìm kiếm cập nhật"""
-        # Thiết lập bước hiện tại
-        self.splash.current_step = 8
-
         # Giả lập đối tượng UpdateChecker
         mock_instance = mock_update_checker_class.return_value
 
@@ -236,18 +214,15 @@ class TestSplashScreen(unittest.TestCase):
         mock_instance.check_for_updates_async.side_effect = fake_check_async
 
         # Gọi hàm xử lý bước tiếp theo
-        self.splash.process_next_step()
+        self.splash.start_step(8)
 
         # Kiểm tra kết quả
         mock_instance.check_for_updates_async.assert_called_once()
-        # Bước tiếp theo được xử lý trong callback, nên không kiểm tra current_step ở đây
+        # Bước kết thúc trong callback
 
     @patch('src.ui.splash_screen.PerformanceOptimizer')
     def test_process_step_10(self, mock_optimizer_class):
         """Kiểm tra bước 10: Tối ưu hóa hiệu suất"""
-        # Thiết lập bước hiện tại
-        self.splash.current_step = 9
-
         # Giả lập đối tượng PerformanceOptimizer
         mock_instance = mock_optimizer_class.return_value
 
@@ -266,11 +241,73 @@ class TestSplashScreen(unittest.TestCase):
         mock_instance.optimize_async.side_effect = fake_optimize_async
 
         # Gọi hàm xử lý bước tiếp theo
-        self.splash.process_next_step()
+        self.splash.start_step(9)
 
         # Kiểm tra kết quả
         mock_instance.optimize_async.assert_called_once()
-        # Bước tiếp theo được xử lý trong callback, nên không kiểm tra current_step ở đây
+        # Bước kết thúc trong callback
+
+    def run_pipeline(self, ffmpeg_manager=None, timeout=5):
+        """Chạy pipeline khởi động, xử lý sự kiện tới khi phát tín hiệu finished"""
+        finished = []
+        self.splash.finished.connect(finished.append)
+        with patch('src.ui.splash_screen.StartupFingerprint'):
+            self.splash.start_setup_process(ffmpeg_manager)
+            deadline = time.time() + timeout
+            while not finished and time.time() < deadline:
+                app.processEvents()
+                time.sleep(0.005)
+        return finished
+
+    def complete_immediately(self, order, skip=()):
+        """Thay hàm của các bước (trừ skip) bằng hàm kết thúc ngay, ghi lại thứ tự bắt đầu"""
+        for index in range(self.splash.total_steps):
+            if index in skip:
+                continue
+            self.splash.step_handlers[index] = (
+                lambda index=index: (order.append(index), self.splash.complete_step(index)))
+
+    def test_pipeline_respects_dependencies(self):
+        """Pipeline chạy mọi bước, mỗi bước chỉ bắt đầu sau các bước nó phụ thuộc"""
+        order = []
+        self.complete_immediately(order)
+
+        self.assertEqual(len(self.run_pipeline()), 1)
+        self.assertEqual(sorted(order), list(range(self.splash.total_steps)))
+        for index, deps in STEP_DEPENDENCIES.items():
+            for dep in deps:
+                self.assertLess(order.index(dep), order.index(index))
+        self.assertTrue(all(info['status'] == "success" for info in self.splash.step_timings.values()))
+
+    @patch.object(splash_screen, 'STEP_RETRY_DELAY', 0)
+    @patch('src.ui.splash_screen.SplashScreen.check_internet_connection')
+    def test_failed_step_is_retried(self, mock_check_internet):
+        """Bước tải FFmpeg lỗi kết nối được chạy lại, không làm treo màn hình chào"""
+        mock_check_internet.side_effect = [False, True]
+        self.ffmpeg_manager.is_available = False
+
+        def setup_ffmpeg():
+            self.ffmpeg_manager.is_available = True
+            return True
+        self.ffmpeg_manager.setup_ffmpeg.side_effect = setup_ffmpeg
+        self.complete_immediately([], skip=(STEP_FFMPEG,))
+
+        self.assertEqual(len(self.run_pipeline(self.ffmpeg_manager)), 1)
+        self.assertEqual(self.splash.step_attempts, {STEP_FFMPEG: 1})
+        self.assertEqual(self.splash.step_timings[STEP_FFMPEG]['status'], "success")
+
+    @patch.object(splash_screen, 'STEP_RETRY_DELAY', 0)
+    @patch('src.ui.splash_screen.SplashScreen.check_internet_connection')
+    def test_step_gives_up_after_retries(self, mock_check_internet):
+        """Bước vẫn lỗi sau số lần thử lại tối đa thì kết thúc với trạng thái lỗi"""
+        mock_check_internet.return_value = False
+        self.ffmpeg_manager.is_available = False
+        self.complete_immediately([], skip=(STEP_FFMPEG,))
+
+        self.assertEqual(len(self.run_pipeline(self.ffmpeg_manager)), 1)
+        self.assertEqual(mock_check_internet.call_count, splash_screen.STEP_MAX_RETRIES + 1)
+        self.assertEqual(self.splash.step_timings[STEP_FFMPEG]['status'], "error")
+        self.ffmpeg_manager.setup_ffmpeg.assert_not_called()
 
     @patch('src.ui.splash_screen.SplashScreen')
     def test_show_splash_screen(self, mock_splash_screen_class):
@@ -0,0 +1,69 @@
+"""
+Kiểm thử cho startup_fingerprint.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import startup_fingerprint
+from src.utils.startup_fingerprint import StartupFingerprint
+
+class TestStartupFingerprint(unittest.TestCase):
+    """Test cho StartupFingerprint"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: file ffmpeg giả và file dấu vân tay tạm"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.ffmpeg_path = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.ffmpeg_path, 'wb') as f:
+            f.write(b"ffmpeg")
+        self.fingerprint = StartupFingerprint(os.path.join(self.temp_dir, "data", "fingerprint.json"))
+
+        # Không chạy ffmpeg thật, đếm số lần đọc phiên bản
+        patcher = patch.object(startup_fingerprint, 'ffmpeg_version', return_value="ffmpeg version 6.1")
+        self.ffmpeg_version = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_matches_after_record_without_running_ffmpeg(self):
+        """Khớp sau khi lưu; phiên bản ffmpeg không đọc lại khi file không đổi"""
+        self.assertFalse(self.fingerprint.matches())
+
+        self.fingerprint.record(self.ffmpeg_path)
+        self.assertEqual(self.ffmpeg_version.call_count, 1)
+        self.assertTrue(self.fingerprint.matches())
+        self.assertEqual(self.ffmpeg_version.call_count, 1)
+
+    def test_changes_are_detected(self):
+        """Đổi phiên bản thư viện hoặc file ffmpeg làm dấu vân tay không còn khớp"""
+        self.fingerprint.record(self.ffmpeg_path)
+
+        with patch.object(startup_fingerprint, 'package_versions', return_value={"requests": "0.0"}):
+            self.assertFalse(self.fingerprint.matches())
+
+        with open(self.ffmpeg_path, 'ab') as f:
+            f.write(b" updated")
+        self.assertFalse(self.fingerprint.matches())
+
+    def test_revalidate_invalidates_on_mismatch(self):
+        """Kiểm tra lại trong nền xóa dấu vân tay khi môi trường đã đổi"""
+        self.fingerprint.record(self.ffmpeg_path)
+        self.assertTrue(self.fingerprint.revalidate(self.ffmpeg_path))
+
+        self.ffmpeg_version.return_value = None  # ffmpeg không còn chạy được
+        self.assertFalse(self.fingerprint.revalidate(self.ffmpeg_path))
+        self.assertIsNone(self.fingerprint.load())
+        self.assertFalse(self.fingerprint.matches())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Kiểm thử cho startup_pipeline.py
+"""
+import os
+import sys
+import time
+import queue
+import threading
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.startup_pipeline import StartupPipeline
+
+class TestStartupPipeline(unittest.TestCase):
+    """Test cho StartupPipeline"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: hàng đợi thay cho vòng lặp sự kiện giao diện"""
+        self.calls = queue.Queue()
+        self.owner = threading.get_ident()
+        self.order = []
+        self.pipeline = StartupPipeline(self.calls.put, on_finished=lambda: self.order.append("finished"))
+
+    def run_until_done(self, timeout=5):
+        """Chạy các hàm được gửi về luồng sở hữu cho đến khi pipeline xong"""
+        deadline = time.monotonic() + timeout
+        while not self.pipeline.done:
+            self.calls.get(timeout=max(0.01, deadline - time.monotonic()))()
+
+    def blocking_step(self, key, delay):
+        """Bước có phần việc chặn chạy trên luồng phụ"""
+        def start():
+            def work():
+                time.sleep(delay)
+                return threading.get_ident()
+
+            def done(thread_id, error):
+                # Kết quả được trả về luồng sở hữu
+                self.assertEqual(threading.get_ident(), self.owner)
+                self.assertNotEqual(thread_id, self.owner)
+                self.order.append(key)
+                self.pipeline.finish(key)
+
+            self.pipeline.submit(work, done)
+        return start
+
+    def test_independent_steps_run_concurrently(self):
+        """Các bước độc lập chạy đồng thời, bước phụ thuộc chờ đủ điều kiện"""
+        for key in ("a", "b", "c"):
+            self.pipeline.add_step(key, self.blocking_step(key, 0.2))
+        self.pipeline.add_step("d", self.blocking_step("d", 0), deps=("a", "b", "c"))
+
+        start = time.perf_counter()
+        self.pipeline.run()
+        self.run_until_done()
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.5)  # Tuần tự sẽ mất ít nhất 0.6 giây
+        self.assertEqual(sorted(self.order[:3]), ["a", "b", "c"])
+        self.assertEqual(self.order[3:], ["d", "finished"])
+
+        timings = self.pipeline.timings()
+        self.assertGreaterEqual(timings["d"]["start"], max(timings[k]["end"] for k in "abc"))
+        self.assertIn("Thời gian khởi động", self.pipeline.timing_report())
+
+    def test_synchronous_steps_and_errors(self):
+        """Bước xong ngay trong start() và bước lỗi khi bắt đầu vẫn mở khóa các bước sau"""
+        def broken():
+            raise RuntimeError("lỗi")
+
+        self.pipeline.add_step("sync", lambda: self.pipeline.finish("sync"))
+        self.pipeline.add_step("broken", broken, deps=("sync",))
+        self.pipeline.add_step("last", lambda: self.pipeline.finish("last"), deps=("broken",))
+        self.pipeline.run()
+
+        self.assertTrue(self.pipeline.done)
+        self.assertEqual(self.order, ["finished"])
+        self.assertEqual(self.pipeline.timings()["broken"]["status"], "error")
+
+        with self.assertRaises(ValueError):
+            self.pipeline.add_step("x", lambda: None, deps=("missing",))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Kiểm thử cho các hàm FFmpeg trong main_tab/ui_helpers.py (cần PyQt5)
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+import importlib.util
+from unittest.mock import patch
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+HAS_PYQT5 = importlib.util.find_spec("PyQt5") is not None
+
+if HAS_PYQT5:
+    from src.utils.main_tab import ui_helpers
+
+class FakeRegistry:
+    """Registry giả: FFmpeg có sẵn tại đường dẫn cố định"""
+
+    def resolve(self, refresh=False):
+        return {'ffmpeg': '/opt/ffmpeg/ffmpeg', 'ffprobe': '/opt/ffmpeg/ffprobe'}
+
+    def is_available(self):
+        return True
+
+def fake_run(cmd, *args, **kwargs):
+    """ffprobe trả về thời lượng 10 giây, ffmpeg tạo file frame đầu ra"""
+    if cmd[0].endswith('ffprobe'):
+        return subprocess.CompletedProcess(cmd, 0, stdout="10.0\n", stderr="")
+    with open(cmd[-1], 'wb') as f:
+        f.write(b"jpg")
+    return subprocess.CompletedProcess(cmd, 0, stdout=b"", stderr=b"")
+
+@unittest.skipUnless(HAS_PYQT5, "Cần PyQt5")
+class TestFFmpegHelpers(unittest.TestCase):
+    """Test cho extract_frames_ffmpeg và check_ffmpeg_installed"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: dùng registry giả"""
+        self.temp_dir = tempfile.mkdtemp()
+        for patcher in (patch.object(ui_helpers, 'get_registry', FakeRegistry),
+                        patch.object(ui_helpers.tempfile, 'gettempdir', lambda: self.temp_dir)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_check_ffmpeg_installed(self):
+        """Dùng registry dùng chung để kiểm tra FFmpeg"""
+        self.assertTrue(ui_helpers.check_ffmpeg_installed())
+
+    def test_extract_frames_ffmpeg(self):
+        """Trích xuất 5 frame bằng FFmpeg lấy từ registry"""
+        with patch('subprocess.run', side_effect=fake_run) as run:
+            frames = ui_helpers.extract_frames_ffmpeg("/videos/clip.mp4")
+
+        self.assertEqual(len(frames), 5)
+        self.assertTrue(all(os.path.exists(frame) for frame in frames))
+        self.assertEqual(run.call_args_list[0].args[0][0], '/opt/ffmpeg/ffprobe')
+        self.assertEqual(run.call_args_list[1].args[0][0], '/opt/ffmpeg/ffmpeg')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,308 @@
+"""
+Kiểm thử cho upload_history.py (lưu trữ SQLite)
+"""
+import os
+import sys
+import json
+import stat
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.upload_history import UploadHistory, BACKEND_SQLITE
+
+class TestUploadHistorySQLite(unittest.TestCase):
+    """Test cho UploadHistory dùng SQLite"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'upload_history.db')
+        self.json_file = os.path.join(self.temp_dir, 'upload_history.json')
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_backend_selected_by_extension(self):
+        """File .db dùng SQLite"""
+        history = UploadHistory(self.db_file)
+        self.assertEqual(history.backend, BACKEND_SQLITE)
+        history.close()
+
+    def test_changes_persist_across_reopen(self):
+        """Thêm, đánh dấu trùng và xóa được ghi ngay vào SQLite"""
+        history = UploadHistory(self.db_file)
+        history.add_upload('hash1', 'a.mp4', '/videos/a.mp4', 100)
+        history.add_upload('hash2', 'b.mp4', '/videos/b.mp4', 200)
+        history.add_duplicate('hash3', 'hash1')
+        history.add_duplicate('hash3', 'hash2')
+        history.remove_upload('hash2')
+        history.close()
+
+        history = UploadHistory(self.db_file)
+        self.assertTrue(history.is_uploaded('hash1'))
+        self.assertFalse(history.is_uploaded('hash2'))
+        self.assertEqual(history.get_duplicates_of('hash3'), ['hash1'])
+        self.assertEqual(list(history.find_by_path('/videos/a.mp4')), ['hash1'])
+        self.assertEqual(list(history.find_by_filename('a.mp4')), ['hash1'])
+        history.close()
+
+    def test_find_by_filename_sees_pending_writes(self):
+        """Tra theo tên file từ bộ nhớ: thấy ngay mục chưa được ghi trễ xuống SQLite"""
+        history = UploadHistory(self.db_file, write_behind=True)
+        history.add_upload('hash1', 'a.mp4', '/videos/a.mp4', 100)
+        self.assertEqual(list(history.find_by_filename('a.mp4')), ['hash1'])
+        history.remove_upload('hash1')
+        self.assertEqual(history.find_by_filename('a.mp4'), {})
+        history.close()
+
+    def test_lookup_many(self):
+        """Tra cứu nhiều hash một lần chỉ từ bộ nhớ, không ghi các thay đổi đang chờ"""
+        history = UploadHistory(self.db_file, write_behind=True)
+        history.add_upload('hash1', 'a.mp4', '/videos/a.mp4', 100)
+        history.add_upload('hash2', 'b.mp4', '/videos/b.mp4', 200)
+        history.remove_upload('hash2')
+
+        with patch.object(history.store, 'get_many', side_effect=AssertionError("truy vấn cơ sở dữ liệu")):
+            result = history.lookup_many(['hash1', 'hash2', None, 'unknown'])
+        self.assertEqual(sorted(result), ['hash1'])
+        self.assertEqual(result['hash1']['filename'], 'a.mp4')
+        # Ghi nền vẫn giữ nguyên các thay đổi đang chờ
+        self.assertTrue(history._pending)
+        history.close()
+
+    def test_one_time_json_migration(self):
+        """Dữ liệu JSON cũ được chuyển sang SQLite đúng một lần"""
+        with open(self.json_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'uploads': {'hash1': {'filename': 'a.mp4', 'path': '/videos/a.mp4',
+                                      'upload_date': '2024-01-01 10:00:00', 'file_size': 100}},
+                'duplicates': {'hash2': ['hash1']}
+            }, f)
+
+        history = UploadHistory(self.db_file)
+        self.assertEqual(history.get_upload_info('hash1')['filename'], 'a.mp4')
+        self.assertEqual(history.get_duplicates_of('hash2'), ['hash1'])
+        history.remove_upload('hash1')
+        history.close()
+
+        # Mở lại: không chuyển lại dữ liệu từ JSON
+        history = UploadHistory(self.db_file)
+        self.assertFalse(history.is_uploaded('hash1'))
+        history.close()
+
+
+class TestUploadHistoryWriteBehind(unittest.TestCase):
+    """Test cho chế độ ghi trễ"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.json_file = os.path.join(self.temp_dir, 'upload_history.json')
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_changes_are_flushed_on_close(self):
+        """Các thay đổi được gom lại và ghi khi đóng, không để lại file tạm"""
+        history = UploadHistory(self.json_file, write_behind=True, flush_interval=60)
+        for i in range(50):
+            history.add_upload(f'hash{i}', f'{i}.mp4', f'/videos/{i}.mp4', i)
+        history.remove_upload('hash0')
+        self.assertFalse(os.path.exists(self.json_file))
+
+        history.close()
+
+        self.assertEqual(os.listdir(self.temp_dir), ['upload_history.json'])
+        reloaded = UploadHistory(self.json_file)
+        self.assertEqual(len(reloaded.get_all_uploads()), 49)
+        self.assertFalse(reloaded.is_uploaded('hash0'))
+
+    def test_flush_when_threshold_reached(self):
+        """Đủ số thay đổi thì thread nền ghi ngay, không chờ hết thời gian"""
+        db_file = os.path.join(self.temp_dir, 'upload_history.db')
+        history = UploadHistory(db_file, write_behind=True, flush_interval=60, max_pending=10)
+        for i in range(10):
+            history.add_upload(f'hash{i}', f'{i}.mp4', f'/videos/{i}.mp4', i)
+
+        deadline = time.time() + 5
+        while history.store.count() < 10 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(history.store.count(), 10)
+        history.close()
+
+
+class TestUploadHistoryIndexes(unittest.TestCase):
+    """Test cho các chỉ mục phụ trong bộ nhớ"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.history = UploadHistory(os.path.join(self.temp_dir, 'upload_history.json'))
+        self.history.add_upload('hash1', 'Summer_Beach.mp4', '/videos/trip/Summer_Beach.mp4', 1, '2024-05-01 10:00:00')
+        self.history.add_upload('hash2', 'beach-night.mkv', '/videos/beach-night.mkv', 2, '2024-06-01 10:00:00')
+        self.history.add_upload('hash3', 'city.mp4', '/videos/city.mp4', 3, '2024-06-02 10:00:00')
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_search_by_substring(self):
+        """Tìm chuỗi con trên tên file, đường dẫn và ngày tải lên, như lọc tuần tự"""
+        self.assertEqual(list(self.history.search('beach')), ['hash1', 'hash2'])
+        self.assertEqual(list(self.history.search('BEACH-N')), ['hash2'])
+        self.assertEqual(list(self.history.search('trip')), ['hash1'])
+        self.assertEqual(list(self.history.search('2024-06')), ['hash2', 'hash3'])
+        self.assertEqual(list(self.history.search('.mp4')), ['hash1', 'hash3'])
+        # Giữa từ và chuỗi ngắn hơn một trigram
+        self.assertEqual(list(self.history.search('ummer_bea')), ['hash1'])
+        self.assertEqual(list(self.history.search('ty')), ['hash3'])
+        self.assertEqual(self.history.search('xyz'), {})
+
+        # Kết quả giống lọc tuần tự trên toàn bộ lịch sử
+        for term in ('each', 'videos/', '_', '10:00', 'ght.mk'):
+            expected = sorted(h for h, info in self.history.get_all_uploads().items()
+                              if any(term in str(info[field]).lower() for field in ('filename', 'path', 'upload_date')))
+            self.assertEqual(sorted(self.history.search(term)), expected)
+
+        # Chỉ mục được cập nhật khi thêm/xóa
+        self.history.remove_upload('hash2')
+        self.assertEqual(list(self.history.search('beach')), ['hash1'])
+
+    def test_reverse_duplicate_index(self):
+        """Quan hệ trùng lặp tra được hai chiều và được dọn khi xóa"""
+        self.history.add_duplicate('hash2', 'hash1')
+        self.history.add_duplicate('hash3', 'hash1')
+
+        self.assertEqual(self.history.get_related_duplicates('hash1'), ['hash2', 'hash3'])
+        self.assertEqual(self.history.get_related_duplicates('hash2'), ['hash1'])
+
+        self.history.remove_upload('hash1')
+        self.assertEqual(self.history.duplicates, {})
+        self.assertEqual(self.history.get_related_duplicates('hash2'), [])
+
+    def test_find_by_path(self):
+        """Tra hash theo đường dẫn"""
+        self.assertEqual(list(self.history.find_by_path('/videos/city.mp4')), ['hash3'])
+        self.history.remove_upload('hash3')
+        self.assertEqual(self.history.find_by_path('/videos/city.mp4'), {})
+
+
+class TestUploadHistoryRetention(unittest.TestCase):
+    """Test cho lưu trữ lịch sử cũ"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'upload_history.db')
+        self.archive_dir = os.path.join(self.temp_dir, 'upload_history_archive')
+
+        history = UploadHistory(self.db_file)
+        for i in range(100):
+            history.add_upload(f'old{i}', f'old{i}.mp4', f'/videos/old{i}.mp4', i, '2020-01-01 00:00:00')
+        history.add_upload('recent', 'recent.mp4', '/videos/recent.mp4', 1)
+        history.add_duplicate('recent', 'old1')
+        history.close()
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_old_entries_archived_and_still_found(self):
+        """Mục cũ được chuyển vào segment nén nhưng vẫn tra cứu được"""
+        history = UploadHistory(self.db_file, retention_days=30)
+
+        self.assertEqual(list(history.get_all_uploads()), ['recent'])
+        self.assertEqual(history.archive.count(), 100)
+        self.assertTrue(history.is_uploaded('old5'))
+        self.assertFalse(history.is_uploaded('never'))
+        self.assertEqual(history.get_upload_info('old7')['filename'], 'old7.mp4')
+        self.assertEqual(sorted(history.lookup_many(['old1', 'recent', 'never'])), ['old1', 'recent'])
+        self.assertEqual(history.get_duplicate_files('recent')[0]['filename'], 'old1.mp4')
+        history.close()
+
+        # Lần mở sau chỉ đọc phần gần đây, kho lưu trữ vẫn còn
+        history = UploadHistory(self.db_file, retention_days=30)
+        self.assertEqual(len(history.get_all_uploads()), 1)
+        self.assertTrue(history.is_uploaded('old99'))
+        self.assertEqual(history.store.count(), 1)
+        history.close()
+
+        segments = [name for name in os.listdir(self.archive_dir) if name.endswith('.json.gz')]
+        self.assertEqual(len(segments), 1)
+        # Segment chỉ đọc
+        mode = os.stat(os.path.join(self.archive_dir, segments[0])).st_mode
+        self.assertFalse(mode & stat.S_IWUSR)
+
+    def test_small_segments_are_merged(self):
+        """Mỗi lần khởi động lưu trữ thêm vài mục: gộp vào segment cũ thay vì tạo segment mới"""
+        UploadHistory(self.db_file, retention_days=30).close()
+        for day in range(3):
+            history = UploadHistory(self.db_file)
+            history.add_upload(f'later{day}', f'later{day}.mp4', f'/videos/later{day}.mp4', 1, f'2021-01-0{day + 1} 00:00:00')
+            history.close()
+            UploadHistory(self.db_file, retention_days=30).close()
+
+        history = UploadHistory(self.db_file, retention_days=30)
+        self.assertEqual(history.archive.count(), 103)
+        self.assertTrue(history.is_uploaded('old3'))
+        self.assertTrue(history.is_uploaded('later2'))
+        history.close()
+
+        segments = [name for name in os.listdir(self.archive_dir) if name.endswith('.json.gz')]
+        self.assertEqual(len(segments), 1)
+
+    def test_archived_entries_searchable_and_removable(self):
+        """Tìm kiếm và xóa có tác dụng với cả các mục đã lưu trữ"""
+        history = UploadHistory(self.db_file, retention_days=30)
+        self.assertEqual(list(history.search('old42')), ['old42'])
+        self.assertEqual(sorted(history.search('recent.mp4')), ['recent'])
+        self.assertEqual(list(history.find_by_filename('old42.mp4')), ['old42'])
+
+        self.assertTrue(history.remove_upload('old42'))
+        self.assertFalse(history.is_uploaded('old42'))
+        self.assertEqual(history.search('old42'), {})
+        self.assertEqual(history.archive.count(), 99)
+        self.assertFalse(history.remove_upload('old42'))
+
+        # Quan hệ trùng lặp với mục đã lưu trữ được dọn cùng
+        self.assertTrue(history.remove_upload('old1'))
+        self.assertEqual(history.get_duplicates_of('recent'), [])
+        history.close()
+
+        history = UploadHistory(self.db_file, retention_days=30)
+        self.assertFalse(history.is_uploaded('old42'))
+        self.assertTrue(history.is_uploaded('old43'))
+        self.assertEqual(history.get_duplicates_of('recent'), [])
+        history.close()
+
+    def test_search_skips_segments_without_match(self):
+        """Tìm kiếm chỉ giải nén segment có thể chứa chuỗi cần tìm"""
+        history = UploadHistory(self.db_file, retention_days=30)
+        archive = history.archive
+        with patch.object(archive, '_read_segment', wraps=archive._read_segment) as read_segment:
+            self.assertEqual(history.search('nothing-like-this'), {})
+            read_segment.assert_not_called()
+            self.assertEqual(list(history.search('old42.mp4')), ['old42'])
+            self.assertEqual(read_segment.call_count, 1)
+        history.close()
+
+    def test_reuploaded_archived_video_removed_everywhere(self):
+        """Video tải lên lại sau khi đã lưu trữ bị xóa khỏi cả lịch sử chính và kho lưu trữ"""
+        history = UploadHistory(self.db_file, retention_days=30)
+        history.add_upload('old5', 'old5.mp4', '/videos/old5.mp4', 5)
+        self.assertTrue(history.remove_upload('old5'))
+        self.assertFalse(history.is_uploaded('old5'))
+        self.assertEqual(history.archive.count(), 99)
+        history.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Kiểm thử cho upload_job_queue.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.upload_job_queue import (
+    UploadJobQueue, default_db_file, STATUS_PENDING, STATUS_IN_FLIGHT, STATUS_DONE, STATUS_FAILED,
+    SOURCE_MANUAL, SOURCE_AUTO, SOURCE_BULK
+)
+
+class TestUploadJobQueue(unittest.TestCase):
+    """Test cho UploadJobQueue"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'upload_jobs.db')
+        self.job_queue = UploadJobQueue(self.db_file)
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        self.job_queue.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_enqueue_is_idempotent(self):
+        """Thêm cùng một file hai lần chỉ tạo một công việc"""
+        first = self.job_queue.enqueue('/videos/a.mp4', source=SOURCE_BULK)
+        second = self.job_queue.enqueue('/videos/a.mp4', source=SOURCE_BULK)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.job_queue.count(STATUS_PENDING), 1)
+
+    def test_claim_and_complete(self):
+        """Công việc chuyển từ pending sang in_flight rồi done"""
+        job_id = self.job_queue.enqueue('/videos/a.mp4', source=SOURCE_AUTO)
+
+        job = self.job_queue.claim_next(sources=SOURCE_AUTO)
+        self.assertEqual(job['id'], job_id)
+        self.assertEqual(job['status'], STATUS_IN_FLIGHT)
+        self.assertEqual(job['attempts'], 1)
+        self.assertIsNone(self.job_queue.claim_next(sources=SOURCE_AUTO))
+
+        self.job_queue.complete(job_id)
+        self.assertEqual(self.job_queue.get_job(job_id)['status'], STATUS_DONE)
+
+    def test_fail_retries_until_max_attempts(self):
+        """Công việc lỗi được thử lại cho tới khi hết lượt"""
+        job_id = self.job_queue.enqueue('/videos/a.mp4', max_attempts=2)
+
+        self.job_queue.claim_next()
+        self.assertEqual(self.job_queue.fail(job_id, 'Lỗi mạng'), STATUS_PENDING)
+
+        self.job_queue.claim_next()
+        self.assertEqual(self.job_queue.fail(job_id, 'Lỗi mạng'), STATUS_FAILED)
+        self.assertEqual(self.job_queue.get_job(job_id)['last_error'], 'Lỗi mạng')
+
+    def _enqueue_sized(self, name, size, source):
+        """Tạo file có kích thước cho trước rồi thêm vào hàng đợi"""
+        file_path = os.path.join(self.temp_dir, name)
+        with open(file_path, 'wb') as f:
+            f.truncate(size)
+        return self.job_queue.enqueue(file_path, source=source)
+
+    def test_small_files_first_within_source(self):
+        """Trong cùng một nguồn, file nhỏ được lấy trước file lớn"""
+        large = self._enqueue_sized('large.mp4', 50 * 1024 * 1024, SOURCE_BULK)
+        small = self._enqueue_sized('small.mp4', 1024, SOURCE_BULK)
+
+        self.assertEqual(self.job_queue.claim_next()['id'], small)
+        self.assertEqual(self.job_queue.claim_next()['id'], large)
+
+    def test_auto_jobs_served_ahead_of_bulk_backlog(self):
+        """File mới phát hiện được phục vụ nhiều hơn phần tồn đọng nhưng bulk không bị bỏ đói"""
+        for i in range(10):
+            self._enqueue_sized(f'bulk{i}.mp4', 1024, SOURCE_BULK)
+        for i in range(4):
+            self._enqueue_sized(f'auto{i}.mp4', 1024, SOURCE_AUTO)
+
+        claimed = [self.job_queue.claim_next()['source'] for _ in range(5)]
+        self.assertEqual(claimed.count(SOURCE_AUTO), 4)
+        self.assertEqual(claimed.count(SOURCE_BULK), 1)
+
+    def test_workers_claim_only_their_own_source(self):
+        """Mỗi worker nền chỉ nhận việc của nguồn mình, lượt vẫn được chia theo bộ lập lịch"""
+        bulk = self._enqueue_sized('bulk.mp4', 1024, SOURCE_BULK)
+        auto = self._enqueue_sized('auto.mp4', 1024, SOURCE_AUTO)
+        self.job_queue.attach_worker(SOURCE_AUTO)
+        self.job_queue.attach_worker(SOURCE_BULK)
+
+        # Tới lượt nguồn auto: worker hàng loạt chờ thay vì lấy việc của worker tự động
+        self.assertIsNone(self.job_queue.claim_next(sources=SOURCE_BULK))
+        self.assertEqual(self.job_queue.claim_next(sources=SOURCE_AUTO)['id'], auto)
+        self.assertEqual(self.job_queue.claim_next(sources=SOURCE_BULK)['id'], bulk)
+
+    def test_worker_not_blocked_by_detached_source(self):
+        """Nguồn không có worker đang chạy không chiếm lượt của worker khác"""
+        bulk = self._enqueue_sized('bulk.mp4', 1024, SOURCE_BULK)
+        self._enqueue_sized('auto.mp4', 1024, SOURCE_AUTO)
+        self.job_queue.attach_worker(SOURCE_AUTO)
+        self.job_queue.detach_worker(SOURCE_AUTO)
+
+        self.assertEqual(self.job_queue.claim_next(sources=SOURCE_BULK)['id'], bulk)
+
+    def test_background_yields_to_manual(self):
+        """Worker nền nhường lượt khi đang có video tải lên thủ công"""
+        self._enqueue_sized('bulk.mp4', 1024, SOURCE_BULK)
+        manual = self._enqueue_sized('manual.mp4', 1024, SOURCE_MANUAL)
+
+        self.assertIsNone(self.job_queue.claim_next(sources=SOURCE_BULK, yield_to_manual=True))
+
+        self.job_queue.start_job(manual)
+        self.job_queue.complete(manual)
+        self.assertIsNotNone(self.job_queue.claim_next(sources=SOURCE_BULK, yield_to_manual=True))
+
+    def test_recover_in_flight_after_restart(self):
+        """Công việc đang tải lên khi ứng dụng tắt được khôi phục ở lần chạy sau"""
+        job_id = self.job_queue.enqueue('/videos/a.mp4', source=SOURCE_BULK)
+        self.job_queue.claim_next()
+        self.job_queue.close()
+
+        self.job_queue = UploadJobQueue(self.db_file)
+        job = self.job_queue.get_job(job_id)
+        self.assertEqual(job['status'], STATUS_PENDING)
+        self.assertEqual(job['attempts'], 1)
+
+    def test_default_db_file_is_in_data_dir(self):
+        """Hàng đợi mặc định nằm trong data/ của ứng dụng, không phụ thuộc thư mục hiện hành"""
+        repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        self.assertEqual(default_db_file(), os.path.join(repo_root, 'data', 'upload_jobs.db'))
+
+
+if __name__ == '__main__':
+    unittest.main()
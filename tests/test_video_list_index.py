@@ -0,0 +1,79 @@
+"""
+Kiểm thử cho video_list_index.py
+"""
+import os
+import sys
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.video_list_index import VideoListIndex, SORT_NAME, SORT_SIZE, SORT_DURATION, SORT_STATUS
+
+def make_video(name, size=0, status="new", duration=0):
+    return {"name": name, "path": f"/videos/{name}", "file_size_bytes": size,
+            "status": status, "duration": duration}
+
+class TestVideoListIndex(unittest.TestCase):
+    """Test cho VideoListIndex"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case"""
+        self.videos = [
+            make_video("Beach_Trip.mp4", 30, "uploaded", 12),
+            make_video("birthday.MKV", 10, "new", 50),
+            make_video("beach_party.mp4", 20, "duplicate", 7),
+            make_video("concert.avi", 40, "new", 30),
+        ]
+        self.index = VideoListIndex(self.videos)
+
+    def names(self, videos):
+        return [video["name"] for video in videos]
+
+    def test_sorted_views(self):
+        """Sắp xếp theo tên (không phân biệt hoa thường), kích thước và trạng thái"""
+        self.assertEqual(self.names(self.index.sorted(SORT_NAME)),
+                         ["beach_party.mp4", "Beach_Trip.mp4", "birthday.MKV", "concert.avi"])
+        self.assertEqual(self.names(self.index.sorted(SORT_SIZE, reverse=True)),
+                         ["concert.avi", "Beach_Trip.mp4", "beach_party.mp4", "birthday.MKV"])
+        self.assertEqual(self.names(self.index.sorted(SORT_STATUS))[:2],
+                         ["Beach_Trip.mp4", "beach_party.mp4"])
+
+    def test_filter_matches_substring_in_sort_order(self):
+        """Lọc theo chuỗi con (trigram và truy vấn ngắn), giữ thứ tự sắp xếp"""
+        self.assertEqual(self.names(self.index.filter("BEACH", SORT_SIZE)),
+                         ["beach_party.mp4", "Beach_Trip.mp4"])
+        self.assertEqual(self.names(self.index.filter("rt", SORT_NAME)),
+                         ["beach_party.mp4", "birthday.MKV", "concert.avi"])
+        self.assertEqual(self.index.filter("xyz"), [])
+
+    def test_incremental_narrowing_matches_full_scan(self):
+        """Kết quả khi gõ thêm từng ký tự giống với lọc lại từ đầu"""
+        query = ""
+        for char in "beach_t":
+            query += char
+            expected = [video for video in self.videos if query in video["name"].casefold()]
+            self.assertEqual(self.index.filter(query), expected)
+
+    def test_add_and_invalidate(self):
+        """Video thêm sau và khóa đã thay đổi được phản ánh trong kết quả"""
+        self.index.sorted(SORT_DURATION)
+        self.index.add([make_video("beach_drone.mov", 5, duration=100)])
+        self.assertEqual(self.index.sorted(SORT_DURATION, reverse=True)[0]["name"], "beach_drone.mov")
+        self.assertEqual(len(self.index.filter("beach")), 3)
+
+        self.videos[1]["duration"] = 500
+        self.index.invalidate(SORT_DURATION)
+        self.assertEqual(self.index.sorted(SORT_DURATION, reverse=True)[0]["name"], "birthday.MKV")
+
+    def test_holds_detects_replaced_list(self):
+        """Danh sách cùng số lượng nhưng khác video không được coi là khớp"""
+        self.assertTrue(self.index.holds(list(reversed(self.videos))))
+
+        replaced = [dict(video) for video in self.videos]
+        self.assertFalse(self.index.holds(replaced))
+        self.assertFalse(self.index.holds(self.videos[:3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Kiểm thử cho video_metadata.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Thêm thư mục gốc vào path để import các module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.video_metadata import VideoMetadataService, parse_probe
+from src.utils.cache_eviction import CacheEvictionEngine
+
+def probe_output(duration="12.5"):
+    """Kết quả JSON giả của ffprobe: một stream video, một stream audio, keyframe mỗi 2 giây"""
+    packets = []
+    for i in range(10):
+        packets.append({'stream_index': 0, 'pts_time': f"{i * 0.5:.6f}", 'flags': "K__" if i % 4 == 0 else "___"})
+        packets.append({'stream_index': 1, 'pts_time': f"{i * 0.5:.6f}", 'flags': "K__"})
+    return {
+        'streams': [
+            {'index': 0, 'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, 'height': 1080,
+             'avg_frame_rate': '30000/1001'},
+            {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac'}
+        ],
+        'format': {'format_name': 'mov,mp4,m4a,3gp,3g2,mj2', 'duration': duration, 'bit_rate': '4000000'},
+        'packets': packets
+    }
+
+class TestVideoMetadataService(unittest.TestCase):
+    """Test cho VideoMetadataService"""
+
+    def setUp(self):
+        """Thiết lập trước mỗi test case: các file video giả và ffprobe giả"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(8):
+            path = os.path.join(self.temp_dir, f"video_{i}.mp4")
+            with open(path, 'wb') as f:
+                f.write(b"x" * (i + 1))
+            self.paths.append(path)
+
+        self.service = VideoMetadataService(max_workers=3)
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+        self.counter_lock = threading.Lock()
+
+        def fake_ffprobe(path):
+            with self.counter_lock:
+                self.calls.append(path)
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(0.02)
+            with self.counter_lock:
+                self.running -= 1
+            return probe_output()
+
+        self.service._run_ffprobe = fake_ffprobe
+
+    def tearDown(self):
+        """Dọn dẹp sau mỗi test case"""
+        self.service.shutdown(wait=True)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parse_probe(self):
+        """Một kết quả ffprobe cho đủ codec, kích thước, thời lượng, bitrate, fps, keyframe"""
+        info = parse_probe(probe_output())
+        self.assertEqual(info['codec'], 'h264')
+        self.assertEqual((info['width'], info['height']), (1920, 1080))
+        self.assertEqual(info['duration'], 12.5)
+        self.assertEqual(info['bitrate'], 4000000)
+        self.assertAlmostEqual(info['fps'], 29.97, places=2)
+        self.assertEqual(info['keyframe_interval'], 2.0)
+        self.assertEqual(info['audio_codec'], 'aac')
+        self.assertIsNone(parse_probe({'streams': [{'index': 0, 'codec_type': 'audio'}]}))
+
+    def test_probe_many_is_bounded_and_cached(self):
+        """Chạy song song tối đa max_workers; lần sau lấy từ cache"""
+        results = self.service.probe_many(self.paths)
+        self.assertEqual(len(self.calls), len(self.paths))
+        self.assertTrue(all(info['duration'] == 12.5 for info in results.values()))
+        self.assertGreater(self.max_running, 1)
+        self.assertLessEqual(self.max_running, 3)
+
+        self.service.probe_many(self.paths)
+        self.assertEqual(len(self.calls), len(self.paths))
+
+    def test_changed_file_is_probed_again(self):
+        """Yêu cầu trùng nhau chỉ chạy một lần; file đổi thì đọc lại"""
+        futures = [self.service.submit(self.paths[0]) for _ in range(5)]
+        self.assertTrue(all(future.result() for future in futures))
+        self.assertEqual(len(self.calls), 1)
+
+        with open(self.paths[0], 'ab') as f:
+            f.write(b"more")
+        self.assertEqual(self.service.probe(self.paths[0])['size'], 5)
+        self.assertEqual(len(self.calls), 2)
+
+        self.assertIsNone(self.service.probe(os.path.join(self.temp_dir, "missing.mp4")))
+
+    def test_results_reused_from_disk_cache(self):
+        """Kết quả lưu trong cache trên đĩa được dùng lại sau khi khởi động lại, tính là lần trúng cache"""
+        engine = CacheEvictionEngine(os.path.join(self.temp_dir, "cache"), ':memory:')
+        self.addCleanup(engine.close)
+        self.service.set_disk_cache(engine)
+        first = self.service.probe(self.paths[0])
+        self.assertEqual(len(self.calls), 1)
+        self.assertGreater(engine.usage()['probe_results'], 0)
+
+        # Dịch vụ mới (bộ nhớ đệm trống) không chạy lại ffprobe
+        restarted = VideoMetadataService(max_workers=1)
+        restarted._run_ffprobe = self.service._run_ffprobe
+        restarted.set_disk_cache(engine)
+        self.addCleanup(restarted.shutdown, True)
+        self.assertEqual(restarted.probe(self.paths[0]), first)
+        self.assertEqual(len(self.calls), 1)
+
+        metrics = engine.metrics()
+        self.assertEqual((metrics['hits'], metrics['misses']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()